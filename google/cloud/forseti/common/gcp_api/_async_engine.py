@@ -0,0 +1,370 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Asyncio execution engines for the GCP API repositories.
+
+An engine sends the HttpRequest objects built by googleapiclient without
+blocking the event loop. AiohttpEngine is used when the optional aiohttp
+package is installed, it shares a pool of keep-alive connections between
+all requests of an event loop. Otherwise ThreadedEngine runs the blocking
+requests on a bounded thread pool.
+"""
+import asyncio
+import concurrent.futures
+import threading
+import time
+import weakref
+
+import httplib2
+from googleapiclient import errors
+import google.auth.transport.requests
+
+from google.cloud.forseti.common.util import http_helpers
+from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.common.util import retryable_exceptions
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+LOGGER = logger.get_logger(__name__)
+
+# Maximum number of requests an engine has in flight.
+DEFAULT_MAX_CONNECTIONS = 100
+
+# Retries, matching the retry decorator of GCPRepository._execute.
+RETRY_ATTEMPTS = 5
+RETRY_WAIT_MULTIPLIER = 1.0
+RETRY_WAIT_MAX = 10.0
+
+# Response statuses retried, as googleapiclient retries them in execute().
+RETRYABLE_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+# AsyncRateLimiter per RateLimiter, so the quota of an API is shared by all
+# of its repositories as in the synchronous path.
+_ASYNC_RATE_LIMITERS = weakref.WeakKeyDictionary()
+_ASYNC_RATE_LIMITERS_LOCK = threading.Lock()
+
+_DEFAULT_ENGINE = None
+_DEFAULT_ENGINE_LOCK = threading.Lock()
+
+
+class AsyncRateLimiter(object):
+    """Token bucket allowing max_calls per period, awaited asynchronously.
+
+    The bucket is not bound to an event loop, it can be shared by the
+    coroutines of several loops and threads.
+    """
+
+    def __init__(self, max_calls, period):
+        """Constructor.
+
+        Args:
+            max_calls (int): Allowed requests per period.
+            period (float): The time period to track requests over.
+        """
+        self.max_calls = max_calls
+        self.period = period
+        self._rate = float(max_calls) / period
+        self._tokens = float(max_calls)
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Take a token from the bucket.
+
+        Returns:
+            float: Seconds to wait until the token is available.
+        """
+        with self._lock:
+            now = time.time()
+            self._tokens = min(
+                self.max_calls,
+                self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0
+            return -self._tokens / self._rate
+
+    async def acquire(self):
+        """Wait until a call is allowed."""
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def __aenter__(self):
+        """Wait until a call is allowed.
+
+        Returns:
+            AsyncRateLimiter: This rate limiter.
+        """
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """Nothing to release, tokens are refilled over time.
+
+        Args:
+            *exc_info (list): Exception raised in the block, if any.
+        """
+
+
+def get_async_rate_limiter(rate_limiter):
+    """Get the asynchronous counterpart of a RateLimiter.
+
+    Args:
+        rate_limiter (RateLimiter): The rate limiter of an API, or None.
+
+    Returns:
+        AsyncRateLimiter: Token bucket with the same quota, or None.
+    """
+    if not rate_limiter:
+        return None
+    with _ASYNC_RATE_LIMITERS_LOCK:
+        async_rate_limiter = _ASYNC_RATE_LIMITERS.get(rate_limiter)
+        if not async_rate_limiter:
+            async_rate_limiter = AsyncRateLimiter(rate_limiter.max_calls,
+                                                  rate_limiter.period)
+            _ASYNC_RATE_LIMITERS[rate_limiter] = async_rate_limiter
+        return async_rate_limiter
+
+
+class ThreadedEngine(object):
+    """Runs the blocking requests on a bounded thread pool.
+
+    Each pool thread reuses the thread local http object of the repository,
+    so connections are kept alive between the requests of a thread.
+    """
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS):
+        """Constructor.
+
+        Args:
+            max_connections (int): Maximum number of requests in flight.
+        """
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_connections)
+
+    async def execute(self, repository, request):
+        """Execute a request.
+
+        Args:
+            repository (GCPRepository): The repository the request is for.
+            request (HttpRequest): The request to execute.
+
+        Returns:
+            dict: The response from the API.
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            repository._execute_request,  # pylint: disable=protected-access
+            request)
+
+    def is_retryable(self, error):
+        """Whether a failed request should be retried.
+
+        Error statuses are already retried by HttpRequest.execute.
+
+        Args:
+            error (Exception): The error raised by execute.
+
+        Returns:
+            bool: True if the request should be retried.
+        """
+        return retryable_exceptions.is_retryable_exception(error)
+
+    async def close(self):
+        """Nothing to close, the pool threads are reused by later loops."""
+
+
+class AiohttpEngine(object):
+    """Sends the requests with aiohttp, pooling connections per event loop."""
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS):
+        """Constructor.
+
+        Args:
+            max_connections (int): Maximum number of open connections per
+                event loop.
+
+        Raises:
+            ImportError: If aiohttp is not installed.
+        """
+        if not aiohttp:
+            raise ImportError('AiohttpEngine requires the aiohttp package.')
+        self._max_connections = max_connections
+        self._sessions = weakref.WeakKeyDictionary()
+        self._user_agent = http_helpers.build_user_agent(
+            'Python-aiohttp/{}'.format(aiohttp.__version__))
+
+    def _get_session(self):
+        """Get the client session of the running event loop.
+
+        Returns:
+            aiohttp.ClientSession: The session.
+        """
+        loop = asyncio.get_event_loop()
+        session = self._sessions.get(loop)
+        if not session or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._max_connections),
+                timeout=aiohttp.ClientTimeout(
+                    total=http_helpers.HTTP_REQUEST_TIMEOUT))
+            self._sessions[loop] = session
+        return session
+
+    @staticmethod
+    async def _authorize(credentials, headers):
+        """Add the authorization header, refreshing the token if needed.
+
+        Args:
+            credentials (Credentials): The credentials of the repository.
+            headers (dict): The request headers to update.
+        """
+        if not credentials.valid:
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(
+                None, credentials.refresh,
+                google.auth.transport.requests.Request())
+        credentials.apply(headers)
+
+    async def execute(self, repository, request):
+        """Execute a request.
+
+        Args:
+            repository (GCPRepository): The repository the request is for.
+            request (HttpRequest): The request to execute.
+
+        Returns:
+            dict: The response from the API.
+
+        Raises:
+            HttpError: If the API returned an error status.
+        """
+        headers = dict(request.headers)
+        headers['user-agent'] = self._user_agent
+        await self._authorize(
+            repository._credentials,  # pylint: disable=protected-access
+            headers)
+
+        session = self._get_session()
+        async with session.request(request.method, request.uri,
+                                   data=request.body,
+                                   headers=headers) as response:
+            content = await response.read()
+            response_headers = {key.lower(): value
+                                for key, value in response.headers.items()}
+            response_headers['status'] = str(response.status)
+
+        resp = httplib2.Response(response_headers)
+        if resp.status >= 300:
+            raise errors.HttpError(resp, content, uri=request.uri)
+        return request.postproc(resp, content)
+
+    def is_retryable(self, error):
+        """Whether a failed request should be retried.
+
+        Args:
+            error (Exception): The error raised by execute.
+
+        Returns:
+            bool: True if the request should be retried.
+        """
+        if isinstance(error, errors.HttpError):
+            return error.resp.status in RETRYABLE_STATUSES
+        return (isinstance(error, (aiohttp.ClientError,
+                                   asyncio.TimeoutError)) or
+                retryable_exceptions.is_retryable_exception(error))
+
+    async def close(self):
+        """Close the client session of the running event loop."""
+        session = self._sessions.pop(asyncio.get_event_loop(), None)
+        if session:
+            await session.close()
+
+
+def get_default_engine():
+    """Get the engine used when a repository is not given one.
+
+    Returns:
+        object: AiohttpEngine if aiohttp is installed, else ThreadedEngine.
+    """
+    global _DEFAULT_ENGINE  # pylint: disable=global-statement
+    with _DEFAULT_ENGINE_LOCK:
+        if not _DEFAULT_ENGINE:
+            if aiohttp:
+                _DEFAULT_ENGINE = AiohttpEngine()
+            else:
+                LOGGER.info('aiohttp not installed, asynchronous API requests '
+                            'run on a thread pool.')
+                _DEFAULT_ENGINE = ThreadedEngine()
+        return _DEFAULT_ENGINE
+
+
+async def execute_with_retries(engine, repository, request, rate_limiter):
+    """Execute a request, retrying transient errors with backoff.
+
+    Args:
+        engine (object): The engine sending the request.
+        repository (GCPRepository): The repository the request is for.
+        request (HttpRequest): The request to execute.
+        rate_limiter (AsyncRateLimiter): The quota of the API, or None.
+
+    Returns:
+        dict: The response from the API.
+    """
+    attempt = 1
+    while True:
+        if rate_limiter:
+            await rate_limiter.acquire()
+        try:
+            return await engine.execute(repository, request)
+        except Exception as e:  # pylint: disable=broad-except
+            if attempt >= RETRY_ATTEMPTS or not engine.is_retryable(e):
+                raise
+            LOGGER.debug('Retrying request %s after error: %s',
+                         request.uri, e)
+        await asyncio.sleep(
+            min(RETRY_WAIT_MULTIPLIER * 2 ** attempt, RETRY_WAIT_MAX))
+        attempt += 1
+
+
+def run_concurrently(coroutines, engine=None):
+    """Run coroutines on a new event loop until all of them are done.
+
+    Used to fan out the requests of many resources, e.g. the list pages of
+    all projects, on a single thread.
+
+    Args:
+        coroutines (list): The coroutines to run.
+        engine (object): The engine the coroutines send requests with, its
+            resources for the event loop are released at the end.
+
+    Returns:
+        list: The result of each coroutine, or the exception it raised, in
+            the order of the coroutines.
+    """
+    engine = engine or get_default_engine()
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(
+            asyncio.gather(*coroutines, return_exceptions=True))
+    finally:
+        loop.run_until_complete(engine.close())
+        asyncio.set_event_loop(None)
+        loop.close()
@@ -33,6 +33,7 @@ import uritemplate
 import google.auth
 from google.auth.credentials import with_scopes_if_required
 
+from google.cloud.forseti.common.gcp_api import _async_engine
 from google.cloud.forseti.common.gcp_api import _supported_apis
 from google.cloud.forseti.common.gcp_api import errors as api_errors
 from google.cloud.forseti.common.util import http_helpers
@@ -458,7 +459,7 @@ class GCPRepository(object):
         """
         if not self._request_supports_pagination(verb=verb):
             raise api_errors.PaginationNotSupportedError(
-                '{} does not support pagination')
+                '{} does not support pagination'.format(verb))
 
         request = self._build_request(verb, verb_arguments)
 
@@ -529,17 +530,110 @@ class GCPRepository(object):
         Returns:
             dict: The response from the API.
         """
-        if hasattr(self.http, 'data'):
-            if isinstance(self.http.data, str):
-                self.http.data = self.http.data.encode()
         if self._rate_limiter:
             # Since the ratelimiter library only exposes a context manager
             # interface the code has to be duplicated to handle the case where
             # no rate limiter is defined.
             with self._rate_limiter:
-                return request.execute(http=self.http,
-                                       num_retries=self._num_retries)
+                return self._execute_request(request)
+        return self._execute_request(request)
+
+    def _execute_request(self, request):
+        """Run execute on the thread local http object.
+
+        Args:
+            request (object): The HttpRequest object to execute.
+
+        Returns:
+            dict: The response from the API.
+        """
+        if hasattr(self.http, 'data'):
+            if isinstance(self.http.data, str):
+                self.http.data = self.http.data.encode()
         return request.execute(http=self.http,
                                num_retries=self._num_retries)
+
+    async def execute_command_async(self, verb, verb_arguments, engine=None):
+        """Executes command (ex. add) without blocking the event loop.
+
+        Args:
+            verb (str): Method to execute on the component (ex. get, list).
+            verb_arguments (dict): key-value pairs to be passed to
+                _build_request.
+            engine (object): The asyncio engine sending the request, defaults
+                to _async_engine.get_default_engine().
+
+        Returns:
+            dict: An async operation Service Response.
+        """
+        request = self._build_request(verb, verb_arguments)
+        return await self._execute_async(request, engine)
+
+    async def execute_paged_query_async(self, verb, verb_arguments,
+                                        engine=None):
+        """Executes query (ex. list) without blocking the event loop.
+
+        Args:
+            verb (str): Method to execute on the component (ex. get, list).
+            verb_arguments (dict): key-value pairs to be passed to
+                _BuildRequest.
+            engine (object): The asyncio engine sending the requests,
+                defaults to _async_engine.get_default_engine().
+
+        Yields:
+            dict: Service Response.
+
+        Raises:
+            PaginationNotSupportedError: When an API does not support paging.
+        """
+        if not self._request_supports_pagination(verb=verb):
+            raise api_errors.PaginationNotSupportedError(
+                '{} does not support pagination'.format(verb))
+
+        request = self._build_request(verb, verb_arguments)
+
+        number_of_pages_processed = 0
+        while request is not None:
+            response = await self._execute_async(request, engine)
+            number_of_pages_processed += 1
+            LOGGER.debug('Executing paged request # %s',
+                         number_of_pages_processed)
+            request = self._build_next_request(verb, request, response)
+            yield response
+
+    async def execute_query_async(self, verb, verb_arguments, engine=None):
+        """Executes query (ex. get) without blocking the event loop.
+
+        Args:
+            verb (str): Method to execute on the component (ex. get, list).
+            verb_arguments (dict): key-value pairs to be passed to
+                _BuildRequest.
+            engine (object): The asyncio engine sending the request, defaults
+                to _async_engine.get_default_engine().
+
+        Returns:
+            dict: Service Response.
+        """
+        request = self._build_request(verb, verb_arguments)
+        return await self._execute_async(request, engine)
+
+    async def _execute_async(self, request, engine=None):
+        """Run execute with retries and rate limiting on an asyncio engine.
+
+        The requests are not recorded or replayed.
+
+        Args:
+            request (object): The HttpRequest object to execute.
+            engine (object): The asyncio engine sending the request, defaults
+                to _async_engine.get_default_engine().
+
+        Returns:
+            dict: The response from the API.
+        """
+        return await _async_engine.execute_with_retries(
+            engine or _async_engine.get_default_engine(),
+            self,
+            request,
+            _async_engine.get_async_rate_limiter(self._rate_limiter))
 # pylint: enable=too-many-instance-attributes, too-many-arguments
 # pylint: enable=too-many-locals
@@ -59,6 +59,40 @@ class ListQueryMixin(object):
             del arguments[self._max_results_field]
             yield self.execute_query(verb=verb, verb_arguments=arguments)
 
+    async def list_async(self, resource=None, fields=None, max_results=None,
+                         verb='list', engine=None, **kwargs):
+        """List subresources of a given resource without blocking.
+
+        Args:
+            self (GCPRespository): An instance of a GCPRespository class.
+            resource (str): The id of the resource to query.
+            fields (str): Fields to include in the response - partial response.
+            max_results (int): Number of entries to include per page.
+            verb (str): The method to call on the API.
+            engine (object): The asyncio engine sending the requests.
+            **kwargs (dict): Optional additional arguments to pass to the query.
+
+        Returns:
+            list: The API responses, one per page of results.
+        """
+        arguments = {'fields': fields,
+                     self._max_results_field: max_results}
+
+        if self._list_key_field and resource:
+            arguments[self._list_key_field] = resource
+
+        if kwargs:
+            arguments.update(kwargs)
+
+        if self._request_supports_pagination(verb):
+            return [resp async for resp in self.execute_paged_query_async(
+                verb=verb, verb_arguments=arguments, engine=engine)]
+
+        # Some API list() methods are not actually paginated.
+        del arguments[self._max_results_field]
+        return [await self.execute_query_async(
+            verb=verb, verb_arguments=arguments, engine=engine)]
+
 
 class AggregatedListQueryMixin(ListQueryMixin):
     """Mixin that implements a paged AggregatedList query."""
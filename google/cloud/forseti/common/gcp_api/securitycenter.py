@@ -19,6 +19,7 @@ from googleapiclient import errors
 from httplib2 import HttpLib2Error
 
 from google.cloud.forseti.common.gcp_api import _base_repository
+from google.cloud.forseti.common.gcp_api import api_helpers
 from google.cloud.forseti.common.gcp_api import errors as api_errors
 from google.cloud.forseti.common.gcp_api import repository_mixins
 from google.cloud.forseti.common.util import logger
@@ -105,19 +106,23 @@ class SecurityCenterClient(object):
     https://cloud.google.com/security-command-center/docs/reference/rest
     """
 
-    def __init__(self, version=None):
+    def __init__(self, global_configs=None, version=None):
         """Initialize.
 
-        TODO: Add api quota configs here.
-        max_calls, quota_period = api_helpers.get_ratelimiter_config(
-            inventory_configs.api_quota_configs, API_NAME)
-
         Args:
+            global_configs (dict): Global configurations, the API calls are
+                not rate limited if None.
             version (str): The version of the API to use.
         """
         LOGGER.debug('Initializing SecurityCenterClient with version: %s',
                      version)
-        self.repository = SecurityCenterRepositoryClient(version=version)
+        max_calls, quota_period = api_helpers.get_ratelimiter_config(
+            global_configs or {}, API_NAME)
+
+        self.repository = SecurityCenterRepositoryClient(
+            quota_max_calls=max_calls,
+            quota_period=quota_period,
+            version=version)
 
     def create_finding(self, finding, source_id=None, finding_id=None):
         """Creates a finding in CSCC.
@@ -195,5 +200,5 @@ class SecurityCenterClient(object):
             LOGGER.exception('Unable to update CSCC finding: Resource: %s',
                              finding)
             violation_data = (
-                finding.get('source_properties').get('violation_data'))
+                finding.get('source_properties', {}).get('violation_data'))
             raise api_errors.ApiExecutionError(violation_data, e)
@@ -24,6 +24,7 @@ from googleapiclient import errors
 from googleapiclient import http
 from httplib2 import HttpLib2Error
 
+from google.cloud.forseti.common.gcp_api import _async_engine
 from google.cloud.forseti.common.gcp_api import _base_repository
 from google.cloud.forseti.common.gcp_api import api_helpers
 from google.cloud.forseti.common.gcp_api import errors as api_errors
@@ -323,13 +324,15 @@ class _StorageObjectsRepository(
             out_stream.close()
         return file_content
 
-    def download_to_file(self, bucket, object_name, output_file):
+    def download_to_file(self, bucket, object_name, output_file,
+                         chunksize=http.DEFAULT_CHUNK_SIZE):
         """Download an object from a bucket.
 
          Args:
             bucket (str): The name of the bucket to read from.
             object_name (str): The name of the object to read.
             output_file (file): The file object to write the data to.
+            chunksize (int): The number of bytes to request per chunk.
 
          Returns:
             int: Total size in bytes of file.
@@ -346,7 +349,8 @@ class _StorageObjectsRepository(
 
         media_request.http = self.http
 
-        downloader = http.MediaIoBaseDownload(output_file, media_request)
+        downloader = http.MediaIoBaseDownload(output_file, media_request,
+                                              chunksize=chunksize)
         done = False
         while not done:
             progress, done = downloader.next_chunk(
@@ -460,12 +464,14 @@ class StorageClient(object):
             LOGGER.exception('Unable to download file.')
             raise
 
-    def download(self, full_bucket_path, output_file):
+    def download(self, full_bucket_path, output_file,
+                 chunksize=http.DEFAULT_CHUNK_SIZE):
         """Downloads a copy of a file from GCS.
 
          Args:
             full_bucket_path (str): The full path of the bucket object.
             output_file (file): The file object to write the data to.
+            chunksize (int): The number of bytes to request per chunk.
 
          Returns:
             int: Total size in bytes of file.
@@ -477,7 +483,7 @@ class StorageClient(object):
         bucket, object_name = get_bucket_and_path_from(full_bucket_path)
         try:
             file_size = self.repository.objects.download_to_file(
-                bucket, object_name, output_file)
+                bucket, object_name, output_file, chunksize=chunksize)
             LOGGER.debug('Downloading file object, full_bucket_path = %s, '
                          'total size = %i', full_bucket_path, file_size)
             return file_size
@@ -514,6 +520,45 @@ class StorageClient(object):
             LOGGER.exception(api_exception)
             raise api_exception
 
+    def get_buckets_for_projects(self, project_ids, raise_errors=True):
+        """Gets all GCS buckets of several projects.
+
+        The list requests of all projects run concurrently on a single event
+        loop.
+
+        Args:
+            project_ids (list): The project ids of the GCP projects.
+            raise_errors (bool): If False, the projects whose buckets can not
+                be listed are left out of the results instead.
+
+        Returns:
+            dict: The list of bucket resource dicts of each project id.
+
+        Raises:
+            ApiExecutionError: ApiExecutionError is raised if the call to the
+                GCP API fails
+        """
+        paged_results = _async_engine.run_concurrently(
+            [self.repository.buckets.list_async(project_id, projection='full')
+             for project_id in project_ids])
+
+        results = {}
+        for project_id, pages in zip(project_ids, paged_results):
+            if isinstance(pages, (errors.HttpError, HttpLib2Error)):
+                pages = api_errors.ApiExecutionError(
+                    'buckets', pages, 'project_id', project_id)
+                if raise_errors:
+                    LOGGER.exception(pages)
+            if isinstance(pages, Exception):
+                if raise_errors:
+                    raise pages
+                LOGGER.warning('Unable to list the buckets of project %s: %s',
+                               project_id, pages)
+                continue
+            results[project_id] = api_helpers.flatten_list_results(pages,
+                                                                   'items')
+        return results
+
     def get_bucket_acls(self, bucket, user_project=None):
         """Gets acls for GCS bucket.
 
@@ -20,6 +20,7 @@ See: https://cloud.google.com/compute/docs/reference/latest/firewalls
 from builtins import str
 from builtins import range
 from builtins import object
+import functools
 import json
 import netaddr
 
@@ -101,6 +102,8 @@ class FirewallRule(object):
         if self.allowed is None and self.denied is None:
             raise InvalidFirewallRuleError('Must have allowed or denied rules')
         self._firewall_action = None
+        self._source_range_index = None
+        self._destination_range_index = None
         if validate:
             self.validate()
 
@@ -424,6 +427,29 @@ class FirewallRule(object):
         """
         return sorted(self._destination_ranges)
 
+    @property
+    def source_range_index(self):
+        """The CidrIndex of the source ranges, built on first use.
+
+        Returns:
+          CidrIndex: The index of the source ranges.
+        """
+        if self._source_range_index is None:
+            self._source_range_index = CidrIndex(self._source_ranges)
+        return self._source_range_index
+
+    @property
+    def destination_range_index(self):
+        """The CidrIndex of the destination ranges, built on first use.
+
+        Returns:
+          CidrIndex: The index of the destination ranges.
+        """
+        if self._destination_range_index is None:
+            self._destination_range_index = CidrIndex(
+                self._destination_ranges)
+        return self._destination_range_index
+
     @property
     def source_tags(self):
         """The sorted source tags for this policy.
@@ -520,9 +546,10 @@ class FirewallRule(object):
         target_tags = (set(self.target_tags).issubset(other.target_tags) or not
                        other.target_tags)
         firewall_action = self.firewall_action < other.firewall_action
-        source_ranges = ips_in_list(self.source_ranges, other.source_ranges)
-        destination_ranges = ips_in_list(self.destination_ranges,
-                                         other.destination_ranges)
+        source_ranges = ips_in_list(self._source_ranges,
+                                    other.source_range_index)
+        destination_ranges = ips_in_list(self._destination_ranges,
+                                         other.destination_range_index)
 
         result = (direction and
                   network and
@@ -557,9 +584,10 @@ class FirewallRule(object):
         target_tags = (set(other.target_tags).issubset(self.target_tags) or not
                        self.target_tags)
         firewall_action = self.firewall_action > other.firewall_action
-        source_ranges = ips_in_list(other.source_ranges, self.source_ranges)
-        destination_ranges = ips_in_list(other.destination_ranges,
-                                         self.destination_ranges)
+        source_ranges = ips_in_list(other._source_ranges,
+                                    self.source_range_index)
+        destination_ranges = ips_in_list(other._destination_ranges,
+                                         self.destination_range_index)
         result = (direction and
                   network and
                   source_tags and
@@ -730,21 +758,21 @@ class FirewallAction(object):
 
     @property
     def expanded_rules(self):
-        """Returns an expanded set of ports.
+        """Returns the set of ports of each protocol.
 
         Returns:
-          dict: A dict of protocol to all port numbers.
+          dict: A dict of protocol to a PortSet of all its ports.
         """
         if self._expanded_rules is None:
             self._expanded_rules = {}
             if not self.any_value:
                 for rule in self.rules:
                     protocol = rule.get('IPProtocol')
-                    ports = rule.get('ports', ['all'])
-                    expanded_ports = set(expand_ports(ports))
-                    current_ports = self._expanded_rules.get(protocol, set([]))
-                    current_ports.update(expanded_ports)
-                    self._expanded_rules[protocol] = current_ports
+                    ports = PortSet.from_ports(rule.get('ports', ['all']))
+                    current_ports = self._expanded_rules.get(protocol)
+                    if current_ports:
+                        ports = current_ports.union(ports)
+                    self._expanded_rules[protocol] = ports
         return self._expanded_rules
 
     @staticmethod
@@ -752,31 +780,27 @@ class FirewallAction(object):
         """Returns whether one port list is a subset of another.
 
         Args:
-          ports_1 (list): A list of string port numbers.
-          ports_2 (list): A list of string port numbers.
+          ports_1 (PortSet): A PortSet, or a list of string ports.
+          ports_2 (PortSet): A PortSet, or a list of string ports.
 
         Returns:
           bool: Whether ports_1 are a subset of ports_2 or not.
         """
-        if any([a in ports_2 for a in ALL_REPRESENTATIONS]):
-            return True
-        return set(ports_1).issubset(ports_2)
+        return PortSet.from_ports(ports_1).issubset(
+            PortSet.from_ports(ports_2))
 
     @staticmethod
     def ports_are_equal(ports_1, ports_2):
         """Returns whether two port lists are the same.
 
         Args:
-          ports_1 (list): A list of string port numbers.
-          ports_2 (list): A list of string port numbers.
+          ports_1 (PortSet): A PortSet, or a list of string ports.
+          ports_2 (PortSet): A PortSet, or a list of string ports.
 
         Returns:
           bool: Whether ports_1 have the same ports as ports_2.
         """
-        if (any([a in ports_1 for a in ALL_REPRESENTATIONS]) and
-                any([a in ports_2 for a in ALL_REPRESENTATIONS])):
-            return True
-        return set(ports_1) == set(ports_2)
+        return PortSet.from_ports(ports_1) == PortSet.from_ports(ports_2)
 
     def is_equivalent(self, other):
         """Returns whether this action and another are functionally equivalent.
@@ -849,6 +873,193 @@ class FirewallAction(object):
         return self.action == other.action and self.rules == other.rules
 
 
+class PortSet(object):
+    """A set of ports stored as sorted and merged inclusive ranges.
+
+    Ports that are not numbers, like "all", are kept by name. A set holding
+    "all" contains every other set, but only equals another "all" set.
+    """
+
+    __slots__ = ('ranges', 'names')
+
+    def __init__(self, ranges=(), names=frozenset()):
+        """Initialize.
+
+        Args:
+          ranges (iterable): (start, end) tuples of inclusive port ranges.
+          names (frozenset): The ports that are not numbers.
+        """
+        self.ranges = _merge_ranges(ranges)
+        self.names = frozenset(names)
+
+    @classmethod
+    def from_ports(cls, ports):
+        """Creates a PortSet from port strings.
+
+        Args:
+          ports (list): Strings of format "<number>", "<number>-<number>" or
+            "all", a PortSet is returned as is.
+
+        Returns:
+          PortSet: The set of the ports.
+        """
+        if isinstance(ports, PortSet):
+            return ports
+        if isinstance(ports, str):
+            ports = [ports]
+        ranges = []
+        names = set()
+        for port_str in ports or []:
+            try:
+                if '-' in port_str:
+                    start, end = port_str.split('-')
+                    ranges.append((int(start), int(end)))
+                else:
+                    ranges.append((int(port_str), int(port_str)))
+            except ValueError:
+                names.add(port_str)
+        return cls(ranges, names)
+
+    @property
+    def all_ports(self):
+        """Returns whether this set contains all ports.
+
+        Returns:
+          bool: Whether the set holds one of the "all" representations.
+        """
+        return any(name in self.names for name in ALL_REPRESENTATIONS)
+
+    def union(self, other):
+        """Returns the union of two port sets.
+
+        Args:
+          other (PortSet): The other set.
+
+        Returns:
+          PortSet: The ports in either set.
+        """
+        return PortSet(self.ranges + other.ranges, self.names | other.names)
+
+    def issubset(self, other):
+        """Returns whether all ports of this set are in the other set.
+
+        Args:
+          other (PortSet): The other set.
+
+        Returns:
+          bool: Whether this set is a subset of the other set.
+        """
+        if other.all_ports:
+            return True
+        if not self.names.issubset(other.names):
+            return False
+        other_ranges = other.ranges
+        i = 0
+        for start, end in self.ranges:
+            # Ranges are merged, a range can only be within a single one.
+            while i < len(other_ranges) and other_ranges[i][1] < start:
+                i += 1
+            if (i == len(other_ranges) or other_ranges[i][0] > start or
+                    other_ranges[i][1] < end):
+                return False
+        return True
+
+    def overlaps(self, other):
+        """Returns whether the two sets have ports in common.
+
+        Args:
+          other (PortSet): The other set.
+
+        Returns:
+          bool: Whether a port is in both sets.
+        """
+        if self.names & other.names:
+            return True
+        # "all" holds every port of the other set, unless it is empty.
+        if self.all_ports and (other.ranges or other.names):
+            return True
+        if other.all_ports and (self.ranges or self.names):
+            return True
+        i = j = 0
+        while i < len(self.ranges) and j < len(other.ranges):
+            start_1, end_1 = self.ranges[i]
+            start_2, end_2 = other.ranges[j]
+            if start_1 <= end_2 and start_2 <= end_1:
+                return True
+            if end_1 < end_2:
+                i += 1
+            else:
+                j += 1
+        return False
+
+    def __eq__(self, other):
+        """Equals.
+
+        Args:
+          other (PortSet): The PortSet to compare to.
+
+        Returns:
+          bool: If both sets hold the same ports.
+        """
+        if not isinstance(other, PortSet):
+            return NotImplemented
+        if self.all_ports and other.all_ports:
+            return True
+        return self.ranges == other.ranges and self.names == other.names
+
+    def __ne__(self, other):
+        """Not equals.
+
+        Args:
+          other (PortSet): The PortSet to compare to.
+
+        Returns:
+          bool: If the sets hold different ports.
+        """
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __hash__(self):
+        """Hash, consistent with equality.
+
+        Returns:
+          int: The hash of the set.
+        """
+        if self.all_ports:
+            return hash('all')
+        return hash((self.ranges, self.names))
+
+    def __repr__(self):
+        """String representation.
+
+        Returns:
+          str: A string representation of the PortSet.
+        """
+        return 'PortSet(ranges=%s, names=%s)' % (list(self.ranges),
+                                                 sorted(self.names))
+
+
+def _merge_ranges(ranges):
+    """Sorts ranges and merges those that overlap or are adjacent.
+
+    Args:
+      ranges (iterable): (start, end) tuples of inclusive ranges.
+
+    Returns:
+      tuple: The merged (start, end) tuples, sorted by start.
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return tuple(merged)
+
+
 def sort_rules(rules):
     """Sorts firewall rules by protocol and sorts ports.
 
@@ -875,6 +1086,136 @@ def sort_rules(rules):
     return sorted_rules
 
 
+class CidrIndex(object):
+    """A prefix trie of IP ranges, answering containment and overlap.
+
+    Each trie node is stored as its (prefix length, prefix) key, so walking
+    the path of a range is a set lookup per prefix length used by the index
+    instead of a comparison with every range.
+    """
+
+    __slots__ = ('_terminals', '_lengths', '_nodes', '_size')
+
+    def __init__(self, ip_ranges=()):
+        """Initialize.
+
+        Args:
+          ip_ranges (iterable): String IP addresses and CIDR ranges.
+        """
+        # IP version -> prefix length -> prefixes of the indexed ranges.
+        self._terminals = {}
+        self._size = 0
+        for ip_range in ip_ranges:
+            version, first, prefixlen, width = _parse_network(ip_range)
+            self._terminals.setdefault(version, {}).setdefault(
+                prefixlen, set()).add(first >> (width - prefixlen))
+            self._size += 1
+        # IP version -> sorted prefix lengths of the indexed ranges.
+        self._lengths = {version: sorted(prefixes)
+                         for version, prefixes in self._terminals.items()}
+        # IP version -> prefix length -> prefixes of all trie nodes, built
+        # on first use by overlaps().
+        self._nodes = None
+
+    def __len__(self):
+        """Returns the number of indexed ranges.
+
+        Returns:
+          int: The number of indexed ranges.
+        """
+        return self._size
+
+    def contains(self, ip_range):
+        """Returns whether an indexed range contains the ip or ip range.
+
+        Args:
+          ip_range (str): A string IP address or CIDR range.
+
+        Returns:
+          bool: Whether the ip / ip range is in an indexed range.
+        """
+        version, first, prefixlen, width = _parse_network(ip_range)
+        terminals = self._terminals.get(version)
+        if not terminals:
+            return False
+        for length in self._lengths[version]:
+            if length > prefixlen:
+                break
+            if first >> (width - length) in terminals[length]:
+                return True
+        return False
+
+    def contains_all(self, ip_ranges):
+        """Returns whether the ips and ranges are all in indexed ranges.
+
+        Args:
+          ip_ranges (iterable): String IP addresses and CIDR ranges.
+
+        Returns:
+          bool: Whether every ip / ip range is in an indexed range.
+        """
+        return all(self.contains(ip_range) for ip_range in ip_ranges)
+
+    def overlaps(self, ip_range):
+        """Returns whether the ip range shares addresses with indexed ranges.
+
+        Args:
+          ip_range (str): A string IP address or CIDR range.
+
+        Returns:
+          bool: Whether the ip range contains or is in an indexed range.
+        """
+        if self.contains(ip_range):
+            return True
+        version, first, prefixlen, width = _parse_network(ip_range)
+        nodes = self._get_nodes().get(version, {}).get(prefixlen)
+        return bool(nodes) and first >> (width - prefixlen) in nodes
+
+    def overlaps_any(self, ip_ranges):
+        """Returns whether any of the ips and ranges overlap indexed ranges.
+
+        Args:
+          ip_ranges (iterable): String IP addresses and CIDR ranges.
+
+        Returns:
+          bool: Whether any ip / ip range shares addresses with the index.
+        """
+        return any(self.overlaps(ip_range) for ip_range in ip_ranges)
+
+    def _get_nodes(self):
+        """Builds the trie nodes on the paths of the indexed ranges.
+
+        Returns:
+          dict: IP version -> prefix length -> prefixes of the trie nodes.
+        """
+        if self._nodes is None:
+            self._nodes = {}
+            for version, terminals in self._terminals.items():
+                nodes = self._nodes.setdefault(version, {})
+                for prefixlen, prefixes in terminals.items():
+                    for prefix in prefixes:
+                        for length in range(prefixlen + 1):
+                            nodes.setdefault(length, set()).add(
+                                prefix >> (prefixlen - length))
+        return self._nodes
+
+
+@functools.lru_cache(maxsize=65536)
+def _parse_network(ip_range):
+    """Parses an IP address or CIDR range, cached across rules.
+
+    Args:
+      ip_range (str): A string IP address or CIDR range.
+
+    Returns:
+      tuple: (IP version, first address of the network as an int, prefix
+        length, address width in bits).
+    """
+    ip_network = netaddr.IPNetwork(ip_range)
+    width = 32 if ip_network.version == 4 else 128
+    return ip_network.version, ip_network.first, ip_network.prefixlen, width
+
+
 def ips_in_list(ips, ips_list):
     """Checks whether the ips and ranges are all in a list.
 
@@ -887,19 +1228,17 @@ def ips_in_list(ips, ips_list):
 
     Args:
       ips (list): A list of string IP addresses.
-      ips_list (list): A list of string IP addresses.
+      ips_list (list): A list of string IP addresses, or a CidrIndex of
+        them.
 
     Returns:
       bool: Whether the ips are all in the given ips_list.
     """
     if not ips or not ips_list:
         return True
-    for ip_addr in ips:
-        if not ips_list:
-            return False
-        if not any([ip_in_range(ip_addr, addr) for addr in ips_list]):
-            return False
-    return True
+    if not isinstance(ips_list, CidrIndex):
+        ips_list = CidrIndex(ips_list)
+    return ips_list.contains_all(ips)
 
 
 def ip_in_range(ip_addr, ip_range):
@@ -917,9 +1256,12 @@ def ip_in_range(ip_addr, ip_range):
     Returns:
       bool: Whether the ip / ip range is in another ip range.
     """
-    ip_network = netaddr.IPNetwork(ip_addr)
-    ip_range_network = netaddr.IPNetwork(ip_range)
-    return ip_network in ip_range_network
+    version, first, prefixlen, width = _parse_network(ip_addr)
+    range_version, range_first, range_prefixlen, _ = _parse_network(ip_range)
+    return (version == range_version and
+            prefixlen >= range_prefixlen and
+            first >> (width - range_prefixlen) ==
+            range_first >> (width - range_prefixlen))
 
 
 def expand_port_range(port_range):
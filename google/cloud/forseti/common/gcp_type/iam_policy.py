@@ -17,6 +17,8 @@ See: https://cloud.google.com/iam/reference/rest/v1/Policy
 """
 
 from builtins import object
+import functools
+import json
 import re
 
 from google.cloud.forseti.common.gcp_type import errors
@@ -27,6 +29,19 @@ from google.cloud.forseti.common.util.regular_exp import escape_and_globify
 LOGGER = logger.get_logger(__name__)
 
 
+@functools.lru_cache(maxsize=65536)
+def _compile_glob(name):
+    """Compile a role or member name to a regex, cached across bindings.
+
+    Args:
+        name (str): The name, may contain '*' wildcards.
+
+    Returns:
+        SRE_Pattern: The case insensitive regex matching the name.
+    """
+    return re.compile(escape_and_globify(name), flags=re.IGNORECASE)
+
+
 def _get_iam_members(members):
     """Get a list of this binding's members as IamPolicyMembers.
 
@@ -132,8 +147,15 @@ class IamPolicyBinding(object):
                  'role_name={}, members={}'.format(role_name, members)))
         self.role_name = role_name
         self.members = _get_iam_members(members)
-        self.role_pattern = re.compile(escape_and_globify(role_name),
-                                       flags=re.IGNORECASE)
+
+    @property
+    def role_pattern(self):
+        """The regex matching the role name, compiled on first use.
+
+        Returns:
+            SRE_Pattern: The role name regex.
+        """
+        return _compile_glob(self.role_name)
 
     def __eq__(self, other):
         """Tests equality of IamPolicyBinding.
@@ -233,10 +255,17 @@ class IamPolicyMember(object):
                 'Invalid policy member: {}'.format(member_type))
         self.type = member_type
         self.name = member_name
-        self.name_pattern = None
-        if member_name:
-            self.name_pattern = re.compile(escape_and_globify(self.name),
-                                           flags=re.IGNORECASE)
+
+    @property
+    def name_pattern(self):
+        """The regex matching the member name, compiled on first use.
+
+        Returns:
+            SRE_Pattern: The member name regex, None if there is no name.
+        """
+        if not self.name:
+            return None
+        return _compile_glob(self.name)
 
     def __eq__(self, other):
         """Tests equality of IamPolicyMember.
@@ -300,6 +329,8 @@ class IamPolicyMember(object):
         Returns:
             IamPolicyMember: Created from the member string.
         """
+        if isinstance(member, cls):
+            return member
         identity_parts = member.split(':')
         member_name = None
         if len(identity_parts) > 1:
@@ -367,6 +398,76 @@ class IamPolicyMember(object):
         return False
 
 
+class IamPolicyBindingLoader(object):
+    """Loads the bindings of many IAM policies.
+
+    Role names and members are interned across the policies: each distinct
+    member string is parsed to an IamPolicyMember once and shared by all the
+    bindings it appears in. The bindings themselves are created per policy,
+    as their member lists may be merged with other bindings.
+    """
+
+    def __init__(self):
+        """Initialize."""
+        self._roles = {}
+        # Member string to IamPolicyMember, None for an invalid member.
+        self._members = {}
+
+    def __len__(self):
+        """Number of distinct members loaded.
+
+        Returns:
+            int: Number of members.
+        """
+        return len(self._members)
+
+    def _get_member(self, member):
+        """Get the interned IamPolicyMember of a member string.
+
+        Args:
+            member (str): The IAM policy binding member.
+
+        Returns:
+            IamPolicyMember: The member, None if the member is invalid.
+        """
+        try:
+            return self._members[member]
+        except KeyError:
+            pass
+        try:
+            iam_member = IamPolicyMember.create_from(member)
+        except errors.InvalidIamPolicyMemberError:
+            iam_member = None
+        self._members[member] = iam_member
+        return iam_member
+
+    def load(self, policy_data):
+        """Load the bindings of an IAM policy.
+
+        Bindings with an invalid member are skipped, as with
+        IamPolicyBinding.create_from.
+
+        Args:
+            policy_data (str): The json representation of the policy.
+
+        Returns:
+            list: The IamPolicyBindings of the policy.
+        """
+        bindings = []
+        for binding in json.loads(policy_data).get('bindings', []):
+            role_name = binding.get('role')
+            members = binding.get('members')
+            if role_name and members:
+                role_name = self._roles.setdefault(role_name, role_name)
+                iam_members = [self._get_member(m) for m in members]
+                if any(m is None for m in iam_members):
+                    LOGGER.debug('Invalid IAM policy member: %s.', members)
+                    continue
+                members = iam_members
+            bindings.append(IamPolicyBinding(role_name, members))
+        return bindings
+
+
 class IamAuditConfig(object):
     """IAM Audit Config.
 
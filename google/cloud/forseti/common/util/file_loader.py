@@ -14,9 +14,12 @@
 
 """Utility functions for reading and parsing files in a variety of formats."""
 
+from builtins import object
 import json
 import os
+import queue
 import tempfile
+import threading
 import yaml
 
 from google.cloud.forseti.common.gcp_api import storage
@@ -26,6 +29,14 @@ from google.cloud.forseti.common.util import logger
 
 LOGGER = logger.get_logger(__name__)
 
+# Download GCS objects in 8 MiB chunks when streaming.
+STREAM_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Number of downloaded chunks that may be buffered ahead of the reader.
+STREAM_MAX_BUFFERED_CHUNKS = 4
+
+_END_OF_STREAM = object()
+
 
 def read_and_parse_file(file_path):
     """Parse a json or yaml formatted file from a local path or GCS.
@@ -71,6 +82,116 @@ def copy_file_from_gcs(file_path, output_path=None, storage_client=None):
     return output_path
 
 
+class _ChunkQueueWriter(object):
+    """File like object that hands downloaded chunks to a bounded queue."""
+
+    def __init__(self, chunk_queue, cancelled):
+        """Initialize.
+
+        Args:
+            chunk_queue (Queue): The bounded queue to put chunks on.
+            cancelled (Event): Set when the reader stops consuming chunks.
+        """
+        self.chunk_queue = chunk_queue
+        self.cancelled = cancelled
+
+    def put(self, item):
+        """Put an item on the queue, blocking while the queue is full.
+
+        Args:
+            item (object): The item to hand to the reader.
+
+        Returns:
+            bool: True if the item was queued, False if the reader stopped.
+        """
+        while not self.cancelled.is_set():
+            try:
+                self.chunk_queue.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def write(self, data):
+        """Write a downloaded chunk to the queue.
+
+        Args:
+            data (bytes): The downloaded chunk.
+
+        Returns:
+            int: The number of bytes written.
+
+        Raises:
+            IOError: If the reader stopped before the download completed.
+        """
+        if not self.put(data):
+            raise IOError('Streaming download cancelled by the reader.')
+        return len(data)
+
+
+def stream_file_from_gcs(file_path,
+                         storage_client=None,
+                         chunk_size=STREAM_CHUNK_SIZE,
+                         max_buffered_chunks=STREAM_MAX_BUFFERED_CHUNKS):
+    """Stream the lines of a text file from GCS while it is downloading.
+
+    The object is downloaded in chunks on a background thread. At most
+    max_buffered_chunks chunks are held in memory, so the download is
+    throttled to the speed of the reader.
+
+    Args:
+        file_path (str): The full GCS path to the file.
+        storage_client (storage.StorageClient): The Storage API Client to use
+            for downloading the file using the API.
+        chunk_size (int): The number of bytes to request per chunk.
+        max_buffered_chunks (int): The maximum number of chunks buffered
+            ahead of the reader.
+
+    Yields:
+        str: Each line in the file, including the trailing newline.
+    """
+    if not storage_client:
+        storage_client = storage.StorageClient()
+
+    chunk_queue = queue.Queue(maxsize=max_buffered_chunks)
+    cancelled = threading.Event()
+    writer = _ChunkQueueWriter(chunk_queue, cancelled)
+
+    def _download():
+        """Download the object and mark the end of the stream."""
+        try:
+            storage_client.download(full_bucket_path=file_path,
+                                    output_file=writer,
+                                    chunksize=chunk_size)
+            writer.put(_END_OF_STREAM)
+        except Exception as e:  # pylint: disable=broad-except
+            # Hand the error to the reader thread to raise.
+            writer.put(e)
+
+    downloader = threading.Thread(target=_download)
+    downloader.daemon = True
+    downloader.start()
+
+    pending = b''
+    try:
+        while True:
+            chunk = chunk_queue.get()
+            if chunk is _END_OF_STREAM:
+                break
+            if isinstance(chunk, Exception):
+                raise chunk
+
+            lines = (pending + chunk).split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                yield line.decode('utf-8') + '\n'
+        if pending:
+            yield pending.decode('utf-8')
+    finally:
+        cancelled.set()
+        downloader.join()
+
+
 def _get_filetype_parser(file_path, parser_type):
     """Return a parser function for parsing the file.
 
@@ -30,12 +30,13 @@ def upload_json(data, gcs_upload_path):
     """Upload data in json format.
 
     Args:
-        data (dict): the data to upload
+        data (object): the data to upload, may be an iterable of items.
         gcs_upload_path (string): the GCS upload path.
     """
     try:
         with tempfile.NamedTemporaryFile() as tmp_data:
-            tmp_data.write(parser.json_stringify(data))
+            for chunk in parser.json_stringify_chunks(data):
+                tmp_data.write(chunk.encode())
             tmp_data.flush()
             storage_client = StorageClient()
             storage_client.put_text_file(tmp_data.name, gcs_upload_path)
@@ -34,14 +34,27 @@ def build_http(http=None):
     """
     if not http:
         http = httplib2.Http(timeout=HTTP_REQUEST_TIMEOUT)
-    user_agent = 'Python-httplib2/{} (gzip), {}/{} {}'.format(
-        httplib2.__version__,
+    user_agent = build_user_agent(
+        'Python-httplib2/{} (gzip)'.format(httplib2.__version__))
+
+    return _set_user_agent(http, user_agent)
+
+
+def build_user_agent(http_client):
+    """Build the Forseti user agent for an http client.
+
+    Args:
+        http_client (str): Name and version of the http client library.
+
+    Returns:
+        str: The user-agent header value.
+    """
+    return '{}, {}/{} {}'.format(
+        http_client,
         forseti_security.__package_name__,
         forseti_security.__version__,
         _USER_AGENT_SUFFIX).strip()
 
-    return _set_user_agent(http, user_agent)
-
 
 def set_user_agent_suffix(suffix):
     """Set custom user agent string suffix. Once set, this suffix will be used
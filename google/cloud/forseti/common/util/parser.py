@@ -85,6 +85,31 @@ def json_stringify(obj_to_jsonify):
     return json.dumps(obj_to_jsonify, sort_keys=True)
 
 
+def json_stringify_chunks(obj_to_jsonify):
+    """Convert a python object to json, in chunks.
+
+    Lists and dicts are converted at once, other iterables, such as
+    generators, are converted to a json list one item at a time.
+
+    Args:
+        obj_to_jsonify (object): The object to json stringify.
+
+    Yields:
+        str: The chunks of the json string.
+    """
+    if (isinstance(obj_to_jsonify, (dict, list, tuple, str)) or
+            not hasattr(obj_to_jsonify, '__iter__')):
+        yield json_stringify(obj_to_jsonify)
+        return
+
+    yield '['
+    separator = ''
+    for item in obj_to_jsonify:
+        yield separator + json_stringify(item)
+        separator = ', '
+    yield ']'
+
+
 def json_unstringify(json_to_objify, default=None):
     """Convert a json string to a python object.
 
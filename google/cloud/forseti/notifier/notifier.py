@@ -78,6 +78,35 @@ def convert_to_timestamp(violations):
     return violations
 
 
+def stream_violations(violation_access, scanner_index_id):
+    """Map the resources to their violations, streamed from the database.
+
+    Only the number of violations of each type is queried here, the
+    violations are streamed each time a notifier iterates over them.
+
+    Args:
+        violation_access (ViolationAccess): The violations facade.
+        scanner_index_id (int64): Scanner index id.
+
+    Returns:
+        dict: Resources mapped to the ViolationStream of their violations,
+            for the resources with violations.
+        ViolationStream: All of the violations of the scanner run.
+    """
+    counts = violation_access.count_by_type(scanner_index_id)
+    violation_map = {}
+    for resource, violation_types in (
+            scanner_dao.get_violation_types_by_resource().items()):
+        count = sum(counts.get(violation_type, 0)
+                    for violation_type in violation_types)
+        if count:
+            violation_map[resource] = scanner_dao.ViolationStream(
+                violation_access, scanner_index_id, violation_types, count)
+    all_violations = scanner_dao.ViolationStream(
+        violation_access, scanner_index_id, None, sum(counts.values()))
+    return violation_map, all_violations
+
+
 # pylint: disable=too-many-branches
 # pylint: disable=too-many-statements
 def run(inventory_index_id,
@@ -100,6 +129,8 @@ def run(inventory_index_id,
     global_configs = service_config.get_global_config()
     notifier_configs = service_config.get_notifier_config()
 
+    # The violations were just written by the scanner, they are read from
+    # the write engine since a read replica can lag behind it.
     with service_config.scoped_session() as session:
         if scanner_index_id:
             inventory_index_id = (
@@ -120,14 +151,20 @@ def run(inventory_index_id,
         else:
             # get violations
             violation_access = scanner_dao.ViolationAccess(session)
-            violations = violation_access.list(
-                scanner_index_id=scanner_index_id)
-            violations_as_dict = []
-            for violation in violations:
-                violations_as_dict.append(
-                    scanner_dao.convert_sqlalchemy_object_to_dict(violation))
-            violations_as_dict = convert_to_timestamp(violations_as_dict)
-            violation_map = scanner_dao.map_by_resource(violations_as_dict)
+            if notifier_configs.get('streaming'):
+                violation_map, violations_as_dict = stream_violations(
+                    violation_access, scanner_index_id)
+            else:
+                violations = violation_access.list(
+                    scanner_index_id=scanner_index_id)
+                violations_as_dict = []
+                for violation in violations:
+                    violations_as_dict.append(
+                        scanner_dao.convert_sqlalchemy_object_to_dict(
+                            violation))
+                violations_as_dict = convert_to_timestamp(violations_as_dict)
+                violation_map = scanner_dao.map_by_resource(
+                    violations_as_dict)
 
             for retrieved_v in violation_map:
                 log_message = (
@@ -181,8 +218,16 @@ def run(inventory_index_id,
                     LOGGER.debug(
                         'Running CSCC notifier with beta API. source_id: '
                         '%s', source_id)
-                    (cscc_notifier.CsccNotifier(inventory_index_id)
-                     .run(violations_as_dict, source_id=source_id))
+                    api_quota_configs = (service_config.get_inventory_config()
+                                         .get_api_quota_configs())
+                    # The findings sent are recorded in a writable session.
+                    with service_config.scoped_session() as cscc_session:
+                        (cscc_notifier.CsccNotifier(
+                            inventory_index_id,
+                            finding_access=scanner_dao.CsccFindingAccess(
+                                cscc_session),
+                            global_configs=api_quota_configs)
+                         .run(violations_as_dict, source_id=source_id))
 
         InventorySummary(service_config, inventory_index_id).run()
 
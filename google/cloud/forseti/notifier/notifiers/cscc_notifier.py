@@ -14,10 +14,12 @@
 
 """Upload violations to GCS bucket as Findings."""
 from builtins import object
-import ast
+from concurrent import futures
+import hashlib
 import json
 import tempfile
 
+from google.cloud.forseti.common.gcp_api import api_helpers
 from google.cloud.forseti.common.gcp_api import errors as api_errors
 from google.cloud.forseti.common.gcp_api import securitycenter
 from google.cloud.forseti.common.gcp_api import storage
@@ -28,20 +30,38 @@ from google.cloud.forseti.common.util import string_formats
 
 
 LOGGER = logger.get_logger(__name__)
+# Maximum number of CSCC API calls made at the same time.
+MAX_WORKERS = 8
+# Source properties of a finding that change with every run, left out of
+# the content hash of the finding.
+PER_RUN_PROPERTIES = ('db_source', 'inventory_index_id', 'scanner_index_id')
 
 
 class CsccNotifier(object):
     """Send violations to CSCC via API or via GCS bucket."""
 
-    def __init__(self, inv_index_id):
+    def __init__(self, inv_index_id, finding_access=None,
+                 global_configs=None):
         """`Findingsnotifier` initializer.
 
         # TODO: Find out why the InventoryConfig is empty.
 
         Args:
             inv_index_id (str): inventory index ID
+            finding_access (CsccFindingAccess): The facade of the findings
+                sent to CSCC, the findings are listed from CSCC on each run
+                if None.
+            global_configs (dict): API quota configs, the CSCC API calls are
+                not rate limited if None.
         """
         self.inv_index_id = inv_index_id
+        self.finding_access = finding_access
+        self.global_configs = global_configs
+        max_calls, _ = api_helpers.get_ratelimiter_config(
+            global_configs or {}, securitycenter.API_NAME)
+        self.max_workers = MAX_WORKERS
+        if max_calls:
+            self.max_workers = max(1, min(MAX_WORKERS, int(max_calls)))
 
     def _transform_for_gcs(self, violations, gcs_upload_path):
         """Transform forseti violations to GCS findings format.
@@ -112,6 +132,46 @@ class CsccNotifier(object):
                     tmp_violations.name, gcs_upload_path)
         return
 
+    def _transform_violation(self, violation, source_id):
+        """Transform a forseti violation to a finding for CSCC API.
+
+        Args:
+            violation (dict): Violation to be sent to CSCC as a finding.
+            source_id (str): Unique ID assigned by CSCC, to the organization
+                that the violations are originating from.
+
+        Returns:
+            list: The finding id and the finding, as a dict.
+        """
+        # CSCC can't accept the full hash, so this must be shortened.
+        finding_id = violation.get('violation_hash')[:32]
+        finding = {
+            'name': '{0}/findings/{1}'.format(source_id, finding_id),
+            'parent': source_id,
+            'resource_name': violation.get('full_name'),
+            'state': 'ACTIVE',
+            'category': violation.get('violation_type'),
+            'event_time': violation.get('created_at_datetime'),
+            'source_properties': {
+                'source': 'FORSETI',
+                'db_source': 'table:{}/id:{}'.format(
+                    'violations', violation.get('id')),
+                'inventory_index_id': self.inv_index_id,
+                'resource_data': (
+                    json.dumps(violation.get('resource_data'),
+                               sort_keys=True)),
+                'resource_id': violation.get('resource_id'),
+                'resource_type': violation.get('resource_type'),
+                'rule_index': violation.get('rule_index'),
+                'rule_name': violation.get('rule_name'),
+                'scanner_index_id': violation.get('scanner_index_id'),
+                'violation_data': (
+                    json.dumps(violation.get('violation_data'),
+                               sort_keys=True))
+            },
+        }
+        return [finding_id, finding]
+
     def _transform_for_api(self, violations, source_id=None):
         """Transform forseti violations to findings for CSCC API.
 
@@ -123,41 +183,32 @@ class CsccNotifier(object):
         Returns:
             list: violations in findings format; each violation is a dict.
         """
-        findings = []
-
         LOGGER.debug('Transforming findings. source_id: %s',
                      source_id)
-        for violation in violations:
-            # CSCC can't accept the full hash, so this must be shortened.
-            finding_id = violation.get('violation_hash')[:32]
-            finding = {
-                'name': '{0}/findings/{1}'.format(
-                    source_id, violation.get('violation_hash')[:32]),
-                'parent': source_id,
-                'resource_name': violation.get('full_name'),
-                'state': 'ACTIVE',
-                'category': violation.get('violation_type'),
-                'event_time': violation.get('created_at_datetime'),
-                'source_properties': {
-                    'source': 'FORSETI',
-                    'db_source': 'table:{}/id:{}'.format(
-                        'violations', violation.get('id')),
-                    'inventory_index_id': self.inv_index_id,
-                    'resource_data': (
-                        json.dumps(violation.get('resource_data'),
-                                   sort_keys=True)),
-                    'resource_id': violation.get('resource_id'),
-                    'resource_type': violation.get('resource_type'),
-                    'rule_index': violation.get('rule_index'),
-                    'rule_name': violation.get('rule_name'),
-                    'scanner_index_id': violation.get('scanner_index_id'),
-                    'violation_data': (
-                        json.dumps(violation.get('violation_data'),
-                                   sort_keys=True))
-                },
-            }
-            findings.append([finding_id, finding])
-        return findings
+        return [self._transform_violation(violation, source_id)
+                for violation in violations]
+
+    @staticmethod
+    def _hash_finding(finding):
+        """Hash the content of a finding.
+
+        The fields changing with every run are left out, a finding has the
+        same hash as long as its violation is found with the same rule.
+
+        Args:
+            finding (dict): The finding, as built by _transform_violation().
+
+        Returns:
+            str: The hex digest of the finding content.
+        """
+        content = dict(finding)
+        del content['event_time']
+        content['source_properties'] = {
+            key: value
+            for key, value in finding['source_properties'].items()
+            if key not in PER_RUN_PROPERTIES}
+        return hashlib.sha256(
+            json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()
 
     @staticmethod
     def find_inactive_findings(new_findings, findings_in_cscc):
@@ -196,68 +247,176 @@ class CsccNotifier(object):
                 inactive_findings.append([finding_id, to_be_updated_finding])
         return inactive_findings
 
-    # pylint: disable=too-many-locals
+    @staticmethod
+    def _list_findings_in_cscc(client, source_id):
+        """List the findings of a source in CSCC.
+
+        Args:
+            client (SecurityCenterClient): The CSCC API client.
+            source_id (str): Unique ID assigned by CSCC, to the organization
+                that the violations are originating from.
+
+        Returns:
+            dict: Finding ids mapped to (content hash, state) tuples, the
+                content hash is always None.
+        """
+        findings_in_cscc = {}
+        # No need to use the next page token, as the results here will
+        # return all the pages.
+        for page in client.list_findings(source_id=source_id):
+            for findings_in_page in page.get('listFindingsResults') or []:
+                finding_data = findings_in_page.get('finding')
+                finding_id = finding_data.get('name')[-32:]
+                findings_in_cscc[finding_id] = (None,
+                                                finding_data.get('state'))
+        return findings_in_cscc
+
+    def _find_changes(self, violations, source_id, sent_findings):
+        """Find the findings to create, update or deactivate in CSCC.
+
+        Args:
+            violations (iterable): Violations to be uploaded as findings.
+            source_id (str): Unique ID assigned by CSCC, to the organization
+                that the violations are originating from.
+            sent_findings (dict): Finding ids mapped to the (content hash,
+                state) tuple they were last sent with.
+
+        Yields:
+            tuple: The finding id, the finding and its content hash, for the
+                new and the changed findings, then for the findings to
+                deactivate.
+        """
+        current_finding_ids = set()
+        for violation in violations:
+            finding_id, finding = self._transform_violation(violation,
+                                                            source_id)
+            if finding_id in current_finding_ids:
+                continue
+            current_finding_ids.add(finding_id)
+            content_hash = self._hash_finding(finding)
+            if sent_findings.get(finding_id) != (content_hash, 'ACTIVE'):
+                yield finding_id, finding, content_hash
+
+        current_time = date_time.get_utc_now_datetime()
+        actual_time = current_time.strftime(
+            string_formats.TIMESTAMP_TIMEZONE)
+        for finding_id, (content_hash, state) in sent_findings.items():
+            if state == 'ACTIVE' and finding_id not in current_finding_ids:
+                finding = {
+                    'name': '{0}/findings/{1}'.format(source_id, finding_id),
+                    'parent': source_id,
+                    'state': 'INACTIVE',
+                    'event_time': actual_time,
+                }
+                yield finding_id, finding, content_hash
+
+    @staticmethod
+    def _send_change(client, source_id, finding_id, finding):
+        """Send a new, changed or inactive finding to CSCC.
+
+        Args:
+            client (SecurityCenterClient): The CSCC API client.
+            source_id (str): Unique ID assigned by CSCC, to the organization
+                that the violations are originating from.
+            finding_id (str): id hash of the CSCC finding.
+            finding (dict): The finding.
+
+        Returns:
+            bool: True if the finding was sent.
+        """
+        try:
+            if finding['state'] == 'ACTIVE':
+                LOGGER.debug('Creating finding CSCC:\n%s.', finding)
+                client.create_finding(finding, source_id=source_id,
+                                      finding_id=finding_id)
+            else:
+                LOGGER.debug('Updating finding CSCC:\n%s.', finding)
+                client.update_finding(finding,
+                                      finding_id,
+                                      source_id=source_id)
+        except api_errors.ApiExecutionError:
+            LOGGER.exception('Encountered CSCC API error.')
+            return False
+        return True
+
+    def _send_changes(self, client, source_id, changes):
+        """Send the changed findings to CSCC from a pool of workers.
+
+        At most twice as many changes as workers are waiting to be sent at
+        a time, the API calls are rate limited by the client.
+
+        Args:
+            client (SecurityCenterClient): The CSCC API client.
+            source_id (str): Unique ID assigned by CSCC, to the organization
+                that the violations are originating from.
+            changes (iterable): (finding id, finding, content hash) tuples.
+
+        Yields:
+            tuple: The change and whether it was sent, in completion order.
+        """
+        with futures.ThreadPoolExecutor(
+                max_workers=self.max_workers) as executor:
+            pending = {}
+            for change in changes:
+                if len(pending) >= 2 * self.max_workers:
+                    done, _ = futures.wait(
+                        pending, return_when=futures.FIRST_COMPLETED)
+                    for future in done:
+                        yield pending.pop(future), future.result()
+                finding_id, finding, _ = change
+                future = executor.submit(self._send_change, client, source_id,
+                                         finding_id, finding)
+                pending[future] = change
+            for future in futures.as_completed(pending):
+                yield pending[future], future.result()
+
     def _send_findings_to_cscc(self, violations, source_id=None):
         """Send violations to CSCC directly via the CSCC API.
 
+        Only the new, changed and inactive findings are sent. The findings
+        sent are recorded with the finding access, the findings are listed
+        from CSCC when none is recorded for the source.
+
         Args:
-            violations (dict): Violations to be uploaded as findings.
+            violations (iterable): Violations to be uploaded as findings.
             source_id (str): Unique ID assigned by CSCC, to the organization
                 that the violations are originating from.
         """
 
         if source_id:
-            formatted_cscc_findings = []
             LOGGER.debug('Sending findings to CSCC. source_id: '
                          '%s', source_id)
-            new_findings = self._transform_for_api(violations,
-                                                   source_id=source_id)
-
-            client = securitycenter.SecurityCenterClient(version='v1')
-
-            paged_findings_in_cscc = client.list_findings(source_id=source_id)
-
-            # No need to use the next page token, as the results here will
-            # return all the pages.
-            for page in paged_findings_in_cscc:
-                formated_findings_in_page = (
-                    ast.literal_eval(json.dumps(page)))
-                list_findings_result_paged = (
-                    formated_findings_in_page.get('listFindingsResults'))
-                if not list_findings_result_paged:
-                    continue
-                for findings_in_page in list_findings_result_paged:
-                    finding_data = findings_in_page.get('finding')
-                    name = finding_data.get('name')
-                    finding_id = name[-32:]
-                    formatted_cscc_findings.append([finding_id, finding_data])
-
-            inactive_findings = self.find_inactive_findings(
-                new_findings,
-                formatted_cscc_findings)
-
-            for finding_list in new_findings:
-                finding_id = finding_list[0]
-                finding = finding_list[1]
-                LOGGER.debug('Creating finding CSCC:\n%s.', finding)
-                try:
-                    client.create_finding(finding, source_id=source_id,
-                                          finding_id=finding_id)
-                except api_errors.ApiExecutionError:
-                    LOGGER.exception('Encountered CSCC API error.')
-                    continue
-
-            for finding_list in inactive_findings:
-                finding_id = finding_list[0]
-                finding = finding_list[1]
-                LOGGER.debug('Updating finding CSCC:\n%s.', finding)
-                try:
-                    client.update_finding(finding,
-                                          finding_id,
-                                          source_id=source_id)
-                except api_errors.ApiExecutionError:
-                    LOGGER.exception('Encountered CSCC API error.')
-                    continue
+            client = securitycenter.SecurityCenterClient(
+                global_configs=self.global_configs, version='v1')
+
+            sent_findings = {}
+            if self.finding_access:
+                sent_findings = self.finding_access.list(source_id)
+            # The findings listed from CSCC are recorded as they are, their
+            # content hash is unknown so the active ones are all sent again.
+            findings_to_save = {}
+            if not sent_findings:
+                LOGGER.info('No finding recorded for CSCC source %s, listing '
+                            'the findings in CSCC.', source_id)
+                sent_findings = self._list_findings_in_cscc(client, source_id)
+                findings_to_save.update(sent_findings)
+
+            change_count = 0
+            failure_count = 0
+            changes = self._find_changes(violations, source_id, sent_findings)
+            for (finding_id, finding, content_hash), sent in (
+                    self._send_changes(client, source_id, changes)):
+                change_count += 1
+                if sent:
+                    findings_to_save[finding_id] = (content_hash,
+                                                    finding['state'])
+                else:
+                    failure_count += 1
+
+            LOGGER.info('Sent %s changed findings to CSCC, %s failed.',
+                        change_count - failure_count, failure_count)
+            if self.finding_access:
+                self.finding_access.save(source_id, findings_to_save)
 
             return
 
@@ -20,7 +20,9 @@ determine whether there are violations.
 """
 
 from builtins import object
+import collections
 import itertools
+import re
 import threading
 
 from google.cloud.forseti.common.gcp_type import errors as resource_errors
@@ -29,6 +31,7 @@ from google.cloud.forseti.common.gcp_type import resource as resource_mod
 from google.cloud.forseti.common.gcp_type import resource_util
 from google.cloud.forseti.common.util import logger
 from google.cloud.forseti.common.util import relationship
+from google.cloud.forseti.common.util.regular_exp import escape_and_globify
 from google.cloud.forseti.scanner.audit import base_rules_engine as bre
 from google.cloud.forseti.scanner.audit import rules as scanner_rules
 from google.cloud.forseti.scanner.audit import errors as audit_errors
@@ -37,6 +40,137 @@ LOGGER = logger.get_logger(__name__)
 
 VIOLATION_TYPE = 'IAM_POLICY_VIOLATION'
 
+# Member types matching every member of the same type, they have no name.
+_ALL_MEMBER_TYPES = frozenset([iam_policy.IamPolicyMember.ALL_USERS,
+                               iam_policy.IamPolicyMember.ALL_AUTH_USERS])
+
+
+def _compile_globs(patterns):
+    """Merge glob patterns into a single case insensitive regex.
+
+    Args:
+        patterns (list): The glob pattern strings.
+
+    Returns:
+        SRE_Pattern: Regex matching a string matched by any of the patterns,
+            None if there are no patterns.
+    """
+    if not patterns:
+        return None
+    return re.compile(
+        '|'.join('(?:{})'.format(escape_and_globify(p)) for p in patterns),
+        flags=re.IGNORECASE)
+
+
+def _get_user_domain(member):
+    """Get the domain of a user member.
+
+    Args:
+        member (IamPolicyMember): The policy binding member.
+
+    Returns:
+        str: The domain of the user's email, None if the member is not a
+            user or has no domain.
+    """
+    if member.type != 'user' or not member.name or '@' not in member.name:
+        return None
+    return member.name.rsplit('@', 1)[1]
+
+
+class MemberMatcher(object):
+    """Rule binding members bucketed by member type.
+
+    Matches a policy member against all the rule members with a dict lookup
+    for the exact member names and one merged regex per member type for the
+    glob names, with the same result as calling IamPolicyMember.matches for
+    each of the rule members.
+    """
+
+    def __init__(self, members):
+        """Initialize.
+
+        Args:
+            members (list): The IamPolicyMembers of the rule binding.
+        """
+        self.members = members
+        self._all_types = collections.Counter()
+        self._exact_names = collections.Counter()
+        self._domains = collections.Counter()
+        self._glob_patterns = collections.defaultdict(list)
+
+        glob_names = collections.defaultdict(list)
+        for member in members:
+            if member.type in _ALL_MEMBER_TYPES:
+                self._all_types[member.type] += 1
+            elif not member.name:
+                continue
+            elif '*' in member.name:
+                glob_names[member.type].append(member.name)
+                self._glob_patterns[member.type].append(member.name_pattern)
+            else:
+                self._exact_names[(member.type, member.name.lower())] += 1
+            if member.type == 'domain' and member.name:
+                self._domains[member.name] += 1
+
+        self._globs = {member_type: _compile_globs(names)
+                       for member_type, names in glob_names.items()}
+
+    def matches(self, member):
+        """Check whether a policy member matches any of the rule members.
+
+        Args:
+            member (IamPolicyMember): The policy binding member.
+
+        Returns:
+            bool: True if a rule member matches the policy member.
+        """
+        if member.type in _ALL_MEMBER_TYPES:
+            return member.type in self._all_types
+        if member.name:
+            if (member.type, member.name.lower()) in self._exact_names:
+                return True
+            glob = self._globs.get(member.type)
+            if glob and glob.match(member.name):
+                return True
+        return _get_user_domain(member) in self._domains
+
+    def count_matches(self, member):
+        """Count the rule members matching a policy member.
+
+        Args:
+            member (IamPolicyMember): The policy binding member.
+
+        Returns:
+            int: The number of rule members matching the policy member.
+        """
+        if member.type in _ALL_MEMBER_TYPES:
+            return self._all_types[member.type]
+        count = 0
+        if member.name:
+            count += self._exact_names[(member.type, member.name.lower())]
+            glob = self._globs.get(member.type)
+            if glob and glob.match(member.name):
+                count += sum(1 for pattern in self._glob_patterns[member.type]
+                             if pattern.match(member.name))
+        domain = _get_user_domain(member)
+        if domain:
+            count += self._domains[domain]
+        return count
+
+
+def _get_member_matcher(rule_members):
+    """Get the MemberMatcher of the rule members.
+
+    Args:
+        rule_members (object): A MemberMatcher, or a list of IamPolicyMembers.
+
+    Returns:
+        MemberMatcher: The matcher for the rule members.
+    """
+    if isinstance(rule_members, MemberMatcher):
+        return rule_members
+    return MemberMatcher(rule_members)
+
 
 def _check_whitelist_members(rule_members=None, policy_members=None):
     """Whitelist: Check that policy members ARE in rule members.
@@ -45,39 +179,37 @@ def _check_whitelist_members(rule_members=None, policy_members=None):
     the violating members.
 
     Args:
-        rule_members (list): IamPolicyMembers allowed in the rule.
+        rule_members (object): IamPolicyMembers allowed in the rule, as a
+            list or a MemberMatcher.
         policy_members (list): IamPolicyMembers in the policy.
 
     Return:
         list: Policy members NOT found in the whitelist (rule members).
     """
-    violating_members = []
-    for policy_member in policy_members:
-        # check if policy_member is found in rule_members
-        if not any(r.matches(policy_member) for r in rule_members):
-            violating_members.append(policy_member)
-    return violating_members
+    matcher = _get_member_matcher(rule_members)
+    return [policy_member for policy_member in policy_members
+            if not matcher.matches(policy_member)]
 
 
 def _check_blacklist_members(rule_members=None, policy_members=None):
     """Blacklist: Check that policy members ARE NOT in rule members.
 
     If a policy member is found in the rule members, add it to the
-    violating members.
+    violating members, once for each rule member it matches.
 
     Args:
-        rule_members (list): IamPolicyMembers allowed in the rule.
+        rule_members (object): IamPolicyMembers denied in the rule, as a
+            list or a MemberMatcher.
         policy_members (list): IamPolicyMembers in the policy.
 
     Return:
         list: Policy members found in the blacklist (rule members).
     """
-    violating_members = [
-        policy_member
-        for policy_member in policy_members
-        for rule_member in rule_members
-        if rule_member.matches(policy_member)
-    ]
+    matcher = _get_member_matcher(rule_members)
+    violating_members = []
+    for policy_member in policy_members:
+        violating_members.extend(
+            [policy_member] * matcher.count_matches(policy_member))
     return violating_members
 
 
@@ -90,20 +222,96 @@ def _check_required_members(rule_members=None, policy_members=None):
     rules vs rules as subset of policy).
 
     Args:
-        rule_members (list): IamPolicyMembers allowed in the rule.
+        rule_members (object): IamPolicyMembers required by the rule, as a
+            list or a MemberMatcher.
         policy_members (list): IamPolicyMembers in the policy.
 
     Return:
         list: Rule members not found in the policy (required-whitelist).
     """
+    if isinstance(rule_members, MemberMatcher):
+        rule_members = rule_members.members
+
+    # Bucket the policy members by type, so each rule member is looked up
+    # instead of being matched against all of the policy members.
+    names = collections.defaultdict(list)
+    lower_names = collections.defaultdict(set)
+    user_domains = set()
+    for policy_member in policy_members:
+        names[policy_member.type].append(policy_member.name)
+        if policy_member.name:
+            lower_names[policy_member.type].add(policy_member.name.lower())
+        user_domains.add(_get_user_domain(policy_member))
+
     violating_members = []
     for rule_member in rule_members:
-        # check if rule_member is found in policy_members
-        if not any(rule_member.matches(m) for m in policy_members):
+        if rule_member.type in _ALL_MEMBER_TYPES:
+            found = rule_member.type in names
+        elif not rule_member.name:
+            found = False
+        elif '*' in rule_member.name:
+            found = any(name and rule_member.name_pattern.match(name)
+                        for name in names.get(rule_member.type, ()))
+        else:
+            found = (rule_member.name.lower() in
+                     lower_names.get(rule_member.type, ()))
+        if (not found and rule_member.type == 'domain' and
+                rule_member.name):
+            found = rule_member.name in user_domains
+        if not found:
             violating_members.append(rule_member)
     return violating_members
 
 
+class CompiledRule(object):
+    """A rule with its bindings indexed by role.
+
+    Exact role names are looked up in a dict, the role globs are merged into
+    a single regex and the rule bindings matching a role name are cached, so
+    each policy binding is only compared with the rule bindings of its role.
+    """
+
+    def __init__(self, rule):
+        """Initialize.
+
+        Args:
+            rule (Rule): The rule to compile.
+        """
+        self.rule = rule
+        self.member_matchers = [MemberMatcher(binding.members)
+                                for binding in rule.bindings]
+        self._exact_roles = collections.defaultdict(list)
+        self._glob_roles = []
+        for (i, binding) in enumerate(rule.bindings):
+            if '*' in binding.role_name:
+                self._glob_roles.append(i)
+            else:
+                self._exact_roles[binding.role_name.lower()].append(i)
+        self._glob = _compile_globs(
+            [rule.bindings[i].role_name for i in self._glob_roles])
+        self._bindings_by_role = {}
+
+    def get_binding_indexes(self, role_name):
+        """Get the rule bindings whose role pattern matches a role name.
+
+        Args:
+            role_name (str): The role of a policy binding.
+
+        Returns:
+            tuple: The indexes of the matching rule bindings, in order.
+        """
+        indexes = self._bindings_by_role.get(role_name)
+        if indexes is None:
+            indexes = list(self._exact_roles.get(role_name.lower(), ()))
+            if self._glob and self._glob.match(role_name):
+                indexes.extend(
+                    i for i in self._glob_roles
+                    if self.rule.bindings[i].role_pattern.match(role_name))
+            indexes = tuple(sorted(indexes))
+            self._bindings_by_role[role_name] = indexes
+        return indexes
+
+
 class IamRulesEngine(bre.BaseRulesEngine):
     """Rules engine for org resources."""
 
@@ -214,6 +422,7 @@ class IamRuleBook(bre.BaseRuleBook):
         super(IamRuleBook, self).__init__()
         self._rules_sema = threading.BoundedSemaphore(value=1)
         self.resource_rules_map = {}
+        self._resource_rules_index = None
         if not rule_defs:
             self.rule_defs = {}
         else:
@@ -262,6 +471,36 @@ class IamRuleBook(bre.BaseRuleBook):
         """
         for (i, rule) in enumerate(rule_defs.get('rules', [])):
             self.add_rule(rule, i)
+        self._get_resource_rules_index()
+
+    def _get_resource_rules_index(self):
+        """Get the ResourceRules indexed by resource, compiling the rules.
+
+        The index is built once after the rules are added, and rebuilt after
+        another rule is added.
+
+        Returns:
+            dict: (resource type, resource id) => list of ResourceRules.
+        """
+        index = self._resource_rules_index
+        if index is not None:
+            return index
+
+        self._rules_sema.acquire()
+        try:
+            index = {}
+            for rule_applies_to in scanner_rules.RuleAppliesTo.apply_types:
+                for (resource, applies_to), resource_rules in (
+                        self.resource_rules_map.items()):
+                    if applies_to != rule_applies_to:
+                        continue
+                    resource_rules.compile_rules()
+                    index.setdefault((resource.type, resource.id), []).append(
+                        resource_rules)
+            self._resource_rules_index = index
+        finally:
+            self._rules_sema.release()
+        return index
 
     def add_rule(self, rule_def, rule_index):
         """Add a rule to the rule book.
@@ -313,6 +552,7 @@ class IamRuleBook(bre.BaseRuleBook):
         self._rules_sema.acquire()
 
         try:
+            self._resource_rules_index = None
             resources = rule_def.get('resource')
 
             for resource in resources:
@@ -369,24 +609,6 @@ class IamRuleBook(bre.BaseRuleBook):
         finally:
             self._rules_sema.release()
 
-    def _get_resource_rules(self, resource):
-        """Get all the resource rules for (resource, RuleAppliesTo.*).
-
-        Args:
-            resource (Resource): The resource to find in the ResourceRules map.
-
-        Returns:
-            list: A list of ResourceRules.
-        """
-        resource_rules = []
-
-        for rule_applies_to in scanner_rules.RuleAppliesTo.apply_types:
-            if (resource, rule_applies_to) in self.resource_rules_map:
-                resource_rules.append(self.resource_rules_map.get(
-                    (resource, rule_applies_to)))
-
-        return resource_rules
-
     def find_violations(self, resource, policy, policy_bindings):
         """Find policy binding violations in the rule book.
 
@@ -405,15 +627,15 @@ class IamRuleBook(bre.BaseRuleBook):
             iterable: A generator of the rule violations.
         """
         violations = itertools.chain()
+        index = self._get_resource_rules_index()
 
         resource_ancestors = (
             relationship.find_ancestors(resource, policy.full_name))
 
         for curr_resource in resource_ancestors:
-            wildcard_resource = resource_util.create_resource(
-                resource_id='*', resource_type=curr_resource.type)
-            resource_rules = self._get_resource_rules(curr_resource)
-            resource_rules.extend(self._get_resource_rules(wildcard_resource))
+            resource_rules = (
+                index.get((curr_resource.type, curr_resource.id), []) +
+                index.get((curr_resource.type, '*'), []))
 
             # Set to None, because if the direct resource (e.g. project)
             # doesn't have a specific rule, we still should check the
@@ -496,6 +718,7 @@ class ResourceRules(object):
         self.rules = rules
         self.applies_to = scanner_rules.RuleAppliesTo.verify(applies_to)
         self.inherit_from_parents = inherit_from_parents
+        self._compiled_rules = {}
 
         self._rule_mode_methods = {
             scanner_rules.RuleMode.WHITELIST: _check_whitelist_members,
@@ -543,6 +766,26 @@ class ResourceRules(object):
                     self.applies_to,
                     self.inherit_from_parents)
 
+    def compile_rules(self):
+        """Compile the rules that are not compiled yet."""
+        for rule in self.rules:
+            self._get_compiled_rule(rule)
+
+    def _get_compiled_rule(self, rule):
+        """Get the CompiledRule of a rule, compiling it if needed.
+
+        Args:
+            rule (Rule): One of the rules.
+
+        Returns:
+            CompiledRule: The compiled rule.
+        """
+        compiled_rule = self._compiled_rules.get(rule)
+        if compiled_rule is None or compiled_rule.rule is not rule:
+            compiled_rule = CompiledRule(rule)
+            self._compiled_rules[rule] = compiled_rule
+        return compiled_rule
+
     def find_mismatches(self, resource, policy_bindings):
         """Determine if the policy binding matches this rule's criteria.
 
@@ -586,21 +829,26 @@ class ResourceRules(object):
         Yields:
             iterable: A generator of RuleViolations.
         """
+        compiled_rule = self._get_compiled_rule(rule)
+        matching_policy_bindings = [[] for _ in rule.bindings]
+        for policy_binding in policy_bindings:
+            for i in compiled_rule.get_binding_indexes(
+                    policy_binding.role_name):
+                matching_policy_bindings[i].append(policy_binding)
+
         found_role = False
         violating_bindings = {}
         # If the rule's binding role is found in the policy,
         # check the policy members to see if all rule binding
         # members are found.
         # Any outstanding rule bindings (role => members) should be reported.
-        for rule_binding in rule.bindings:
-            for policy_binding in policy_bindings:
-                violating_members = None
-                if rule_binding.role_pattern.match(policy_binding.role_name):
-                    found_role = True
-                    violating_members = (self._dispatch_rule_mode_check(
-                        mode=rule.mode,
-                        rule_members=rule_binding.members,
-                        policy_members=policy_binding.members))
+        for (i, rule_binding) in enumerate(rule.bindings):
+            for policy_binding in matching_policy_bindings[i]:
+                found_role = True
+                violating_members = (self._dispatch_rule_mode_check(
+                    mode=rule.mode,
+                    rule_members=compiled_rule.member_matchers[i],
+                    policy_members=policy_binding.members))
                 if violating_members:
                     violating_bindings[
                         rule_binding.role_name] = violating_members
@@ -632,17 +880,16 @@ class ResourceRules(object):
         Yields:
             iterable: A generator of RuleViolations.
         """
+        compiled_rule = self._get_compiled_rule(rule)
         for policy_binding in policy_bindings:
-            for rule_binding in rule.bindings:
-                # If the rule's role pattern matches the policy binding's
-                # role pattern, then check the members to see whether they
-                # match, according to the rule mode.
-                violating_members = None
-                if rule_binding.role_pattern.match(policy_binding.role_name):
-                    violating_members = (self._dispatch_rule_mode_check(
-                        mode=rule.mode,
-                        rule_members=rule_binding.members,
-                        policy_members=policy_binding.members))
+            # Check the members of the rule bindings whose role pattern
+            # matches the policy binding's role, according to the rule mode.
+            for i in compiled_rule.get_binding_indexes(
+                    policy_binding.role_name):
+                violating_members = (self._dispatch_rule_mode_check(
+                    mode=rule.mode,
+                    rule_members=compiled_rule.member_matchers[i],
+                    policy_members=policy_binding.members))
                 if violating_members:
                     yield scanner_rules.RuleViolation(
                         resource_type=resource.type,
@@ -661,7 +908,7 @@ class ResourceRules(object):
 
         Args:
             mode (str): The rule mode.
-            rule_members (list): The rule binding members.
+            rule_members (MemberMatcher): The rule binding members.
             policy_members (list): The policy binding members.
 
         Returns:
@@ -13,6 +13,9 @@
 # limitations under the License.
 """GCP Resource scanner."""
 
+import concurrent.futures
+import resource
+import time
 import traceback
 
 from google.cloud.forseti.common.util import logger
@@ -22,6 +25,10 @@ from google.cloud.forseti.services.scanner import dao as scanner_dao
 
 LOGGER = logger.get_logger(__name__)
 
+# Number of scanners run at the same time, unless 'max_concurrency' is set
+# in the scanner configs.
+DEFAULT_MAX_CONCURRENCY = 1
+
 
 def init_scanner_index(session, inventory_index_id):
     """Initialize the 'scanner_index' table.
@@ -55,7 +62,7 @@ def _error_message(failed):
 
 
 def mark_scanner_index_complete(
-        session, scanner_index_id, succeeded, failed):
+        session, scanner_index_id, succeeded, failed, scanner_stats=None):
     """Mark the current 'scanner_index' row as complete.
 
     Args:
@@ -63,10 +70,14 @@ def mark_scanner_index_complete(
         scanner_index_id (str): id of the `ScannerIndex` row to mark
         succeeded (list): names of scanners that ran successfully
         failed (list): names of scanners that failed
+        scanner_stats (dict): names of scanners mapped to their wall time
+            and peak memory
     """
     scanner_index = (
         session.query(scanner_dao.ScannerIndex)
         .filter(scanner_dao.ScannerIndex.id == scanner_index_id).one())
+    if scanner_stats:
+        scanner_index.set_scanner_stats(session, scanner_stats)
     if failed and succeeded:
         scanner_index.complete(IndexState.PARTIAL_SUCCESS)
     elif not failed:
@@ -79,6 +90,91 @@ def mark_scanner_index_complete(
     session.flush()
 
 
+def _run_scanner(service_config, scanner, progress_queue):
+    """Run a scanner, writing its violations in its own session.
+
+    The violations of the scanner are committed together once it completes,
+    none are written if it fails.
+
+    Args:
+        service_config (ServiceConfig): Forseti 2.0 service configs.
+        scanner (BaseScanner): The scanner to run.
+        progress_queue (Queue): The progress queue.
+
+    Returns:
+        dict: Whether the scanner succeeded, its wall time in seconds and
+            the peak resident memory of the process in kilobytes.
+    """
+    scanner_name = scanner.__class__.__name__
+    start = time.time()
+    succeeded = True
+    try:
+        with service_config.scoped_session() as session:
+            scanner.violation_access = scanner_dao.ViolationAccess(session)
+            scanner.run()
+        progress_queue.put('Running {}...'.format(scanner_name))
+    except Exception:  # pylint: disable=broad-except
+        log_message = 'Error running scanner: {}: \'{}\''.format(
+            scanner_name, traceback.format_exc())
+        progress_queue.put(log_message)
+        LOGGER.exception(log_message)
+        succeeded = False
+    finally:
+        scanner.violation_access = None
+    return {
+        'succeeded': succeeded,
+        'wall_time_seconds': round(time.time() - start, 3),
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def _get_max_concurrency(scanner_configs):
+    """Get the number of scanners run at the same time.
+
+    Args:
+        scanner_configs (dict): Scanner configurations.
+
+    Returns:
+        int: The 'max_concurrency' of the scanner configs, at least 1.
+    """
+    max_concurrency = scanner_configs.get('max_concurrency',
+                                          DEFAULT_MAX_CONCURRENCY)
+    try:
+        max_concurrency = int(max_concurrency)
+    except (TypeError, ValueError):
+        LOGGER.warning('Invalid scanner max_concurrency: %s, using %s.',
+                       max_concurrency, DEFAULT_MAX_CONCURRENCY)
+        return DEFAULT_MAX_CONCURRENCY
+    if max_concurrency < 1:
+        LOGGER.warning('Scanner max_concurrency %s is lower than 1, using 1.',
+                       max_concurrency)
+        return 1
+    return max_concurrency
+
+
+def _schedule_scanners(scanners, run_scanner, max_concurrency):
+    """Run the scanners concurrently.
+
+    The scanners only read the model and write their own violations, so
+    they do not depend on each other and run in any order.
+
+    Args:
+        scanners (list): The scanners to run, in order.
+        run_scanner (function): Runs a scanner and returns its statistics.
+        max_concurrency (int): Maximum number of scanners run at a time.
+
+    Yields:
+        tuple: (scanner class name, statistics) of each scanner, as it
+            completes.
+    """
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_concurrency) as executor:
+        running = {executor.submit(run_scanner, scanner):
+                   scanner.__class__.__name__ for scanner in scanners}
+        for future in concurrent.futures.as_completed(running):
+            yield running[future], future.result()
+
+
 def run(model_name=None,
         progress_queue=None,
         service_config=None,
@@ -97,6 +193,7 @@ def run(model_name=None,
     """
     global_configs = service_config.get_global_config()
     scanner_configs = service_config.get_scanner_config()
+    max_concurrency = _get_max_concurrency(scanner_configs)
     with service_config.scoped_session() as session:
         service_config.violation_access = scanner_dao.ViolationAccess(session)
         model_description = (
@@ -104,34 +201,47 @@ def run(model_name=None,
         inventory_index_id = (
             model_description.get('source_info').get('inventory_index_id'))
         scanner_index_id = init_scanner_index(session, inventory_index_id)
+        # The scanners write their violations in their own sessions, which
+        # need to see the running scanner index.
+        session.commit()
         runnable_scanners = scanner_builder.ScannerBuilder(
             global_configs, scanner_configs, service_config, model_name,
             None, scanner_name).build()
 
         succeeded = []
         failed = []
+        scanner_stats = {}
 
         progress_queue.put('Scanner Index ID: {} is created'.
                            format(scanner_index_id))
 
-        for scanner in runnable_scanners:
-            try:
-                scanner.run()
-                progress_queue.put('Running {}...'.format(
-                    scanner.__class__.__name__))
-            except Exception:  # pylint: disable=broad-except
-                log_message = 'Error running scanner: {}: \'{}\''.format(
-                    scanner.__class__.__name__, traceback.format_exc())
-                progress_queue.put(log_message)
-                LOGGER.exception(log_message)
-                failed.append(scanner.__class__.__name__)
-            else:
-                succeeded.append(scanner.__class__.__name__)
-            session.flush()
-        # pylint: enable=bare-except
+        def run_scanner(scanner):
+            """Run a scanner of this scanner run.
+
+            Args:
+                scanner (BaseScanner): The scanner to run.
+
+            Returns:
+                dict: The statistics of the scanner.
+            """
+            return _run_scanner(service_config, scanner, progress_queue)
+
+        # The scanners share the resources they load from the model.
+        data_access = service_config.model_manager.get_data_access(
+            model_name)
+        with data_access.scanner_snapshot():
+            for name, stats in _schedule_scanners(
+                    runnable_scanners, run_scanner, max_concurrency):
+                if stats.pop('succeeded'):
+                    succeeded.append(name)
+                else:
+                    failed.append(name)
+                if stats:
+                    LOGGER.info('Scanner %s completed: %s', name, stats)
+                    scanner_stats[name] = stats
         log_message = 'Scan completed!'
         mark_scanner_index_complete(
-            session, scanner_index_id, succeeded, failed)
+            session, scanner_index_id, succeeded, failed, scanner_stats)
         progress_queue.put(log_message)
         progress_queue.put(None)
         LOGGER.info(log_message)
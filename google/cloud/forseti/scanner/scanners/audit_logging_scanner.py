@@ -120,7 +120,8 @@ class AuditLoggingScanner(base_scanner.BaseScanner):
             list: List of projects' audit logging config data.
         """
         model_manager = self.service_config.model_manager
-        scoped_session, data_access = model_manager.get(self.model_name)
+        scoped_session, data_access = model_manager.get(
+            self.model_name, readonly=True)
         with scoped_session as session:
             project_configs = []
             ancestor_configs = {}
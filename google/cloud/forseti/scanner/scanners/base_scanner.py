@@ -51,6 +51,9 @@ class BaseScanner(with_metaclass(abc.ABCMeta, object)):
         self.model_name = model_name
         self.snapshot_timestamp = snapshot_timestamp
         self.rules = rules
+        # Set by the scanner scheduler, so each scanner writes its
+        # violations in its own session.
+        self.violation_access = None
 
     @abc.abstractmethod
     def run(self):
@@ -104,14 +107,15 @@ class BaseScanner(with_metaclass(abc.ABCMeta, object)):
         """Output scanner results to DB.
 
         Args:
-            violations (list): A list of violations.
+            violations (iterable): The violations, may be a generator.
         """
         model_description = (
             self.service_config.model_manager.get_description(self.model_name))
         inventory_index_id = (
             model_description.get('source_info').get('inventory_index_id'))
 
-        violation_access = self.service_config.violation_access
+        violation_access = (self.violation_access or
+                            self.service_config.violation_access)
         scanner_index_id = scanner_dao.get_latest_scanner_index_id(
             violation_access.session, inventory_index_id,
             index_state=IndexState.RUNNING)
@@ -128,7 +128,8 @@ class BigqueryScanner(base_scanner.BaseScanner):
             ValueError: if resources have an unexpected type.
         """
         model_manager = self.service_config.model_manager
-        scoped_session, data_access = model_manager.get(self.model_name)
+        scoped_session, data_access = model_manager.get(
+            self.model_name, readonly=True)
         with scoped_session as session:
             bq_acl_data = []
             policies = []
@@ -95,7 +95,8 @@ class BlacklistScanner(base_scanner.BaseScanner):
         """
 
         model_manager = self.service_config.model_manager
-        scoped_session, data_access = model_manager.get(self.model_name)
+        scoped_session, data_access = model_manager.get(
+            self.model_name, readonly=True)
 
         instance_from_data_models = []
         with scoped_session as session:
@@ -118,7 +118,8 @@ class BucketsAclScanner(base_scanner.BaseScanner):
             list: BigQuery ACL data
         """
         model_manager = self.service_config.model_manager
-        scoped_session, data_access = model_manager.get(self.model_name)
+        scoped_session, data_access = model_manager.get(
+            self.model_name, readonly=True)
         with scoped_session as session:
             bucket_acls = []
             gcs_policies = [policy for policy in
@@ -115,7 +115,8 @@ class CloudSqlAclScanner(base_scanner.BaseScanner):
             list: CloudSQL ACL data.
         """
         model_manager = self.service_config.model_manager
-        scoped_session, data_access = model_manager.get(self.model_name)
+        scoped_session, data_access = model_manager.get(
+            self.model_name, readonly=True)
         with scoped_session as session:
             cloudsql_acls = []
 
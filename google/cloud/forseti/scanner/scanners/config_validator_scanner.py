@@ -87,8 +87,8 @@ class ConfigValidatorScanner(base_scanner.BaseScanner):
         """Output results.
 
         Args:
-            all_violations (List[RuleViolation]): A list of
-                flattened Config Validator violations.
+            all_violations (iterable): The flattened Config Validator
+                violations.
         """
         self._output_results_to_db(all_violations)
 
@@ -108,7 +108,8 @@ class ConfigValidatorScanner(base_scanner.BaseScanner):
             ValueError: if resources have an unexpected type.
         """
         model_manager = self.service_config.model_manager
-        scoped_session, data_access = model_manager.get(self.model_name)
+        scoped_session, data_access = model_manager.get(
+            self.model_name, readonly=True)
 
         if not iam_policy:
             resource_types = importer.GCP_TYPE_LIST
@@ -152,7 +153,8 @@ class ConfigValidatorScanner(base_scanner.BaseScanner):
             iam_policy (bool): Retrieve flattened IAM policy violations.
 
         Returns:
-            list: A list of flattened violations.
+            generator: The flattened violations, to consume before the next
+                retrieval resets the resource lookup table.
         """
         # Clean up the validator environment by doing a reset pre audit.
         self.validator_client.reset()
@@ -169,7 +171,7 @@ class ConfigValidatorScanner(base_scanner.BaseScanner):
         # Clean up the validator environment by doing a reset post audit.
         self.validator_client.reset()
 
-        return list(self._flatten_violations(violations))
+        return self._flatten_violations(violations)
 
     def run(self):
         """Runs the Config Validator Scanner.
@@ -182,12 +184,9 @@ class ConfigValidatorScanner(base_scanner.BaseScanner):
         corresponding violation types.
         """
         # TODO: break up the _retrieve_flattened_violations method.
-        # Retrieving resource violations.
-        all_violations = self._retrieve_flattened_violations()
+        # Retrieving and outputting resource violations.
+        self._output_results(self._retrieve_flattened_violations())
 
-        # Retrieving iam violations.
-        all_violations.extend(
+        # Retrieving and outputting iam violations.
+        self._output_results(
             self._retrieve_flattened_violations(iam_policy=True))
-
-        # Output all violations to db.
-        self._output_results(all_violations)
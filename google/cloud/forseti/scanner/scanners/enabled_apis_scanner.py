@@ -118,7 +118,8 @@ class EnabledApisScanner(base_scanner.BaseScanner):
             NoDataError: If no enabled APIs are found.
         """
         model_manager = self.service_config.model_manager
-        scoped_session, data_access = model_manager.get(self.model_name)
+        scoped_session, data_access = model_manager.get(
+            self.model_name, readonly=True)
         with scoped_session as session:
             enabled_apis_data = []
 
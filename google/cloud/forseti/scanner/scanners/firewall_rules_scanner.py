@@ -125,7 +125,8 @@ class FirewallPolicyScanner(base_scanner.BaseScanner):
         """
 
         model_manager = self.service_config.model_manager
-        scoped_session, data_access = model_manager.get(self.model_name)
+        scoped_session, data_access = model_manager.get(
+            self.model_name, readonly=True)
         project_policies = defaultdict(list)
         count = -1
         with scoped_session as session:
@@ -99,7 +99,8 @@ class ForwardingRuleScanner(base_scanner.BaseScanner):
             list: forwarding rule list.
         """
         model_manager = self.service_config.model_manager
-        scoped_session, data_access = model_manager.get(self.model_name)
+        scoped_session, data_access = model_manager.get(
+            self.model_name, readonly=True)
         with scoped_session as session:
             forwarding_rules = []
             for forwarding_rule in data_access.scanner_iter(
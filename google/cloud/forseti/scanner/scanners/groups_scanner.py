@@ -209,7 +209,8 @@ class GroupsScanner(base_scanner.BaseScanner):
                 the recursive members.
         """
         model_manager = self.service_config.model_manager
-        scoped_session, data_access = model_manager.get(self.model_name)
+        scoped_session, data_access = model_manager.get(
+            self.model_name, readonly=True)
         with scoped_session as session:
             members = data_access.expand_members(session,
                                                  [starting_node.member_id])
@@ -228,7 +229,8 @@ class GroupsScanner(base_scanner.BaseScanner):
         """
         root = MemberNode(MY_CUSTOMER, MY_CUSTOMER)
         model_manager = self.service_config.model_manager
-        scoped_session, data_access = model_manager.get(self.model_name)
+        scoped_session, data_access = model_manager.get(
+            self.model_name, readonly=True)
         with scoped_session as session:
             all_groups = data_access.iter_groups(session)
 
@@ -139,7 +139,8 @@ class GroupsSettingsScanner(base_scanner.BaseScanner):
         iam_groups_settings = []
 
         model_manager = self.service_config.model_manager
-        scoped_session, data_access = model_manager.get(self.model_name)
+        scoped_session, data_access = model_manager.get(
+            self.model_name, readonly=True)
         with scoped_session as session:
             for settings in data_access.scanner_fetch_groups_settings(session,
                                                                       True):
@@ -14,8 +14,6 @@
 
 """Scanner for the IAM rules engine."""
 
-import json
-
 from google.cloud.forseti.common.gcp_type import iam_policy
 from google.cloud.forseti.common.gcp_type.billing_account import BillingAccount
 from google.cloud.forseti.common.gcp_type.bucket import Bucket
@@ -166,7 +164,7 @@ class IamPolicyScanner(base_scanner.BaseScanner):
         """Output results.
 
         Args:
-            all_violations (list): A list of violations.
+            all_violations (iterable): The violations.
         """
         all_violations = self._flatten_violations(all_violations)
         self._output_results_to_db(all_violations)
@@ -178,10 +176,9 @@ class IamPolicyScanner(base_scanner.BaseScanner):
             policies (list): list of (parent resource, iam_policy resource,
                 policy bindings) tuples to find violations in.
 
-        Returns:
-            list: A list of all violations
+        Yields:
+            RuleViolation: The violations, as they are found.
         """
-        all_violations = []
         LOGGER.info('Finding IAM policy violations...')
         for (resource, policy, policy_bindings) in policies:
             # At this point, the variable's meanings are switched:
@@ -190,8 +187,8 @@ class IamPolicyScanner(base_scanner.BaseScanner):
             LOGGER.debug('%s => %s', resource, policy)
             violations = self.rules_engine.find_violations(
                 resource, policy, policy_bindings)
-            all_violations.extend(violations)
-        return all_violations
+            for violation in violations:
+                yield violation
 
     def _retrieve(self):
         """Retrieves the data for scanner.
@@ -204,18 +201,18 @@ class IamPolicyScanner(base_scanner.BaseScanner):
             NoDataError: If no policies are found.
         """
         model_manager = self.service_config.model_manager
-        scoped_session, data_access = model_manager.get(self.model_name)
+        scoped_session, data_access = model_manager.get(
+            self.model_name, readonly=True)
         with scoped_session as session:
             policy_data = []
             resource_counts = {iam_type: 0
                                for iam_type in IAM_TYPE_RESOURCE_MAP}
+            loader = iam_policy.IamPolicyBindingLoader()
             for policy in data_access.scanner_iter(session, 'iam_policy'):
                 if policy.parent.type not in IAM_TYPE_RESOURCE_MAP:
                     continue
 
-                policy_bindings = [_f for _f in [
-                    iam_policy.IamPolicyBinding.create_from(b)
-                    for b in json.loads(policy.data).get('bindings', [])] if _f]
+                policy_bindings = loader.load(policy.data)
 
                 resource_counts[policy.parent.type] += 1
                 resource_class = IAM_TYPE_RESOURCE_MAP[policy.parent.type]
@@ -229,6 +226,9 @@ class IamPolicyScanner(base_scanner.BaseScanner):
             LOGGER.warning('No policies found.')
             return [], 0
 
+        LOGGER.debug('Loaded %s IAM policies with %s distinct members.',
+                     len(policy_data), len(loader))
+
         return policy_data, resource_counts
 
     def run(self):
@@ -440,7 +440,7 @@ class IapScanner(base_scanner.BaseScanner):
             snapshot_timestamp=self.snapshot_timestamp)
         self.rules_engine.build_rule_book(self.global_configs)
         self.scoped_session, self.data_access = (
-            service_config.model_manager.get(model_name))
+            service_config.model_manager.get(model_name, readonly=True))
 
     @staticmethod
     def _flatten_violations(violations):
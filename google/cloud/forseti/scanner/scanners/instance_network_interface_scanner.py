@@ -119,7 +119,8 @@ class InstanceNetworkInterfaceScanner(base_scanner.BaseScanner):
         """
 
         model_manager = self.service_config.model_manager
-        scoped_session, data_access = model_manager.get(self.model_name)
+        scoped_session, data_access = model_manager.get(
+            self.model_name, readonly=True)
         with scoped_session as session:
             network_interfaces = []
 
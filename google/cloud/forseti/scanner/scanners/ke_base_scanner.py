@@ -179,7 +179,8 @@ def ke_scanner_factory(scanner_name, rules_engine_cls):
                 list: KE Cluster data.
             """
             model_manager = self.service_config.model_manager
-            scoped_session, data_access = model_manager.get(self.model_name)
+            scoped_session, data_access = model_manager.get(
+                self.model_name, readonly=True)
             with scoped_session as session:
                 ke_clusters = []
                 for cluster in data_access.scanner_iter(
@@ -118,7 +118,8 @@ class KMSScanner(base_scanner.BaseScanner):
         keys = []
 
         model_manager = self.service_config.model_manager
-        scoped_session, data_access = model_manager.get(self.model_name)
+        scoped_session, data_access = model_manager.get(
+            self.model_name, readonly=True)
         with scoped_session as session:
             for key in data_access.scanner_iter(session, 'kms_cryptokey'):
                 if not key.parent_type_name.startswith('kms_keyring'):
@@ -69,7 +69,7 @@ class LienScanner(base_scanner.BaseScanner):
             ValueError: if resources have an unexpected type.
         """
         scoped_session, data_access = self.service_config.model_manager.get(
-            self.model_name)
+            self.model_name, readonly=True)
         with scoped_session as session:
             parent_resource_to_liens = {}
 
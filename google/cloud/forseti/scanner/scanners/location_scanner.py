@@ -69,7 +69,7 @@ class LocationScanner(base_scanner.BaseScanner):
         resources = []
 
         scoped_session, data_access = self.service_config.model_manager.get(
-            self.model_name)
+            self.model_name, readonly=True)
         with scoped_session as session:
             for resource_type in lre.SUPPORTED_LOCATION_RESOURCE_TYPES:
                 for resource in data_access.scanner_iter(
@@ -117,7 +117,8 @@ class LogSinkScanner(base_scanner.BaseScanner):
             list: List of GCP resources' log sinks.
         """
         model_manager = self.service_config.model_manager
-        scoped_session, data_access = model_manager.get(self.model_name)
+        scoped_session, data_access = model_manager.get(
+            self.model_name, readonly=True)
         with scoped_session as session:
             log_sink_data = []
 
@@ -69,7 +69,7 @@ class ResourceScanner(base_scanner.BaseScanner):
         resource_types = (
             self.rules_engine.rule_book.get_applicable_resource_types())
         scoped_session, data_access = self.service_config.model_manager.get(
-            self.model_name)
+            self.model_name, readonly=True)
         with scoped_session as session:
             for resource_type in resource_types:
                 for resource in data_access.scanner_iter(
@@ -109,7 +109,8 @@ class RetentionScanner(base_scanner.BaseScanner):
                 SUPPORTED_RETENTION_RES_TYPES
         """
         model_manager = self.service_config.model_manager
-        scoped_session, data_access = model_manager.get(self.model_name)
+        scoped_session, data_access = model_manager.get(
+            self.model_name, readonly=True)
         retention_res = []
         with scoped_session as session:
             for resource_type in rre.SUPPORTED_RETENTION_RES_TYPES:
@@ -108,7 +108,8 @@ class RoleScanner(base_scanner.BaseScanner):
             list: a list of custom Roles, no curated roles.
         """
         model_manager = self.service_config.model_manager
-        scoped_session, data_access = model_manager.get(self.model_name)
+        scoped_session, data_access = model_manager.get(
+            self.model_name, readonly=True)
         role_res = []
         with scoped_session as session:
             for resource in data_access.scanner_iter(
@@ -117,7 +117,8 @@ class ServiceAccountKeyScanner(base_scanner.BaseScanner):
             list: ServiceAccount objects
         """
         model_manager = self.service_config.model_manager
-        scoped_session, data_access = model_manager.get(self.model_name)
+        scoped_session, data_access = model_manager.get(
+            self.model_name, readonly=True)
         with scoped_session as session:
             service_accounts = []
             for service_account in data_access.scanner_iter(
@@ -37,6 +37,29 @@ from google.cloud.forseti.services.inventory.storage import Storage
 
 LOGGER = logger.get_logger(__name__)
 
+# Engine options that can be set per connection pool.
+POOL_OPTIONS = ['pool_size', 'max_overflow', 'pool_timeout', 'pool_recycle',
+                'pool_pre_ping']
+
+
+def _get_pool_options(pool_config):
+    """Get the engine options of a connection pool.
+
+    Args:
+        pool_config (dict): Settings of the pool in the database section of
+            the server configuration.
+
+    Returns:
+        dict: Keyword arguments for create_engine.
+    """
+    # Enable pool_pre_ping to ensure that disconnected or errored
+    # connections are dropped and recreated before use.
+    options = {'pool_recycle': 3600, 'pool_pre_ping': True}
+    for option in POOL_OPTIONS:
+        if pool_config.get(option) is not None:
+            options[option] = pool_config[option]
+    return options
+
 
 def _validate_cai_enabled(cai_configs):
     """Verifies if CloudAsset Inventory can be used for this inventory config.
@@ -90,6 +113,10 @@ class AbstractInventoryConfig(with_metaclass(abc.ABCMeta, object)):
     def get_retention_days_configs(self):
         """Returns the days of inventory data to retain."""
 
+    @abc.abstractmethod
+    def get_incremental_configs(self):
+        """Returns the incremental inventory settings."""
+
     @abc.abstractmethod
     def get_cai_asset_types(self):
         """Returns the GCS bucket path to store the CAI data dumps in."""
@@ -106,6 +133,14 @@ class AbstractInventoryConfig(with_metaclass(abc.ABCMeta, object)):
     def get_cai_timeout(self):
         """Returns the timeout in seconds for calls to the Cloud Asset API."""
 
+    @abc.abstractmethod
+    def get_cai_bulk_load(self):
+        """Returns True if CAI dumps should be loaded with bulk inserts."""
+
+    @abc.abstractmethod
+    def get_cai_pipeline_configs(self):
+        """Returns the per stage settings for the CAI import pipeline."""
+
     @abc.abstractmethod
     def get_service_config(self):
         """Returns the service config."""
@@ -196,7 +231,8 @@ class InventoryConfig(AbstractInventoryConfig):
                  retention_days,
                  cai_configs,
                  composite_root_resources=None,
-                 excluded_resources=None):
+                 excluded_resources=None,
+                 incremental_configs=None):
         """Initialize.
 
         Args:
@@ -208,6 +244,7 @@ class InventoryConfig(AbstractInventoryConfig):
             composite_root_resources (list): The list of resources to use crawl
                 using a composite root.
             excluded_resources (list): The list of resources to exclude.
+            incremental_configs (dict): Settings for incremental inventories.
 
         Raises:
             ValueError: Raised if neither or both root_resource_id and
@@ -237,6 +274,7 @@ class InventoryConfig(AbstractInventoryConfig):
         self.composite_root_resources = composite_root_resources
         self.excluded_resources = self._filter_valid_resources(
             excluded_resources)
+        self.incremental_configs = incremental_configs or {}
 
     def use_composite_root(self):
         """Checks if inventory is configured to use a composite root resource.
@@ -295,6 +333,16 @@ class InventoryConfig(AbstractInventoryConfig):
         """
         return self.retention_days
 
+    def get_incremental_configs(self):
+        """Returns the incremental inventory settings.
+
+        Returns:
+            dict: Whether to store inventories incrementally and how many
+                incremental inventories to take between full inventories, an
+                empty dict if not configured.
+        """
+        return self.incremental_configs
+
     def get_cai_asset_types(self):
         """Returns the list of Asset Types to include in the CAI export.
 
@@ -331,6 +379,24 @@ class InventoryConfig(AbstractInventoryConfig):
         """
         return self.cai_configs.get('api_timeout', 3600)
 
+    def get_cai_bulk_load(self):
+        """Returns True if CAI dumps should be loaded with bulk inserts.
+
+        Returns:
+            bool: Whether to stream CAI dumps into the database with Core
+                bulk inserts instead of ORM objects, defaults to False.
+        """
+        return self.cai_configs.get('bulk_load', False)
+
+    def get_cai_pipeline_configs(self):
+        """Returns the per stage settings for the CAI import pipeline.
+
+        Returns:
+            dict: The pipeline worker and buffer settings, an empty dict if
+                not configured.
+        """
+        return self.cai_configs.get('pipeline', {})
+
     def get_service_config(self):
         """Return the attached service configuration.
 
@@ -367,21 +433,35 @@ class ServiceConfig(AbstractServiceConfig):
         super(ServiceConfig, self).__init__()
         self.thread_pool = ThreadPool()
 
-        # Enable pool_pre_ping to ensure that disconnected or errored
-        # connections are dropped and recreated before use.
-        self.engine = create_engine(forseti_db_connect_string,
-                                    pool_recycle=3600,
-                                    pool_pre_ping=True)
-        self.model_manager = ModelManager(self.engine)
+        self.forseti_config_file_path = forseti_config_file_path
+
+        # The pools are created once, changes to the database section of
+        # the configuration apply when the server restarts.
+        forseti_config, _ = self._read_from_config()
+        pools_config = (forseti_config.get('database') or {}).get(
+            'pools') or {}
+        self.engine = create_engine(
+            forseti_db_connect_string,
+            pool_name='write',
+            **_get_pool_options(pools_config.get('write') or {}))
+        read_config = pools_config.get('read')
+        if read_config:
+            self.read_engine = create_engine(
+                (read_config.get('db_connect_string') or
+                 forseti_db_connect_string),
+                pool_name='read',
+                **_get_pool_options(read_config))
+        else:
+            self.read_engine = self.engine
+        self.model_manager = ModelManager(self.engine, self.read_engine)
         self.sessionmaker = db.create_scoped_sessionmaker(self.engine)
         self.endpoint = endpoint
 
-        self.forseti_config_file_path = forseti_config_file_path
-
         self.inventory_config = None
         self.scanner_config = None
         self.notifier_config = None
         self.global_config = None
+        self.explain_config = None
         self.forseti_config = None
 
         self.update_lock = threading.RLock()
@@ -453,7 +533,9 @@ class ServiceConfig(AbstractServiceConfig):
                             'composite_root_resources')
                     ),
                     excluded_resources=forseti_inventory_config.get(
-                        'excluded_resources', [])
+                        'excluded_resources', []),
+                    incremental_configs=forseti_inventory_config.get(
+                        'incremental', {})
                 )
             except ValueError as e:
                 return False, str(e)
@@ -473,6 +555,8 @@ class ServiceConfig(AbstractServiceConfig):
 
             forseti_global_config = forseti_config.get('global', {})
 
+            forseti_explain_config = forseti_config.get('explain', {})
+
             self.inventory_config = inventory_config
             self.inventory_config.set_service_config(self)
 
@@ -480,6 +564,8 @@ class ServiceConfig(AbstractServiceConfig):
             self.notifier_config = forseti_notifier_config
 
             self.global_config = forseti_global_config
+
+            self.explain_config = forseti_explain_config
         return True, err_msg
 
     def get_forseti_config(self):
@@ -527,6 +613,15 @@ class ServiceConfig(AbstractServiceConfig):
 
         return self.global_config
 
+    def get_explain_config(self):
+        """Get the explain config.
+
+        Returns:
+            dict: Explain config.
+        """
+
+        return self.explain_config
+
     def get_engine(self):
         """Get the database engine.
 
@@ -545,6 +640,32 @@ class ServiceConfig(AbstractServiceConfig):
 
         return self.sessionmaker()
 
+    def scoped_readonly_session(self):
+        """Get a read-only scoped session, bound to the read engine.
+
+        The read engine can be a replica lagging behind the write engine.
+        Reads of rows that were just written, like the violations of the
+        scan a notifier runs for, use scoped_session instead.
+
+        Returns:
+            object: A read-only scoped session.
+        """
+
+        return db.create_scoped_readonly_session(self.read_engine)
+
+    def get_pool_stats(self):
+        """Get the statistics of the connection pools.
+
+        Returns:
+            dict: The statistics of the write pool, and of the read pool if
+                configured.
+        """
+
+        stats = {'write': db.get_pool_stats(self.engine)}
+        if self.read_engine is not self.engine:
+            stats['read'] = db.get_pool_stats(self.read_engine)
+        return stats
+
     def client(self):
         """Get an API client.
 
@@ -290,6 +290,13 @@ def define_model_parser(parent):
         action='store_true',
         help='Run import in background'
     )
+    create_model_parser.add_argument(
+        '--bulk',
+        default=False,
+        action='store_true',
+        help='Import with batched inserts, using less memory for large '
+             'inventories'
+    )
 
 
 def define_scanner_parser(parent):
@@ -795,7 +802,8 @@ def run_model(client, config, output, config_env):
 
     def do_create_model():
         """Create a model."""
-        result = client.new_model('inventory',
+        source = 'inventory_bulk' if config.bulk else 'inventory'
+        result = client.new_model(source,
                                   config.name,
                                   int(config.inventory_index_id),
                                   config.background)
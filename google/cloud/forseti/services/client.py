@@ -281,8 +281,8 @@ class ModelClient(ForsetiClient):
         """Creates a new model, reply contains the handle.
 
         Args:
-            source (str): the source to create the model, either EMPTY
-                or INVENTORY.
+            source (str): the source to create the model, either EMPTY,
+                INVENTORY or INVENTORY_BULK.
             name (str): the name for the model.
             inventory_index_id (int64): the index id of the inventory to
                 import from.
@@ -750,8 +750,8 @@ class ClientComposition(object):
         """Create a new model from the specified source.
 
         Args:
-            source (str): the source to create the model, either EMPTY
-                or INVENTORY.
+            source (str): the source to create the model, either EMPTY,
+                INVENTORY or INVENTORY_BULK.
             name (str): the name for the model.
             inventory_index_id (int64): the index id of the inventory to
                 import from.
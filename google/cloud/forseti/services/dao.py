@@ -21,6 +21,7 @@ from builtins import next
 from builtins import object
 import binascii
 import collections
+import contextlib
 import hmac
 import json
 import os
@@ -40,7 +41,8 @@ from sqlalchemy import Table
 from sqlalchemy import DateTime
 from sqlalchemy import or_
 from sqlalchemy import and_
-from sqlalchemy import not_
+from sqlalchemy import bindparam
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import aliased
 from sqlalchemy.orm import joinedload
 from sqlalchemy.orm import reconstructor
@@ -48,13 +50,16 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.sql import select
-from sqlalchemy.sql import union
 from sqlalchemy.ext.declarative import declarative_base
 
 from google.cloud.forseti.common.util import date_time
 from google.cloud.forseti.services.utils import mutual_exclusive
 from google.cloud.forseti.services.utils import to_full_resource_name
 from google.cloud.forseti.services import db
+from google.cloud.forseti.services.iam_graph import IamGraph
+from google.cloud.forseti.services.membership_graph import MembershipGraph
+from google.cloud.forseti.services.permission_index import PermissionIndex
+from google.cloud.forseti.services.resource_snapshot import ResourceSnapshot
 from google.cloud.forseti.services.utils import get_sql_dialect
 from google.cloud.forseti.common.util import logger
 
@@ -64,6 +69,9 @@ LOGGER = logger.get_logger(__name__)
 POOL_RECYCLE_SECONDS = 300
 PER_YIELD = 1024
 
+# Engine options that only apply to a queue pool.
+QUEUE_POOL_OPTIONS = ['pool_size', 'max_overflow', 'pool_timeout']
+
 
 def generate_model_handle():
     """Generate random model handle.
@@ -202,6 +210,16 @@ class Model(MODEL_BASE):
             self.name, self.handle, self.state)
 
 
+def _commit_model_changes(session):
+    """Record the changes of the models once the session committed them.
+
+    Args:
+        session (object): The committed session.
+    """
+    for model_access, roles in session.info.pop('model_changes', {}).items():
+        model_access.model_changed(roles=roles)
+
+
 # pylint: disable=too-many-locals,no-member
 def define_model(model_name, dbengine, model_seed):
     """Defines table classes which point to the corresponding model.
@@ -225,6 +243,7 @@ def define_model(model_name, dbengine, model_seed):
     base = declarative_base()
 
     denormed_group_in_group = '{}_group_in_group'.format(model_name)
+    resource_ancestors_tablename = '{}_resource_ancestors'.format(model_name)
     bindings_tablename = '{}_bindings'.format(model_name)
     roles_tablename = '{}_roles'.format(model_name)
     permissions_tablename = '{}_permissions'.format(model_name)
@@ -429,6 +448,31 @@ def define_model(model_name, dbengine, model_seed):
                 self.parent,
                 self.member)
 
+    class ResourceAncestor(base):
+        """Row for a resource and one of its ancestors, or itself."""
+
+        __tablename__ = resource_ancestors_tablename
+        id = Column(Integer, Sequence('{}_id_seq'.format(
+            resource_ancestors_tablename)), primary_key=True)
+        ancestor_type_name = Column(
+            get_string_by_dialect(dbengine.dialect.name, 512), index=True)
+        resource_type_name = Column(
+            get_string_by_dialect(dbengine.dialect.name, 512), index=True)
+        depth = Column(Integer)
+
+        def __repr__(self):
+            """String representation.
+
+            Returns:
+                str: ResourceAncestor represented as
+                    (ancestor='{}', resource='{}', depth='{}')
+            """
+            fmt_s = '<ResourceAncestor(ancestor={}, resource={}, depth={})>'
+            return fmt_s.format(
+                self.ancestor_type_name,
+                self.resource_type_name,
+                self.depth)
+
     class Role(base):
         """Row entry for an IAM role."""
 
@@ -473,12 +517,18 @@ def define_model(model_name, dbengine, model_seed):
         TBL_GROUP_IN_GROUP = GroupInGroup
         TBL_GROUPS_SETTINGS = groups_settings
         TBL_BINDING = Binding
+        TBL_BINDING_MEMBERS = binding_members
         TBL_MEMBER = Member
         TBL_PERMISSION = Permission
         TBL_ROLE = Role
+        TBL_ROLE_PERMISSIONS = role_permissions
         TBL_RESOURCE = Resource
+        TBL_RESOURCE_ANCESTOR = ResourceAncestor
         TBL_MEMBERSHIP = group_members
 
+        # Engine the model is written with, see get_iam_graph.
+        engine = dbengine
+
         # Set of member binding types that expand like groups.
         GROUP_TYPES = {'group',
                        'projecteditor',
@@ -488,6 +538,39 @@ def define_model(model_name, dbengine, model_seed):
         # Members that represent all users
         ALL_USER_MEMBERS = ['allusers', 'allauthenticatedusers']
 
+        # MembershipGraph of the model, see get_membership_graph.
+        _membership_graph = None
+        _membership_graph_lock = Lock()
+
+        # PermissionIndex of the model, see get_permission_index. Dropped by
+        # the methods changing the roles.
+        _permission_index = None
+        _permission_index_lock = Lock()
+
+        # IamGraph of the model, see get_iam_graph. Dropped by the methods
+        # changing the model.
+        _iam_graph = None
+        _iam_graph_lock = Lock()
+
+        # Generation of each of the caches above, incremented when the cache
+        # is dropped, see _load_cache.
+        _cache_generations = collections.Counter()
+        _cache_generations_lock = Lock()
+
+        # Incremented by the methods changing the model, see model_changed.
+        model_version = 0
+
+        # Whether the ResourceAncestor table is known to be built, see
+        # _check_resource_hierarchy.
+        _resource_hierarchy_checked = False
+        _resource_hierarchy_lock = Lock()
+
+        # ResourceSnapshot served by scanner_iter while a scanner run is in
+        # progress, see scanner_snapshot.
+        _scanner_snapshot = None
+        _scanner_snapshot_users = 0
+        _scanner_snapshot_lock = Lock()
+
         @classmethod
         def delete_all(cls, engine):
             """Delete all data from the model.
@@ -497,6 +580,8 @@ def define_model(model_name, dbengine, model_seed):
             """
 
             LOGGER.info('Deleting all data from the model.')
+            cls._drop_caches('_membership_graph')
+            cls.model_changed(roles=True)
             role_permissions.drop(engine)
             binding_members.drop(engine)
             group_members.drop(engine)
@@ -505,11 +590,253 @@ def define_model(model_name, dbengine, model_seed):
             Binding.__table__.drop(engine)
             Permission.__table__.drop(engine)
             GroupInGroup.__table__.drop(engine)
+            ResourceAncestor.__table__.drop(engine)
 
             Role.__table__.drop(engine)
             Member.__table__.drop(engine)
             Resource.__table__.drop(engine)
 
+        @classmethod
+        def _drop_caches(cls, *names):
+            """Drop caches of the model.
+
+            Args:
+                *names (list): Class attributes of the caches.
+            """
+            with cls._cache_generations_lock:
+                for name in names:
+                    setattr(cls, name, None)
+                    cls._cache_generations[name] += 1
+
+        @classmethod
+        def _load_cache(cls, name, session, load, refresh=False):
+            """Get a cache of the model, loading it if it is dropped.
+
+            The caches are shared by all sessions, so they are loaded from
+            the engine the model is written with, never from a read replica
+            that can lag behind it. A load started before the cache was
+            dropped can miss the change the cache was dropped for, it is
+            discarded and the cache is loaded again. The caller holds the
+            lock of the cache.
+
+            Args:
+                name (str): Class attribute of the cache.
+                session (object): Database session or connection to load
+                    the cache with, if bound to the write engine.
+                load (function): Loads the cache from a session or
+                    connection.
+                refresh (bool): Load the cache even if it is loaded.
+
+            Returns:
+                object: The cache.
+            """
+            if refresh:
+                cls._drop_caches(name)
+            while True:
+                with cls._cache_generations_lock:
+                    value = getattr(cls, name)
+                    generation = cls._cache_generations[name]
+                if value is not None:
+                    return value
+                if isinstance(session, Connection):
+                    bind = session.engine
+                else:
+                    bind = session.get_bind()
+                if bind is cls.engine:
+                    value = load(session)
+                else:
+                    with cls.engine.connect() as connection:
+                        value = load(connection)
+                with cls._cache_generations_lock:
+                    if generation == cls._cache_generations[name]:
+                        setattr(cls, name, value)
+                        return value
+                LOGGER.debug('Model changed while loading %s, loading it '
+                             'again.', name)
+
+        @classmethod
+        def get_membership_graph(cls, session, refresh=False):
+            """Get the in-memory graph of the group memberships.
+
+            The graph is loaded once per model and kept up to date by the
+            methods changing the memberships.
+
+            Args:
+                session (object): Database session to load the graph with,
+                    if bound to the write engine.
+                refresh (bool): Reload the graph from the database.
+
+            Returns:
+                MembershipGraph: The group memberships of the model.
+            """
+            def load(connection):
+                """Load the graph.
+
+                Args:
+                    connection (object): Database session or connection.
+
+                Returns:
+                    MembershipGraph: The group memberships of the model.
+                """
+                qry = select([group_members.c.group_name,
+                              group_members.c.members_name])
+                graph = MembershipGraph(connection.execute(qry))
+                LOGGER.debug('Loaded membership graph, %s members, %s '
+                             'memberships.', len(graph), graph.edge_count)
+                return graph
+
+            with cls._membership_graph_lock:
+                return cls._load_cache('_membership_graph', session, load,
+                                       refresh)
+
+        @classmethod
+        def get_permission_index(cls, session, refresh=False):
+            """Get the index of the permissions of the roles.
+
+            The index is built once the model is imported and kept until the
+            roles change.
+
+            Args:
+                session (object): Database session to build the index with,
+                    if bound to the write engine.
+                refresh (bool): Rebuild the index from the database.
+
+            Returns:
+                PermissionIndex: The permissions of the roles of the model.
+            """
+            def load(connection):
+                """Build the index.
+
+                Args:
+                    connection (object): Database session or connection.
+
+                Returns:
+                    PermissionIndex: The permissions of the roles.
+                """
+                qry = select([role_permissions.c.roles_name,
+                              role_permissions.c.permissions_name])
+                index = PermissionIndex(connection.execute(qry))
+                LOGGER.debug('Built permission index, %s roles, %s '
+                             'permissions.', len(index),
+                             index.permission_count)
+                return index
+
+            with cls._permission_index_lock:
+                return cls._load_cache('_permission_index', session, load,
+                                       refresh)
+
+        @classmethod
+        def model_changed(cls, roles=False):
+            """Record a change of the model.
+
+            Drops the IamGraph and increments model_version, so results
+            computed from the model before the change are not reused.
+
+            Args:
+                roles (bool): Whether the roles or permissions changed, to
+                    also drop the PermissionIndex.
+            """
+            if roles:
+                cls._drop_caches('_permission_index', '_iam_graph')
+            else:
+                cls._drop_caches('_iam_graph')
+            cls.model_version += 1
+            if cls._scanner_snapshot is not None:
+                cls._scanner_snapshot.clear()
+
+        @classmethod
+        def _changed_on_commit(cls, session, roles=False):
+            """Record a change of the model made in the session.
+
+            The change is recorded right away for the reads of the session,
+            and again once the session commits, since concurrent sessions
+            can load the caches from the model before the commit meanwhile.
+
+            Args:
+                session (object): Database session changing the model.
+                roles (bool): Whether the roles or permissions changed.
+            """
+            cls.model_changed(roles=roles)
+            changes = session.info.setdefault('model_changes', {})
+            changes[cls] = changes.get(cls, False) or roles
+            if not event.contains(session, 'after_commit',
+                                  _commit_model_changes):
+                event.listen(session, 'after_commit', _commit_model_changes)
+
+        @classmethod
+        @contextlib.contextmanager
+        def scanner_snapshot(cls):
+            """Share the resources loaded by scanner_iter within a scan run.
+
+            Within the context, each resource type is loaded once by
+            scanner_iter and its rows are served to all of the scanners.
+            Nested contexts share the same snapshot, which is dropped when
+            the outermost one exits.
+
+            Yields:
+                ResourceSnapshot: The snapshot of the resources.
+            """
+            with cls._scanner_snapshot_lock:
+                if cls._scanner_snapshot is None:
+                    cls._scanner_snapshot = ResourceSnapshot()
+                cls._scanner_snapshot_users += 1
+                snapshot = cls._scanner_snapshot
+            try:
+                yield snapshot
+            finally:
+                with cls._scanner_snapshot_lock:
+                    cls._scanner_snapshot_users -= 1
+                    if not cls._scanner_snapshot_users:
+                        LOGGER.debug('Dropping scanner snapshot of %s '
+                                     'resources, %s.', len(snapshot),
+                                     dict(snapshot.stats))
+                        cls._scanner_snapshot = None
+
+        @classmethod
+        def get_iam_graph(cls, session):
+            """Get the IAM policies of the model compiled in memory.
+
+            The graph is loaded once per model, and again after the model
+            changed. It is shared by all sessions, so it is loaded from the
+            engine the model is written with, never from a read replica
+            that can lag behind it.
+
+            Args:
+                session (object): Database session to load the graph with,
+                    if bound to the write engine.
+
+            Returns:
+                IamGraph: The IAM policies of the model.
+            """
+            with cls._iam_graph_lock:
+                return cls._load_cache('_iam_graph', session,
+                                       cls._load_iam_graph)
+
+        @classmethod
+        def _load_iam_graph(cls, connection):
+            """Load the IAM policies of the model.
+
+            Args:
+                connection (object): Database session or connection.
+
+            Returns:
+                IamGraph: The IAM policies of the model.
+            """
+            return IamGraph(
+                cls.get_membership_graph(connection),
+                connection.execute(select([Member.name, Member.type])),
+                cls.get_permission_index(connection),
+                connection.execute(select(
+                    [Resource.type_name, Resource.parent_type_name,
+                     Resource.full_name, Resource.name])),
+                connection.execute(select(
+                    [Binding.id, Binding.resource_type_name,
+                     Binding.role_name,
+                     binding_members.c.members_name]).where(
+                         binding_members.c.bindings_id == Binding.id)),
+                cls.GROUP_TYPES,
+                cls.ALL_USER_MEMBERS)
+
         @classmethod
         def denorm_group_in_group(cls, session):
             """Denormalize group-in-group relation.
@@ -519,95 +846,143 @@ def define_model(model_name, dbengine, model_seed):
             whenever adding or removing a new group or group-group
             relationship, this method should be called to re-denormalize
 
+            The closure is computed in memory from the membership graph and
+            written in batches.
+
             Args:
                 session (object): Database session to use.
 
             Returns:
-                int: Number of iterations.
+                int: Number of group-in-group rows written.
 
             Raises:
                 Exception: dernomalize fail
             """
 
-            tbl1 = aliased(GroupInGroup.__table__, name='alias1')
-            tbl2 = aliased(GroupInGroup.__table__, name='alias2')
-            tbl3 = aliased(GroupInGroup.__table__, name='alias3')
-
-            if get_sql_dialect(session) != 'sqlite':
-                # Lock tables for denormalization
-                # including aliases 1-3
-                locked_tables = [
-                    '`{}`'.format(GroupInGroup.__tablename__),
-                    '`{}` as {}'.format(
-                        GroupInGroup.__tablename__,
-                        tbl1.name),
-                    '`{}` as {}'.format(
-                        GroupInGroup.__tablename__,
-                        tbl2.name),
-                    '`{}` as {}'.format(
-                        GroupInGroup.__tablename__,
-                        tbl3.name),
-                    '`{}`'.format(group_members.name)]
-                lock_stmts = ['{} WRITE'.format(tbl) for tbl in locked_tables]
-                query = 'LOCK TABLES {}'.format(', '.join(lock_stmts))
-                session.execute(query)
+            def is_group(name):
+                """Whether the member name is a group.
+
+                Args:
+                    name (str): Member name.
+
+                Returns:
+                    bool: True for groups.
+                """
+                return name.startswith('group/')
+
+            graph = cls.get_membership_graph(session, refresh=True)
+            insert = GroupInGroup.__table__.insert()
+            count = 0
             try:
                 # Remove all existing rows in the denormalization
                 session.execute(GroupInGroup.__table__.delete())
 
-                # Select member relation into GroupInGroup
-                qry = (GroupInGroup.__table__.insert().from_select(
-                    ['parent', 'member'], group_members.select().where(
-                        group_members.c.group_name.startswith('group/')
-                    ).where(
-                        group_members.c.members_name.startswith('group/')
-                    )
-                ))
-
-                session.execute(qry)
-
-                iterations = 0
-                rows_affected = True
-                while rows_affected:
-                    # Join membership on its own to find transitive
-                    expansion = tbl1.join(tbl2, tbl1.c.member == tbl2.c.parent)
-
-                    # Left outjoin to find the entries that
-                    # are already in the table to prevent
-                    # inserting already existing entries
-                    expansion = expansion.outerjoin(
-                        tbl3,
-                        and_(tbl1.c.parent == tbl3.c.parent,
-                             tbl2.c.member == tbl3.c.member))
-
-                    # Select only such elements that are not
-                    # already in the table, indicated as NULL
-                    # values through the outer-left-join
-                    stmt = (
-                        select([tbl1.c.parent,
-                                tbl2.c.member])
-                        .select_from(expansion)
-                        # pylint: disable=singleton-comparison
-                        .where(tbl3.c.parent == None)
-                        .distinct()
-                    )
-
-                    # Execute the query and insert into the table
-                    qry = (GroupInGroup.__table__
-                           .insert()
-                           .from_select(['parent', 'member'], stmt))
-
-                    rows_affected = bool(session.execute(qry).rowcount)
-                    iterations += 1
+                rows = []
+                for parent, member in graph.transitive_closure(is_group):
+                    rows.append({'parent': parent, 'member': member})
+                    if len(rows) >= PER_YIELD:
+                        session.execute(insert, rows)
+                        count += len(rows)
+                        rows = []
+                if rows:
+                    session.execute(insert, rows)
+                    count += len(rows)
+                session.commit()
             except Exception as e:
                 LOGGER.exception(e)
                 session.rollback()
                 raise
-            finally:
-                if get_sql_dialect(session) != 'sqlite':
-                    session.execute('UNLOCK TABLES')
+            cls.model_changed()
+            return count
+
+        @classmethod
+        def denorm_resource_hierarchy(cls, session):
+            """Denormalize the resource hierarchy.
+
+            This method will fill the ResourceAncestor table with
+            (ancestor, resource, depth) for every resource and each of its
+            ancestors, following the parent of each resource. Every
+            resource is also its own ancestor at depth 0.
+
+            Args:
+                session (object): Database session to use.
+
+            Returns:
+                int: Number of resource ancestor rows written.
+
+            Raises:
+                Exception: dernomalize fail
+            """
+            parents = {}
+            for type_name, parent_type_name in (
+                    session.query(Resource.type_name,
+                                  Resource.parent_type_name)
+                    .yield_per(PER_YIELD)):
+                parents[type_name] = parent_type_name
+
+            roots = []
+            children = collections.defaultdict(list)
+            for type_name, parent_type_name in parents.items():
+                if parent_type_name in parents:
+                    children[parent_type_name].append(type_name)
+                else:
+                    roots.append(type_name)
+
+            insert = ResourceAncestor.__table__.insert()
+            count = 0
+            try:
+                session.execute(ResourceAncestor.__table__.delete())
+
+                rows = []
+                for root in roots:
+                    # Depth first, path holds the ancestors of the resource.
+                    path = []
+                    stack = [(root, 0)]
+                    while stack:
+                        type_name, depth = stack.pop()
+                        del path[depth:]
+                        path.append(type_name)
+                        for ancestor_depth, ancestor in enumerate(path):
+                            rows.append({
+                                'ancestor_type_name': ancestor,
+                                'resource_type_name': type_name,
+                                'depth': depth - ancestor_depth})
+                        stack.extend((child, depth + 1)
+                                     for child in children.get(type_name, ()))
+                        if len(rows) >= PER_YIELD:
+                            session.execute(insert, rows)
+                            count += len(rows)
+                            rows = []
+                if rows:
+                    session.execute(insert, rows)
+                    count += len(rows)
                 session.commit()
-            return iterations
+            except Exception as e:
+                LOGGER.exception(e)
+                session.rollback()
+                raise
+            cls.model_changed()
+            cls._resource_hierarchy_checked = True
+            return count
+
+        @classmethod
+        def _check_resource_hierarchy(cls, session):
+            """Build the resource hierarchy of models imported without it.
+
+            Args:
+                session (object): Database session to use.
+            """
+            if cls._resource_hierarchy_checked:
+                return
+            with cls._resource_hierarchy_lock:
+                if cls._resource_hierarchy_checked:
+                    return
+                if (session.query(ResourceAncestor.id).first() is None and
+                        session.query(Resource.type_name).first() is not None):
+                    LOGGER.info('Building the resource hierarchy of the '
+                                'model.')
+                    cls.denorm_resource_hierarchy(session)
+                cls._resource_hierarchy_checked = True
 
         @classmethod
         def expand_special_members(cls, session):
@@ -639,16 +1014,19 @@ def define_model(model_name, dbengine, model_seed):
                     continue
                 members = iam_policy.get('bindings', {}).get(role, [])
                 expanded_members = cls.expand_members(session, members)
+                graph = cls.get_membership_graph(session)
                 for member in expanded_members:
                     stmt = cls.TBL_MEMBERSHIP.insert(
                         {'group_name': parent_member,
                          'members_name': member.name})
                     session.execute(stmt)
+                    graph.add_edge(parent_member, member.name)
                     if member.type == 'group' and member.name in members:
                         session.add(cls.TBL_GROUP_IN_GROUP(
                             parent=parent_member,
                             member=member.name))
             session.commit()
+            cls.model_changed()
 
         @classmethod
         def explain_granted(cls, session, member_name, resource_type_name,
@@ -688,17 +1066,12 @@ def define_model(model_name, dbengine, model_seed):
 
             if role:
                 roles = set([role])
-                qry = session.query(Binding, Member).join(
-                    binding_members).join(Member)
             else:
-                roles = [r.name for r in
-                         cls.get_roles_by_permission_names(
-                             session,
-                             [permission])]
-                qry = session.query(Binding, Member)
-                qry = qry.join(binding_members).join(Member)
-                qry = qry.join(Role).join(role_permissions).join(Permission)
+                roles = cls.get_role_names_by_permission_names(
+                    session, [permission])
 
+            qry = session.query(Binding, Member).join(
+                binding_members).join(Member)
             qry = qry.filter(Binding.role_name.in_(roles))
             qry = qry.filter(Member.name.in_(member_names))
             qry = qry.filter(
@@ -726,20 +1099,42 @@ def define_model(model_name, dbengine, model_seed):
                 resource_type (str): type of the resource to scan
                 parent_type_name (str): type_name of the parent resource
 
+            Within a scanner_snapshot context, the resources are read-only
+            ResourceRows loaded once per type for all of the scanners.
+
             Yields:
                 Resource: resource that match the query
             """
 
-            qry = (
-                session.query(Resource)
-                .filter(Resource.type == resource_type)
-                .options(joinedload(Resource.parent))
-                .enable_eagerloads(True))
+            def load(load_type, load_parent_type_name=None):
+                """Query the resources of a type with their parent.
+
+                Args:
+                    load_type (str): type of the resources
+                    load_parent_type_name (str): type_name of the parent
+
+                Returns:
+                    iterable: The resources.
+                """
+                qry = (
+                    session.query(Resource)
+                    .filter(Resource.type == load_type)
+                    .options(joinedload(Resource.parent))
+                    .enable_eagerloads(True))
+
+                if load_parent_type_name:
+                    qry = qry.filter(
+                        Resource.parent_type_name == load_parent_type_name)
 
-            if parent_type_name:
-                qry = qry.filter(Resource.parent_type_name == parent_type_name)
+                return qry.yield_per(PER_YIELD)
 
-            for resource in qry.yield_per(PER_YIELD):
+            snapshot = cls._scanner_snapshot
+            if snapshot is not None:
+                resources = snapshot.get(resource_type, parent_type_name, load)
+            else:
+                resources = load(resource_type, parent_type_name)
+
+            for resource in resources:
                 yield resource
 
         @classmethod
@@ -794,10 +1189,8 @@ def define_model(model_name, dbengine, model_seed):
             """
 
             if not role_names:
-                role_names = [r.name for r in
-                              cls.get_roles_by_permission_names(
-                                  session,
-                                  permission_names)]
+                role_names = list(cls.get_role_names_by_permission_names(
+                    session, permission_names))
                 if not role_names:
                     error_message = 'No roles covering requested permission set'
                     LOGGER.error(error_message)
@@ -887,7 +1280,7 @@ def define_model(model_name, dbengine, model_seed):
         def query_access_by_member(cls, session, member_name, permission_names,
                                    expand_resources=False,
                                    reverse_expand_members=True):
-            """Return the set of resources the member has access to.
+            """Yield the resources the member has access to.
 
             By default, this method expand group_member relation,
             so the result includes all resources can be accessed by the
@@ -896,6 +1289,9 @@ def define_model(model_name, dbengine, model_seed):
             so the result does not include a resource if such resource does
             not have a direct binding to allow access.
 
+            The bindings are streamed from the database, one access tuple
+            per binding.
+
             Args:
                 session (object): Database session.
                 member_name (str): name of the member
@@ -903,8 +1299,8 @@ def define_model(model_name, dbengine, model_seed):
                 expand_resources (bool): whether to expand resources
                 reverse_expand_members (bool): whether to expand members
 
-            Returns:
-                list: list of access tuples, ("role_name", "resource_type_name")
+            Yields:
+                tuple: access tuple, ("role_name", ["resource_type_name"])
             """
 
             if reverse_expand_members:
@@ -915,33 +1311,56 @@ def define_model(model_name, dbengine, model_seed):
             else:
                 member_names = [member_name]
 
-            roles = cls.get_roles_by_permission_names(
+            role_names = cls.get_role_names_by_permission_names(
                 session, permission_names)
 
+            if not expand_resources:
+                qry = (
+                    session.query(Binding.id, Binding.role_name,
+                                  Binding.resource_type_name)
+                    .filter(Binding.role_name.in_(role_names))
+                    .filter(binding_members.c.bindings_id == Binding.id)
+                    .filter(binding_members.c.members_name.in_(member_names))
+                    .distinct()
+                )
+                for _, role_name, resource_type_name in (
+                        qry.yield_per(PER_YIELD)):
+                    yield role_name, [resource_type_name]
+                return
+
+            cls._check_resource_hierarchy(session)
+            bound = aliased(Resource, name='bound')
+            expanded = aliased(Resource, name='expanded')
             qry = (
-                session.query(Binding)
-                .join(binding_members)
-                .join(Member)
-                .filter(Binding.role_name.in_([r.name for r in roles]))
-                .filter(Member.name.in_(member_names))
+                session.query(Binding.id, Binding.role_name,
+                              expanded.type_name)
+                .filter(Binding.role_name.in_(role_names))
+                .filter(binding_members.c.bindings_id == Binding.id)
+                .filter(binding_members.c.members_name.in_(member_names))
+                .filter(bound.type_name == Binding.resource_type_name)
+                .filter(ResourceAncestor.ancestor_type_name ==
+                        bound.type_name)
+                .filter(expanded.type_name ==
+                        ResourceAncestor.resource_type_name)
+                # Residual filter on the descendants, see
+                # expand_resources_by_type_names.
+                .filter(expanded.full_name.startswith(bound.full_name))
+                .distinct()
+                .order_by(Binding.id)
             )
 
-            bindings = qry.yield_per(1024)
-            if not expand_resources:
-                return [(binding.role_name,
-                         [binding.resource_type_name]) for binding in bindings]
-
-            r_type_names = [binding.resource_type_name for binding in bindings]
-            expansion = cls.expand_resources_by_type_names(
-                session,
-                r_type_names)
-
-            res_exp = {k.type_name: [v.type_name for v in values]
-                       for k, values in expansion.items()}
-
-            return [(binding.role_name,
-                     res_exp[binding.resource_type_name])
-                    for binding in bindings]
+            # The rows of a binding are consecutive, each binding is yielded
+            # once all its resources are read.
+            binding_id, role_name, resource_type_names = None, None, []
+            for row_id, row_role_name, type_name in qry.yield_per(PER_YIELD):
+                if row_id != binding_id:
+                    if binding_id is not None:
+                        yield role_name, resource_type_names
+                    binding_id, role_name = row_id, row_role_name
+                    resource_type_names = []
+                resource_type_names.append(type_name)
+            if binding_id is not None:
+                yield role_name, resource_type_names
 
         @classmethod
         def query_access_by_permission(cls,
@@ -975,21 +1394,27 @@ def define_model(model_name, dbengine, model_seed):
             if role_name:
                 role_names = [role_name]
             elif permission_name:
-                role_names = [p.name for p in
-                              cls.get_roles_by_permission_names(
-                                  session,
-                                  [permission_name])]
+                role_names = list(cls.get_role_names_by_permission_names(
+                    session, [permission_name]))
             else:
                 error_message = 'Either role or permission must be set'
                 LOGGER.error(error_message)
                 raise ValueError(error_message)
 
             if expand_resources:
+                cls._check_resource_hierarchy(session)
                 expanded_resources = aliased(Resource)
                 qry = (
                     session.query(expanded_resources, Binding, Member)
                     .filter(binding_members.c.bindings_id == Binding.id)
                     .filter(binding_members.c.members_name == Member.name)
+                    .filter(ResourceAncestor.ancestor_type_name ==
+                            Binding.resource_type_name)
+                    .filter(expanded_resources.type_name ==
+                            ResourceAncestor.resource_type_name)
+                    # Residual filter on the descendants, the full names
+                    # of the children of a composite root do not include
+                    # the root.
                     .filter(expanded_resources.full_name.startswith(
                         Resource.full_name))
                     .filter((Resource.type_name ==
@@ -1047,6 +1472,9 @@ def define_model(model_name, dbengine, model_seed):
             have the binding, the access will be shown
             By default, the group relationship will not be expanded
 
+            The bindings are streamed from the database ordered by role, so
+            only the members of one role are held at a time.
+
             Args:
                 session (object): db session
                 resource_type_name (str): type_name of the resource to query
@@ -1054,33 +1482,48 @@ def define_model(model_name, dbengine, model_seed):
                     to query
                 expand_groups (bool): whether to expand groups
 
-            Returns:
-                dict: role_member_mapping, <"role_name", "member_names">
+            Yields:
+                tuple: ("role_name", "member_names"), once per role
             """
 
-            roles = cls.get_roles_by_permission_names(
+            role_names = cls.get_role_names_by_permission_names(
                 session, permission_names)
             resources = cls.find_resource_path(session, resource_type_name)
 
-            res = (session.query(Binding, Member)
+            qry = (session.query(Binding.role_name,
+                                 binding_members.c.members_name)
                    .filter(
-                       Binding.role_name.in_([r.name for r in roles]),
+                       Binding.role_name.in_(role_names),
                        Binding.resource_type_name.in_(
                            [r.type_name for r in resources]))
-                   .join(binding_members).join(Member))
+                   .filter(binding_members.c.bindings_id == Binding.id)
+                   .distinct()
+                   .order_by(Binding.role_name))
 
-            role_member_mapping = collections.defaultdict(set)
-            for binding, member in res:
-                role_member_mapping[binding.role_name].add(member.name)
+            def role_access(role_name, member_names):
+                """Access tuple of a role.
 
-            if expand_groups:
-                for role in role_member_mapping:
-                    role_member_mapping[role] = (
-                        [m.name for m in cls.expand_members(
-                            session,
-                            role_member_mapping[role])])
+                Args:
+                    role_name (str): The role name.
+                    member_names (set): The members bound to the role.
 
-            return role_member_mapping
+                Returns:
+                    tuple: ("role_name", "member_names")
+                """
+                if expand_groups:
+                    return role_name, [m.name for m in cls.expand_members(
+                        session, member_names)]
+                return role_name, member_names
+
+            current_role, member_names = None, set()
+            for role_name, member_name in qry.yield_per(PER_YIELD):
+                if role_name != current_role:
+                    if current_role is not None:
+                        yield role_access(current_role, member_names)
+                    current_role, member_names = role_name, set()
+                member_names.add(member_name)
+            if current_role is not None:
+                yield role_access(current_role, member_names)
 
         @classmethod
         def query_permissions_by_roles(cls, session, role_names, role_prefixes,
@@ -1104,15 +1547,15 @@ def define_model(model_name, dbengine, model_seed):
                 error_message = 'No roles or role prefixes specified'
                 LOGGER.error(error_message)
                 raise Exception(error_message)
-            qry = session.query(Role, Permission).join(
-                role_permissions).join(Permission)
-            if role_names:
-                qry = qry.filter(Role.name.in_(role_names))
-            if role_prefixes:
-                qry = qry.filter(
-                    or_(*[Role.name.startswith(prefix)
-                          for prefix in role_prefixes]))
-            return qry.all()
+            pairs = cls.get_permission_index(session).permissions_by_roles(
+                role_names, role_prefixes)
+            roles = dict((role.name, role) for role in cls._get_by_names(
+                session, Role, set(r for r, _ in pairs)))
+            permissions = dict(
+                (permission.name, permission) for permission in
+                cls._get_by_names(session, Permission,
+                                  set(p for _, p in pairs)))
+            return [(roles[r], permissions[p]) for r, p in pairs]
 
         @classmethod
         def set_iam_policy(cls,
@@ -1246,6 +1689,7 @@ def define_model(model_name, dbengine, model_seed):
                 Resource.type_name == resource_type_name).one()
             resource.increment_update_counter()
             session.commit()
+            cls.model_changed()
 
         @classmethod
         def get_iam_policy(cls, session, resource_type_name, roles=None):
@@ -1463,6 +1907,15 @@ def define_model(model_name, dbengine, model_seed):
             if full_resource_name_prefix:
                 qry = qry.filter(Resource.full_name.startswith(
                     full_resource_name_prefix))
+                root = cls._get_resource_by_full_name(
+                    session, full_resource_name_prefix)
+                if root is not None:
+                    # Look up the descendants instead of scanning all full
+                    # names.
+                    qry = (qry.filter(Resource.type_name ==
+                                      ResourceAncestor.resource_type_name)
+                           .filter(ResourceAncestor.ancestor_type_name ==
+                                   root.type_name))
             if type_name_prefix:
                 qry = qry.filter(Resource.type_name.startswith(
                     type_name_prefix))
@@ -1476,6 +1929,27 @@ def define_model(model_name, dbengine, model_seed):
             for resource in qry.yield_per(1024):
                 yield resource
 
+        @classmethod
+        def _get_resource_by_full_name(cls, session, full_resource_name):
+            """Get a resource by full name, through its type_name key.
+
+            Args:
+                session (object): db session
+                full_resource_name (str): the full name of the resource
+
+            Returns:
+                Resource: the resource, None if no resource has the full
+                    name or its type_name is not the last full name segment
+            """
+            parts = full_resource_name.split('/')
+            if len(parts) < 3 or parts[-1]:
+                return None
+            resource = session.query(Resource).get('/'.join(parts[-3:-1]))
+            if resource is None or resource.full_name != full_resource_name:
+                return None
+            cls._check_resource_hierarchy(session)
+            return resource
+
         @classmethod
         def list_resources_by_prefix(cls,
                                      session,
@@ -1564,6 +2038,17 @@ def define_model(model_name, dbengine, model_seed):
                                 type=res_type,
                                 parent=parent)
             session.add(resource)
+            cls._changed_on_commit(session)
+
+            ancestors = [resource_type_name]
+            while parent is not None:
+                ancestors.append(parent.type_name)
+                parent = parent.parent
+            session.add_all([
+                ResourceAncestor(ancestor_type_name=ancestor,
+                                 resource_type_name=resource_type_name,
+                                 depth=depth)
+                for depth, ancestor in enumerate(ancestors)])
             return resource
 
         @classmethod
@@ -1584,6 +2069,7 @@ def define_model(model_name, dbengine, model_seed):
             permissions = [] if permissions is None else permissions
             role = Role(name=name, permissions=permissions)
             session.add(role)
+            cls._changed_on_commit(session, roles=True)
             return role
 
         @classmethod
@@ -1604,6 +2090,7 @@ def define_model(model_name, dbengine, model_seed):
             roles = [] if roles is None else roles
             permission = Permission(name=name, roles=roles)
             session.add(permission)
+            cls._changed_on_commit(session, roles=True)
             return permission
 
         @classmethod
@@ -1625,6 +2112,7 @@ def define_model(model_name, dbengine, model_seed):
                         resource, role, members, session)
             binding = Binding(resource=resource, role=role, members=members)
             session.add(binding)
+            cls._changed_on_commit(session)
             return binding
 
         @classmethod
@@ -1669,6 +2157,9 @@ def define_model(model_name, dbengine, model_seed):
                             parents=parents)
             session.add(member)
             session.commit()
+            if parents:
+                cls._drop_caches('_membership_graph')
+            cls.model_changed()
             if denorm and res_type == 'group' and parents:
                 cls.denorm_group_in_group(session)
             return member
@@ -1686,17 +2177,19 @@ def define_model(model_name, dbengine, model_seed):
                       {res_type_name: Expansion(res_type_name), ... }
             """
 
+            cls._check_resource_hierarchy(session)
             res_key = aliased(Resource, name='res_key')
             res_values = aliased(Resource, name='res_values')
 
-            expressions = []
-            for res_type_name in res_type_names:
-                expressions.append(and_(
-                    res_key.type_name == res_type_name))
-
             res = (
                 session.query(res_key, res_values)
                 .filter(res_key.type_name.in_(res_type_names))
+                .filter(ResourceAncestor.ancestor_type_name ==
+                        res_key.type_name)
+                .filter(res_values.type_name ==
+                        ResourceAncestor.resource_type_name)
+                # Residual filter on the descendants, the full names of the
+                # children of a composite root do not include the root.
                 .filter(res_values.full_name.startswith(
                     res_key.full_name))
                 .yield_per(1024)
@@ -1707,6 +2200,51 @@ def define_model(model_name, dbengine, model_seed):
                 mapping[k].add(value)
             return mapping
 
+        @classmethod
+        def _is_group(cls, member_name):
+            """Whether a member name expands like a group.
+
+            Args:
+                member_name (str): The member name, in type/name format.
+
+            Returns:
+                bool: True if the member type is in GROUP_TYPES.
+            """
+            return member_name.split('/', 1)[0] in cls.GROUP_TYPES
+
+        @classmethod
+        def _get_by_names(cls, session, table, names):
+            """Load Members, Roles or Permissions by name, in batches.
+
+            Args:
+                session (object): db session
+                table (object): Member, Role or Permission
+                names (iterable): names of the rows to load
+
+            Returns:
+                list: the rows found
+            """
+            names = list(names)
+            qry = session.query(table).filter(
+                table.name.in_(bindparam('names', expanding=True)))
+            rows = []
+            for i in range(0, len(names), PER_YIELD):
+                rows.extend(qry.params(names=names[i:i + PER_YIELD]).all())
+            return rows
+
+        @classmethod
+        def _get_members(cls, session, member_names):
+            """Load members by name, in batches.
+
+            Args:
+                session (object): db session
+                member_names (iterable): names of the members to load
+
+            Returns:
+                list: the Members found
+            """
+            return cls._get_by_names(session, Member, member_names)
+
         @classmethod
         def reverse_expand_members(cls, session, member_names,
                                    request_graph=False):
@@ -1727,35 +2265,18 @@ def define_model(model_name, dbengine, model_seed):
             members = session.query(Member).filter(
                 Member.name.in_(member_names)).all()
             membership_graph = collections.defaultdict(set)
-            member_set = set()
-            new_member_set = set()
-
-            def add_to_sets(members, child):
-                """Adds the members & children to the sets.
-
-                Args:
-                    members (list): list of Members to be added
-                    child (Member): child to be added
-                """
 
-                for member in members:
-                    if request_graph and child:
-                        membership_graph[child.name].add(member.name)
-                    if request_graph and not child:
-                        if member.name not in membership_graph:
-                            membership_graph[member.name] = set()
-                    if member not in member_set:
-                        new_member_set.add(member)
-                        member_set.add(member)
-
-            add_to_sets(members, None)
-            while new_member_set:
-                members_to_walk = new_member_set
-                new_member_set = set()
-                for member in members_to_walk:
-                    add_to_sets(member.parents, member)
+            start_names = set(member.name for member in members)
+            group_names = cls.get_membership_graph(session).reverse_expand(
+                start_names, membership_graph if request_graph else None)
+            member_set = set(members)
+            member_set.update(
+                cls._get_members(session, group_names - start_names))
 
             if request_graph:
+                for name in start_names:
+                    if name not in membership_graph:
+                        membership_graph[name] = set()
                 return member_set, membership_graph
             return member_set
 
@@ -1777,81 +2298,32 @@ def define_model(model_name, dbengine, model_seed):
                 dict: <Member, set(Children)>
             """
 
-            def separate_groups(member_names):
-                """Separate groups and other members in two lists.
-
-                This is a helper function. groups are needed to query on
-                group_in_group table
+            def is_group(name):
+                """Whether the member name is a group.
 
                 Args:
-                    member_names (list): list of members to be separated
+                    name (str): Member name.
 
                 Returns:
-                    tuples: two lists of strs containing groups and others
+                    bool: True for groups.
                 """
-                groups = []
-                others = []
-                for name in member_names:
-                    member_type = name.split('/')[0]
-                    if member_type in cls.GROUP_TYPES:
-                        groups.append(name)
-                    else:
-                        others.append(name)
-                return groups, others
-
-            selectables = []
-            group_names, other_names = separate_groups(member_names)
-
-            t_ging = GroupInGroup.__table__
-            t_members = group_members
-
-            # This resolves groups to its transitive non-group members.
-            transitive_membership = (
-                select([t_ging.c.parent, t_members.c.members_name])
-                .select_from(t_ging.join(t_members,
-                                         (t_ging.c.member ==
-                                          t_members.c.group_name)))
-            ).where(t_ging.c.parent.in_(group_names))
-
-            if not show_group_members:
-                transitive_membership = transitive_membership.where(
-                    not_(t_members.c.members_name.startswith('group/')))
-
-            selectables.append(
-                transitive_membership.alias('transitive_membership'))
-
-            direct_membership = (
-                select([t_members.c.group_name,
-                        t_members.c.members_name])
-                .where(t_members.c.group_name.in_(group_names))
-            )
-
-            if not show_group_members:
-                direct_membership = direct_membership.where(
-                    not_(t_members.c.members_name.startswith('group/')))
-
-            selectables.append(
-                direct_membership.alias('direct_membership'))
-
-            if show_group_members:
-                # Show groups as members of other groups
-                group_in_groups = (
-                    select([t_ging.c.parent,
-                            t_ging.c.member]).where(
-                                t_ging.c.parent.in_(group_names))
-                )
-                selectables.append(
-                    group_in_groups.alias('group_in_groups'))
+                return name.startswith('group/')
 
-            # Union all the queries
-            qry = union(*selectables)
+            graph = cls.get_membership_graph(session)
 
             # Build the result dict
             result = collections.defaultdict(set)
-            for parent, child in session.execute(qry):
-                result[parent].add(child)
-            for parent in other_names:
-                result[parent] = set()
+            for name in member_names:
+                if not cls._is_group(name):
+                    result[name] = set()
+                    continue
+                # Members of the group and of its transitive subgroups.
+                children = graph.expand_members(name, is_group)
+                if not show_group_members:
+                    children = set(child for child in children
+                                   if not is_group(child))
+                if children:
+                    result[name].update(children)
 
             # Add each parent as its own member
             if member_contain_self:
@@ -1874,44 +2346,13 @@ def define_model(model_name, dbengine, model_seed):
             members = session.query(Member).filter(
                 Member.name.in_(member_names)).all()
 
-            def is_group(member):
-                """Returns true iff the member is a group.
-
-                Args:
-                    member (Member): member to check
-
-                Returns:
-                    bool: whether the member is a group
-                """
-                return member.type in cls.GROUP_TYPES
-
-            group_set = set()
-            non_group_set = set()
-            new_group_set = set()
-
-            def add_to_sets(members):
-                """Adds new members to the sets.
-
-                Args:
-                    members (list): members to be added
-                """
-                for member in members:
-                    if is_group(member):
-                        if member not in group_set:
-                            new_group_set.add(member)
-                        group_set.add(member)
-                    else:
-                        non_group_set.add(member)
-
-            add_to_sets(members)
-
-            while new_group_set:
-                groups_to_walk = new_group_set
-                new_group_set = set()
-                for group in groups_to_walk:
-                    add_to_sets(group.children)
-
-            return group_set.union(non_group_set)
+            start_names = set(member.name for member in members)
+            expanded_names = cls.get_membership_graph(session).expand(
+                start_names, cls._is_group)
+            member_set = set(members)
+            member_set.update(
+                cls._get_members(session, expanded_names - start_names))
+            return member_set
 
         @classmethod
         def resource_ancestors(cls, session, resource_type_names):
@@ -1929,34 +2370,25 @@ def define_model(model_name, dbengine, model_seed):
                 dict: <parent, childs> graph of the resource hierarchy
             """
 
-            resource_names = resource_type_names
+            cls._check_resource_hierarchy(session)
             resource_graph = collections.defaultdict(set)
-
-            res_childs = aliased(Resource, name='res_childs')
-            res_anc = aliased(Resource, name='resource_parent')
-
-            resources_set = set(resource_names)
-            resources_new = set(resource_names)
-
-            for resource in resources_new:
+            for resource in resource_type_names:
                 resource_graph[resource] = set()
 
-            while resources_new:
-                resources_new = set()
-                for parent, child in (
-                        session.query(res_anc, res_childs)
-                        .filter(res_childs.type_name.in_(resources_set))
-                        .filter(res_childs.parent_type_name ==
-                                res_anc.type_name)
-                        .all()):
-
-                    if parent.type_name not in resources_set:
-                        resources_new.add(parent.type_name)
-
-                    resources_set.add(parent.type_name)
-                    resources_set.add(child.type_name)
-
-                    resource_graph[parent.type_name].add(child.type_name)
+            ancestors = {}
+            for type_name, parent_type_name in (
+                    session.query(Resource.type_name,
+                                  Resource.parent_type_name)
+                    .filter(Resource.type_name ==
+                            ResourceAncestor.ancestor_type_name)
+                    .filter(ResourceAncestor.resource_type_name.in_(
+                        resource_type_names))
+                    .distinct()):
+                ancestors[type_name] = parent_type_name
+
+            for type_name, parent_type_name in ancestors.items():
+                if parent_type_name in ancestors:
+                    resource_graph[parent_type_name].add(type_name)
 
             return resource_graph
 
@@ -1975,39 +2407,34 @@ def define_model(model_name, dbengine, model_seed):
                     resource
             """
 
+            cls._check_resource_hierarchy(session)
             qry = (
-                session.query(Resource).filter(
-                    Resource.type_name == resource_type_name)
+                session.query(Resource)
+                .filter(Resource.type_name ==
+                        ResourceAncestor.ancestor_type_name)
+                .filter(ResourceAncestor.resource_type_name ==
+                        resource_type_name)
+                .order_by(ResourceAncestor.depth)
             )
 
-            resources = qry.all()
-            return cls._find_resource_path(session, resources)
+            return qry.all()
 
         @classmethod
-        def _find_resource_path(cls, _, resources):
-            """Find the list of transitive ancestors for the given resource.
+        def get_role_names_by_permission_names(cls, session,
+                                               permission_names):
+            """Return the names of the roles covering the permissions.
 
             Args:
-                _ (object): position holder
-                resources (list): list of the resources to query
+                session (object): db session
+                permission_names (list): permissions to be covered by.
 
             Returns:
-                list: list of Resources, transitive ancestors for the given
-                    resource
+                set: names of the roles that cover the permissions, all roles
+                    with a permission if no permission is given.
             """
 
-            if not resources:
-                return []
-
-            path = []
-            resource = resources[0]
-
-            path.append(resource)
-            while resource.parent:
-                resource = resource.parent
-                path.append(resource)
-
-            return path
+            return cls.get_permission_index(session).roles_by_permissions(
+                permission_names)
 
         @classmethod
         def get_roles_by_permission_names(cls, session, permission_names):
@@ -2021,25 +2448,10 @@ def define_model(model_name, dbengine, model_seed):
                 set: roles set that cover the permissions
             """
 
-            permission_set = set(permission_names)
-            qry = session.query(Permission)
-            if permission_set:
-                qry = qry.filter(Permission.name.in_(permission_set))
-            permissions = qry.all()
-
-            roles = set()
-            for permission in permissions:
-                for role in permission.roles:
-                    roles.add(role)
-
-            result_set = set()
-            for role in roles:
-                role_permissions = set(
-                    [p.name for p in role.permissions])
-                if permission_set.issubset(role_permissions):
-                    result_set.add(role)
-
-            return result_set
+            return set(cls._get_by_names(
+                session, Role,
+                cls.get_role_names_by_permission_names(session,
+                                                       permission_names)))
 
         @classmethod
         def get_member(cls, session, name):
@@ -2081,13 +2493,16 @@ class ModelManager(object):
         session cache which is given in each client's request.
     """
 
-    def __init__(self, dbengine):
+    def __init__(self, dbengine, read_engine=None):
         """Initialization
 
         Args:
             dbengine (object): Database engine
+            read_engine (object): Database engine of the read-only sessions,
+                defaults to dbengine.
         """
         self.engine = dbengine
+        self.read_engine = read_engine or dbengine
         self.modelmaker = self._create_model_session()
         self.sessionmakers = {}
 
@@ -2134,18 +2549,42 @@ class ModelManager(object):
                 model.handle, self.engine, model.etag_seed)
             return handle
 
-    def get(self, model):
+    def get(self, model, readonly=False):
         """Get model data by handle.
 
         Args:
             model (str): model handle
+            readonly (bool): Get a read-only session, bound to the read
+                engine.
 
         Returns:
             tuple: session and ModelAccess object
         """
 
         session_maker, data_access = self._get(model)
-        return db.ScopedSession(session_maker()), data_access
+        if not readonly:
+            return db.ScopedSession(session_maker()), data_access
+
+        # The resource hierarchy of models imported without it is built
+        # once, on the write engine, before the first read.
+        # pylint: disable=protected-access
+        if not data_access._resource_hierarchy_checked:
+            with db.ScopedSession(session_maker()) as session:
+                data_access._check_resource_hierarchy(session)
+        return (db.create_scoped_readonly_session(self.read_engine),
+                data_access)
+
+    def get_data_access(self, model):
+        """Get the data access of a model, without opening a session.
+
+        Args:
+            model (str): model handle
+
+        Returns:
+            ModelAccess: The data access of the model.
+        """
+        _, data_access = self._get(model)
+        return data_access
 
     def get_readonly_session(self):
         """Get read-only session.
@@ -2365,15 +2804,21 @@ def create_engine(*args, **kwargs):
 
     if sqlite_enforce_fks in forward_kwargs:
         del forward_kwargs[sqlite_enforce_fks]
+    pool_name = forward_kwargs.pop('pool_name', 'default')
 
     if is_sqlite:
+        # SQLite does not use a queue pool.
+        for option in QUEUE_POOL_OPTIONS:
+            forward_kwargs.pop(option, None)
         engine = sqlalchemy_create_engine(*args, **forward_kwargs)
     else:
+        forward_kwargs.setdefault('pool_size', 50)
         # Default connection timeout for mysql is 10 seconds which is
         # not enough for a bigger dataset, increasing this to 1 hour instead.
         engine = sqlalchemy_create_engine(
             *args,
-            pool_size=50,
+            poolclass=db.MonitoredQueuePool,
+            pool_name=pool_name,
             connect_args={'connect_timeout': 3600},
             **forward_kwargs)
     dialect = engine.dialect.name
@@ -15,12 +15,20 @@
 """Database session handling for Forseti Server."""
 
 from builtins import object
+import threading
+import time
+
+from sqlalchemy import exc
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from google.cloud.forseti.common.util import logger
 
 
 LOGGER = logger.get_logger(__name__)
 
+# The pool statistics are logged every this many checkouts.
+STATS_LOG_INTERVAL = 1000
+
 
 class ScopedSession(object):
     """A scoped session is automatically released."""
@@ -160,3 +168,129 @@ def create_readonly_session(engine):
     session = sessionmaker(bind=engine, autocommit=True, autoflush=False)()
     stub_out_flush_operation(session)
     return session
+
+
+class PoolStats(object):
+    """Checkout statistics of a connection pool."""
+
+    def __init__(self, name):
+        """Initialize.
+
+        Args:
+            name (str): Name of the pool, for the logs.
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def record_checkout(self, wait, timed_out=False):
+        """Record a connection checkout.
+
+        Args:
+            wait (float): Seconds waited for the connection.
+            timed_out (bool): Whether the wait timed out.
+        """
+        with self._lock:
+            self._checkouts += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            if timed_out:
+                self._timeouts += 1
+            if not self._checkouts % STATS_LOG_INTERVAL:
+                LOGGER.info('Database pool %s: %s', self.name,
+                            self._get_stats())
+
+    def _get_stats(self):
+        """Get the statistics, the lock must be held.
+
+        Returns:
+            dict: The checkout counters.
+        """
+        return {
+            'checkouts': self._checkouts,
+            'timeouts': self._timeouts,
+            'total_wait_seconds': self._total_wait,
+            'max_wait_seconds': self._max_wait,
+            'mean_wait_seconds': (self._total_wait / self._checkouts
+                                  if self._checkouts else 0.0)}
+
+    def get_stats(self):
+        """Get the statistics.
+
+        Returns:
+            dict: The number of checkouts and of checkouts timed out, the
+                total, maximum and mean seconds waited for a connection.
+        """
+        with self._lock:
+            return self._get_stats()
+
+
+class MonitoredQueuePool(QueuePool):
+    """QueuePool recording how long checkouts wait for a connection."""
+
+    def __init__(self, creator, pool_name='default', **kw):
+        """Initialize.
+
+        Args:
+            creator (function): Creates a database connection.
+            pool_name (str): Name of the pool, for the statistics.
+            **kw (dict): QueuePool arguments.
+        """
+        super(MonitoredQueuePool, self).__init__(creator, **kw)
+        self.stats = PoolStats(pool_name)
+
+    def _do_get(self):
+        """Checkout a connection, waiting if the pool is exhausted.
+
+        Returns:
+            object: The connection record.
+        """
+        start = time.time()
+        timed_out = False
+        try:
+            return super(MonitoredQueuePool, self)._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.stats.record_checkout(time.time() - start, timed_out)
+
+    def recreate(self):
+        """Recreate the pool, keeping the statistics.
+
+        Returns:
+            MonitoredQueuePool: The new pool.
+        """
+        pool = super(MonitoredQueuePool, self).recreate()
+        pool.stats = self.stats
+        return pool
+
+    def get_stats(self):
+        """Get the checkout statistics and the current pool usage.
+
+        Returns:
+            dict: The statistics of PoolStats, with the pool size, the
+                connections checked out and the overflow connections.
+        """
+        stats = self.stats.get_stats()
+        stats.update({'size': self.size(),
+                      'checked_out': self.checkedout(),
+                      'overflow': self.overflow()})
+        return stats
+
+
+def get_pool_stats(engine):
+    """Get the statistics of the pool of an engine.
+
+    Args:
+        engine (object): Database engine.
+
+    Returns:
+        dict: The pool statistics, empty if the pool is not monitored.
+    """
+    if isinstance(engine.pool, MonitoredQueuePool):
+        return engine.pool.get_stats()
+    return {}
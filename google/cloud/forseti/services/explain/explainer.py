@@ -15,10 +15,81 @@
 """ Explain API. """
 
 from builtins import object
+import functools
+import threading
+import types
+
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.services.explain.result_cache import ResultCache
 
 LOGGER = logger.get_logger(__name__)
 
+# Seconds a cached result is kept if explain.cache.ttl_seconds is not set.
+DEFAULT_CACHE_TTL_SECONDS = 600
+
+
+def _normalize(value):
+    """Make a query argument hashable.
+
+    Args:
+        value (object): The argument, e.g. a string or a list of strings.
+
+    Returns:
+        object: The value, or a tuple of its normalized items.
+    """
+    if value is None or isinstance(value, (str, bytes, bool, int, float)):
+        return value
+    return tuple(_normalize(item) for item in value)
+
+
+def cached(method):
+    """Serve the results of an Explainer query from the result cache.
+
+    Results are keyed by the model handle, the method and the arguments,
+    and are valid for the model version they were computed from. Generator
+    results are cached as lists. The results are shared by the server
+    threads after the session they were read with is gone, so the cached
+    methods return plain values, never ORM instances. Nothing is cached if
+    the queries read from a replica, which can lag behind the model
+    version.
+
+    Args:
+        method (function): The query method, taking the model handle first.
+
+    Returns:
+        function: The method, reading and filling the cache if enabled.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, model_name, *args):
+        """Run the query if its result is not cached.
+
+        Args:
+            self (Explainer): The explainer.
+            model_name (str): Model to operate on.
+            *args (list): The query arguments.
+
+        Returns:
+            object: The query result.
+        """
+        cache = self.get_cache()
+        model_manager = self.config.model_manager
+        if (cache is None or
+                model_manager.read_engine is not model_manager.engine):
+            return method(self, model_name, *args)
+
+        # Also raises for a deleted model.
+        version = model_manager.get_data_access(model_name).model_version
+        key = (model_name, method.__name__, _normalize(args))
+        found, result = cache.get(key, version)
+        if not found:
+            result = method(self, model_name, *args)
+            if isinstance(result, types.GeneratorType):
+                result = list(result)
+            cache.put(key, version, result)
+        return result
+    return wrapper
+
 
 class Explainer(object):
     """Implements the Explain API."""
@@ -30,7 +101,50 @@ class Explainer(object):
             config (object): ServiceConfig in server
         """
         self.config = config
+        self._cache = None
+        self._cache_lock = threading.Lock()
+
+    def get_cache(self):
+        """Get the result cache configured in explain.cache.
+
+        Returns:
+            ResultCache: The cache, None if max_entries is not set.
+        """
+        explain_config = self.config.get_explain_config() or {}
+        cache_config = explain_config.get('cache', {})
+        max_entries = cache_config.get('max_entries', 0)
+        ttl_seconds = cache_config.get('ttl_seconds',
+                                       DEFAULT_CACHE_TTL_SECONDS)
+        if not max_entries:
+            return None
+        with self._cache_lock:
+            if (self._cache is None or
+                    self._cache.max_entries != max_entries or
+                    self._cache.ttl_seconds != ttl_seconds):
+                self._cache = ResultCache(max_entries, ttl_seconds)
+            return self._cache
+
+    def get_cache_stats(self):
+        """Get the statistics of the result cache.
+
+        Returns:
+            dict: The counters of the cache, empty if it is disabled.
+        """
+        cache = self.get_cache()
+        if cache is None:
+            return {}
+        return cache.get_stats()
+
+    def _use_iam_graph(self):
+        """Whether the access queries are answered from the in-memory graph.
 
+        Returns:
+            bool: True if explain.in_memory.enabled is set.
+        """
+        explain_config = self.config.get_explain_config() or {}
+        return explain_config.get('in_memory', {}).get('enabled', False)
+
+    @cached
     def list_resources(self, model_name, full_resource_name_prefix):
         """Lists resources by resource name prefix.
 
@@ -38,19 +152,22 @@ class Explainer(object):
             model_name (str): Model to operate on.
             full_resource_name_prefix (ste): the prefix of the resource name
 
-        Returns:
-            list: list of Resources match the query
+        Yields:
+            str: Generator of the type names of the matching resources.
         """
 
         LOGGER.debug('Listing resources, model_name = %s,'
                      ' full_resource_name_prefix = %s',
                      model_name, full_resource_name_prefix)
         model_manager = self.config.model_manager
-        scoped_session, data_access = model_manager.get(model_name)
+        scoped_session, data_access = model_manager.get(model_name,
+                                                        readonly=True)
         with scoped_session as session:
-            return data_access.list_resources_by_prefix(
-                session, full_resource_name_prefix)
+            for resource in data_access.iter_resources_by_prefix(
+                    session, full_resource_name_prefix):
+                yield resource.type_name
 
+    @cached
     def list_group_members(self, model_name, member_name_prefix):
         """Lists a member from the model.
 
@@ -65,10 +182,12 @@ class Explainer(object):
         LOGGER.debug('Listing Group members, model_name = %s,'
                      ' member_name_prefix = %s', model_name, member_name_prefix)
         model_manager = self.config.model_manager
-        scoped_session, data_access = model_manager.get(model_name)
+        scoped_session, data_access = model_manager.get(model_name,
+                                                        readonly=True)
         with scoped_session as session:
             return data_access.list_group_members(session, member_name_prefix)
 
+    @cached
     def list_roles(self, model_name, role_name_prefix):
         """Lists the role in the model matching the prefix.
 
@@ -83,10 +202,12 @@ class Explainer(object):
         LOGGER.info('Listing roles, model_name = %s,'
                     ' role_name_prefix = %s', model_name, role_name_prefix)
         model_manager = self.config.model_manager
-        scoped_session, data_access = model_manager.get(model_name)
+        scoped_session, data_access = model_manager.get(model_name,
+                                                        readonly=True)
         with scoped_session as session:
             return data_access.list_roles_by_prefix(session, role_name_prefix)
 
+    @cached
     def get_iam_policy(self, model_name, resource):
         """Gets the IAM policy for the resource.
 
@@ -101,10 +222,12 @@ class Explainer(object):
         LOGGER.debug('Retrieving IAM policy, model_name = %s, resource = %s',
                      model_name, resource)
         model_manager = self.config.model_manager
-        scoped_session, data_access = model_manager.get(model_name)
+        scoped_session, data_access = model_manager.get(model_name,
+                                                        readonly=True)
         with scoped_session as session:
             return data_access.get_iam_policy(session, resource)
 
+    @cached
     def check_iam_policy(self, model_name, resource, permission, identity):
         """Checks access according to IAM policy for the resource.
 
@@ -122,11 +245,16 @@ class Explainer(object):
                      ' permission = %s, identity = %s',
                      model_name, resource, permission, identity)
         model_manager = self.config.model_manager
-        scoped_session, data_access = model_manager.get(model_name)
+        scoped_session, data_access = model_manager.get(model_name,
+                                                        readonly=True)
         with scoped_session as session:
+            if self._use_iam_graph():
+                return data_access.get_iam_graph(session).check_iam_policy(
+                    resource, permission, identity)
             return data_access.check_iam_policy(
                 session, resource, permission, identity)
 
+    @cached
     def explain_denied(self, model_name, member, resources, permissions, roles):
         """Provides information on granting a member access to a resource.
 
@@ -147,8 +275,12 @@ class Explainer(object):
                      ' permissions = %s, roles = %s',
                      model_name, member, resources, permissions, roles)
         model_manager = self.config.model_manager
-        scoped_session, data_access = model_manager.get(model_name)
+        scoped_session, data_access = model_manager.get(model_name,
+                                                        readonly=True)
         with scoped_session as session:
+            if self._use_iam_graph():
+                return data_access.get_iam_graph(session).explain_denied(
+                    member, resources, permissions, roles)
             result = data_access.explain_denied(session,
                                                 member,
                                                 resources,
@@ -156,6 +288,7 @@ class Explainer(object):
                                                 roles)
             return result
 
+    @cached
     def explain_granted(self, model_name, member, resource, role, permission):
         """Provides information on why a member has access to a resource.
 
@@ -178,8 +311,12 @@ class Explainer(object):
                      ' permission = %s, role = %s',
                      model_name, member, resource, permission, role)
         model_manager = self.config.model_manager
-        scoped_session, data_access = model_manager.get(model_name)
+        scoped_session, data_access = model_manager.get(model_name,
+                                                        readonly=True)
         with scoped_session as session:
+            if self._use_iam_graph():
+                return data_access.get_iam_graph(session).explain_granted(
+                    member, resource, role, permission)
             result = data_access.explain_granted(session,
                                                  member,
                                                  resource,
@@ -187,6 +324,7 @@ class Explainer(object):
                                                  permission)
             return result
 
+    @cached
     def get_access_by_resources(self, model_name, resource_name,
                                 permission_names, expand_groups):
         """Returns members who have access to the given resource.
@@ -197,8 +335,8 @@ class Explainer(object):
             permission_names (list): Permission names to query for.
             expand_groups (bool): Whether to expand groups in policies.
 
-        Returns:
-            dict: role_member_mapping, <"role_name", "member_names">
+        Yields:
+            tuple: Generator for (role, members).
         """
 
         LOGGER.debug('Retrieving members that have access to the resource,'
@@ -207,14 +345,20 @@ class Explainer(object):
                      model_name, resource_name,
                      permission_names, expand_groups)
         model_manager = self.config.model_manager
-        scoped_session, data_access = model_manager.get(model_name)
+        scoped_session, data_access = model_manager.get(model_name,
+                                                        readonly=True)
         with scoped_session as session:
-            mapping = data_access.query_access_by_resource(session,
-                                                           resource_name,
-                                                           permission_names,
-                                                           expand_groups)
-            return mapping
-
+            if self._use_iam_graph():
+                access = data_access.get_iam_graph(
+                    session).query_access_by_resource(
+                        resource_name, permission_names, expand_groups)
+            else:
+                access = data_access.query_access_by_resource(
+                    session, resource_name, permission_names, expand_groups)
+            for role, members in access:
+                yield role, members
+
+    @cached
     def get_access_by_permissions(self, model_name, role_name, permission_name,
                                   expand_groups, expand_resources):
         """Returns access tuples satisfying the permission or role.
@@ -236,16 +380,22 @@ class Explainer(object):
                      ' expand_resources = %s', model_name, role_name,
                      permission_name, expand_groups, expand_resources)
         model_manager = self.config.model_manager
-        scoped_session, data_access = model_manager.get(model_name)
+        scoped_session, data_access = model_manager.get(model_name,
+                                                        readonly=True)
         with scoped_session as session:
-            for role, resource, members in (
-                    data_access.query_access_by_permission(session,
-                                                           role_name,
-                                                           permission_name,
-                                                           expand_groups,
-                                                           expand_resources)):
+            if self._use_iam_graph():
+                access = data_access.get_iam_graph(
+                    session).query_access_by_permission(
+                        role_name, permission_name, expand_groups,
+                        expand_resources)
+            else:
+                access = data_access.query_access_by_permission(
+                    session, role_name, permission_name, expand_groups,
+                    expand_resources)
+            for role, resource, members in access:
                 yield role, resource, members
 
+    @cached
     def get_access_by_members(self, model_name, member_name, permission_names,
                               expand_resources):
         """Returns access to resources for the provided member.
@@ -266,12 +416,20 @@ class Explainer(object):
                      model_name, member_name,
                      permission_names, expand_resources)
         model_manager = self.config.model_manager
-        scoped_session, data_access = model_manager.get(model_name)
+        scoped_session, data_access = model_manager.get(model_name,
+                                                        readonly=True)
         with scoped_session as session:
-            for role, resources in data_access.query_access_by_member(
-                    session, member_name, permission_names, expand_resources):
+            if self._use_iam_graph():
+                access = data_access.get_iam_graph(
+                    session).query_access_by_member(
+                        member_name, permission_names, expand_resources)
+            else:
+                access = data_access.query_access_by_member(
+                    session, member_name, permission_names, expand_resources)
+            for role, resources in access:
                 yield role, resources
 
+    @cached
     def get_permissions_by_roles(self, model_name, role_names, role_prefixes):
         """Returns the permissions associated with the specified roles.
 
@@ -281,7 +439,7 @@ class Explainer(object):
             role_prefixes (list): Role name prefixes to query for
 
         Yields:
-            tuple: Generator for (Role, Permission).
+            tuple: Generator for (role name, permission name).
         """
 
         LOGGER.debug('Retrieving the permissions associated with the'
@@ -289,8 +447,9 @@ class Explainer(object):
                      ' role_prefixes = %s',
                      model_name, role_names, role_prefixes)
         model_manager = self.config.model_manager
-        scoped_session, data_access = model_manager.get(model_name)
+        scoped_session, data_access = model_manager.get(model_name,
+                                                        readonly=True)
         with scoped_session as session:
-            for result in data_access.query_permissions_by_roles(
+            for role, permission in data_access.query_permissions_by_roles(
                     session, role_names, role_prefixes):
-                yield result
+                yield role.name, permission.name
@@ -0,0 +1,129 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bounded cache of the Explainer query results."""
+
+from builtins import object
+import collections
+import threading
+import time
+
+from google.cloud.forseti.common.util import logger
+
+LOGGER = logger.get_logger(__name__)
+
+# The cache statistics are logged every this many lookups.
+STATS_LOG_INTERVAL = 1000
+
+
+class ResultCache(object):
+    """Least recently used cache of query results, with a time to live.
+
+    Each result is stored with the version of the model it was computed
+    from, a lookup with another version is a miss and drops the entry.
+    """
+
+    def __init__(self, max_entries, ttl_seconds):
+        """Initialize.
+
+        Args:
+            max_entries (int): Maximum number of cached results.
+            ttl_seconds (float): Seconds a result is kept, None to keep it
+                until evicted.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = collections.Counter()
+
+    def __len__(self):
+        """Number of cached results.
+
+        Returns:
+            int: Number of entries.
+        """
+        return len(self._entries)
+
+    def get(self, key, version):
+        """Get a cached result.
+
+        Args:
+            key (tuple): The key of the result.
+            version (int): The current version of the model.
+
+        Returns:
+            tuple: (True, result) if cached, (False, None) otherwise.
+        """
+        with self._lock:
+            self._stats['lookups'] += 1
+            if not self._stats['lookups'] % STATS_LOG_INTERVAL:
+                LOGGER.info('Explain result cache: %s', self._get_stats())
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, entry_version, result = entry
+                if entry_version != version:
+                    self._stats['invalidations'] += 1
+                    del self._entries[key]
+                elif expires_at is not None and expires_at <= time.time():
+                    self._stats['expirations'] += 1
+                    del self._entries[key]
+                else:
+                    self._stats['hits'] += 1
+                    self._entries.move_to_end(key)
+                    return True, result
+            self._stats['misses'] += 1
+            return False, None
+
+    def put(self, key, version, result):
+        """Cache a result, evicting the least recently used ones if full.
+
+        Args:
+            key (tuple): The key of the result.
+            version (int): The version of the model the result is from.
+            result (object): The result.
+        """
+        expires_at = None
+        if self.ttl_seconds is not None:
+            expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, version, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def _get_stats(self):
+        """Get the statistics, the lock must be held.
+
+        Returns:
+            dict: The counters and the number of entries.
+        """
+        stats = dict((name, self._stats[name]) for name in
+                     ['lookups', 'hits', 'misses', 'evictions',
+                      'expirations', 'invalidations'])
+        stats['entries'] = len(self._entries)
+        return stats
+
+    def get_stats(self):
+        """Get the statistics.
+
+        Returns:
+            dict: The number of lookups, hits, misses, evictions of least
+                recently used results, expirations, invalidations by a model
+                change, and of cached results.
+        """
+        with self._lock:
+            return self._get_stats()
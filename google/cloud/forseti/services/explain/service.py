@@ -126,7 +126,7 @@ class GrpcExplainer(explain_pb2_grpc.ExplainServicer):
                                                   request.prefix)
         for resource in resources:
             yield explain_pb2.Resource(
-                full_resource_name=resource.type_name)
+                full_resource_name=resource)
 
     @autoclose_stream
     def ListGroupMembers(self, request, context):
@@ -336,12 +336,12 @@ class GrpcExplainer(explain_pb2_grpc.ExplainServicer):
             yield self._set_not_supported_status(context, reply)
 
         model_name = self._get_handle(context)
-        mapping = self.explainer.get_access_by_resources(
+        role_members = self.explainer.get_access_by_resources(
             model_name,
             request.resource_name,
             request.permission_names,
             request.expand_groups)
-        for role, members in mapping.items():
+        for role, members in role_members:
             access = explain_pb2.Access(
                 role=role, resource=request.resource_name, members=members)
             yield access
@@ -394,7 +394,7 @@ class GrpcExplainer(explain_pb2_grpc.ExplainServicer):
 
         permissions_by_roles_map = defaultdict(list)
         for role, permission in result:
-            permissions_by_roles_map[role.name].append(permission.name)
+            permissions_by_roles_map[role].append(permission)
 
         permissions_by_roles_list = []
         for role, permissions in permissions_by_roles_map.items():
@@ -0,0 +1,560 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-memory graph of the IAM policies of a model, for the explain queries.
+
+The queries mirror the ones of the ModelAccess class of the model and
+return the same names, without a database round trip.
+"""
+
+from builtins import object
+import collections
+
+from google.cloud.forseti.common.util import logger
+
+LOGGER = logger.get_logger(__name__)
+
+
+def _is_group(name):
+    """Whether the member name is a group.
+
+    Args:
+        name (str): Member name.
+
+    Returns:
+        bool: True for groups.
+    """
+    return name.startswith('group/')
+
+
+class IamGraph(object):
+    """IAM policies of a model compiled into in-memory indexes.
+
+    The permissions of the roles are answered by the PermissionIndex of the
+    model. Resources are interned to integer ids and numbered depth first, so
+    the descendants of a resource are an interval of the depth first order.
+    Bindings are indexed by resource, role and member, group memberships are
+    answered by the MembershipGraph of the model.
+    """
+
+    def __init__(self, membership_graph, members, permission_index,
+                 resources, bindings, group_types, all_user_members):
+        """Initialize.
+
+        Args:
+            membership_graph (MembershipGraph): The group memberships.
+            members (iterable): (name, type) of each member.
+            permission_index (PermissionIndex): The permissions of the roles.
+            resources (iterable): (type_name, parent type_name, full name,
+                name) of each resource.
+            bindings (iterable): (binding id, resource type_name, role name,
+                member name) for each member of each binding.
+            group_types (set): Member types that expand like groups.
+            all_user_members (list): Members that represent all users.
+        """
+        self._membership_graph = membership_graph
+        self._group_types = group_types
+        self._all_user_members = all_user_members
+        self._member_types = dict((name, member_type)
+                                  for name, member_type in members)
+
+        self._permission_index = permission_index
+
+        self._resource_ids = {}
+        self._type_names = []
+        self._full_names = []
+        self._names = []
+        parent_type_names = []
+        for type_name, parent_type_name, full_name, name in resources:
+            self._resource_ids[type_name] = len(self._type_names)
+            self._type_names.append(type_name)
+            self._full_names.append(full_name)
+            self._names.append(name)
+            parent_type_names.append(parent_type_name)
+        self._parents = [self._resource_ids.get(parent, -1)
+                         for parent in parent_type_names]
+        self._number_resources()
+
+        # Bindings as (resource id, role name, member names).
+        self._bindings = []
+        self._bindings_by_resource = collections.defaultdict(list)
+        self._bindings_by_role = collections.defaultdict(list)
+        self._bindings_by_member = collections.defaultdict(list)
+        binding_indexes = {}
+        binding_members = []
+        for binding_id, resource_type_name, role_name, member_name in (
+                bindings):
+            index = binding_indexes.get(binding_id)
+            if index is None:
+                resource_id = self._resource_ids.get(resource_type_name)
+                if resource_id is None:
+                    continue
+                index = len(self._bindings)
+                binding_indexes[binding_id] = index
+                self._bindings.append((resource_id, role_name))
+                binding_members.append([])
+                self._bindings_by_resource[resource_id].append(index)
+                self._bindings_by_role[role_name].append(index)
+            binding_members[index].append(member_name)
+            self._bindings_by_member[member_name].append(index)
+        self._bindings = [(resource_id, role_name, frozenset(members))
+                          for (resource_id, role_name), members in
+                          zip(self._bindings, binding_members)]
+
+        LOGGER.debug('Compiled IAM graph, %s resources, %s roles, %s '
+                     'bindings, %s members.', len(self._type_names),
+                     len(self._permission_index), len(self._bindings),
+                     len(self._member_types))
+
+    def _number_resources(self):
+        """Number the resources in depth first order from the roots.
+
+        Resources not reachable from a root, i.e. without a resource path,
+        are not numbered.
+        """
+        children = [[] for _ in self._parents]
+        roots = []
+        for resource_id, parent_id in enumerate(self._parents):
+            if parent_id < 0:
+                roots.append(resource_id)
+            else:
+                children[parent_id].append(resource_id)
+
+        self._left = [None] * len(self._parents)
+        self._right = [None] * len(self._parents)
+        self._preorder = []
+        for root in roots:
+            stack = [(root, False)]
+            while stack:
+                resource_id, visited = stack.pop()
+                if visited:
+                    self._right[resource_id] = len(self._preorder)
+                    continue
+                self._left[resource_id] = len(self._preorder)
+                self._preorder.append(resource_id)
+                stack.append((resource_id, True))
+                stack.extend((child, False) for child in children[resource_id])
+
+    def _resource_path(self, resource_type_name):
+        """The ids of a resource and its ancestors.
+
+        Args:
+            resource_type_name (str): type_name of the resource.
+
+        Returns:
+            list: Resource ids from the resource up to its root, empty if
+                the resource is not in the resource hierarchy.
+        """
+        resource_id = self._resource_ids.get(resource_type_name)
+        if resource_id is None or self._left[resource_id] is None:
+            return []
+        path = []
+        while resource_id >= 0:
+            path.append(resource_id)
+            resource_id = self._parents[resource_id]
+        return path
+
+    def _descendants(self, resource_id):
+        """The ids of a resource and its descendants.
+
+        Descendants whose full name does not start with the full name of the
+        resource, i.e. the children of a composite root, are excluded as
+        in ModelAccess.expand_resources_by_type_names.
+
+        Args:
+            resource_id (int): Id of the resource.
+
+        Returns:
+            list: Resource ids in depth first order.
+        """
+        left = self._left[resource_id]
+        if left is None:
+            return []
+        full_name = self._full_names[resource_id]
+        return [descendant for descendant in
+                self._preorder[left:self._right[resource_id]]
+                if self._full_names[descendant].startswith(full_name)]
+
+    def _reverse_expand(self, member_name, edges=None):
+        """Expand a member and the all users members to their groups.
+
+        Args:
+            member_name (str): Name of the member.
+            edges (dict): If given, filled with the direct parents of each
+                member as in ModelAccess.reverse_expand_members.
+
+        Returns:
+            tuple: (names of the members found, names of the members found
+                and of their transitive groups).
+        """
+        start_names = set(name for name in
+                          [member_name] + self._all_user_members
+                          if name in self._member_types)
+        member_names = self._membership_graph.reverse_expand(start_names,
+                                                             edges)
+        return start_names, set(name for name in member_names
+                                if name in self._member_types)
+
+    def _expand_groups(self, member_names):
+        """Expand members towards their transitive members.
+
+        Args:
+            member_names (iterable): Names of the members to expand.
+
+        Returns:
+            set: Names of the members found and of their transitive members.
+        """
+        start_names = set(name for name in member_names
+                          if name in self._member_types)
+        return set(name for name in self._membership_graph.expand(
+            start_names, self._is_group_type)
+                   if name in self._member_types)
+
+    def _is_group_type(self, member_name):
+        """Whether a member name expands like a group.
+
+        Args:
+            member_name (str): The member name, in type/name format.
+
+        Returns:
+            bool: True if the member type is a group type.
+        """
+        return member_name.split('/', 1)[0] in self._group_types
+
+    def check_iam_policy(self, resource_type_name, permission_name,
+                         member_name):
+        """Check access according to the resource IAM policy.
+
+        Args:
+            resource_type_name (str): type_name of the resource to check
+            permission_name (str): name of the permission to check
+            member_name (str): name of the member to check
+
+        Returns:
+            bool: whether such access is allowed
+
+        Raises:
+            Exception: member or resource not found
+        """
+        _, member_names = self._reverse_expand(member_name)
+        path = self._resource_path(resource_type_name)
+
+        if not member_names:
+            error_message = 'Member not found: {}'.format(member_name)
+            LOGGER.error(error_message)
+            raise Exception(error_message)
+        if not path:
+            error_message = 'Resource not found: {}'.format(
+                resource_type_name)
+            LOGGER.error(error_message)
+            raise Exception(error_message)
+
+        role_names = self._permission_index.roles_by_permissions(
+            [permission_name])
+        for resource_id in path:
+            for index in self._bindings_by_resource.get(resource_id, ()):
+                _, role_name, members = self._bindings[index]
+                if role_name in role_names and not members.isdisjoint(
+                        member_names):
+                    return True
+        return False
+
+    def explain_granted(self, member_name, resource_type_name, role,
+                        permission):
+        """Provide info about how the member has access to the resource.
+
+        Args:
+            member_name (str): name of the member
+            resource_type_name (str): type_name of the resource
+            role (str): role to query
+            permission (str): permission to query
+
+        Returns:
+            tuples: (bindings, member_graph, resource_type_names) bindings,
+                the bindings to grant the access member_graph, the graph to
+                have member included in the binding resource_type_names, the
+                resource tree
+
+        Raises:
+            Exception: not granted
+        """
+        member_graph = collections.defaultdict(set)
+        start_names, member_names = self._reverse_expand(member_name,
+                                                         member_graph)
+        for name in start_names:
+            if name not in member_graph:
+                member_graph[name] = set()
+        path = self._resource_path(resource_type_name)
+
+        if role:
+            role_names = set([role])
+        else:
+            role_names = self._permission_index.roles_by_permissions(
+                [permission])
+
+        bindings = []
+        for resource_id in path:
+            for index in self._bindings_by_resource.get(resource_id, ()):
+                _, role_name, members = self._bindings[index]
+                if role_name in role_names:
+                    bindings.extend(
+                        (self._type_names[resource_id], role_name, name)
+                        for name in members & member_names)
+        if not bindings:
+            error_message = 'Grant not found: ({},{},{})'.format(
+                member_name,
+                resource_type_name,
+                role if role is not None else permission)
+            LOGGER.error(error_message)
+            raise Exception(error_message)
+        return (bindings, member_graph,
+                [self._type_names[resource_id] for resource_id in path])
+
+    def explain_denied(self, member_name, resource_type_names,
+                       permission_names, role_names):
+        """Explain why an access is denied.
+
+        Args:
+            member_name (str): name of the member
+            resource_type_names (list): list of type_names of resources
+            permission_names (list): list of permissions
+            role_names (list): list of roles
+
+        Returns:
+            list: list of tuples,
+                (overgranting,[(role_name,member_name,resource_name)])
+
+        Raises:
+            Exception: No roles covering requested permission set,
+                Not possible
+        """
+        if not role_names:
+            role_names = list(self._permission_index.roles_by_permissions(
+                permission_names))
+            if not role_names:
+                error_message = 'No roles covering requested permission set'
+                LOGGER.error(error_message)
+                raise Exception(error_message)
+
+        # The hierarchy of the resources and their ancestors, as in
+        # ModelAccess.resource_ancestors.
+        resource_hierarchy = collections.defaultdict(set)
+        for type_name in resource_type_names:
+            resource_hierarchy[type_name] = set()
+        ancestors = set()
+        for type_name in resource_type_names:
+            ancestors.update(self._resource_path(type_name))
+        for resource_id in ancestors:
+            parent_id = self._parents[resource_id]
+            if parent_id in ancestors:
+                resource_hierarchy[self._type_names[parent_id]].add(
+                    self._type_names[resource_id])
+
+        # Walk down from the root until a resource has more than one child.
+        children = set()
+        for values in resource_hierarchy.values():
+            children.update(values)
+        root = None
+        for type_name in list(resource_hierarchy.keys()):
+            if type_name not in children:
+                root = type_name
+        candidates = [root]
+        while len(resource_hierarchy[candidates[-1]]) == 1:
+            candidates.append(next(iter(resource_hierarchy[candidates[-1]])))
+
+        strategies = []
+        for type_name in candidates:
+            for role_name in role_names:
+                overgranting = (len(candidates) -
+                                candidates.index(type_name) - 1)
+                strategies.append(
+                    (overgranting, [(role_name, member_name, type_name)]))
+
+        role_set = set(role_names)
+        for position, type_name in enumerate(candidates):
+            overgranting = len(candidates) - 1 - position
+            resource_id = self._resource_ids.get(type_name)
+            for index in self._bindings_by_resource.get(resource_id, ()):
+                _, role_name, members = self._bindings[index]
+                if role_name not in role_set:
+                    continue
+                for name in members:
+                    if (self._member_types.get(name) == 'group' or
+                            name == member_name):
+                        strategies.append(
+                            (overgranting, [(role_name, name, type_name)]))
+        return strategies
+
+    def query_access_by_member(self, member_name, permission_names,
+                               expand_resources=False,
+                               reverse_expand_members=True):
+        """Return the set of resources the member has access to.
+
+        Args:
+            member_name (str): name of the member
+            permission_names (list): list of names of permissions to query
+            expand_resources (bool): whether to expand resources
+            reverse_expand_members (bool): whether to expand members
+
+        Yields:
+            tuple: access tuple, ("role_name", ["resource_type_name"])
+        """
+        if reverse_expand_members:
+            _, member_names = self._reverse_expand(member_name)
+        else:
+            member_names = set([member_name])
+        role_names = self._permission_index.roles_by_permissions(
+            permission_names)
+
+        indexes = set()
+        for name in member_names:
+            indexes.update(self._bindings_by_member.get(name, ()))
+
+        for index in sorted(indexes):
+            resource_id, role_name, _ = self._bindings[index]
+            if role_name in role_names:
+                if expand_resources:
+                    resource_ids = self._descendants(resource_id)
+                else:
+                    resource_ids = [resource_id]
+                yield role_name, [self._type_names[descendant]
+                                  for descendant in resource_ids]
+
+    def _expand_members_map(self, member_names):
+        """Expand group membership keyed by member, towards the non groups.
+
+        Args:
+            member_names (iterable): Member names to expand.
+
+        Returns:
+            dict: <member name, set(member names)>, the member itself and
+                its transitive members that are not groups.
+        """
+        result = {}
+        for name in member_names:
+            expanded = set([name])
+            if self._is_group_type(name):
+                expanded.update(
+                    child for child in
+                    self._membership_graph.expand_members(name, _is_group)
+                    if not _is_group(child))
+            result[name] = expanded
+        return result
+
+    def query_access_by_permission(self,
+                                   role_name=None,
+                                   permission_name=None,
+                                   expand_groups=False,
+                                   expand_resources=False):
+        """Query access via the specified permission.
+
+        Args:
+            role_name (str): Role name to query for
+            permission_name (str): Permission name to query for.
+            expand_groups (bool): Whether or not to expand groups.
+            expand_resources (bool): Whether or not to expand resources.
+
+        Yields:
+            tuple: (role name, resource type_name, member names) per resource
+                ordered by resource name, the role is the first role name of
+                the bindings of the resource.
+
+        Raises:
+            ValueError: If neither role nor permission is set.
+        """
+        if role_name:
+            role_names = [role_name]
+        elif permission_name:
+            role_names = self._permission_index.roles_by_permissions(
+                [permission_name])
+        else:
+            error_message = 'Either role or permission must be set'
+            LOGGER.error(error_message)
+            raise ValueError(error_message)
+
+        bound = collections.defaultdict(list)
+        for name in role_names:
+            for index in self._bindings_by_role.get(name, ()):
+                bound[self._bindings[index][0]].append(index)
+
+        if expand_groups:
+            to_expand = set()
+            for indexes in bound.values():
+                for index in indexes:
+                    to_expand.update(self._bindings[index][2])
+            expansion = self._expand_members_map(to_expand)
+
+        if expand_resources:
+            resource_ids = set()
+            for resource_id in bound:
+                left = self._left[resource_id]
+                if left is not None:
+                    resource_ids.update(
+                        self._preorder[left:self._right[resource_id]])
+        else:
+            resource_ids = set(bound)
+
+        for resource_id in sorted(resource_ids,
+                                  key=lambda r: (self._names[r],
+                                                 self._type_names[r])):
+            if expand_resources:
+                full_name = self._full_names[resource_id]
+                indexes = [index
+                           for ancestor in self._resource_path(
+                               self._type_names[resource_id])
+                           if full_name.startswith(self._full_names[ancestor])
+                           for index in bound.get(ancestor, ())]
+            else:
+                indexes = bound[resource_id]
+            if not indexes:
+                continue
+
+            members = set()
+            for index in indexes:
+                if expand_groups:
+                    for name in self._bindings[index][2]:
+                        members.update(expansion[name])
+                else:
+                    members.update(self._bindings[index][2])
+            yield (min(self._bindings[index][1] for index in indexes),
+                   self._type_names[resource_id],
+                   members)
+
+    def query_access_by_resource(self, resource_type_name, permission_names,
+                                 expand_groups=False):
+        """Query access by resource.
+
+        Args:
+            resource_type_name (str): type_name of the resource to query
+            permission_names (list): list of strs, names of the permissions
+                to query
+            expand_groups (bool): whether to expand groups
+
+        Yields:
+            tuple: ("role_name", "member_names"), once per role
+        """
+        role_names = self._permission_index.roles_by_permissions(
+            permission_names)
+
+        role_member_mapping = collections.defaultdict(set)
+        for resource_id in self._resource_path(resource_type_name):
+            for index in self._bindings_by_resource.get(resource_id, ()):
+                _, role_name, members = self._bindings[index]
+                if role_name in role_names:
+                    role_member_mapping[role_name].update(members)
+
+        for role_name, members in role_member_mapping.items():
+            if expand_groups:
+                members = list(self._expand_groups(members))
+            yield role_name, members
@@ -1631,6 +1631,13 @@ class CaiApiClientImpl(gcp.ApiClientImpl):
         return super(CaiApiClientImpl, self).fetch_storage_bucket_iam_policy(
             bucket_id)
 
+    def prefetch_storage_buckets(self, project_numbers):
+        """The buckets are read from Cloud Asset data, nothing to prefetch.
+
+        Args:
+            project_numbers (list): numbers of the projects to query.
+        """
+
     def iter_storage_buckets(self, project_number):
         """Iterate Buckets from GCP API.
 
@@ -14,11 +14,11 @@
 
 """Forseti Inventory Cloud Asset API integration."""
 
-import os
 import time
 
 import concurrent.futures
 from googleapiclient import errors
+from sqlalchemy.orm import sessionmaker
 
 from google.cloud.forseti.common.gcp_api import cloudasset
 from google.cloud.forseti.common.gcp_api import errors as api_errors
@@ -29,6 +29,10 @@ from google.cloud.forseti.services.inventory.storage import CaiDataAccess
 LOGGER = logger.get_logger(__name__)
 CONTENT_TYPES = ['RESOURCE', 'IAM_POLICY']
 
+# Default worker counts for the export and import pipeline stages.
+DEFAULT_EXPORT_WORKERS = 2
+DEFAULT_IMPORT_WORKERS = 2
+
 # Any asset type referenced in cai_gcp_client.py needs to be added here.
 DEFAULT_ASSET_TYPES = [
     'appengine.googleapis.com/Application',
@@ -99,6 +103,11 @@ DEFAULT_ASSET_TYPES = [
 def load_cloudasset_data(session, config):
     """Export asset data from Cloud Asset API and load into storage.
 
+    Exports, downloads and imports run as overlapping pipeline stages. Each
+    finished export is streamed from GCS in chunks and imported while it
+    downloads, and dumps for different roots and content types are imported
+    concurrently when the database supports it.
+
     Args:
         session (object): Database session.
         config (object): Inventory configuration on server.
@@ -120,38 +129,75 @@ def load_cloudasset_data(session, config):
     else:
         root_resources.append(config.get_root_resource_id())
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-        futures = []
+    pipeline_configs = config.get_cai_pipeline_configs()
+    export_executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=pipeline_configs.get('export_workers',
+                                         DEFAULT_EXPORT_WORKERS))
+    engine = session.get_bind()
+    if engine.dialect.name == 'sqlite':
+        # SQLite connections are bound to the thread that created them and
+        # only support a single writer, so import on the calling thread.
+        import_executor = None
+        session_maker = None
+    else:
+        import_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=pipeline_configs.get('import_workers',
+                                             DEFAULT_IMPORT_WORKERS))
+        session_maker = sessionmaker(bind=engine)
+
+    export_futures = []
+    import_futures = []
+    failed = False
+    try:
         for root_id in root_resources:
             for content_type in CONTENT_TYPES:
-                futures.append(executor.submit(_export_assets,
-                                               cloudasset_client,
-                                               config,
-                                               root_id,
-                                               content_type))
-
-        for future in concurrent.futures.as_completed(futures):
-            temporary_file = ''
-            try:
-                temporary_file = future.result()
-                if not temporary_file:
-                    return _clear_cai_data(session)
-
-                LOGGER.debug('Importing Cloud Asset data from %s to database.',
-                             temporary_file)
-                with open(temporary_file, 'r') as cai_data:
-                    rows = CaiDataAccess.populate_cai_data(cai_data, session)
-                    imported_assets += rows
-                    LOGGER.info('%s assets imported to database.', rows)
-            finally:
-                if temporary_file:
-                    os.unlink(temporary_file)
+                export_futures.append(export_executor.submit(_export_assets,
+                                                             cloudasset_client,
+                                                             config,
+                                                             root_id,
+                                                             content_type))
+
+        for future in concurrent.futures.as_completed(export_futures):
+            export_path = future.result()
+            if not export_path:
+                failed = True
+                break
+
+            if import_executor:
+                import_futures.append(import_executor.submit(_import_assets,
+                                                             export_path,
+                                                             session,
+                                                             session_maker,
+                                                             config))
+                continue
+
+            rows = _import_assets(export_path, session, session_maker, config)
+            if rows is None:
+                failed = True
+                break
+            imported_assets += rows
+
+        for future in concurrent.futures.as_completed(import_futures):
+            rows = future.result()
+            if rows is None:
+                failed = True
+            else:
+                imported_assets += rows
+    finally:
+        for future in export_futures + import_futures:
+            future.cancel()
+        export_executor.shutdown(wait=True)
+        if import_executor:
+            import_executor.shutdown(wait=True)
+
+    if failed:
+        return _clear_cai_data(session)
 
     return imported_assets
 
 
 def _export_assets(cloudasset_client, config, root_id, content_type):
-    """Worker function for exporting assets and downloading dump from GCS.
+    """Worker function for exporting assets to GCS.
 
     Args:
         cloudasset_client (CloudAssetClient): CloudAsset API client interface.
@@ -160,8 +206,7 @@ def _export_assets(cloudasset_client, config, root_id, content_type):
         content_type (ContentTypes): The content type to export.
 
     Returns:
-        str: The path to the temporary file downloaded from GCS or None on
-            error.
+        str: The GCS path of the exported dump or None on error.
     """
     asset_types = config.get_cai_asset_types()
     if not asset_types:
@@ -205,12 +250,49 @@ def _export_assets(cloudasset_client, config, root_id, content_type):
                      '%s', results)
         return None
 
+    return export_path
+
+
+def _import_assets(export_path, session, session_maker, config):
+    """Worker function for streaming a dump from GCS into the database.
+
+    Args:
+        export_path (str): The GCS path of the exported dump.
+        session (object): Database session, used if session_maker is None.
+        session_maker (object): Creates a session private to this worker, or
+            None to import on the shared session.
+        config (object): Inventory configuration on server.
+
+    Returns:
+        int: The number of assets imported or None on error.
+    """
+    if config.get_cai_bulk_load():
+        populate_cai_data = CaiDataAccess.bulk_load_cai_data
+    else:
+        populate_cai_data = CaiDataAccess.populate_cai_data
+
+    pipeline_configs = config.get_cai_pipeline_configs()
+    import_session = session_maker() if session_maker else session
     try:
-        LOGGER.debug('Downloading Cloud Asset data from GCS to disk.')
-        return file_loader.copy_file_from_gcs(export_path)
+        LOGGER.debug('Streaming Cloud Asset data from %s to database.',
+                     export_path)
+        cai_data = file_loader.stream_file_from_gcs(
+            export_path,
+            chunk_size=pipeline_configs.get(
+                'download_chunk_size', file_loader.STREAM_CHUNK_SIZE),
+            max_buffered_chunks=pipeline_configs.get(
+                'download_buffer_chunks',
+                file_loader.STREAM_MAX_BUFFERED_CHUNKS))
+        rows = populate_cai_data(cai_data, import_session)
+        LOGGER.info('%s assets imported to database from %s.', rows,
+                    export_path)
+        return rows
     except errors.HttpError as e:
         LOGGER.warning('Download of CAI dump from GCS failed: %s', e)
         return None
+    finally:
+        if session_maker:
+            import_session.close()
 
 
 def _clear_cai_data(session):
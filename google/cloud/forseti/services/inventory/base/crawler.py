@@ -47,11 +47,12 @@ class Crawler(object):
         """
         raise NotImplementedError('The visit function of the crawler')
 
-    def dispatch(self, callback):
+    def dispatch(self, callback, resource=None):
         """Dispatch crawling of a subtree.
 
         Args:
             callback (function): Callback to dispatch.
+            resource (Resource): Root resource of the subtree.
 
         Raises:
             NotImplementedError: Because not implemented.
@@ -18,6 +18,8 @@
 
 from builtins import object
 import abc
+import collections
+import threading
 
 from future.utils import with_metaclass
 from google.cloud.forseti.common.gcp_api import admin_directory
@@ -34,6 +36,11 @@ from google.cloud.forseti.common.gcp_api import servicemanagement
 from google.cloud.forseti.common.gcp_api import stackdriver_logging
 from google.cloud.forseti.common.gcp_api import storage
 
+# Number of projects whose prefetched buckets are kept until they are
+# iterated. The buckets prefetched longest ago are dropped first, and
+# listed again if their project is iterated after all.
+MAX_PREFETCHED_BUCKET_PROJECTS = 1000
+
 
 class AssetMetadata(object):
     """Asset Metadata."""
@@ -928,6 +935,15 @@ class ApiClient(with_metaclass(abc.ABCMeta, object)):
             object_name (str): name of the object.
         """
 
+    def prefetch_storage_buckets(self, project_numbers):
+        """Fetch the buckets of several projects ahead of their iteration.
+
+        Clients that do not prefetch the buckets do nothing.
+
+        Args:
+            project_numbers (list): numbers of the projects to query.
+        """
+
     @abc.abstractmethod
     def iter_storage_buckets(self, project_number):
         """Iterate Buckets from GCP API.
@@ -1019,6 +1035,10 @@ class ApiClientImpl(ApiClient):
         self.storage = None
 
         self.config = config
+        # Buckets of the projects, by project number, fetched by
+        # prefetch_storage_buckets and not iterated yet.
+        self._prefetched_buckets = collections.OrderedDict()
+        self._prefetched_buckets_lock = threading.Lock()
 
     def _create_ad(self):
         """Create admin directory API client.
@@ -2594,6 +2614,30 @@ class ApiClientImpl(ApiClient):
         return self.storage.get_storage_object_iam_policy(bucket_name,
                                                           object_name), None
 
+    @create_lazy('storage', _create_storage)
+    def prefetch_storage_buckets(self, project_numbers):
+        """Fetch the buckets of several projects concurrently.
+
+        The bucket lists of all the projects are requested on a single event
+        loop, iter_storage_buckets then serves them without another API
+        call. Only enabled by the prefetch_buckets option of the storage
+        API configuration.
+
+        Args:
+            project_numbers (list): numbers of the projects to query.
+        """
+        if not self.config.get(storage.API_NAME, {}).get('prefetch_buckets'):
+            return
+        # Projects whose buckets can not be listed are left to
+        # iter_storage_buckets, which reports the error.
+        buckets = self.storage.get_buckets_for_projects(project_numbers,
+                                                        raise_errors=False)
+        with self._prefetched_buckets_lock:
+            self._prefetched_buckets.update(buckets)
+            while (len(self._prefetched_buckets) >
+                   MAX_PREFETCHED_BUCKET_PROJECTS):
+                self._prefetched_buckets.popitem(last=False)
+
     @create_lazy('storage', _create_storage)
     def iter_storage_buckets(self, project_number):
         """Iterate Buckets from GCP API.
@@ -2606,7 +2650,11 @@ class ApiClientImpl(ApiClient):
                 and asset metadata that defaults to None for all
                 GCP clients.
         """
-        for bucket in self.storage.get_buckets(project_number):
+        with self._prefetched_buckets_lock:
+            buckets = self._prefetched_buckets.pop(project_number, None)
+        if buckets is None:
+            buckets = self.storage.get_buckets(project_number)
+        for bucket in buckets:
             yield bucket, None
 
     @create_lazy('storage', _create_storage)
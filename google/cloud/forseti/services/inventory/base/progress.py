@@ -60,6 +60,15 @@ class Progresser(object):
         """
         raise NotImplementedError()
 
+    def on_worker_stats(self, stats):
+        """Receive the crawler worker statistics, ignored by default.
+
+        Args:
+            stats (list): Dict per crawler thread with the busy and idle
+                seconds and the number of tasks run.
+        """
+        pass
+
     def get_summary(self):
         """Not Implemented.
 
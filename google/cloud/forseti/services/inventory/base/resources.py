@@ -32,6 +32,10 @@ from google.cloud.forseti.services.inventory.base import iam_helpers
 
 LOGGER = logger.get_logger(__name__)
 
+# Number of projects whose buckets are fetched together, when the API client
+# prefetches them.
+BUCKET_PREFETCH_PROJECTS = 100
+
 
 def size_t_hash(key):
     """Hash the key using size_t.
@@ -346,7 +350,7 @@ class Resource(object):
                     # Parallelization for resource subtrees.
                     if res.should_dispatch():
                         callback = partial(res.try_accept, visitor, new_stack)
-                        visitor.dispatch(callback)
+                        visitor.dispatch(callback, res)
                     else:
                         res.try_accept(visitor, new_stack)
             except Exception as e:
@@ -1760,13 +1764,39 @@ class ResourceManagerProjectIterator(ResourceIterator):
         parent_type = self.resource.type()
         parent_id = self.resource.key()
         try:
+            projects = []
             for data, metadata in gcp.iter_crm_projects(
                     parent_type=parent_type, parent_id=parent_id):
-                yield FACTORIES['project'].create_new(data, metadata=metadata)
+                projects.append(
+                    FACTORIES['project'].create_new(data, metadata=metadata))
+                if len(projects) >= BUCKET_PREFETCH_PROJECTS:
+                    self._prefetch_buckets(projects)
+                    for project in projects:
+                        yield project
+                    projects = []
+            self._prefetch_buckets(projects)
+            for project in projects:
+                yield project
         except ResourceNotSupported as e:
             # API client doesn't support this resource, ignore.
             LOGGER.debug(e)
 
+    def _prefetch_buckets(self, projects):
+        """Fetch the buckets of the active projects together.
+
+        Args:
+            projects (list): The projects about to be crawled.
+        """
+        project_numbers = [project['projectNumber'] for project in projects
+                           if project.enumerable()]
+        if len(project_numbers) < 2:
+            return
+        try:
+            self.client.prefetch_storage_buckets(project_numbers)
+        except ResourceNotSupported as e:
+            # Storage API disabled, the buckets are not crawled.
+            LOGGER.debug(e)
+
 
 class ResourceManagerProjectOrgPolicyIterator(resource_iter_class_factory(
         api_method_name='iter_crm_project_org_policies',
@@ -104,6 +104,31 @@ class Storage(object):
         """
         raise NotImplementedError()
 
+    def start_concurrent_writer(self, session_maker, threads):
+        """Write from writer threads, by default writes stay synchronous.
+
+        Args:
+            session_maker (object): Creates the db sessions of the writers.
+            threads (int): Number of writer threads.
+        """
+        del session_maker, threads  # Unused.
+
+    def stop_concurrent_writer(self):
+        """Stop the writer threads, by default there are none."""
+
+    def get_child_counts(self, resource_types):
+        """Count the children of resources in the previous inventory.
+
+        Args:
+            resource_types (list): Resource types to count children of.
+
+        Returns:
+            dict: '<resource_type>/<resource_id>' -> number of children, by
+                default no counts are known.
+        """
+        del resource_types  # Unused.
+        return {}
+
 
 class Memory(Storage):
     """The storage in memory"""
@@ -14,14 +14,17 @@
 
 """Crawler implementation."""
 
+from builtins import object
 from builtins import str
 from builtins import range
-from queue import Empty
-from queue import Queue
+import itertools
+from queue import PriorityQueue
 import threading
 import time
 
 from future import standard_library
+from sqlalchemy.orm import sessionmaker
+
 from google.cloud.forseti.common.util import logger
 from google.cloud.forseti.services.inventory.base import cai_gcp_client
 from google.cloud.forseti.services.inventory.base import cloudasset
@@ -33,6 +36,20 @@ standard_library.install_aliases()
 
 LOGGER = logger.get_logger(__name__)
 
+# Number of threads writing crawled resources to the database.
+DEFAULT_WRITER_THREADS = 2
+
+# Resource types whose subtrees are ordered by their size in the previous
+# inventory, largest first, so the longest crawls start early.
+SIZE_HINT_RESOURCE_TYPES = ['project']
+
+# Resource types dispatched ahead of all others, they are cheap and expand
+# into the rest of the hierarchy.
+EXPANDING_RESOURCE_TYPES = frozenset(['folder'])
+
+# Priority of the worker shutdown sentinel, ahead of any queued work.
+_SHUTDOWN_PRIORITY = (float('-inf'),)
+
 
 class CrawlerConfig(crawler.CrawlerConfig):
     """Crawler configuration to inject dependencies."""
@@ -58,7 +75,8 @@ class ParallelCrawlerConfig(crawler.CrawlerConfig):
     """Multithreaded crawler configuration, to inject dependencies."""
 
     def __init__(self, storage, progresser, api_client, threads=10,
-                 variables=None):
+                 variables=None, session_maker=None,
+                 writer_threads=DEFAULT_WRITER_THREADS, size_hints=None):
         """Initialize
 
         Args:
@@ -68,6 +86,11 @@ class ParallelCrawlerConfig(crawler.CrawlerConfig):
             api_client (ApiClientImpl): GCP API client
             threads (int): how many threads to use
             variables (dict): config variables
+            session_maker (object): Creates the db sessions of the writer
+                threads, if None the storage writes from the crawler threads.
+            writer_threads (int): how many threads write to the database
+            size_hints (dict): '<resource_type>/<resource_id>' -> estimated
+                subtree size, larger subtrees are crawled first.
         """
         super(ParallelCrawlerConfig, self).__init__()
         self.storage = storage
@@ -75,6 +98,98 @@ class ParallelCrawlerConfig(crawler.CrawlerConfig):
         self.variables = {} if not variables else variables
         self.threads = threads
         self.client = api_client
+        self.session_maker = session_maker
+        self.writer_threads = writer_threads
+        self.size_hints = {} if not size_hints else size_hints
+
+
+class PriorityExecutor(object):
+    """Thread pool running the callbacks with the lowest priority first.
+
+    Unlike concurrent.futures.ThreadPoolExecutor, queued callbacks are run
+    by priority instead of submission order, callbacks submitting more work
+    can be waited on as a whole, and the busy and idle time of each worker
+    is recorded.
+    """
+
+    def __init__(self, threads):
+        """Initialize
+
+        Args:
+            threads (int): Number of worker threads.
+        """
+        self._threads = threads
+        self._queue = PriorityQueue()
+        self._sequence = itertools.count()
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._workers = []
+        self.stats = []
+
+    def start(self):
+        """Start the worker threads."""
+        for _ in range(self._threads):
+            stats = {'busy_seconds': 0.0, 'idle_seconds': 0.0, 'tasks': 0}
+            worker = threading.Thread(target=self._work, args=(stats,))
+            worker.daemon = True
+            worker.start()
+            self.stats.append(stats)
+            self._workers.append(worker)
+
+    def _work(self, stats):
+        """Run queued callbacks until the shutdown sentinel is received.
+
+        Args:
+            stats (dict): Statistics of this worker.
+        """
+        while True:
+            waiting_since = time.time()
+            _, _, callback = self._queue.get()
+            started = time.time()
+            stats['idle_seconds'] += started - waiting_since
+            if callback is None:
+                return
+
+            try:
+                callback()
+            except Exception as e:  # pylint: disable=broad-except
+                LOGGER.exception(e)
+            finally:
+                stats['busy_seconds'] += time.time() - started
+                stats['tasks'] += 1
+                with self._idle:
+                    self._pending -= 1
+                    if not self._pending:
+                        self._idle.notify_all()
+
+    def submit(self, callback, priority=(0,)):
+        """Queue a callback.
+
+        Args:
+            callback (function): Callback to run.
+            priority (tuple): Callbacks with lower priorities run first,
+                equal priorities run in submission order.
+        """
+        with self._idle:
+            self._pending += 1
+        self._queue.put((priority, next(self._sequence), callback))
+
+    def wait(self):
+        """Block until all callbacks, including those they submit, ran."""
+        with self._idle:
+            while self._pending:
+                self._idle.wait()
+
+    def shutdown(self):
+        """Stop the workers after their current callback and join them.
+
+        Callbacks still queued are not run.
+        """
+        for _ in self._workers:
+            self._queue.put((_SHUTDOWN_PRIORITY, next(self._sequence), None))
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
 
 
 class Crawler(crawler.Crawler):
@@ -131,11 +246,12 @@ class Crawler(crawler.Crawler):
         else:
             progresser.on_new_object(resource)
 
-    def dispatch(self, callback):
+    def dispatch(self, callback, resource=None):
         """Dispatch crawling of a subtree.
 
         Args:
             callback (function): Callback to dispatch.
+            resource (Resource): Root resource of the subtree.
         """
         callback()
 
@@ -198,27 +314,7 @@ class ParallelCrawler(Crawler):
         """
         super(ParallelCrawler, self).__init__(config)
         self._write_lock = threading.Lock()
-        self._dispatch_queue = Queue()
-        self._shutdown_event = threading.Event()
-
-    def _start_workers(self):
-        """Start a pool of worker threads for processing the dispatch queue."""
-        self._shutdown_event.clear()
-        for _ in range(self.config.threads):
-            worker = threading.Thread(target=self._process_queue)
-            worker.daemon = True
-            worker.start()
-
-    def _process_queue(self):
-        """Process items in the queue until the shutdown event is set."""
-        while not self._shutdown_event.is_set():
-            try:
-                callback = self._dispatch_queue.get(timeout=1)
-            except Empty:
-                continue
-
-            callback()
-            self._dispatch_queue.task_done()
+        self._executor = None
 
     def run(self, resource):
         """Run the crawler, given a start resource.
@@ -229,23 +325,66 @@ class ParallelCrawler(Crawler):
         Returns:
             QueueProgresser: The filled progresser described in inventory
         """
+        storage = self.config.storage
+        concurrent_writer = (self.config.session_maker and
+                             self.config.writer_threads)
+        if concurrent_writer:
+            # Database writes are done by the writer threads, crawler threads
+            # only hold the write lock to build rows.
+            storage.start_concurrent_writer(self.config.session_maker,
+                                            self.config.writer_threads)
+        self._executor = PriorityExecutor(self.config.threads)
         try:
-            self._start_workers()
+            self._executor.start()
             resource.accept(self)
-            self._dispatch_queue.join()
+            self._executor.wait()
         finally:
-            self._shutdown_event.set()
-            # Wait for threads to exit.
-            time.sleep(2)
+            self._executor.shutdown()
+            self._report_worker_stats(self._executor.stats)
+            if concurrent_writer:
+                storage.stop_concurrent_writer()
         return self.config.progresser
 
-    def dispatch(self, callback):
+    def _report_worker_stats(self, stats):
+        """Log the worker statistics and pass them to the progresser.
+
+        Args:
+            stats (list): Dict per worker with the busy and idle seconds and
+                the number of tasks run.
+        """
+        busy = sum(worker['busy_seconds'] for worker in stats)
+        idle = sum(worker['idle_seconds'] for worker in stats)
+        if busy + idle:
+            LOGGER.info('Crawler workers: %s, tasks: %s, utilization: %.1f%%',
+                        len(stats), sum(worker['tasks'] for worker in stats),
+                        100.0 * busy / (busy + idle))
+        self.config.progresser.on_worker_stats(stats)
+
+    def _get_priority(self, resource):
+        """Order the dispatched subtrees, expanding and larger ones first.
+
+        Args:
+            resource (Resource): Root resource of the subtree.
+
+        Returns:
+            tuple: Priority of the subtree, lower runs first.
+        """
+        if resource is None:
+            return (1, 0)
+        if resource.type() in EXPANDING_RESOURCE_TYPES:
+            return (0, 0)
+        size_hint = self.config.size_hints.get(
+            '{}/{}'.format(resource.type(), resource.key()), 0)
+        return (1, -size_hint)
+
+    def dispatch(self, callback, resource=None):
         """Dispatch crawling of a subtree.
 
         Args:
             callback (function): Callback to dispatch.
+            resource (Resource): Root resource of the subtree.
         """
-        self._dispatch_queue.put(callback)
+        self._executor.submit(callback, self._get_priority(resource))
 
     def write(self, resource):
         """Save resource to storage.
@@ -324,14 +463,20 @@ def _api_client_factory(storage, config, parallel):
     return gcp.ApiClientImpl(client_config)
 
 
-def _crawler_factory(storage, progresser, client, parallel):
+def _crawler_factory(storage, progresser, client, parallel,
+                     session_maker=None):
     """Creates the proper initialized crawler based on the configuration.
 
+    The parallel crawler orders projects by their size in the previous
+    inventory.
+
     Args:
         storage (object): Storage implementation to use.
         progresser (object): Progresser to notify status updates.
         client (object): The API client instance.
         parallel (bool): If true, use the parallel crawler implementation.
+        session_maker (object): Creates the db sessions of the writer threads
+            of the parallel crawler.
 
     Returns:
         Union[Crawler, ParallelCrawler]:
@@ -340,10 +485,13 @@ def _crawler_factory(storage, progresser, client, parallel):
     excluded_resources = set(client.config.get('excluded_resources', []))
     config_variables = {'excluded_resources': excluded_resources}
     if parallel:
+        size_hints = storage.get_child_counts(SIZE_HINT_RESOURCE_TYPES)
         parallel_config = ParallelCrawlerConfig(storage,
                                                 progresser,
                                                 client,
-                                                variables=config_variables)
+                                                variables=config_variables,
+                                                session_maker=session_maker,
+                                                size_hints=size_hints)
         return ParallelCrawler(parallel_config)
 
     # Default to the non-parallel crawler
@@ -387,12 +535,15 @@ def run_crawler(storage,
     Returns:
         QueueProgresser: The progresser implemented in inventory
     """
-    if parallel and 'sqlite' in str(config.get_service_config().get_engine()):
+    engine = config.get_service_config().get_engine()
+    if parallel and 'sqlite' in str(engine):
         LOGGER.info('SQLite used, disabling parallel threads.')
         parallel = False
 
     client = _api_client_factory(storage, config, parallel)
-    crawler_impl = _crawler_factory(storage, progresser, client, parallel)
+    session_maker = sessionmaker(bind=engine) if parallel else None
+    crawler_impl = _crawler_factory(storage, progresser, client, parallel,
+                                    session_maker)
     resource = _root_resource_factory(config, client)
 
     progresser = crawler_impl.run(resource)
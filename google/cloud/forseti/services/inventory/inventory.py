@@ -27,6 +27,8 @@ from google.cloud.forseti.common.util import date_time
 from google.cloud.forseti.common.util import logger
 from google.cloud.forseti.services.inventory.crawler import run_crawler
 from google.cloud.forseti.services.inventory.storage import DataAccess
+from google.cloud.forseti.services.inventory.storage import \
+    DEFAULT_MAX_INCREMENTAL_INVENTORIES
 from google.cloud.forseti.services.inventory.storage import initialize \
     as init_storage
 
@@ -53,6 +55,7 @@ class Progress(object):
         self.errors = 0
         self.last_warning = ''
         self.last_error = ''
+        self.worker_stats = []
 
 
 class QueueProgresser(Progress):
@@ -109,6 +112,16 @@ class QueueProgresser(Progress):
         self.errors += 1
         self._notify()
 
+    def on_worker_stats(self, stats):
+        """Stores the crawler worker statistics.
+
+        Args:
+            stats (list): Dict per crawler thread with the busy and idle
+                seconds and the number of tasks run.
+        """
+
+        self.worker_stats = stats
+
     def get_summary(self):
         """Indicate end of updates, and return self as last state.
 
@@ -171,15 +184,21 @@ def run_inventory(service_config,
         Exception: Reraises any exception.
     """
 
+    inventory_config = service_config.get_inventory_config()
+    incremental_configs = inventory_config.get_incremental_configs()
     storage_cls = service_config.get_storage_class()
-    with storage_cls(session) as storage:
+    with storage_cls(session,
+                     incremental=incremental_configs.get('enabled', False),
+                     max_incremental_inventories=incremental_configs.get(
+                         'max_incremental_inventories',
+                         DEFAULT_MAX_INCREMENTAL_INVENTORIES)) as storage:
         try:
             progresser.inventory_index_id = storage.inventory_index.id
             progresser.final_message = True if background else False
             queue.put(progresser)
             result = run_crawler(storage,
                                  progresser,
-                                 service_config.get_inventory_config())
+                                 inventory_config)
         except Exception as e:
             LOGGER.exception(e)
             storage.rollback()
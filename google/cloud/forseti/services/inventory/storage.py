@@ -15,8 +15,13 @@
 # pylint: disable=too-many-lines
 
 from builtins import object
+import collections
+import hashlib
 import json
 import enum
+from queue import Queue
+import threading
+import time
 
 from retrying import retry
 from sqlalchemy import and_
@@ -25,6 +30,7 @@ from sqlalchemy import case
 from sqlalchemy import Column
 from sqlalchemy import DateTime
 from sqlalchemy import Enum
+from sqlalchemy import exc
 from sqlalchemy import exists
 from sqlalchemy import func
 from sqlalchemy import Index
@@ -32,9 +38,11 @@ from sqlalchemy import Integer
 from sqlalchemy import LargeBinary
 from sqlalchemy import or_
 from sqlalchemy import PrimaryKeyConstraint
+from sqlalchemy import select
 from sqlalchemy import String
 from sqlalchemy import Table
 from sqlalchemy import Text
+from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import aliased
@@ -54,6 +62,19 @@ BASE = declarative_base()
 CURRENT_SCHEMA = 1
 PER_YIELD = 1024
 MAX_ALLOWED_PACKET = 32 * 1024 * 1024  # 32 Mb default mysql max packet size
+# Content hash of the rows marking a resource deleted in an incremental
+# inventory.
+DELETED_CONTENT_HASH = 'deleted'
+# Number of incremental inventories stored against a full inventory before
+# a new full inventory is taken.
+DEFAULT_MAX_INCREMENTAL_INVENTORIES = 6
+# Number of gcp_inventory rows of a failed inventory deleted per transaction.
+ROLLBACK_DELETE_BATCH_SIZE = 10000
+# Number of gcp_inventory row ids reserved at a time by a storage.
+ROW_ID_BLOCK_SIZE = 1000
+
+_BaseRow = collections.namedtuple('_BaseRow',
+                                  ['id', 'parent_id', 'content_hash'])
 
 
 class Categories(enum.Enum):
@@ -92,6 +113,7 @@ class InventoryIndex(BASE):
     inventory_index_warnings = Column(Text(16777215))
     inventory_index_errors = Column(Text(16777215))
     message = Column(Text(16777215))
+    base_inventory_index_id = Column(BigInteger)
 
     def __repr__(self):
         """Object string representation.
@@ -122,6 +144,58 @@ class InventoryIndex(BASE):
             schema_version=CURRENT_SCHEMA,
             counter=0)
 
+    @staticmethod
+    def get_schema_update_actions():
+        """Maintain all the schema changes for this table.
+
+        Returns:
+            dict: A mapping of Action: Column.
+        """
+        columns_to_create = [Column('base_inventory_index_id', BigInteger)]
+
+        schema_update_actions = {'CREATE': columns_to_create}
+        return schema_update_actions
+
+    def is_incremental(self):
+        """Whether this inventory is stored as a delta against a base.
+
+        Returns:
+            bool: True if the inventory only holds the resources that were
+                added, changed or deleted since its base inventory.
+        """
+        return bool(self.base_inventory_index_id)
+
+    def inventory_filter(self):
+        """Build the filter selecting the rows visible in this inventory.
+
+        A full inventory owns all of its rows. An incremental inventory
+        sees its own rows, minus the deletion markers, and the rows of its
+        base inventory that were not superseded. Data rows of the base
+        inventory, such as IAM policies, are superseded together with their
+        resource.
+
+        Returns:
+            object: SQLAlchemy filter expression on the Inventory table.
+        """
+        if not self.is_incremental():
+            return Inventory.inventory_index_id == self.id
+
+        superseding = aliased(Inventory)
+        # Comparison to None needed to compare to Null in SQL.
+        # pylint: disable=singleton-comparison
+        return or_(
+            and_(Inventory.inventory_index_id == self.id,
+                 or_(Inventory.content_hash == None,
+                     Inventory.content_hash != DELETED_CONTENT_HASH)),
+            and_(Inventory.inventory_index_id == self.base_inventory_index_id,
+                 ~exists().where(and_(
+                     superseding.inventory_index_id == self.id,
+                     or_(superseding.base_row_id == Inventory.id,
+                         and_(Inventory.category != Categories.resource,
+                              superseding.base_row_id ==
+                              Inventory.parent_id))))))
+        # pylint: enable=singleton-comparison
+
     def complete(self, status=IndexState.SUCCESS):
         """Mark the inventory as completed with a final inventory_status.
 
@@ -176,7 +250,7 @@ class InventoryIndex(BASE):
         details = dict(
             session.query(func.json_extract(resource_data, '$.lifecycleState'),
                           func.count())
-            .filter(Inventory.inventory_index_id == self.id)
+            .filter(self.inventory_filter())
             .filter(Inventory.category == 'resource')
             .filter(Inventory.resource_type == resource_type_input)
             .group_by(func.json_extract(resource_data, '$.lifecycleState'))
@@ -232,7 +306,7 @@ class InventoryIndex(BASE):
 
         details_query = (
             session.query(hidden_label, shown_label)
-            .filter(Inventory.inventory_index_id == self.id)
+            .filter(self.inventory_filter())
             .filter(Inventory.category == 'resource')
             .filter(Inventory.resource_type == resource_type).one())
 
@@ -255,7 +329,7 @@ class InventoryIndex(BASE):
 
         summary = dict(
             session.query(resource_type, func.count(resource_type))
-            .filter(Inventory.inventory_index_id == self.id)
+            .filter(self.inventory_filter())
             .filter(Inventory.category == 'resource')
             .group_by(resource_type).all())
 
@@ -310,6 +384,8 @@ class Inventory(BASE):
     parent_id = Column(Integer)
     other = Column(Text)
     inventory_errors = Column(Text)
+    content_hash = Column(String(64))
+    base_row_id = Column(Integer)
 
     __table_args__ = (
         Index('idx_resource_category',
@@ -317,7 +393,9 @@ class Inventory(BASE):
               'resource_type',
               'category'),
         Index('idx_parent_id',
-              'parent_id'))
+              'parent_id'),
+        Index('idx_base_row_id',
+              'base_row_id'))
 
     @staticmethod
     def get_schema_update_actions():
@@ -331,7 +409,9 @@ class Inventory(BASE):
                                     default=''),
                              Column('cai_resource_name',
                                     String(4096),
-                                    default='')]
+                                    default=''),
+                             Column('content_hash', String(64)),
+                             Column('base_row_id', Integer)]
 
         schema_update_actions = {'CREATE': columns_to_create}
         return schema_update_actions
@@ -456,6 +536,28 @@ class Inventory(BASE):
 
         return rows
 
+    @staticmethod
+    def compute_content_hash(rows):
+        """Hash the content of the rows of a crawled resource.
+
+        The crawl timestamp stored in 'other' is left out, so the hash only
+        changes when the resource or its attached data changes.
+
+        Args:
+            rows (list): The Inventory rows built by from_resource.
+
+        Returns:
+            str: Hex digest of the content.
+        """
+        content = sorted(
+            [row.category.name,
+             row.cai_resource_name,
+             row.cai_resource_type,
+             row.resource_data,
+             row.inventory_errors] for row in rows)
+        return hashlib.sha256(
+            json.dumps(content).encode('utf-8')).hexdigest()
+
     def copy_inplace(self, new_row):
         """Update a database row object from a resource.
 
@@ -469,6 +571,7 @@ class Inventory(BASE):
         self.resource_data = new_row.resource_data
         self.other = new_row.other
         self.inventory_errors = new_row.inventory_errors
+        self.content_hash = new_row.content_hash
 
     def __repr__(self):
         """String representation of the database row object.
@@ -564,6 +667,24 @@ class Inventory(BASE):
         return self.inventory_errors
 
 
+class InventoryRowIdCounter(BASE):
+    """First gcp_inventory row id not reserved by a storage."""
+
+    __tablename__ = 'gcp_inventory_row_ids'
+
+    id = Column(Integer, primary_key=True)
+    next_id = Column(BigInteger, nullable=False)
+
+    def __repr__(self):
+        """String representation.
+
+        Returns:
+            str: The next row id.
+        """
+        return '<{}(next_id={})>'.format(self.__class__.__name__,
+                                         self.next_id)
+
+
 class CaiTemporaryStore(object):
     """CAI temporary inventory table."""
 
@@ -663,6 +784,25 @@ class CaiTemporaryStore(object):
         Returns:
             object: database row object or None if there is no data.
         """
+        values = cls.row_values_from_json(asset_json)
+        if not values:
+            return None
+        return cls(**values)
+
+    @classmethod
+    def row_values_from_json(cls, asset_json):
+        """Parses a dump file line into the column values of a table row.
+
+        The line is decoded exactly once and the parent name is derived in
+        the same pass, so the result can be handed directly to a Core insert.
+
+        Args:
+            asset_json (bytes): The json representation of an Asset.
+
+        Returns:
+            dict: A mapping of column name to value, or None if there is no
+                data.
+        """
         asset = json.loads(asset_json)
         if len(asset['name']) > 512:
             LOGGER.warning('Skipping insert of asset %s, name too long.',
@@ -678,13 +818,13 @@ class CaiTemporaryStore(object):
         else:
             return None
 
-        return cls(
-            name=asset['name'],
-            parent_name=parent_name,
-            content_type=content_type,
-            asset_type=asset['asset_type'],
-            asset_data=asset_json
-        )
+        return {
+            'name': asset['name'],
+            'parent_name': parent_name,
+            'content_type': content_type,
+            'asset_type': asset['asset_type'],
+            'asset_data': asset_json,
+        }
 
     @classmethod
     def delete_all(cls, session):
@@ -872,6 +1012,240 @@ class BufferedDbWriter(object):
         self.buffer = []
 
 
+class ConcurrentDbWriter(object):
+    """Buffered db writing from a pool of writer threads.
+
+    Full buffers are handed to the writer threads over a bounded queue, so
+    callers only wait on the database when all writers are busy. Each writer
+    thread commits its batches with its own session.
+    """
+
+    def __init__(self,
+                 session_maker,
+                 threads=2,
+                 max_size=1024,
+                 max_packet_size=MAX_ALLOWED_PACKET * .75,
+                 max_queued_batches=4):
+        """Initialize
+
+        Args:
+            session_maker (object): Creates the db sessions of the writers.
+            threads (int): Number of writer threads.
+            max_size (int): max size of buffer
+            max_packet_size (int): max size of a packet to send to SQL
+            max_queued_batches (int): Number of full buffers queued for the
+                writer threads before add blocks.
+        """
+        # Session for reading back written rows, each flush commits the
+        # writer sessions so it sees them.
+        self.session = session_maker()
+        self.buffer = []
+        self.estimated_packet_size = 0
+        self.max_size = max_size
+        self.max_packet_size = max_packet_size
+        self._queue = Queue(maxsize=max_queued_batches)
+        self._errors = []
+        self._writers = []
+        for _ in range(threads):
+            writer = threading.Thread(target=self._write_batches,
+                                      args=(session_maker,))
+            writer.daemon = True
+            writer.start()
+            self._writers.append(writer)
+
+    def _write_batches(self, session_maker):
+        """Write queued batches until the end of the queue is reached.
+
+        Args:
+            session_maker (object): Creates the db session of this writer.
+        """
+        session = session_maker()
+        try:
+            while True:
+                batch = self._queue.get()
+                try:
+                    if batch is None:
+                        return
+                    session.bulk_save_objects(batch)
+                    session.commit()
+                except Exception as e:  # pylint: disable=broad-except
+                    LOGGER.exception(e)
+                    session.rollback()
+                    self._errors.append(e)
+                finally:
+                    self._queue.task_done()
+        finally:
+            session.close()
+
+    def add(self, obj, estimated_length=0):
+        """Add an object to the buffer to write to db.
+
+        Args:
+            obj (object): Object to write to db.
+            estimated_length (int): The estimated length of this object.
+        """
+
+        self.buffer.append(obj)
+        self.estimated_packet_size += estimated_length
+        if (self.estimated_packet_size > self.max_packet_size or
+                len(self.buffer) >= self.max_size):
+            self._submit()
+
+    def _submit(self):
+        """Queue the buffer for the writer threads."""
+        if self.buffer:
+            self._queue.put(self.buffer)
+        self.estimated_packet_size = 0
+        self.buffer = []
+
+    def flush(self):
+        """Write all pending objects and wait until they are committed.
+
+        Raises:
+            Exception: If a writer thread failed to write a batch.
+        """
+        self._submit()
+        self._queue.join()
+        if self._errors:
+            raise Exception('Concurrent db write failed: {}'.format(
+                self._errors[0]))
+        # End the read transaction so the next read sees the new rows.
+        self.session.commit()
+
+    def close(self):
+        """Flush the pending objects and stop the writer threads."""
+        try:
+            self.flush()
+        finally:
+            for _ in self._writers:
+                self._queue.put(None)
+            for writer in self._writers:
+                writer.join()
+            self.session.close()
+
+
+def _reserve_row_ids(connection, count):
+    """Reserve a block of gcp_inventory row ids.
+
+    The block starts after the last block reserved and after the highest
+    stored row id, so rows written without reserving ids are never
+    collided with.
+
+    Args:
+        connection (object): Database connection, in a transaction.
+        count (int): Number of row ids to reserve.
+
+    Returns:
+        int: The first id of the block.
+    """
+    counter = InventoryRowIdCounter.__table__
+    first_free_id = select(
+        [func.coalesce(func.max(Inventory.id), 0) + 1]).as_scalar()
+    reserve = counter.update().where(counter.c.id == 1).values(
+        next_id=case([(counter.c.next_id > first_free_id, counter.c.next_id)],
+                     else_=first_free_id) + count)
+    if not connection.execute(reserve).rowcount:
+        try:
+            connection.execute(counter.insert().values(
+                id=1, next_id=first_free_id + count))
+        except exc.IntegrityError:
+            # Created by a concurrent storage in the meantime.
+            connection.execute(reserve)
+    end_id = connection.execute(
+        select([counter.c.next_id]).where(counter.c.id == 1)).scalar()
+    return end_id - count
+
+
+class _RowIdGenerator(object):
+    """Client side generator of gcp_inventory row ids.
+
+    Row ids are handed out from blocks reserved in the database, instead of
+    flushing each resource row to learn its autoincrement id, so that the
+    storages of several server processes or of a CLI import never hand out
+    the same ids.
+    """
+
+    def __init__(self, session, block_size=ROW_ID_BLOCK_SIZE):
+        """Initialize
+
+        Args:
+            session (object): Database session of the storage.
+            block_size (int): Number of row ids reserved at a time.
+        """
+        self._session = session
+        self._block_size = block_size
+        self._next_id = 0
+        self._end_id = 0
+        self._lock = threading.Lock()
+
+    def _reserve_block(self):
+        """Reserve the next block of row ids.
+
+        SQLite has a single writer at a time, the block is reserved in the
+        transaction of the storage, which holds the write lock. Other
+        databases reserve it in a transaction of its own, committed right
+        away, so the storages do not wait on each other.
+
+        Returns:
+            int: The first id of the block.
+        """
+        engine = self._session.get_bind()
+        if engine.dialect.name == 'sqlite':
+            return _reserve_row_ids(self._session.connection(),
+                                    self._block_size)
+        with engine.begin() as connection:
+            return _reserve_row_ids(connection, self._block_size)
+
+    def next_id(self):
+        """Hand out the next row id.
+
+        Returns:
+            int: An unused row id.
+        """
+        with self._lock:
+            if self._next_id == self._end_id:
+                self._next_id = self._reserve_block()
+                self._end_id = self._next_id + self._block_size
+            row_id = self._next_id
+            self._next_id += 1
+            return row_id
+
+
+def _get_max_allowed_packet(session):
+    """Get the maximum packet size the database server will accept.
+
+    Args:
+        session (object): Database session.
+
+    Returns:
+        int: The server max_allowed_packet for MySQL, else the MySQL default.
+    """
+    if session.get_bind().dialect.name != 'mysql':
+        return MAX_ALLOWED_PACKET
+
+    try:
+        return int(session.execute(
+            text('SELECT @@max_allowed_packet')).scalar())
+    except (SQLAlchemyError, TypeError, ValueError) as e:
+        LOGGER.warning('Unable to read max_allowed_packet, using default of '
+                       '%s bytes: %s', MAX_ALLOWED_PACKET, e)
+        return MAX_ALLOWED_PACKET
+
+
+def _log_load_throughput(num_rows, num_bytes, elapsed):
+    """Log the throughput of a CAI data load.
+
+    Args:
+        num_rows (int): The number of rows written.
+        num_bytes (int): The number of bytes of asset data written.
+        elapsed (float): The wall time of the load in seconds.
+    """
+    elapsed = max(elapsed, 1e-6)
+    LOGGER.info('Loaded %s CAI assets (%s bytes) in %.2f seconds, '
+                '%.0f rows/sec, %.0f bytes/sec.', num_rows, num_bytes,
+                elapsed, num_rows / elapsed, num_bytes / elapsed)
+
+
 class CaiDataAccess(object):
     """Access to the CAI temporary store table."""
 
@@ -913,7 +1287,9 @@ class CaiDataAccess(object):
         commit_buffer = BufferedDbWriter(session,
                                          max_size=512,
                                          commit_on_flush=True)
+        start_time = time.time()
         num_rows = 0
+        num_bytes = 0
         try:
             for line in data:
                 if not line:
@@ -925,10 +1301,71 @@ class CaiDataAccess(object):
                     # exceeded. The actual length is closer to len(line) * 1.5.
                     commit_buffer.add(row, estimated_length=len(line) * 2)
                     num_rows += 1
+                    num_bytes += len(row.asset_data)
             commit_buffer.flush()
         except SQLAlchemyError as e:
             LOGGER.exception('Error populating CAI data: %s', e)
             session.rollback()
+        _log_load_throughput(num_rows, num_bytes, time.time() - start_time)
+        return num_rows
+
+    @staticmethod
+    def bulk_load_cai_data(data, session):
+        """Stream assets from cai data dump into cai temporary table.
+
+        Each line is parsed once and written with Core executemany inserts,
+        skipping the ORM unit of work. The MySQL driver rewrites executemany
+        into multi-row INSERT statements, and the batches are bounded by the
+        server's max_allowed_packet instead of a fixed row count.
+
+        Args:
+            data (file): A file like object, line delimeted text dump of json
+                data representing assets from Cloud Asset Inventory exportAssets
+                API.
+            session (object): Database session.
+
+        Returns:
+            int: The number of rows inserted
+        """
+        table = BASE.metadata.tables[CaiTemporaryStore.__tablename__]
+        insert_stmt = table.insert()
+        max_packet_size = _get_max_allowed_packet(session) * .75
+        start_time = time.time()
+        num_rows = 0
+        num_bytes = 0
+        batch = []
+        batch_size = 0
+        try:
+            for line in data:
+                if not line:
+                    continue
+
+                asset_json = line.strip().encode()
+                row = CaiTemporaryStore.row_values_from_json(asset_json)
+                if not row:
+                    continue
+
+                # Overestimate the packet length to ensure max size is never
+                # exceeded, escaping can nearly double the size of a row.
+                row_size = len(asset_json) * 2
+                if batch and batch_size + row_size > max_packet_size:
+                    session.execute(insert_stmt, batch)
+                    session.commit()
+                    batch = []
+                    batch_size = 0
+
+                batch.append(row)
+                batch_size += row_size
+                num_rows += 1
+                num_bytes += len(asset_json)
+
+            if batch:
+                session.execute(insert_stmt, batch)
+                session.commit()
+        except SQLAlchemyError as e:
+            LOGGER.exception('Error bulk loading CAI data: %s', e)
+            session.rollback()
+        _log_load_throughput(num_rows, num_bytes, time.time() - start_time)
         return num_rows
 
     @staticmethod
@@ -1014,11 +1451,21 @@ class DataAccess(object):
             inventory_index_id.
 
         Raises:
-            Exception: Reraises any exception.
+            Exception: Reraises any exception, or if incremental inventories
+                are stored against the inventory.
         """
 
         try:
             result = cls.get(session, inventory_index_id)
+            incremental_count = session.query(
+                func.count(InventoryIndex.id)).filter(
+                    InventoryIndex.base_inventory_index_id ==
+                    inventory_index_id).scalar()
+            if incremental_count:
+                raise Exception(
+                    'Inventory {} is the base of {} incremental inventories, '
+                    'delete them first.'.format(inventory_index_id,
+                                                incremental_count))
             session.query(Inventory).filter(
                 Inventory.inventory_index_id == inventory_index_id).delete()
             session.query(InventoryIndex).filter(
@@ -1116,6 +1563,10 @@ class DataAccess(object):
             cls, session, cutoff_datetime):
         """Get all inventory index entries older than the cutoff.
 
+        Full inventories that incremental inventories newer than the cutoff
+        are stored against are kept. Incremental inventories are listed
+        before the full inventory they are stored against.
+
         Args:
             session (object): Database session
             cutoff_datetime (datetime): The cutoff point to find any
@@ -1125,8 +1576,15 @@ class DataAccess(object):
             list: InventoryIndex
         """
 
+        retained_incremental = aliased(InventoryIndex)
         inventory_indexes = session.query(InventoryIndex).filter(
-            InventoryIndex.created_at_datetime < cutoff_datetime).all()
+            InventoryIndex.created_at_datetime < cutoff_datetime).filter(
+                ~exists().where(and_(
+                    retained_incremental.base_inventory_index_id ==
+                    InventoryIndex.id,
+                    retained_incremental.created_at_datetime >=
+                    cutoff_datetime))).order_by(
+                        InventoryIndex.id.desc()).all()
         session.expunge_all()
         return inventory_indexes
 
@@ -1150,7 +1608,13 @@ def initialize(engine):
 class Storage(BaseStorage):
     """Inventory storage used during creation."""
 
-    def __init__(self, session, existing_id=0, readonly=False):
+    def __init__(self,
+                 session,
+                 existing_id=0,
+                 readonly=False,
+                 incremental=False,
+                 max_incremental_inventories=(
+                     DEFAULT_MAX_INCREMENTAL_INVENTORIES)):
         """Initialize
 
         Args:
@@ -1158,6 +1622,12 @@ class Storage(BaseStorage):
             existing_id (int64): The inventory id if wants to open an existing
                 inventory.
             readonly (bool): whether to keep the inventory read-only.
+            incremental (bool): whether a new inventory should only store the
+                resources added, changed or deleted since the latest full
+                inventory.
+            max_incremental_inventories (int): Number of incremental
+                inventories stored against a full inventory before a new
+                full inventory is taken.
         """
         self.session = session
         self.opened = False
@@ -1166,6 +1636,21 @@ class Storage(BaseStorage):
         self._existing_id = existing_id
         self.session_completed = False
         self.readonly = readonly
+        self.incremental = incremental
+        self.max_incremental_inventories = max_incremental_inventories
+        # (resource_type, resource_id) -> [_BaseRow] of the base inventory.
+        self._base_rows = {}
+        # Base row ids matched by a written resource.
+        self._seen_base_rows = set()
+        # Base row ids still used as inventory key of an unchanged resource.
+        self._unchanged_base_rows = set()
+        # Row id -> id of the base row it supersedes.
+        self._superseded = {}
+        # Base row id -> id of the superseding row, None if deleted.
+        self._replacements = None
+        # (resource_type, resource_id) -> row id of the written resources.
+        self._resource_ids = {}
+        self._row_ids = None
 
     def _require_opened(self):
         """Make sure the storage is in 'open' state.
@@ -1189,6 +1674,13 @@ class Storage(BaseStorage):
 
         try:
             index = InventoryIndex.create()
+            if self.incremental:
+                base_index = self._get_base_index()
+                if base_index:
+                    LOGGER.info('Storing inventory %s incrementally against '
+                                'inventory %s.', index.id, base_index.id)
+                    index.base_inventory_index_id = base_index.id
+                    self._base_rows = self._load_base_rows(base_index.id)
             self.session.add(index)
         except Exception as e:
             LOGGER.exception(e)
@@ -1214,6 +1706,158 @@ class Storage(BaseStorage):
                         [IndexState.SUCCESS, IndexState.PARTIAL_SUCCESS]))
             .one())
 
+    def get_child_counts(self, resource_types):
+        """Count the children of resources in the last full inventory.
+
+        Args:
+            resource_types (list): Resource types to count children of.
+
+        Returns:
+            dict: '<resource_type>/<resource_id>' -> number of direct
+                children.
+        """
+        # pylint: disable=singleton-comparison
+        last_full_index = (
+            self.session.query(InventoryIndex.id).filter(
+                InventoryIndex.inventory_status.in_(
+                    [IndexState.SUCCESS, IndexState.PARTIAL_SUCCESS]))
+            .filter(InventoryIndex.base_inventory_index_id == None)
+            .order_by(InventoryIndex.id.desc()).first())
+        # pylint: enable=singleton-comparison
+        if not last_full_index:
+            return {}
+
+        parent = aliased(Inventory)
+        query = (
+            self.session.query(parent.resource_type,
+                               parent.resource_id,
+                               func.count(Inventory.id))
+            .select_from(Inventory)
+            .join(parent, Inventory.parent_id == parent.id)
+            .filter(Inventory.inventory_index_id == last_full_index.id)
+            .filter(parent.resource_type.in_(resource_types))
+            .group_by(parent.id, parent.resource_type, parent.resource_id))
+        return {'{}/{}'.format(resource_type, resource_id): count
+                for resource_type, resource_id, count in query}
+
+    def _get_base_index(self):
+        """Find the full inventory to store a new inventory against.
+
+        Returns:
+            InventoryIndex: The base inventory, or None if a full inventory
+                should be taken.
+        """
+        successful_states = [IndexState.SUCCESS, IndexState.PARTIAL_SUCCESS]
+        latest_index = (
+            self.session.query(InventoryIndex).filter(
+                InventoryIndex.inventory_status.in_(successful_states))
+            .order_by(InventoryIndex.id.desc()).first())
+        if not latest_index:
+            return None
+
+        base_index_id = (latest_index.base_inventory_index_id or
+                         latest_index.id)
+        incremental_count = (
+            self.session.query(func.count(InventoryIndex.id)).filter(
+                InventoryIndex.base_inventory_index_id == base_index_id)
+            .filter(InventoryIndex.inventory_status.in_(successful_states))
+            .scalar())
+        if incremental_count >= self.max_incremental_inventories:
+            return None
+
+        # Only full inventories taken in incremental mode carry the content
+        # hashes needed to compare resources against.
+        # pylint: disable=singleton-comparison
+        has_content_hashes = self.session.query(exists().where(and_(
+            Inventory.inventory_index_id == base_index_id,
+            Inventory.category == Categories.resource,
+            Inventory.content_hash != None))).scalar()
+        # pylint: enable=singleton-comparison
+        if not has_content_hashes:
+            return None
+
+        return (
+            self.session.query(InventoryIndex).filter(
+                InventoryIndex.id == base_index_id).one_or_none())
+
+    def _load_base_rows(self, base_index_id):
+        """Load the resource keys and content hashes of a base inventory.
+
+        Args:
+            base_index_id (int64): Id of the base inventory.
+
+        Returns:
+            dict: (resource_type, resource_id) -> list of _BaseRow. Group
+                members have one entry per group.
+        """
+        base_rows = collections.defaultdict(list)
+        query = (
+            self.session.query(Inventory.id,
+                               Inventory.resource_type,
+                               Inventory.resource_id,
+                               Inventory.parent_id,
+                               Inventory.content_hash)
+            .filter(Inventory.inventory_index_id == base_index_id)
+            .filter(Inventory.category == Categories.resource))
+        for row in query.yield_per(PER_YIELD):
+            base_rows[(row.resource_type, row.resource_id)].append(
+                _BaseRow(row.id, row.parent_id, row.content_hash))
+        return base_rows
+
+    def _match_base_row(self, resource_row, is_member):
+        """Compare a resource with its row in the base inventory.
+
+        Args:
+            resource_row (Inventory): The resource row of the resource.
+            is_member (bool): Whether the resource is a group member, which
+                is keyed by its group as well.
+
+        Returns:
+            tuple: (_BaseRow, bool), the matching base row or None and whether
+                the resource is unchanged since the base inventory.
+        """
+        parent_id = self._superseded.get(resource_row.parent_id,
+                                         resource_row.parent_id)
+        candidates = self._base_rows.get(
+            (resource_row.resource_type, resource_row.resource_id), [])
+
+        for base_row in candidates:
+            if base_row.parent_id == parent_id:
+                unchanged = base_row.content_hash == resource_row.content_hash
+                return base_row, unchanged
+
+        if not is_member and len(candidates) == 1:
+            # The resource moved to a different parent.
+            return candidates[0], False
+
+        return None, False
+
+    def _get_replacements(self):
+        """Map the base rows superseded by this incremental inventory.
+
+        Returns:
+            dict: Base row id -> id of the superseding row, or None if the
+                resource was deleted.
+        """
+        if self._replacements is None:
+            # Comparison to None needed to compare to Null in SQL.
+            # pylint: disable=singleton-comparison
+            query = (
+                self.session.query(Inventory.id,
+                                   Inventory.base_row_id,
+                                   Inventory.content_hash)
+                .filter(Inventory.inventory_index_id ==
+                        self.inventory_index.id)
+                .filter(Inventory.category == Categories.resource)
+                .filter(Inventory.base_row_id != None))
+            # pylint: enable=singleton-comparison
+            self._replacements = {
+                row.base_row_id: (
+                    None if row.content_hash == DELETED_CONTENT_HASH
+                    else row.id)
+                for row in query.yield_per(PER_YIELD)}
+        return self._replacements
+
     def _get_resource_rows(self, key, resource_type):
         """ Get the rows in the database for a certain resource
 
@@ -1229,7 +1873,7 @@ class Storage(BaseStorage):
             Exception: if there is no such row or more than one.
         """
 
-        rows = self.session.query(Inventory).filter(
+        rows = self.buffer.session.query(Inventory).filter(
             and_(
                 Inventory.inventory_index_id == self.inventory_index.id,
                 Inventory.resource_id == key,
@@ -1245,23 +1889,28 @@ class Storage(BaseStorage):
         """Checks if a resource exists already in the inventory.
 
         Args:
-            resource (object): Resource object to check against the db.
+            resource (object): Resource object to check against the written
+                resources.
 
         Returns:
             int: The resource id of the existing resource, else 0.
         """
-        row = self.session.query(Inventory.id).filter(
-            and_(
-                Inventory.inventory_index_id == self.inventory_index.id,
-                Inventory.category == Categories.resource,
-                Inventory.resource_type == resource.type(),
-                Inventory.resource_id == resource.key(),
-            )).one_or_none()
+        return self._resource_ids.get((resource.type(), resource.key()), 0)
 
-        if row:
-            return row.id
+    def _load_resource_ids(self):
+        """Load the keys of the resources already stored in the inventory.
 
-        return 0
+        Returns:
+            dict: (resource_type, resource_id) -> row id.
+        """
+        query = (
+            self.session.query(Inventory.id,
+                               Inventory.resource_type,
+                               Inventory.resource_id)
+            .filter(Inventory.inventory_index_id == self.inventory_index.id)
+            .filter(Inventory.category == Categories.resource))
+        return {(row.resource_type, row.resource_id): row.id
+                for row in query.yield_per(PER_YIELD)}
 
     def open(self, handle=None):
         """Open the storage, potentially create a new index.
@@ -1287,21 +1936,74 @@ class Storage(BaseStorage):
         # Should we create a new entry or are we opening an existing one?
         if existing_id:
             self.inventory_index = self._open(existing_id)
+            if not self.readonly:
+                self._resource_ids = self._load_resource_ids()
         else:
             self.inventory_index = self._create()
             self.session.commit()  # commit only on create.
 
         self.opened = True
         if not self.readonly:
+            self._row_ids = _RowIdGenerator(self.session)
             self.session.begin_nested()
         return self.inventory_index.id
 
+    def start_concurrent_writer(self, session_maker, threads):
+        """Write buffered rows from writer threads with their own sessions.
+
+        Args:
+            session_maker (object): Creates the db sessions of the writers.
+            threads (int): Number of writer threads.
+        """
+        self.buffer.flush()
+        self.buffer = ConcurrentDbWriter(session_maker, threads)
+
+    def stop_concurrent_writer(self):
+        """Wait for the writer threads and write from the storage session.
+
+        Raises:
+            Exception: If a writer thread failed to write a batch.
+        """
+        writer = self.buffer
+        self.buffer = BufferedDbWriter(self.session)
+        writer.close()
+
+    def _delete_rows(self, batch_size=ROLLBACK_DELETE_BATCH_SIZE):
+        """Delete the rows of the inventory, one id range at a time.
+
+        Each range is deleted and committed in a transaction of its own, to
+        bound the locks held and the undo log of a large inventory.
+
+        Args:
+            batch_size (int): Number of rows deleted per transaction.
+        """
+        rows = self.session.query(Inventory.id).filter(
+            Inventory.inventory_index_id == self.inventory_index.id)
+        lower_id = None
+        while True:
+            batch = rows
+            if lower_id is not None:
+                batch = batch.filter(Inventory.id > lower_id)
+            upper_id = batch.order_by(Inventory.id).offset(
+                batch_size - 1).limit(1).scalar()
+            if upper_id is not None:
+                batch = batch.filter(Inventory.id <= upper_id)
+            num_rows = batch.delete(synchronize_session=False)
+            self.session.commit()
+            LOGGER.debug('Deleted %s rows of failed inventory %s.',
+                         num_rows, self.inventory_index.id)
+            if upper_id is None:
+                return
+            lower_id = upper_id
+
     def rollback(self):
         """Roll back the stored inventory, but keep the index entry."""
 
         try:
             self.buffer.flush()
             self.session.rollback()
+            # Rows committed by concurrent writers are not rolled back.
+            self._delete_rows()
             self.inventory_index.complete(status=IndexState.FAILURE)
             self.session.commit()
         finally:
@@ -1314,6 +2016,8 @@ class Storage(BaseStorage):
         else:
             status = IndexState.SUCCESS
         try:
+            if self.inventory_index.is_incremental():
+                self._mark_unseen_base_rows_deleted()
             self.buffer.flush()
             self.session.commit()
             self.inventory_index.complete(status=status)
@@ -1338,9 +2042,53 @@ class Storage(BaseStorage):
 
         self.opened = False
 
+    def _mark_unseen_base_rows_deleted(self):
+        """Store a deletion marker for each base resource not crawled."""
+        for resource_key, base_rows in self._base_rows.items():
+            for base_row in base_rows:
+                if base_row.id in self._seen_base_rows:
+                    continue
+                resource_type, resource_id = resource_key
+                self.buffer.add(
+                    Inventory(id=self._row_ids.next_id(),
+                              inventory_index_id=self.inventory_index.id,
+                              category=Categories.resource,
+                              resource_type=resource_type,
+                              resource_id=resource_id,
+                              content_hash=DELETED_CONTENT_HASH,
+                              base_row_id=base_row.id))
+                self.inventory_index.counter += 1
+
+    def _write_rows(self, resource, rows):
+        """Write the rows of a resource and update its inventory key.
+
+        Args:
+            resource (object): Resource object to store in db.
+            rows (list): The Inventory rows built from the resource.
+        """
+        for row in rows:
+            # Row ids are generated up front, so that child resources and
+            # related data can be tied back to the parent resource row
+            # without flushing it first.
+            row.id = self._row_ids.next_id()
+            if row.category == Categories.resource:
+                resource.set_inventory_key(row.id)
+                self._resource_ids[(row.resource_type, row.resource_id)] = (
+                    row.id)
+                if row.base_row_id:
+                    self._superseded[row.id] = row.base_row_id
+            else:
+                row.parent_id = resource.inventory_key()
+            self.buffer.add(row)
+
+        self.inventory_index.counter += len(rows)
+
     def write(self, resource):
         """Write a resource to the storage and updates its row
 
+        In an incremental inventory, a resource unchanged since the base
+        inventory is not written and keeps the inventory key of its base row.
+
         Args:
             resource (object): Resource object to store in db.
 
@@ -1353,7 +2101,8 @@ class Storage(BaseStorage):
         resource_data = resource.data()
         # Group members do not need to be checked if it already exists
         # in Inventory, as a user can be members in multiple groups.
-        if resource_data.get('kind') != 'admin#directory#member':
+        is_member = resource_data.get('kind') == 'admin#directory#member'
+        if not is_member:
             previous_id = self._get_resource_id(resource)
             if previous_id:
                 resource.set_inventory_key(previous_id)
@@ -1362,20 +2111,21 @@ class Storage(BaseStorage):
 
         rows = Inventory.from_resource(self.inventory_index, resource)
 
-        for row in rows:
-            if row.category == Categories.resource:
-                # Force flush to insert the resource row in order to get the
-                # inventory id value. This is used to tie child resources
-                # and related data back to the parent resource row and to
-                # check for duplicate resources.
-                self.session.add(row)
-                self.session.flush()
-                resource.set_inventory_key(row.id)
-            else:
-                row.parent_id = resource.inventory_key()
-                self.buffer.add(row)
-
-        self.inventory_index.counter += len(rows)
+        if self.incremental:
+            resource_row = rows[0]
+            resource_row.content_hash = Inventory.compute_content_hash(rows)
+            if self.inventory_index.is_incremental():
+                base_row, unchanged = self._match_base_row(resource_row,
+                                                           is_member)
+                if base_row:
+                    self._seen_base_rows.add(base_row.id)
+                    if unchanged:
+                        self._unchanged_base_rows.add(base_row.id)
+                        resource.set_inventory_key(base_row.id)
+                        return
+                    resource_row.base_row_id = base_row.id
+
+        self._write_rows(resource, rows)
 
     def update(self, resource):
         """Update a resource in the storage.
@@ -1391,9 +2141,24 @@ class Storage(BaseStorage):
             raise Exception('Opened storage readonly')
 
         self.buffer.flush()
+        # The writer session, which sees the rows flushed by the buffer.
+        session = self.buffer.session
 
         try:
             new_rows = Inventory.from_resource(self.inventory_index, resource)
+            if self.incremental:
+                new_rows[0].content_hash = (
+                    Inventory.compute_content_hash(new_rows))
+
+            base_row_id = resource.inventory_key()
+            if base_row_id in self._unchanged_base_rows:
+                # The resource was left in the base inventory, supersede it
+                # now that its content changed.
+                self._unchanged_base_rows.discard(base_row_id)
+                new_rows[0].base_row_id = base_row_id
+                self._write_rows(resource, new_rows)
+                return
+
             old_rows = self._get_resource_rows(
                 resource.key(), resource.type())
 
@@ -1406,9 +2171,10 @@ class Storage(BaseStorage):
                         old_dict[category].copy_inplace(
                             new_dict[category])
                     else:
+                        new_dict[category].id = self._row_ids.next_id()
                         new_dict[category].parent_id = resource.inventory_key()
-                        self.session.add(new_dict[category])
-            self.session.commit()
+                        session.add(new_dict[category])
+            session.commit()
         except Exception as e:
             LOGGER.exception(e)
             raise Exception('Resource Update Unsuccessful: {}'.format(e))
@@ -1466,39 +2232,42 @@ class Storage(BaseStorage):
             object: Single row object or child/parent if 'with_parent' is set.
         """
 
-        filters = [Inventory.inventory_index_id == self.inventory_index.id]
+        filters = [self.inventory_index.inventory_filter()]
 
         if fetch_iam_policy:
-            filters.append(
-                Inventory.category == Categories.iam_policy)
+            category = Categories.iam_policy
 
         elif fetch_gcs_policy:
-            filters.append(
-                Inventory.category == Categories.gcs_policy)
+            category = Categories.gcs_policy
 
         elif fetch_dataset_policy:
-            filters.append(
-                Inventory.category == Categories.dataset_policy)
+            category = Categories.dataset_policy
 
         elif fetch_billing_info:
-            filters.append(
-                Inventory.category == Categories.billing_info)
+            category = Categories.billing_info
 
         elif fetch_enabled_apis:
-            filters.append(
-                Inventory.category == Categories.enabled_apis)
+            category = Categories.enabled_apis
 
         elif fetch_service_config:
-            filters.append(
-                Inventory.category == Categories.kubernetes_service_config)
+            category = Categories.kubernetes_service_config
 
         else:
-            filters.append(
-                Inventory.category == Categories.resource)
+            category = Categories.resource
+
+        filters.append(Inventory.category == category)
 
         if type_list:
             filters.append(Inventory.resource_type.in_(type_list))
 
+        if self.inventory_index.is_incremental():
+            rows = self._iter_incremental(filters, category)
+            if with_parent:
+                rows = self._join_parents(rows)
+            for row in rows:
+                yield row
+            return
+
         if with_parent:
             parent_inventory = aliased(Inventory)
             p_id = parent_inventory.id
@@ -1516,6 +2285,122 @@ class Storage(BaseStorage):
         for row in base_query.yield_per(PER_YIELD):
             yield row
 
+    def iter_all(self):
+        """Iterate the rows of all categories with a single ordered scan.
+
+        Yields:
+            Inventory: Row objects ordered by id, parents before children.
+        """
+        filters = [self.inventory_index.inventory_filter()]
+        if self.inventory_index.is_incremental():
+            rows = self._iter_incremental(filters, Categories.resource)
+        else:
+            rows = (self.session.query(Inventory)
+                    .filter(*filters)
+                    .order_by(Inventory.id.asc())
+                    .yield_per(PER_YIELD))
+        for row in rows:
+            yield row
+
+    def _iter_incremental(self, filters, category):
+        """Iterate the rows of an incremental inventory.
+
+        Rows superseding a base row are yielded at the position of the base
+        row, and parent ids are remapped to the superseding rows, so that
+        parents are still yielded before their children. Resources moved
+        under a resource created since the base inventory are held back
+        until their new parent was yielded.
+
+        Args:
+            filters (list): Filters selecting the rows to iterate.
+            category (Categories): The category of the rows.
+
+        Yields:
+            Inventory: Row objects, detached from the session if their
+                parent id was remapped.
+        """
+        query = self.session.query(Inventory)
+        for qry_filter in filters:
+            query = query.filter(qry_filter)
+        query = query.order_by(
+            func.coalesce(Inventory.base_row_id, Inventory.id).asc(),
+            Inventory.id.asc())
+
+        if category != Categories.resource:
+            for row in query.yield_per(PER_YIELD):
+                yield row
+            return
+
+        replacements = self._get_replacements()
+        positions = {row_id: base_row_id
+                     for base_row_id, row_id in replacements.items()
+                     if row_id}
+        deferred = collections.defaultdict(list)
+        pending = set()
+
+        for row in query.yield_per(PER_YIELD):
+            parent_id = replacements.get(row.parent_id)
+            if parent_id:
+                self.session.expunge(row)
+                row.parent_id = parent_id
+
+            position = row.base_row_id or row.id
+            parent_id = row.parent_id
+            if parent_id and (parent_id in pending or
+                              positions.get(parent_id, parent_id) > position):
+                deferred[parent_id].append(row)
+                pending.add(row.id)
+                continue
+
+            ready = [row]
+            while ready:
+                row = ready.pop()
+                pending.discard(row.id)
+                yield row
+                ready.extend(reversed(deferred.pop(row.id, [])))
+
+        # Parents filtered out by the type list are never yielded.
+        for rows in list(deferred.values()):
+            for row in rows:
+                yield row
+
+    def _join_parents(self, rows):
+        """Join each row with its parent row.
+
+        Args:
+            rows (iterable): Inventory rows.
+
+        Yields:
+            tuple: (row, parent row), rows without a parent are skipped.
+        """
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= PER_YIELD:
+                for joined in self._fetch_parents(chunk):
+                    yield joined
+                chunk = []
+        for joined in self._fetch_parents(chunk):
+            yield joined
+
+    def _fetch_parents(self, rows):
+        """Fetch the parent rows of a chunk of rows.
+
+        Args:
+            rows (list): Inventory rows.
+
+        Returns:
+            list: (row, parent row) tuples, rows without a parent are skipped.
+        """
+        parent_ids = set(row.parent_id for row in rows if row.parent_id)
+        if not parent_ids:
+            return []
+        parents = {
+            parent.id: parent for parent in self.session.query(
+                Inventory).filter(Inventory.id.in_(parent_ids))}
+        return [(row, parents[row.parent_id]) for row in rows
+                if row.parent_id in parents]
+
     def get_root(self):
         """get the resource root from the inventory
 
@@ -1526,7 +2411,7 @@ class Storage(BaseStorage):
         # pylint: disable=singleton-comparison
         root = self.session.query(Inventory).filter(
             and_(
-                Inventory.inventory_index_id == self.inventory_index.id,
+                self.inventory_index.inventory_filter(),
                 Inventory.parent_id == None,
                 Inventory.category == Categories.resource,
                 Inventory.resource_type.in_(['composite_root',
@@ -1550,7 +2435,7 @@ class Storage(BaseStorage):
             bool: If these types of resources exists
         """
         return self.session.query(exists().where(and_(
-            Inventory.inventory_index_id == self.inventory_index.id,
+            self.inventory_index.inventory_filter(),
             Inventory.category == Categories.resource,
             Inventory.resource_type.in_(type_list)
         ))).scalar()
@@ -0,0 +1,290 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-memory graph of the group memberships of a model."""
+
+from builtins import object
+
+
+class MembershipGraph(object):
+    """Group membership edges of a model, indexed in both directions.
+
+    Member names are interned to integer ids, each id has the list of its
+    children and the list of its parents.
+    """
+
+    def __init__(self, edges=()):
+        """Initialize.
+
+        Args:
+            edges (iterable): (group name, member name) tuples.
+        """
+        self._ids = {}
+        self._names = []
+        self._children = []
+        self._parents = []
+        self.edge_count = 0
+        for group_name, member_name in edges:
+            self.add_edge(group_name, member_name)
+
+    def __len__(self):
+        """Number of members with at least one membership.
+
+        Returns:
+            int: Number of members in the graph.
+        """
+        return len(self._names)
+
+    def _get_id(self, name):
+        """Get the id of a member name, adding it if needed.
+
+        Args:
+            name (str): The member name.
+
+        Returns:
+            int: The id of the member.
+        """
+        node_id = self._ids.get(name)
+        if node_id is None:
+            node_id = len(self._names)
+            self._ids[name] = node_id
+            self._names.append(name)
+            self._children.append([])
+            self._parents.append([])
+        return node_id
+
+    def add_edge(self, group_name, member_name):
+        """Add a membership.
+
+        Args:
+            group_name (str): The name of the group.
+            member_name (str): The name of the member of the group.
+        """
+        group_id = self._get_id(group_name)
+        member_id = self._get_id(member_name)
+        self._children[group_id].append(member_id)
+        self._parents[member_id].append(group_id)
+        self.edge_count += 1
+
+    def _walk(self, start_ids, adjacency, expandable, edges=None):
+        """Visit the members reachable from the start ids.
+
+        Args:
+            start_ids (iterable): The ids to start from, always visited.
+            adjacency (list): The neighbour ids of each id.
+            expandable (function): Whether the neighbours of a member name
+                are visited.
+            edges (dict): If given, filled with the neighbour names of each
+                expanded member name.
+
+        Returns:
+            set: Ids of the visited members.
+        """
+        visited = set(start_ids)
+        to_expand = list(visited)
+        while to_expand:
+            node_id = to_expand.pop()
+            name = self._names[node_id]
+            if not expandable(name):
+                continue
+            neighbours = adjacency[node_id]
+            if edges is not None and neighbours:
+                edges.setdefault(name, set()).update(
+                    self._names[n] for n in neighbours)
+            for neighbour in neighbours:
+                if neighbour not in visited:
+                    visited.add(neighbour)
+                    to_expand.append(neighbour)
+        return visited
+
+    def _to_ids(self, names):
+        """Get the ids of the names in the graph.
+
+        Args:
+            names (iterable): Member names.
+
+        Returns:
+            list: Ids of the names in the graph, others are skipped.
+        """
+        return [self._ids[name] for name in names if name in self._ids]
+
+    def children(self, name):
+        """Direct members of a group.
+
+        Args:
+            name (str): The group name.
+
+        Returns:
+            list: Names of the direct members.
+        """
+        node_id = self._ids.get(name)
+        if node_id is None:
+            return []
+        return [self._names[child] for child in self._children[node_id]]
+
+    def expand(self, names, expandable):
+        """Expand members towards their transitive members.
+
+        Args:
+            names (iterable): Member names to expand.
+            expandable (function): Whether the members of a member name are
+                included, e.g. true for groups.
+
+        Returns:
+            set: The given names and the names of their transitive members.
+        """
+        names = set(names)
+        visited = self._walk(self._to_ids(names), self._children, expandable)
+        names.update(self._names[node_id] for node_id in visited)
+        return names
+
+    def expand_members(self, name, expandable):
+        """Members of a group and of its expandable transitive subgroups.
+
+        Args:
+            name (str): The group name.
+            expandable (function): Whether the members of a subgroup name
+                are included.
+
+        Returns:
+            set: Names of the transitive members.
+        """
+        node_id = self._ids.get(name)
+        if node_id is None:
+            return set()
+        visited = self._walk(self._children[node_id], self._children,
+                             expandable)
+        return set(self._names[member_id] for member_id in visited)
+
+    def reverse_expand(self, names, edges=None):
+        """Expand members towards the groups containing them.
+
+        Args:
+            names (iterable): Member names to expand.
+            edges (dict): If given, filled with the names of the direct
+                parents of each visited member that has any.
+
+        Returns:
+            set: The given names and the names of their transitive groups.
+        """
+        names = set(names)
+        visited = self._walk(self._to_ids(names), self._parents,
+                             lambda _: True, edges)
+        names.update(self._names[node_id] for node_id in visited)
+        return names
+
+    def _strongly_connected_components(self, node_ids, successors):
+        """Find the strongly connected components, Tarjan's algorithm.
+
+        Iterative, so that deep nesting does not hit the recursion limit.
+
+        Args:
+            node_ids (list): The ids of the subgraph.
+            successors (list): The successor ids of each id in the subgraph.
+
+        Returns:
+            list: Lists of ids per component, in reverse topological order,
+                i.e. a component comes after all components it reaches.
+        """
+        index = {}
+        lowlink = {}
+        on_stack = set()
+        stack = []
+        components = []
+        for root in node_ids:
+            if root in index:
+                continue
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(successors[root]))]
+            while work:
+                node, neighbours = work[-1]
+                for neighbour in neighbours:
+                    if neighbour not in index:
+                        index[neighbour] = lowlink[neighbour] = len(index)
+                        stack.append(neighbour)
+                        on_stack.add(neighbour)
+                        work.append((neighbour, iter(successors[neighbour])))
+                        break
+                    elif neighbour in on_stack:
+                        lowlink[node] = min(lowlink[node], index[neighbour])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(component)
+        return components
+
+    def transitive_closure(self, included):
+        """Iterate the transitive closure of a subgraph.
+
+        The strongly connected components of the subgraph are condensed into
+        a DAG, the components reachable from each component are collected
+        as a bitset, sinks first.
+
+        Args:
+            included (function): Whether a member name is in the subgraph.
+
+        Yields:
+            tuple: (group name, member name) for each member reachable from
+                the group by one or more memberships in the subgraph.
+        """
+        node_ids = [node_id for node_id, name in enumerate(self._names)
+                    if included(name)]
+        in_subgraph = set(node_ids)
+        successors = {}
+        for node_id in node_ids:
+            successors[node_id] = [child for child in self._children[node_id]
+                                   if child in in_subgraph]
+
+        components = self._strongly_connected_components(node_ids,
+                                                         successors)
+        component_of = {}
+        for component_id, component in enumerate(components):
+            for node_id in component:
+                component_of[node_id] = component_id
+
+        reachable = []
+        for component_id, component in enumerate(components):
+            mask = 1 << component_id if len(component) > 1 else 0
+            for node_id in component:
+                for successor in successors[node_id]:
+                    successor_component = component_of[successor]
+                    if successor_component == component_id:
+                        # Self membership.
+                        mask |= 1 << component_id
+                    else:
+                        mask |= (reachable[successor_component] |
+                                 1 << successor_component)
+            reachable.append(mask)
+
+            members = []
+            while mask:
+                lowest = mask & -mask
+                members.extend(components[lowest.bit_length() - 1])
+                mask ^= lowest
+            for node_id in component:
+                name = self._names[node_id]
+                for member_id in members:
+                    yield name, self._names[member_id]
@@ -17,14 +17,20 @@
 # pylint: disable=too-many-instance-attributes
 
 from builtins import object
+import collections
 import json
 from io import StringIO
+import pickle
+import tempfile
 import traceback
 
 from future import standard_library
 from sqlalchemy.exc import SQLAlchemyError
 
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.services.inventory.storage import Categories
+from google.cloud.forseti.services.inventory.storage import \
+    Inventory as InventoryRow
 from google.cloud.forseti.services.inventory.storage import Storage as Inventory
 from google.cloud.forseti.services.utils import get_resource_id_from_type_name
 from google.cloud.forseti.services.utils import get_sql_dialect
@@ -118,6 +124,27 @@ GROUPS_SETTINGS_LIST = [
     'gsuite_groups_settings',
 ]
 
+# Rows buffered by the BulkInventoryImporter before they are written.
+BULK_INSERT_BATCH_SIZE = 1000
+
+# Approximate size of the buffered rows triggering a write, below the default
+# MySQL max_allowed_packet.
+BULK_INSERT_MAX_BYTES = 2 * 1024 * 1024
+
+# Rows held in memory by a SpillQueue before they are written to disk.
+SPILL_QUEUE_MAX_ROWS = 10000
+
+INVENTORY_COLUMNS = [column.name for column in InventoryRow.__table__.columns]
+
+# Policy rows converted to model resources, and whether they are counted as
+# imported items.
+POLICY_CATEGORIES = {
+    Categories.dataset_policy: True,
+    Categories.gcs_policy: True,
+    Categories.kubernetes_service_config: True,
+    Categories.enabled_apis: False,
+}
+
 
 class ResourceCache(dict):
     """Resource cache."""
@@ -138,6 +165,144 @@ class ResourceCache(dict):
         super(ResourceCache, self).__setitem__(key, value)
 
 
+# Parent of a resource imported by the BulkInventoryImporter, only the names
+# needed by the children are kept in the resource cache.
+CachedResource = collections.namedtuple('CachedResource',
+                                        ['type_name', 'full_name'])
+
+
+class BulkInsertWriter(object):
+    """Buffers rows and writes them with batched Core insert statements.
+
+    The tables are written in the given order, so rows referencing rows of
+    another table with a foreign key are inserted after them.
+    """
+
+    def __init__(self, session, tables, batch_size=BULK_INSERT_BATCH_SIZE,
+                 max_bytes=BULK_INSERT_MAX_BYTES):
+        """Initialize.
+
+        Args:
+            session (Session): Database session to write to.
+            tables (list): The tables rows are written to, parent tables
+                first.
+            batch_size (int): Number of buffered rows triggering a write.
+            max_bytes (int): Approximate size of the buffered rows
+                triggering a write.
+        """
+        self.session = session
+        self.tables = tables
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.row_count = 0
+        self._rows = {table: [] for table in tables}
+        self._pending = 0
+        self._pending_bytes = 0
+        # SQLite limits the number of parameters of a statement, the rows are
+        # inserted with executemany instead.
+        self._multi_values = get_sql_dialect(session) != 'sqlite'
+
+    def add(self, table, row, size=0):
+        """Buffer a row, writing all the buffered rows when full.
+
+        Args:
+            table (Table): The table to write the row to.
+            row (dict): The column values, all rows of a table must have the
+                same columns.
+            size (int): Approximate size of the row data.
+        """
+        self._rows[table].append(row)
+        self._pending += 1
+        self._pending_bytes += size
+        if (self._pending >= self.batch_size or
+                self._pending_bytes >= self.max_bytes):
+            self.flush()
+
+    def flush(self):
+        """Write the buffered rows."""
+        try:
+            for table in self.tables:
+                rows = self._rows[table]
+                if not rows:
+                    continue
+                if self._multi_values:
+                    self.session.execute(table.insert().values(rows))
+                else:
+                    self.session.execute(table.insert(), rows)
+                self.row_count += len(rows)
+        finally:
+            for table in self.tables:
+                self._rows[table] = []
+            self._pending = 0
+            self._pending_bytes = 0
+
+
+class SpillQueue(object):
+    """FIFO queue of inventory rows, spilled to a temporary file when large.
+
+    Holds the rows the importer reads before the rows they depend on, so
+    that the inventory is read with a single scan.
+    """
+
+    def __init__(self, max_rows=SPILL_QUEUE_MAX_ROWS):
+        """Initialize.
+
+        Args:
+            max_rows (int): Number of rows kept in memory before they are
+                written to the temporary file.
+        """
+        self.max_rows = max_rows
+        self._rows = []
+        self._file = None
+        self._count = 0
+
+    def __len__(self):
+        """Number of rows in the queue.
+
+        Returns:
+            int: The number of rows.
+        """
+        return self._count
+
+    def put(self, row):
+        """Add a copy of a row to the queue.
+
+        Args:
+            row (object): The inventory row.
+        """
+        self._rows.append({column: getattr(row, column)
+                           for column in INVENTORY_COLUMNS})
+        self._count += 1
+        if len(self._rows) >= self.max_rows:
+            if not self._file:
+                self._file = tempfile.TemporaryFile()
+            pickle.dump(self._rows, self._file, pickle.HIGHEST_PROTOCOL)
+            self._rows = []
+
+    def drain(self):
+        """Remove the rows from the queue, in the order they were added.
+
+        Yields:
+            object: Detached copies of the inventory rows.
+        """
+        spill_file, rows = self._file, self._rows
+        self._file, self._rows, self._count = None, [], 0
+        if spill_file:
+            try:
+                spill_file.seek(0)
+                while True:
+                    try:
+                        chunk = pickle.load(spill_file)
+                    except EOFError:
+                        break
+                    for columns in chunk:
+                        yield InventoryRow(**columns)
+            finally:
+                spill_file.close()
+        for columns in rows:
+            yield InventoryRow(**columns)
+
+
 class EmptyImporter(object):
     """Imports an empty model."""
 
@@ -263,76 +428,7 @@ class InventoryImporter(object):
                 else:
                     LOGGER.debug('Root resource is not organization: %s.', root)
 
-                item_counter = 0
-                LOGGER.debug('Start storing resources into models.')
-                for resource in inventory.iter(GCP_TYPE_LIST):
-                    item_counter += 1
-                    self._store_resource(resource)
-                    if not item_counter % 1000:
-                        # Flush database every 1000 resources
-                        LOGGER.debug('Flushing model write session: %s',
-                                     item_counter)
-                        self._flush_session()
-
-                if item_counter % 1000:
-                    # Additional rows added since last flush.
-                    self._flush_session()
-                LOGGER.debug('Finished storing resources into models.')
-
-                item_counter += self.model_action_wrapper(
-                    inventory.iter(['role']),
-                    self._convert_role,
-                    post_action=self._convert_role_post
-                )
-
-                item_counter += self.model_action_wrapper(
-                    inventory.iter(GCP_TYPE_LIST,
-                                   fetch_dataset_policy=True),
-                    self._convert_dataset_policy
-                )
-
-                item_counter += self.model_action_wrapper(
-                    inventory.iter(GCP_TYPE_LIST,
-                                   fetch_gcs_policy=True),
-                    self._convert_gcs_policy
-                )
-
-                item_counter += self.model_action_wrapper(
-                    inventory.iter(GCP_TYPE_LIST,
-                                   fetch_service_config=True),
-                    self._convert_service_config
-                )
-
-                self.model_action_wrapper(
-                    inventory.iter(GSUITE_TYPE_LIST),
-                    self._store_gsuite_principal
-                )
-
-                self.model_action_wrapper(
-                    inventory.iter(GCP_TYPE_LIST, fetch_enabled_apis=True),
-                    self._convert_enabled_apis
-                )
-
-                self.model_action_wrapper(
-                    inventory.iter(MEMBER_TYPE_LIST, with_parent=True),
-                    self._store_gsuite_membership,
-                    post_action=self._store_gsuite_membership_post
-                )
-
-                self.model_action_wrapper(
-                    inventory.iter(GROUPS_SETTINGS_LIST),
-                    self._store_groups_settings
-                )
-
-                self.dao.denorm_group_in_group(self.session)
-
-                self.model_action_wrapper(
-                    inventory.iter(GCP_TYPE_LIST,
-                                   fetch_iam_policy=True),
-                    self._store_iam_policy
-                )
-
-                self.dao.expand_special_members(self.session)
+                item_counter = self._import_inventory(inventory)
 
         except Exception as e:  # pylint: disable=broad-except
             LOGGER.exception(e)
@@ -354,6 +450,148 @@ class InventoryImporter(object):
             self.session.autoflush = autoflush
     # pylint: enable=too-many-statements
 
+    def _import_inventory(self, inventory):
+        """Import the inventory rows with a single ordered scan.
+
+        Rows are converted as they are read, except for the rows depending on
+        rows that are not read yet. Policies read before their resource and
+        memberships read before their group wait for the end of the scan, IAM
+        policies wait until all roles are imported, and groups settings until
+        the memberships are stored.
+
+        Args:
+            inventory (Inventory): The inventory to import.
+
+        Returns:
+            int: Number of resources, roles and policies imported.
+        """
+        waiting = SpillQueue()
+        groups_settings = SpillQueue()
+        iam_policies = SpillQueue()
+        group_names = {}
+
+        LOGGER.debug('Start storing inventory rows into models.')
+        item_counter = 0
+        idx = 0
+        for idx, row in enumerate(inventory.iter_all(), start=1):
+            if row.category == Categories.iam_policy:
+                if row.resource_type in GCP_TYPE_LIST:
+                    iam_policies.put(row)
+            elif row.resource_type in GROUPS_SETTINGS_LIST:
+                groups_settings.put(row)
+            elif self._is_waiting(row, group_names):
+                waiting.put(row)
+            else:
+                item_counter += self._import_row(row, group_names)
+
+            if not idx % 1000:
+                # Flush database every 1000 rows
+                LOGGER.debug('Flushing model write session: %s', idx)
+                self._flush_session()
+
+        if idx % 1000:
+            # Additional rows added since last flush.
+            self._flush_session()
+        LOGGER.debug('Finished storing inventory rows into models.')
+
+        waiting_counter = [0]
+
+        def import_waiting_row(row):
+            """Import a row that waited for the end of the scan.
+
+            Args:
+                row (object): The inventory row.
+            """
+            waiting_counter[0] += self._import_row(row, group_names)
+
+        self.model_action_wrapper(
+            waiting.drain(),
+            import_waiting_row,
+            post_action=self._convert_role_post
+        )
+        item_counter += waiting_counter[0]
+
+        self._store_gsuite_membership_post()
+
+        self.model_action_wrapper(
+            groups_settings.drain(),
+            self._store_groups_settings
+        )
+
+        self.dao.denorm_group_in_group(self.session)
+
+        self.model_action_wrapper(
+            iam_policies.drain(),
+            self._store_iam_policy
+        )
+
+        self.dao.denorm_resource_hierarchy(self.session)
+        self.dao.expand_special_members(self.session)
+        self.dao.get_permission_index(self.session, refresh=True)
+        return item_counter
+
+    def _is_waiting(self, row, group_names):
+        """Whether a row depends on a row that is not imported yet.
+
+        Args:
+            row (object): The inventory row.
+            group_names (dict): Row id => group name, of the imported groups.
+
+        Returns:
+            bool: True if the row must wait for the end of the scan.
+        """
+        if row.resource_type in MEMBER_TYPE_LIST:
+            return row.parent_id not in group_names
+        if row.resource_type == 'role':
+            # Custom roles are stored as resources, under their parent.
+            is_custom = not row.get_resource_data()['name'].startswith(
+                'roles/')
+            return is_custom and row.parent_id not in self.resource_cache
+        if (row.category in POLICY_CATEGORIES and
+                row.resource_type in GCP_TYPE_LIST):
+            return row.parent_id not in self.resource_cache
+        return False
+
+    def _import_row(self, row, group_names):
+        """Convert an inventory row to model objects.
+
+        Args:
+            row (object): The inventory row.
+            group_names (dict): Row id => group name, of the imported groups.
+
+        Returns:
+            int: 1 if the row is counted as an imported item, else 0.
+        """
+        if row.resource_type not in GCP_TYPE_LIST:
+            if row.category != Categories.resource:
+                return 0
+            if row.resource_type == 'role':
+                self._convert_role(row)
+                return 1
+            if row.resource_type in GSUITE_TYPE_LIST:
+                self._store_gsuite_principal(row)
+                if row.resource_type == 'gsuite_group':
+                    group_names[row.id] = group_name(row)
+            elif row.resource_type in MEMBER_TYPE_LIST:
+                # Memberships of groups not in the inventory are skipped.
+                parent_group = group_names.get(row.parent_id)
+                if parent_group:
+                    self._store_gsuite_membership(row, parent_group)
+            return 0
+
+        if row.category == Categories.resource:
+            self._store_resource(row)
+            return 1
+        if row.category == Categories.dataset_policy:
+            self._convert_dataset_policy(row)
+        elif row.category == Categories.gcs_policy:
+            self._convert_gcs_policy(row)
+        elif row.category == Categories.kubernetes_service_config:
+            self._convert_service_config(row)
+        elif row.category == Categories.enabled_apis:
+            self._convert_enabled_apis(row)
+        return int(POLICY_CATEGORIES.get(row.category, False))
+
     def model_action_wrapper(self,
                              inventory_iterable,
                              action,
@@ -442,12 +680,12 @@ class InventoryImporter(object):
                     self.membership_items)
                 self.session.execute(stmt)
 
-    def _store_gsuite_membership(self, child, parent):
+    def _store_gsuite_membership(self, child, parent_group):
         """Store a gsuite principal such as a group, user or member.
 
         Args:
             child (object): member item.
-            parent (object): parent part of membership.
+            parent_group (str): group/name of the parent group.
         """
 
         def member_name(child):
@@ -476,15 +714,13 @@ class InventoryImporter(object):
                 member_name=name)
             self.session.add(self.member_cache[member])
 
-        parent_group = group_name(parent)
-
         if parent_group not in self.membership_map:
             self.membership_map[parent_group] = set()
 
         if member not in self.membership_map[parent_group]:
             self.membership_map[parent_group].add(member)
             self.membership_items.append(
-                dict(group_name=group_name(parent), members_name=member))
+                dict(group_name=parent_group, members_name=member))
 
     def _store_groups_settings(self, settings):
         """Store gsuite settings.
@@ -659,7 +895,7 @@ class InventoryImporter(object):
         else:
             parent, full_res_name, type_name = self._full_resource_name(
                 resource)
-        row = self.dao.TBL_RESOURCE(
+        row = self._add_resource(
             cai_resource_name=resource.get_cai_resource_name(),
             cai_resource_type=resource.get_cai_resource_type(),
             full_name=full_res_name,
@@ -670,8 +906,6 @@ class InventoryImporter(object):
             email=data.get(email_key, ''),
             data=resource.get_resource_data_raw(),
             parent=parent)
-
-        self.session.add(row)
         if cached:
             self._add_to_cache(row, resource.id)
 
@@ -961,7 +1195,7 @@ class InventoryImporter(object):
         type_name = to_type_name(cloudsqlinstance.get_resource_type(),
                                  resource_identifier)
 
-        resource = self.dao.TBL_RESOURCE(
+        self._add_resource(
             cai_resource_name=cloudsqlinstance.get_cai_resource_name(),
             cai_resource_type=cloudsqlinstance.get_cai_resource_type(),
             full_name=full_res_name,
@@ -973,8 +1207,6 @@ class InventoryImporter(object):
             data=cloudsqlinstance.get_resource_data_raw(),
             parent=parent)
 
-        self.session.add(resource)
-
     def _convert_dataset_policy(self, dataset_policy):
         """Convert a dataset policy to a database object.
 
@@ -988,7 +1220,7 @@ class InventoryImporter(object):
             dataset_policy.get_category(),
             dataset_policy.get_resource_id())
         policy_res_name = to_full_resource_name(full_res_name, policy_type_name)
-        resource = self.dao.TBL_RESOURCE(
+        self._add_resource(
             cai_resource_name=dataset_policy.get_cai_resource_name(),
             cai_resource_type=dataset_policy.get_cai_resource_type(),
             full_name=policy_res_name,
@@ -998,8 +1230,6 @@ class InventoryImporter(object):
             data=dataset_policy.get_resource_data_raw(),
             parent=parent)
 
-        self.session.add(resource)
-
     def _convert_enabled_apis(self, enabled_apis):
         """Convert a description of enabled APIs to a database object.
 
@@ -1011,7 +1241,7 @@ class InventoryImporter(object):
             enabled_apis.get_category(),
             ':'.join(parent.type_name.split('/')))
         apis_res_name = to_full_resource_name(full_res_name, apis_type_name)
-        resource = self.dao.TBL_RESOURCE(
+        self._add_resource(
             cai_resource_name=enabled_apis.get_cai_resource_name(),
             cai_resource_type=enabled_apis.get_cai_resource_type(),
             full_name=apis_res_name,
@@ -1021,8 +1251,6 @@ class InventoryImporter(object):
             data=enabled_apis.get_resource_data_raw(),
             parent=parent)
 
-        self.session.add(resource)
-
     def _convert_gcs_policy(self, gcs_policy):
         """Convert a gcs policy to a database object.
 
@@ -1034,7 +1262,7 @@ class InventoryImporter(object):
             gcs_policy.get_category(),
             gcs_policy.get_resource_id())
         policy_res_name = to_full_resource_name(full_res_name, policy_type_name)
-        resource = self.dao.TBL_RESOURCE(
+        self._add_resource(
             cai_resource_name=gcs_policy.get_cai_resource_name(),
             cai_resource_type=gcs_policy.get_cai_resource_type(),
             full_name=policy_res_name,
@@ -1044,8 +1272,6 @@ class InventoryImporter(object):
             data=gcs_policy.get_resource_data_raw(),
             parent=parent)
 
-        self.session.add(resource)
-
     def _convert_iam_policy(self, iam_policy):
         """Convert an IAM policy to a database object.
 
@@ -1060,7 +1286,7 @@ class InventoryImporter(object):
         iam_policy_full_res_name = to_full_resource_name(
             full_res_name,
             iam_policy_type_name)
-        resource = self.dao.TBL_RESOURCE(
+        self._add_resource(
             cai_resource_name=iam_policy.get_cai_resource_name(),
             cai_resource_type=iam_policy.get_cai_resource_type(),
             full_name=iam_policy_full_res_name,
@@ -1070,8 +1296,6 @@ class InventoryImporter(object):
             data=iam_policy.get_resource_data_raw(),
             parent_type_name=parent_type_name)
 
-        self.session.add(resource)
-
     def _convert_role(self, role):
         """Convert a role to a database object.
 
@@ -1106,7 +1330,7 @@ class InventoryImporter(object):
 
         if is_custom:
             parent, full_res_name, type_name = self._full_resource_name(role)
-            role_resource = self.dao.TBL_RESOURCE(
+            role_resource = self._add_resource(
                 cai_resource_name=role.get_cai_resource_name(),
                 cai_resource_type=role.get_cai_resource_type(),
                 full_name=full_res_name,
@@ -1118,7 +1342,6 @@ class InventoryImporter(object):
                 parent=parent)
 
             self._add_to_cache(role_resource, role.id)
-            self.session.add(role_resource)
 
     def _convert_role_post(self):
         """Executed after all roles were handled. Performs bulk insert."""
@@ -1137,7 +1360,7 @@ class InventoryImporter(object):
             service_config.get_category(),
             parent.type_name)
         sc_res_name = to_full_resource_name(full_res_name, sc_type_name)
-        resource = self.dao.TBL_RESOURCE(
+        self._add_resource(
             cai_resource_name=service_config.get_cai_resource_name(),
             cai_resource_type=service_config.get_cai_resource_type(),
             full_name=sc_res_name,
@@ -1147,8 +1370,6 @@ class InventoryImporter(object):
             data=service_config.get_resource_data_raw(),
             parent=parent)
 
-        self.session.add(resource)
-
     def _convert_bigquery_table(self, table):
         """Convert a table to a database object.
 
@@ -1158,6 +1379,20 @@ class InventoryImporter(object):
 
         self._convert_resource(table, cached=True)
 
+    def _add_resource(self, **kwargs):
+        """Add a resource row to the model.
+
+        Args:
+            **kwargs (dict): The column values of the resource row, the
+                parent resource is given as `parent`.
+
+        Returns:
+            object: The resource, to put in the cache for parent lookup.
+        """
+        resource = self.dao.TBL_RESOURCE(**kwargs)
+        self.session.add(resource)
+        return resource
+
     def _add_to_cache(self, resource, resource_id):
         """Add a resource to the cache for parent lookup.
 
@@ -1250,6 +1485,269 @@ class InventoryImporter(object):
             resource.get_resource_id())
 
 
+class BulkInventoryImporter(InventoryImporter):
+    """Imports data from Inventory with batched Core insert statements.
+
+    Rows are written without creating ORM objects, and the resource cache only
+    keeps the type name and full name of the parent resources, which bounds
+    the memory used by the import of large inventories.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Create a bulk Inventory importer.
+
+        Args:
+            *args (list): Arguments of InventoryImporter.
+            **kwargs (dict): Keyword arguments of InventoryImporter.
+        """
+        super(BulkInventoryImporter, self).__init__(*args, **kwargs)
+        self.role_cache = set()
+        self.permission_cache = set()
+        self.member_cache = set()
+        self.binding_id = 0
+
+        self.tbl_resource = self.dao.TBL_RESOURCE.__table__
+        self.tbl_permission = self.dao.TBL_PERMISSION.__table__
+        self.tbl_role = self.dao.TBL_ROLE.__table__
+        self.tbl_member = self.dao.TBL_MEMBER.__table__
+        self.tbl_binding = self.dao.TBL_BINDING.__table__
+        self.writer = BulkInsertWriter(self.session, [
+            self.tbl_resource,
+            self.tbl_permission,
+            self.tbl_role,
+            self.dao.TBL_ROLE_PERMISSIONS,
+            self.tbl_member,
+            self.tbl_binding,
+            self.dao.TBL_BINDING_MEMBERS,
+            self.dao.TBL_MEMBERSHIP,
+            self.dao.TBL_GROUPS_SETTINGS,
+        ])
+
+    def _flush_session(self):
+        """Write the buffered rows and flush the session."""
+        try:
+            self.writer.flush()
+        except SQLAlchemyError:
+            LOGGER.exception(
+                'Unexpected SQLAlchemyError occurred during model creation.')
+            self.session.rollback()
+        super(BulkInventoryImporter, self)._flush_session()
+
+    def _add_resource(self, parent=None, **kwargs):
+        """Buffer a resource row.
+
+        Args:
+            parent (CachedResource): The parent resource, None for the root.
+            **kwargs (dict): The column values of the resource row.
+
+        Returns:
+            CachedResource: The resource, to put in the cache for parent
+                lookup.
+        """
+        row = {
+            'cai_resource_name': None,
+            'cai_resource_type': None,
+            'parent_type_name': None,
+            'policy_update_counter': 0,
+            'display_name': '',
+            'email': '',
+            'data': None,
+        }
+        row.update(kwargs)
+        if parent:
+            row['parent_type_name'] = parent.type_name
+        self.writer.add(self.tbl_resource, row, size=len(row['data'] or ''))
+        return CachedResource(row['type_name'], row['full_name'])
+
+    def _add_to_cache(self, resource, resource_id):
+        """Add a resource to the cache for parent lookup.
+
+        Args:
+            resource (CachedResource): Resource to put in the cache.
+            resource_id (int): The database key for the resource.
+        """
+        self.resource_cache[resource_id] = resource
+
+    def _get_parent(self, resource):
+        """Return the parent of a resource from cache.
+
+        Args:
+            resource (object): Resource whose parent to look for.
+
+        Returns:
+            tuple: cached parent and its full resource name
+        """
+        parent = self.resource_cache[resource.get_parent_id()]
+        return parent, parent.full_name
+
+    def _add_member(self, member):
+        """Buffer a member row, unless the member was already added.
+
+        Args:
+            member (str): The type/name of the member.
+        """
+        if member in self.member_cache:
+            return
+        try:
+            # This is the default case, e.g. 'group/foobar'
+            m_type, name = member.split('/', 1)
+        except ValueError:
+            # Special groups like 'allUsers' done specify a type
+            m_type, name = member, member
+        self.member_cache.add(member)
+        self.writer.add(self.tbl_member,
+                        dict(name=member, type=m_type, member_name=name))
+
+    def _convert_role(self, role):
+        """Buffer the rows of a role and its permissions.
+
+        Args:
+            role (object): Role to store.
+        """
+        data = role.get_resource_data()
+        is_custom = not data['name'].startswith('roles/')
+        permissions = []
+        if 'includedPermissions' not in data:
+            self.model.add_warning(
+                'Role missing permissions: {}'.format(
+                    data.get('name', '<missing name>')))
+        else:
+            for perm_name in data['includedPermissions']:
+                if perm_name not in self.permission_cache:
+                    self.permission_cache.add(perm_name)
+                    self.writer.add(self.tbl_permission, dict(name=perm_name))
+                if perm_name not in permissions:
+                    permissions.append(perm_name)
+
+        if not self._is_role_unique(data['name']):
+            return
+        self.role_cache.add(data['name'])
+        self.writer.add(self.tbl_role, dict(
+            name=data['name'],
+            title=data.get('title', ''),
+            stage=data.get('stage', ''),
+            description=data.get('description', ''),
+            custom=is_custom))
+        for perm_name in permissions:
+            self.writer.add(self.dao.TBL_ROLE_PERMISSIONS,
+                            dict(roles_name=data['name'],
+                                 permissions_name=perm_name))
+
+        if is_custom:
+            parent, full_res_name, type_name = self._full_resource_name(role)
+            role_resource = self._add_resource(
+                cai_resource_name=role.get_cai_resource_name(),
+                cai_resource_type=role.get_cai_resource_type(),
+                full_name=full_res_name,
+                type_name=type_name,
+                name=role.get_resource_id(),
+                type=role.get_resource_type(),
+                display_name=data.get('title'),
+                data=role.get_resource_data_raw(),
+                parent=parent)
+
+            self._add_to_cache(role_resource, role.id)
+
+    def _convert_role_post(self):
+        """Executed after all roles were handled, the rows are buffered."""
+
+    def _store_gsuite_principal(self, principal):
+        """Buffer the member row of a gsuite group or user.
+
+        Args:
+            principal (object): object to store.
+
+        Raises:
+            Exception: if the principal type is unknown.
+        """
+        gsuite_type = principal.get_resource_type()
+        data = principal.get_resource_data()
+        if gsuite_type == 'gsuite_user':
+            member = 'user/{}'.format(data['primaryEmail'].lower())
+        elif gsuite_type == 'gsuite_group':
+            member = 'group/{}'.format(data['email'].lower())
+        else:
+            raise Exception('Unknown gsuite principal: {}'.format(gsuite_type))
+        self._add_member(member)
+
+    def _store_gsuite_membership(self, child, parent_group):
+        """Buffer a gsuite group membership.
+
+        Args:
+            child (object): member item.
+            parent_group (str): group/name of the parent group.
+        """
+        data = child.get_resource_data()
+        member = '{}/{}'.format(data['type'].lower(), data['email'].lower())
+        # Gsuite group members don't have to be part of this domain, so we
+        # might see them for the first time here.
+        self._add_member(member)
+
+        group_members = self.membership_map.setdefault(parent_group, set())
+        if member not in group_members:
+            group_members.add(member)
+            self.writer.add(self.dao.TBL_MEMBERSHIP,
+                            dict(group_name=parent_group, members_name=member))
+
+    def _store_gsuite_membership_post(self):
+        """Write the buffered gsuite memberships."""
+        self._flush_session()
+
+    def _store_groups_settings(self, settings):
+        """Buffer the settings of a gsuite group.
+
+        Args:
+            settings (object): settings resource object.
+        """
+        settings_dict = settings.get_resource_data()
+        group_email = group_name(settings)
+        if group_email not in self.groups_settings_cache:
+            self.groups_settings_cache.add(group_email)
+            settings_json = json.dumps(settings_dict, sort_keys=True)
+            self.writer.add(self.dao.TBL_GROUPS_SETTINGS,
+                            dict(group_name=group_email,
+                                 settings=settings_json),
+                            size=len(settings_json))
+
+    def _store_iam_policy(self, policy):
+        """Buffer the bindings of an IAM policy and the policy resource.
+
+        Args:
+            policy (object): IAM policy to store.
+        """
+        bindings = policy.get_resource_data().get('bindings', [])
+        policy_type_name = self._type_name(policy)
+        for binding in bindings:
+            role = binding['role']
+            if role not in self.role_cache:
+                msg = 'Role reference in iam policy not found: {}'.format(role)
+                self.model.add_warning(msg)
+                continue
+
+            # The model tables are new, so the binding ids are assigned here
+            # to insert the binding members in the same batch.
+            self.binding_id += 1
+            self.writer.add(self.tbl_binding,
+                            dict(id=self.binding_id,
+                                 resource_type_name=policy_type_name,
+                                 role_name=role))
+
+            # binding['members'] can have duplicate ids
+            db_members = set()
+            for member in binding['members']:
+                member = member.replace(':', '/', 1).lower()
+                if member in db_members:
+                    continue
+                db_members.add(member)
+                # We still might hit external users or groups
+                # that we haven't seen in gsuite.
+                self._add_member(member)
+                self.writer.add(self.dao.TBL_BINDING_MEMBERS,
+                                dict(bindings_id=self.binding_id,
+                                     members_name=member))
+        self._convert_iam_policy(policy)
+
+
 def group_name(group):
     """Create the type:name representation for a group.
 
@@ -1276,5 +1774,6 @@ def by_source(source):
 
     return {
         'INVENTORY': InventoryImporter,
+        'INVENTORY_BULK': BulkInventoryImporter,
         'EMPTY': EmptyImporter,
     }[source.upper()]
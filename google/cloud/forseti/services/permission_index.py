@@ -0,0 +1,175 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Index of the permissions of the roles of a model, as bitsets."""
+
+from builtins import object
+import bisect
+import collections
+import itertools
+
+
+def _to_mask(ids, size):
+    """Build a bitset from integer ids.
+
+    Args:
+        ids (iterable): The ids of the bits to set.
+        size (int): The number of ids.
+
+    Returns:
+        int: The bitset.
+    """
+    bits = bytearray((size + 7) // 8)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bytes(bits), 'little')
+
+
+def _from_mask(mask):
+    """Ids of the bits set in a bitset.
+
+    Args:
+        mask (int): The bitset.
+
+    Returns:
+        list: The ids of the set bits, in order.
+    """
+    return [i for i, bit in enumerate(reversed(bin(mask)[2:]))
+            if bit == '1']
+
+
+class PermissionIndex(object):
+    """Permissions of the roles of a model.
+
+    Role and permission names are interned to integer ids. Each role is a
+    bitset of its permissions and each permission a bitset of its roles, so
+    the roles having a set of permissions are the intersection of the role
+    bitsets of the permissions. Roles without permissions are not indexed.
+    """
+
+    def __init__(self, role_permissions):
+        """Initialize.
+
+        Args:
+            role_permissions (iterable): (role name, permission name) tuples.
+        """
+        self._role_ids = {}
+        self._role_names = []
+        self._permission_ids = {}
+        self._permission_names = []
+        permission_roles = collections.defaultdict(list)
+        role_permission_ids = collections.defaultdict(list)
+        for role_name, permission_name in role_permissions:
+            role_id = self._role_ids.setdefault(role_name,
+                                                len(self._role_names))
+            if role_id == len(self._role_names):
+                self._role_names.append(role_name)
+            permission_id = self._permission_ids.setdefault(
+                permission_name, len(self._permission_names))
+            if permission_id == len(self._permission_names):
+                self._permission_names.append(permission_name)
+            permission_roles[permission_id].append(role_id)
+            role_permission_ids[role_id].append(permission_id)
+
+        role_count = len(self._role_names)
+        permission_count = len(self._permission_names)
+        self._role_masks = [_to_mask(role_permission_ids[role_id],
+                                     permission_count)
+                            for role_id in range(role_count)]
+        self._permission_masks = [_to_mask(permission_roles[permission_id],
+                                           role_count)
+                                  for permission_id in range(
+                                      permission_count)]
+        self._all_roles = (1 << role_count) - 1
+        # Role names in order, for the prefix lookups.
+        self._sorted_role_names = sorted(self._role_names)
+
+    def __len__(self):
+        """Number of indexed roles.
+
+        Returns:
+            int: Number of roles.
+        """
+        return len(self._role_names)
+
+    @property
+    def permission_count(self):
+        """Number of indexed permissions.
+
+        Returns:
+            int: Number of permissions.
+        """
+        return len(self._permission_names)
+
+    def roles_by_permissions(self, permission_names):
+        """Roles that have all of the permissions.
+
+        Args:
+            permission_names (iterable): Names of the permissions.
+
+        Returns:
+            set: Role names, all roles with a permission if no permission is
+                given.
+        """
+        mask = self._all_roles
+        for permission_name in set(permission_names):
+            permission_id = self._permission_ids.get(permission_name)
+            if permission_id is None:
+                return set()
+            mask &= self._permission_masks[permission_id]
+        return set(self._role_names[role_id]
+                   for role_id in _from_mask(mask))
+
+    def _roles_by_prefixes(self, role_prefixes):
+        """Bitset of the roles with a name starting with one of the prefixes.
+
+        Args:
+            role_prefixes (list): Prefixes of the role names.
+
+        Returns:
+            int: The bitset of the roles.
+        """
+        role_ids = []
+        for prefix in role_prefixes:
+            start = bisect.bisect_left(self._sorted_role_names, prefix)
+            for role_name in itertools.islice(self._sorted_role_names,
+                                              start, None):
+                if not role_name.startswith(prefix):
+                    break
+                role_ids.append(self._role_ids[role_name])
+        return _to_mask(role_ids, len(self._role_names))
+
+    def permissions_by_roles(self, role_names, role_prefixes):
+        """Permissions of the roles matching the names and the prefixes.
+
+        Args:
+            role_names (list): Names of the roles, all roles if empty.
+            role_prefixes (list): Prefixes of the role names, all roles if
+                empty.
+
+        Returns:
+            list: (role name, permission name) tuples.
+        """
+        mask = self._all_roles
+        if role_names:
+            mask &= _to_mask((self._role_ids[name] for name in role_names
+                              if name in self._role_ids),
+                             len(self._role_names))
+        if role_prefixes:
+            mask &= self._roles_by_prefixes(role_prefixes)
+
+        return [(self._role_names[role_id],
+                 self._permission_names[permission_id])
+                for role_id in _from_mask(mask)
+                for permission_id in _from_mask(self._role_masks[role_id])]
@@ -0,0 +1,186 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Snapshot of the resources of a model, shared by the scanners of a run."""
+
+from builtins import object
+import collections
+import threading
+
+# Columns of the resources table copied to the snapshot rows.
+RESOURCE_COLUMNS = ('cai_resource_name', 'cai_resource_type', 'full_name',
+                    'type_name', 'parent_type_name', 'name', 'type',
+                    'policy_update_counter', 'display_name', 'email', 'data')
+
+
+class ResourceRow(object):
+    """Read-only copy of a resource, detached from the database session.
+
+    Has the column attributes of the resource and its parent, as loaded by
+    ModelAccess.scanner_iter. The parent has no parent of its own.
+    """
+
+    __slots__ = RESOURCE_COLUMNS + ('parent',)
+
+    def __init__(self, resource, parent=None):
+        """Initialize.
+
+        Args:
+            resource (Resource): The resource to copy.
+            parent (ResourceRow): The copy of the parent of the resource.
+        """
+        for column in RESOURCE_COLUMNS:
+            object.__setattr__(self, column, getattr(resource, column))
+        object.__setattr__(self, 'parent', parent)
+
+    def __setattr__(self, name, value):
+        """Rows are shared by the scanners, they can not be changed.
+
+        Args:
+            name (str): Name of the attribute.
+            value (object): Value of the attribute.
+
+        Raises:
+            AttributeError: Always.
+        """
+        raise AttributeError('Resource snapshot rows are read-only.')
+
+    def __repr__(self):
+        """String representation.
+
+        Returns:
+            str: Resource represented as
+                (full_name='{}', name='{}' type='{}')
+        """
+        return '<ResourceRow(full_name={}, name={} type={})>'.format(
+            self.full_name, self.name, self.type)
+
+
+class ResourceSnapshot(object):
+    """Resources of a model by type, each type loaded once.
+
+    Scanners running at the same time wait for a type being loaded by
+    another scanner instead of loading it again. The parents are shared
+    between the rows of all the types.
+
+    Loads are tagged with the generation of the snapshot, incremented by
+    clear, and a load started before a clear is not kept.
+    """
+
+    def __init__(self):
+        """Initialize."""
+        self._lock = threading.Lock()
+        self._type_locks = collections.defaultdict(threading.Lock)
+        self._generation = 0
+        # Resource type to (rows, rows by parent type_name).
+        self._types = {}
+        self._parents = {}
+        self._parents_lock = threading.Lock()
+        self.stats = collections.Counter()
+
+    def __len__(self):
+        """Number of resources in the snapshot.
+
+        Returns:
+            int: Number of resources.
+        """
+        return sum(len(rows) for rows, _ in list(self._types.values()))
+
+    def _get_parent(self, parents, parent):
+        """Get the shared copy of a parent resource.
+
+        Args:
+            parents (dict): The parent copies of the generation of the load.
+            parent (Resource): The parent resource, may be None.
+
+        Returns:
+            ResourceRow: The copy of the parent, None if there is no parent.
+        """
+        if parent is None:
+            return None
+        with self._parents_lock:
+            row = parents.get(parent.type_name)
+            if row is None:
+                row = ResourceRow(parent)
+                parents[parent.type_name] = row
+            return row
+
+    def _load(self, resource_type, load, parents):
+        """Load the resources of a type.
+
+        Args:
+            resource_type (str): Type of the resources.
+            load (function): Called with the resource type to load the
+                resources, with their parent.
+            parents (dict): The parent copies of the generation of the load.
+
+        Returns:
+            tuple: The ResourceRows, and the ResourceRows by parent
+                type_name.
+        """
+        self.stats['loads'] += 1
+        rows = []
+        by_parent = collections.defaultdict(list)
+        for resource in load(resource_type):
+            row = ResourceRow(resource,
+                              self._get_parent(parents, resource.parent))
+            rows.append(row)
+            by_parent[row.parent_type_name].append(row)
+        return rows, dict(by_parent)
+
+    def get(self, resource_type, parent_type_name, load):
+        """Get the resources of a type, loading the type if needed.
+
+        Args:
+            resource_type (str): Type of the resources.
+            parent_type_name (str): type_name of the parent of the
+                resources, None for all of the resources of the type.
+            load (function): Called with the resource type to load the
+                resources, with their parent, if the type is not loaded.
+
+        Returns:
+            list: The ResourceRows of the resources.
+        """
+        with self._lock:
+            type_lock = self._type_locks[resource_type]
+        with type_lock:
+            with self._lock:
+                entry = self._types.get(resource_type)
+                generation = self._generation
+                parents = self._parents
+            if entry is not None:
+                self.stats['hits'] += 1
+            while entry is None:
+                entry = self._load(resource_type, load, parents)
+                with self._lock:
+                    if generation == self._generation:
+                        self._types[resource_type] = entry
+                        break
+                    # Cleared while loading, the rows can be stale.
+                    self.stats['discards'] += 1
+                    entry = None
+                    generation = self._generation
+                    parents = self._parents
+
+        rows, by_parent = entry
+        if parent_type_name:
+            return by_parent.get(parent_type_name, [])
+        return rows
+
+    def clear(self):
+        """Drop the loaded resources, and the resources being loaded."""
+        with self._lock:
+            self._generation += 1
+            self._types = {}
+            self._parents = {}
@@ -26,16 +26,27 @@ from sqlalchemy import Integer
 from sqlalchemy import String
 from sqlalchemy import Text
 from sqlalchemy import and_
+from sqlalchemy import func
 from sqlalchemy import inspect
+from sqlalchemy import select
 from sqlalchemy.ext.declarative import declarative_base
 
 from google.cloud.forseti.common.data_access import violation_map as vm
 from google.cloud.forseti.common.util import date_time
 from google.cloud.forseti.common.util import logger
+from google.cloud.forseti.common.util import string_formats
 from google.cloud.forseti.common.util.index_state import IndexState
 
 LOGGER = logger.get_logger(__name__)
 BASE = declarative_base()
+# Maximum number of violations inserted by a statement.
+VIOLATION_BATCH_SIZE = 1000
+# Maximum size of the data of the violations inserted by a statement.
+VIOLATION_BATCH_BYTES = 8 * 1024 * 1024
+# Number of violations fetched at a time when streaming them.
+VIOLATION_FETCH_SIZE = 1000
+# Maximum number of CSCC findings written by a statement.
+CSCC_FINDING_BATCH_SIZE = 1000
 CURRENT_SCHEMA = 1
 SUCCESS_STATES = [IndexState.SUCCESS, IndexState.PARTIAL_SUCCESS]
 
@@ -54,6 +65,7 @@ class ScannerIndex(BASE):
     scanner_index_warnings = Column(Text(16777215))
     scanner_index_errors = Column(Text())
     message = Column(Text())
+    scanner_stats = Column(Text())
 
     def __repr__(self):
         """Object string representation.
@@ -86,6 +98,19 @@ class ScannerIndex(BASE):
             scanner_status=IndexState.CREATED,
             schema_version=CURRENT_SCHEMA)
 
+    @staticmethod
+    def get_schema_update_actions():
+        """Maintain all the schema changes for this table.
+
+        Returns:
+            dict: A mapping of Action: Column.
+        """
+        columns_to_create = [Column('scanner_stats', Text())]
+
+        schema_update_actions = {'CREATE': columns_to_create}
+
+        return schema_update_actions
+
     def complete(self, status=IndexState.SUCCESS):
         """Mark the scanner as completed with a final scanner_status.
 
@@ -110,6 +135,18 @@ class ScannerIndex(BASE):
         session.add(self)
         session.flush()
 
+    def set_scanner_stats(self, session, scanner_stats):
+        """Record the statistics of the scanners of the run.
+
+        Args:
+            session (object): session object to work on.
+            scanner_stats (dict): Scanner class names mapped to a dict of the
+                scanner's statistics.
+        """
+        self.scanner_stats = json.dumps(scanner_stats, sort_keys=True)
+        session.add(self)
+        session.flush()
+
     def set_error(self, session, message):
         """Indicate a broken scanner run.
 
@@ -224,36 +261,41 @@ class ViolationAccess(object):
     def create(self, violations, scanner_index_id):
         """Save violations to the db table.
 
+        The violations are inserted in batches, bounded by the number of
+        violations and by the size of their data.
+
         Args:
-            violations (list): A list of violations.
+            violations (iterable): The violations, may be a generator.
             scanner_index_id (int): id of the `ScannerIndex` row for this
                 scanner run.
+
+        Returns:
+            int: The number of violations saved.
         """
         created_at_datetime = date_time.get_utc_now_datetime()
+        violation_hash = _new_violation_hash()
+        insert = Violation.__table__.insert()
+        count = 0
+        batch = []
+        batch_size = 0
         for violation in violations:
-            violation_hash = _create_violation_hash(
-                violation.get('full_name', ''),
-                violation.get('resource_data', ''),
-                violation.get('violation_data', ''),
-            )
-
-            violation = Violation(
-                created_at_datetime=created_at_datetime,
-                full_name=violation.get('full_name'),
-                resource_data=violation.get('resource_data'),
-                resource_name=violation.get('resource_name'),
-                resource_id=violation.get('resource_id'),
-                resource_type=violation.get('resource_type'),
-                rule_index=violation.get('rule_index'),
-                rule_name=violation.get('rule_name'),
-                scanner_index_id=scanner_index_id,
-                violation_data=json.dumps(
-                    violation.get('violation_data'), sort_keys=True),
-                violation_hash=violation_hash,
-                violation_message=violation.get('violation_message', ''),
-                violation_type=violation.get('violation_type')
-            )
-            self.session.add(violation)
+            row = _create_violation_row(violation, violation_hash)
+            row['created_at_datetime'] = created_at_datetime
+            row['scanner_index_id'] = scanner_index_id
+            batch.append(row)
+            batch_size += (len(row['violation_data']) +
+                           len(row['resource_data'] or ''))
+            if (len(batch) >= VIOLATION_BATCH_SIZE or
+                    batch_size >= VIOLATION_BATCH_BYTES):
+                self.session.execute(insert, batch)
+                count += len(batch)
+                batch = []
+                batch_size = 0
+        if batch:
+            self.session.execute(insert, batch)
+            count += len(batch)
+        LOGGER.debug('Saved %s violations.', count)
+        return count
 
     def list(self, inv_index_id=None, scanner_index_id=None):
         """List all violations from the db table.
@@ -308,6 +350,197 @@ class ViolationAccess(object):
             violations.append(violation)
         return violations
 
+    def _successful_scanner_run(self, scanner_index_id):
+        """Condition on the violations of a successful scanner run.
+
+        Args:
+            scanner_index_id (int): Id of the scanner index.
+
+        Returns:
+            object: The where clause.
+        """
+        scanner_index = ScannerIndex.__table__
+        return and_(
+            scanner_index.c.scanner_status.in_(SUCCESS_STATES),
+            scanner_index.c.id == scanner_index_id,
+            Violation.__table__.c.scanner_index_id == scanner_index.c.id)
+
+    def count_by_type(self, scanner_index_id):
+        """Count the violations of a scanner run by violation type.
+
+        Args:
+            scanner_index_id (int): Id of the scanner index.
+
+        Returns:
+            dict: Violation types mapped to their number of violations.
+        """
+        violations = Violation.__table__
+        qry = (select([violations.c.violation_type,
+                       func.count(violations.c.id)])
+               .where(self._successful_scanner_run(scanner_index_id))
+               .group_by(violations.c.violation_type))
+        return dict(self.session.execute(qry).fetchall())
+
+    def stream(self, scanner_index_id, violation_types=None):
+        """Stream the violations of a scanner run with a server side cursor.
+
+        Only VIOLATION_FETCH_SIZE rows are held at a time, whatever the
+        number of violations.
+
+        Args:
+            scanner_index_id (int): Id of the scanner index.
+            violation_types (list): Types of the violations, all of the
+                types if None.
+
+        Yields:
+            dict: The violations, in creation order, converted as by
+                map_by_resource with created_at_datetime as a timestamp
+                string.
+        """
+        violations = Violation.__table__
+        qry = (select(violations.columns)
+               .where(self._successful_scanner_run(scanner_index_id))
+               .order_by(violations.c.id)
+               .execution_options(stream_results=True))
+        if violation_types is not None:
+            qry = qry.where(violations.c.violation_type.in_(violation_types))
+
+        results = self.session.execute(qry)
+        try:
+            while True:
+                rows = results.fetchmany(VIOLATION_FETCH_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    v_data = dict(row)
+                    v_data['created_at_datetime'] = (
+                        v_data['created_at_datetime'].strftime(
+                            string_formats.TIMESTAMP_TIMEZONE))
+                    yield _parse_violation_data(v_data)
+        finally:
+            results.close()
+
+
+class ViolationStream(object):
+    """Violations of a scanner run, streamed from the database.
+
+    Can be passed to the notifiers in place of a list of violations: each
+    iteration streams the violations again, and len() is their number.
+    """
+
+    def __init__(self, violation_access, scanner_index_id, violation_types,
+                 count):
+        """Initialize.
+
+        Args:
+            violation_access (ViolationAccess): The violations facade.
+            scanner_index_id (int): Id of the scanner index.
+            violation_types (list): Types of the violations, all of the
+                types if None.
+            count (int): Number of violations.
+        """
+        self.violation_access = violation_access
+        self.scanner_index_id = scanner_index_id
+        self.violation_types = violation_types
+        self.count = count
+
+    def __iter__(self):
+        """Stream the violations.
+
+        Returns:
+            iterator: The violations as dicts.
+        """
+        return self.violation_access.stream(self.scanner_index_id,
+                                            self.violation_types)
+
+    def __len__(self):
+        """Number of violations.
+
+        Returns:
+            int: Number of violations.
+        """
+        return self.count
+
+
+class CsccFinding(BASE):
+    """Row entry for the last state of a finding sent to CSCC."""
+
+    __tablename__ = 'cscc_findings'
+
+    source_id = Column(String(255), primary_key=True)
+    finding_id = Column(String(32), primary_key=True)
+    content_hash = Column(String(64))
+    state = Column(String(16), nullable=False)
+
+    def __repr__(self):
+        """String representation.
+
+        Returns:
+            str: string representation of the CsccFinding row entry.
+        """
+        string = '<CsccFinding(source_id={}, finding_id={} state={})>'
+        return string.format(self.source_id, self.finding_id, self.state)
+
+
+class CsccFindingAccess(object):
+    """Facade for the findings sent to CSCC, against cscc_findings table."""
+
+    def __init__(self, session):
+        """Constructor for the CSCC Finding Access.
+
+        Args:
+            session (Session): SQLAlchemy session object.
+        """
+        self.session = session
+
+    def list(self, source_id):
+        """Get the findings sent to a CSCC source.
+
+        Args:
+            source_id (str): Unique ID assigned by CSCC, to the organization
+                that the violations are originating from.
+
+        Returns:
+            dict: Finding ids mapped to (content hash, state) tuples.
+        """
+        findings = CsccFinding.__table__
+        qry = (select([findings.c.finding_id,
+                       findings.c.content_hash,
+                       findings.c.state])
+               .where(findings.c.source_id == source_id))
+        return {finding_id: (content_hash, state)
+                for finding_id, content_hash, state
+                in self.session.execute(qry)}
+
+    def save(self, source_id, findings):
+        """Record the findings sent to a CSCC source.
+
+        The previous state of the findings is replaced, the other findings
+        of the source are left as they are.
+
+        Args:
+            source_id (str): Unique ID assigned by CSCC, to the organization
+                that the violations are originating from.
+            findings (dict): Finding ids mapped to (content hash, state)
+                tuples.
+        """
+        table = CsccFinding.__table__
+        finding_ids = list(findings)
+        for start in range(0, len(finding_ids), CSCC_FINDING_BATCH_SIZE):
+            batch = finding_ids[start:start + CSCC_FINDING_BATCH_SIZE]
+            self.session.execute(
+                table.delete().where(and_(
+                    table.c.source_id == source_id,
+                    table.c.finding_id.in_(batch))))
+            self.session.execute(
+                table.insert(),
+                [{'source_id': source_id,
+                  'finding_id': finding_id,
+                  'content_hash': findings[finding_id][0],
+                  'state': findings[finding_id][1]}
+                 for finding_id in batch])
+        LOGGER.debug('Saved the state of %s CSCC findings.', len(finding_ids))
+
 
 # pylint: disable=invalid-name
 def convert_sqlalchemy_object_to_dict(sqlalchemy_obj):
@@ -324,6 +557,44 @@ def convert_sqlalchemy_object_to_dict(sqlalchemy_obj):
             for c in inspect(sqlalchemy_obj).mapper.column_attrs}
 
 
+def _parse_violation_data(v_data):
+    """Parse the json violation and resource data of a violation.
+
+    Args:
+        v_data (dict): The violation as a dict.
+
+    Returns:
+        dict: The violation, with the data parsed.
+    """
+    try:
+        v_data['violation_data'] = json.loads(v_data['violation_data'])
+    except ValueError:
+        LOGGER.warning('Invalid violation data, unable to parse json '
+                       'for %s',
+                       v_data['violation_data'])
+
+    # resource_data can be regular python string
+    try:
+        v_data['resource_data'] = json.loads(v_data['resource_data'])
+    except ValueError:
+        v_data['resource_data'] = json.loads(
+            json.dumps(v_data['resource_data']))
+    return v_data
+
+
+def get_violation_types_by_resource():
+    """Group the violation types by the notifier resource they belong to.
+
+    Returns:
+        dict: Notifier resources mapped to the list of their violation
+            types.
+    """
+    types_by_resource = defaultdict(list)
+    for violation_type, resource in vm.VIOLATION_RESOURCES.items():
+        types_by_resource[resource].append(violation_type)
+    return dict(types_by_resource)
+
+
 def map_by_resource(violation_rows):
     """Create a map of violation types to violations of that resource.
 
@@ -339,21 +610,7 @@ def map_by_resource(violation_rows):
     v_by_type = defaultdict(list)
 
     for v_data in violation_rows:
-
-        try:
-            v_data['violation_data'] = json.loads(v_data['violation_data'])
-        except ValueError:
-            LOGGER.warning('Invalid violation data, unable to parse json '
-                           'for %s',
-                           v_data['violation_data'])
-
-        # resource_data can be regular python string
-        try:
-            v_data['resource_data'] = json.loads(v_data['resource_data'])
-        except ValueError:
-            v_data['resource_data'] = json.loads(
-                json.dumps(v_data['resource_data']))
-
+        v_data = _parse_violation_data(v_data)
         v_resource = vm.VIOLATION_RESOURCES.get(v_data['violation_type'])
         if v_resource:
             v_by_type[v_resource].append(v_data)
@@ -361,36 +618,50 @@ def map_by_resource(violation_rows):
     return dict(v_by_type)
 
 
-def _create_violation_hash(violation_full_name, resource_data, violation_data):
-    """Create a hash of violation data.
-
-    Args:
-        violation_full_name (str): The full name of the violation.
-        resource_data (str): The inventory data.
-        violation_data (dict): A violation.
+def _new_violation_hash():
+    """Create the hash object the violation hashes are copied from.
 
     Returns:
-        str: The resulting hex digest or '' if we can't successfully create
-        a hash.
+        object: The hash object, None if the algorithm is not available.
     """
-
     # TODO: Intelligently choose from hashlib.algorithms_guaranteed if our
     # desired one is not available.
     algorithm = 'sha512'
 
     try:
-        violation_hash = hashlib.new(algorithm)
+        return hashlib.new(algorithm)
     except ValueError:
         LOGGER.exception('Cannot create hash for a violation with algorithm: '
                          '%s', algorithm)
+        return None
+
+
+def _hash_violation(violation_hash, violation_full_name, resource_data,
+                    violation_data):
+    """Hash a violation.
+
+    Args:
+        violation_hash (object): The hash object to copy, None if the hash
+            algorithm is not available.
+        violation_full_name (str): The full name of the violation.
+        resource_data (str): The inventory data.
+        violation_data (str): The violation data, serialized to json with
+            sorted keys.
+
+    Returns:
+        str: The resulting hex digest or '' if we can't successfully create
+        a hash.
+    """
+    if violation_hash is None:
         return ''
 
     try:
         # Group resources do not have full name.  Issue #1072
+        violation_hash = violation_hash.copy()
         violation_hash.update(
             json.dumps(violation_full_name).encode() +
             json.dumps(resource_data, sort_keys=True).encode() +
-            json.dumps(violation_data, sort_keys=True).encode()
+            violation_data.encode()
         )
     except TypeError:
         LOGGER.exception('Cannot create hash for a violation: %s',
@@ -400,6 +671,47 @@ def _create_violation_hash(violation_full_name, resource_data, violation_data):
     return violation_hash.hexdigest()
 
 
+def _create_violation_row(violation, violation_hash):
+    """Create the violations table row of a violation.
+
+    The violation data is serialized once, for both the hash and the row.
+
+    Args:
+        violation (dict): The violation.
+        violation_hash (object): The hash object to copy, None if the hash
+            algorithm is not available.
+
+    Returns:
+        dict: The values of the row, without the creation time and the
+            scanner index id.
+    """
+    violation_data = json.dumps(violation.get('violation_data'),
+                                sort_keys=True)
+    hashed_violation_data = violation_data
+    if 'violation_data' not in violation:
+        hashed_violation_data = json.dumps('')
+
+    resource_name = violation.get('resource_name')
+    rule_index = violation.get('rule_index')
+    return {
+        'full_name': violation.get('full_name'),
+        'resource_data': violation.get('resource_data'),
+        'resource_name': '' if resource_name is None else resource_name,
+        'resource_id': violation.get('resource_id'),
+        'resource_type': violation.get('resource_type'),
+        'rule_index': 0 if rule_index is None else rule_index,
+        'rule_name': violation.get('rule_name'),
+        'violation_data': violation_data,
+        'violation_hash': _hash_violation(
+            violation_hash,
+            violation.get('full_name', ''),
+            violation.get('resource_data', ''),
+            hashed_violation_data),
+        'violation_message': violation.get('violation_message', ''),
+        'violation_type': violation.get('violation_type'),
+    }
+
+
 def initialize(engine):
     """Create all tables in the database if not existing.
 
@@ -0,0 +1,125 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests the asyncio execution engines."""
+import socket
+import unittest
+import unittest.mock as mock
+
+from ratelimiter import RateLimiter
+
+from tests import unittest_utils
+from google.cloud.forseti.common.gcp_api import _async_engine
+
+
+class InlineEngine(object):
+    """Engine executing the requests on the event loop thread."""
+
+    def __init__(self, failures=None):
+        """Initialize.
+
+        Args:
+            failures (list): Errors raised by the first executions.
+        """
+        self.failures = list(failures or [])
+        self.calls = 0
+
+    async def execute(self, repository, request):
+        """Execute the request, or raise the next failure.
+
+        Args:
+            repository (object): The repository of the request.
+            request (object): The request to execute.
+
+        Returns:
+            dict: The response of the request.
+        """
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        return repository._execute_request(request)
+
+    def is_retryable(self, error):
+        """Whether the error is retried.
+
+        Args:
+            error (Exception): The error raised by an execution.
+
+        Returns:
+            bool: True for socket errors.
+        """
+        return isinstance(error, socket.error)
+
+    async def close(self):
+        """Close the engine."""
+
+
+class AsyncEngineTest(unittest_utils.ForsetiTestCase):
+    """Test the asyncio execution engines."""
+
+    def test_rate_limiter_delays_calls_over_quota(self):
+        """Calls over the quota wait for the bucket to refill."""
+        rate_limiter = _async_engine.AsyncRateLimiter(max_calls=2, period=1.0)
+        self.assertEqual(0, rate_limiter._reserve())
+        self.assertEqual(0, rate_limiter._reserve())
+        self.assertAlmostEqual(0.5, rate_limiter._reserve(), places=1)
+        self.assertAlmostEqual(1.0, rate_limiter._reserve(), places=1)
+
+    def test_async_rate_limiter_is_shared_per_api(self):
+        """Repositories of an API share the async rate limiter."""
+        rate_limiter = RateLimiter(max_calls=10, period=2.0)
+        async_rate_limiter = _async_engine.get_async_rate_limiter(rate_limiter)
+        self.assertEqual(10, async_rate_limiter.max_calls)
+        self.assertEqual(2.0, async_rate_limiter.period)
+        self.assertIs(async_rate_limiter,
+                      _async_engine.get_async_rate_limiter(rate_limiter))
+        self.assertIsNone(_async_engine.get_async_rate_limiter(None))
+
+    @mock.patch.object(_async_engine, 'RETRY_WAIT_MAX', 0)
+    def test_execute_with_retries(self):
+        """Retryable errors are retried, others are raised."""
+        repository = mock.Mock()
+        repository._execute_request.return_value = {'items': []}
+        rate_limiter = _async_engine.AsyncRateLimiter(max_calls=10,
+                                                      period=1.0)
+
+        engine = InlineEngine(failures=[socket.error('reset')])
+        results = _async_engine.run_concurrently(
+            [_async_engine.execute_with_retries(
+                engine, repository, mock.Mock(), rate_limiter)],
+            engine)
+        self.assertEqual([{'items': []}], results)
+        self.assertEqual(2, engine.calls)
+
+        engine = InlineEngine(failures=[ValueError('bad request')])
+        results = _async_engine.run_concurrently(
+            [_async_engine.execute_with_retries(
+                engine, repository, mock.Mock(), None)],
+            engine)
+        self.assertIsInstance(results[0], ValueError)
+        self.assertEqual(1, engine.calls)
+
+    def test_threaded_engine(self):
+        """Requests run on the engine thread pool."""
+        engine = _async_engine.ThreadedEngine(max_connections=4)
+        repository = mock.Mock()
+        repository._execute_request.side_effect = lambda request: request * 2
+
+        results = _async_engine.run_concurrently(
+            [engine.execute(repository, i) for i in range(10)], engine)
+        self.assertEqual([i * 2 for i in range(10)], results)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -23,7 +23,9 @@ import io
 
 from tests import unittest_utils
 from tests.common.gcp_api.test_data import fake_storage_responses as fake_storage
+from tests.common.gcp_api.async_engine_test import InlineEngine
 from tests.common.gcp_api.test_data import http_mocks
+from google.cloud.forseti.common.gcp_api import _async_engine
 from google.cloud.forseti.common.gcp_api import errors as api_errors
 from google.cloud.forseti.common.gcp_api import storage
 from google.cloud.forseti.common.util import metadata_server
@@ -84,6 +86,43 @@ class StorageTest(unittest_utils.ForsetiTestCase):
         with self.assertRaises(api_errors.ApiExecutionError):
             self.gcs_api_client.get_buckets(fake_storage.FAKE_PROJECT_NUMBER)
 
+    def test_get_buckets_for_projects(self):
+        """Test get buckets of several projects on one event loop."""
+        mock_responses = []
+        for page in fake_storage.GET_BUCKETS_RESPONSES * 2:
+            mock_responses.append(({'status': '200'}, page))
+        http_mocks.mock_http_response_sequence(mock_responses)
+
+        expected_bucket_names = fake_storage.EXPECTED_FAKE_BUCKET_NAMES
+
+        with mock.patch.object(_async_engine, 'get_default_engine',
+                               return_value=InlineEngine()):
+            results = self.gcs_api_client.get_buckets_for_projects(
+                ['project1', 'project2'])
+        self.assertEqual(['project1', 'project2'], sorted(results))
+        for buckets in results.values():
+            self.assertEqual(expected_bucket_names,
+                             [r.get('name') for r in buckets])
+
+    def test_get_buckets_for_projects_raises(self):
+        """Test get buckets of several projects access forbidden."""
+        http_mocks.mock_http_response(fake_storage.ACCESS_FORBIDDEN, '403')
+
+        with mock.patch.object(_async_engine, 'get_default_engine',
+                               return_value=InlineEngine()):
+            with self.assertRaises(api_errors.ApiExecutionError):
+                self.gcs_api_client.get_buckets_for_projects(['project1'])
+
+    def test_get_buckets_for_projects_skips_errors(self):
+        """Test get buckets of several projects leaves out failed ones."""
+        http_mocks.mock_http_response(fake_storage.ACCESS_FORBIDDEN, '403')
+
+        with mock.patch.object(_async_engine, 'get_default_engine',
+                               return_value=InlineEngine()):
+            results = self.gcs_api_client.get_buckets_for_projects(
+                ['project1'], raise_errors=False)
+        self.assertEqual({}, results)
+
     def test_get_bucket_acls(self):
         """Test get bucket acls."""
         http_mocks.mock_http_response(
@@ -274,6 +274,23 @@ class FirewallRuleTest(ForsetiTestCase):
         """Tests whether ips_subset_of_ips returns the correct data."""
         self.assertEqual(expected, firewall_rule.ips_in_list(ips, ips_range))
 
+    @parameterized.parameterized.expand([
+        (['10.0.0.0/8', '192.168.1.0/24'], '10.1.2.3', True, True),
+        (['10.0.0.0/8', '192.168.1.0/24'], '10.0.0.0/7', False, True),
+        (['10.0.0.0/8', '192.168.1.0/24'], '192.168.0.0/16', False, True),
+        (['10.0.0.0/8', '192.168.1.0/24'], '192.168.2.1', False, False),
+        (['10.0.0.0/8'], '2001:db8::/32', False, False),
+        (['2001:db8::/32'], '2001:db8::1', True, True),
+        (['0.0.0.0/0'], '1.2.3.4/16', True, True),
+        ([], '1.2.3.4', False, False),
+    ])
+    def test_cidr_index(self, ip_ranges, ip_range, contains, overlaps):
+        """Tests CidrIndex containment and overlap queries."""
+        index = firewall_rule.CidrIndex(ip_ranges)
+        self.assertEqual(len(ip_ranges), len(index))
+        self.assertEqual(contains, index.contains(ip_range))
+        self.assertEqual(overlaps, index.overlaps(ip_range))
+
     @parameterized.parameterized.expand([
         (
             {
@@ -1542,5 +1559,70 @@ class FirewallActionTest(ForsetiTestCase):
         action_2 = firewall_rule.FirewallAction(**action_2_dict)
         self.assertEqual(expected, action_1.is_equivalent(action_2))
 
+
+class PortSetTest(ForsetiTestCase):
+    """Tests for PortSet."""
+
+    def test_from_ports_merges_ranges(self):
+        """Overlapping and adjacent ranges are merged."""
+        ports = firewall_rule.PortSet.from_ports(
+            ['80', '8080-8090', '81', '8000-8085', '443', '79'])
+        self.assertEqual(((79, 81), (443, 443), (8000, 8090)), ports.ranges)
+        self.assertEqual(frozenset(), ports.names)
+
+    def test_wide_range_is_compact(self):
+        """A range of all port numbers is stored as one range."""
+        ports = firewall_rule.PortSet.from_ports(['0-65535'])
+        self.assertEqual(((0, 65535),), ports.ranges)
+
+    @parameterized.parameterized.expand([
+        (['22'], ['21-23'], True),
+        (['21-23'], ['22'], False),
+        (['20-25', '80'], ['1-1000'], True),
+        (['20-25', '1001'], ['1-1000'], False),
+        (['10-20'], ['10-15', '16-20'], True),
+        (['10-20'], ['10-14', '16-20'], False),
+        ([], ['22'], True),
+        (['22'], [], False),
+        (['0-65535'], ['all'], True),
+        (['all'], ['0-65535'], False),
+        (['all'], ['all'], True),
+    ])
+    def test_issubset(self, ports_1, ports_2, expected):
+        """Tests ports_1 is a subset of ports_2."""
+        self.assertEqual(
+            expected,
+            firewall_rule.FirewallAction.ports_are_subset(ports_1, ports_2))
+
+    @parameterized.parameterized.expand([
+        (['21-23'], ['22', '21', '23'], True),
+        (['21-23'], ['21-24'], False),
+        (['all'], 'all', True),
+        (['all'], ['0-65535'], False),
+        ([], [], True),
+    ])
+    def test_equal(self, ports_1, ports_2, expected):
+        """Tests ports_1 has the same ports as ports_2."""
+        self.assertEqual(
+            expected,
+            firewall_rule.FirewallAction.ports_are_equal(ports_1, ports_2))
+
+    @parameterized.parameterized.expand([
+        (['22'], ['21-23'], True),
+        (['1-10', '30-40'], ['11-29', '41-50'], False),
+        (['1-10', '30-40'], ['11-29', '40-50'], True),
+        (['all'], ['all'], True),
+        (['all'], ['80'], True),
+        (['all'], [], False),
+        ([], ['1-100'], False),
+    ])
+    def test_overlaps(self, ports_1, ports_2, expected):
+        """Tests ports_1 and ports_2 have a port in common."""
+        port_set_1 = firewall_rule.PortSet.from_ports(ports_1)
+        port_set_2 = firewall_rule.PortSet.from_ports(ports_2)
+        self.assertEqual(expected, port_set_1.overlaps(port_set_2))
+        self.assertEqual(expected, port_set_2.overlaps(port_set_1))
+
+
 if __name__ == '__main__':
     unittest.main()
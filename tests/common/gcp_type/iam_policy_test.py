@@ -24,6 +24,7 @@ from google.cloud.forseti.common.gcp_type.errors import InvalidIamPolicyMemberEr
 from google.cloud.forseti.common.gcp_type.iam_policy import IamAuditConfig
 from google.cloud.forseti.common.gcp_type.iam_policy import IamPolicy
 from google.cloud.forseti.common.gcp_type.iam_policy import IamPolicyBinding
+from google.cloud.forseti.common.gcp_type.iam_policy import IamPolicyBindingLoader
 from google.cloud.forseti.common.gcp_type.iam_policy import IamPolicyMember
 
 
@@ -360,6 +361,29 @@ class IamPolicyTest(ForsetiTestCase):
         self.assertEqual('xyz.edu', member.name)
         self.assertEqual('^xyz\\.edu$', member.name_pattern.pattern)
 
+    def test_binding_loader_interns_members(self):
+        """Test that the loaded members are shared between the policies."""
+        loader = IamPolicyBindingLoader()
+        policy1 = ('{"bindings": [{"role": "roles/owner", "members": '
+                   '["user:a@xyz.edu", "group:g@xyz.edu"]}]}')
+        policy2 = ('{"bindings": [{"role": "roles/owner", "members": '
+                   '["user:a@xyz.edu"]}, {"role": "roles/viewer", "members": '
+                   '["user:a@xyz.edu", "projectViewer:123"]}]}')
+        bindings1 = loader.load(policy1)
+        bindings2 = loader.load(policy2)
+
+        self.assertEqual(
+            [IamPolicyBinding('roles/owner',
+                              ['user:a@xyz.edu', 'group:g@xyz.edu'])],
+            bindings1)
+        # The binding with an invalid member is skipped.
+        self.assertEqual(
+            [IamPolicyBinding('roles/owner', ['user:a@xyz.edu'])], bindings2)
+        self.assertIs(bindings1[0].members[0], bindings2[0].members[0])
+        self.assertIsNot(bindings1[0].members, bindings2[0].members)
+        self.assertEqual(3, len(loader))
+        self.assertEqual([], loader.load('{}'))
+
     def test_is_matching_domain_success(self):
         member = IamPolicyMember.create_from('domain:xyz.edu')
         other = IamPolicyMember.create_from('user:u@xyz.edu')
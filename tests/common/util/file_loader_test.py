@@ -105,5 +105,52 @@ class FileLoaderTest(ForsetiTestCase):
         finally:
             os.unlink(file_path)
 
+    @mock.patch('google.cloud.forseti.common.util.file_loader.storage.'
+                'StorageClient', autospec=True)
+    def test_stream_file_from_gcs(self, mock_storage_client):
+        """Test streaming a file from GCS reassembles lines across chunks."""
+        data = b'{"line": 1}\n{"line": 2}\n{"line": 3}'
+
+        def _download(full_bucket_path, output_file, chunksize):
+            """Fake download that writes the data in chunks."""
+            self.assertEqual('gs://fake/file.dump', full_bucket_path)
+            for i in range(0, len(data), chunksize):
+                output_file.write(data[i:i + chunksize])
+            return len(data)
+
+        mock_storage_client.return_value.download.side_effect = _download
+
+        lines = list(file_loader.stream_file_from_gcs(
+            'gs://fake/file.dump', chunk_size=5, max_buffered_chunks=1))
+        self.assertEqual(['{"line": 1}\n', '{"line": 2}\n', '{"line": 3}'],
+                         lines)
+
+    @mock.patch('google.cloud.forseti.common.util.file_loader.storage.'
+                'StorageClient', autospec=True)
+    def test_stream_file_from_gcs_raises(self, mock_storage_client):
+        """Test streaming a file from GCS raises download errors."""
+        mock_storage_client.return_value.download.side_effect = IOError(
+            'download failed')
+
+        with self.assertRaises(IOError):
+            list(file_loader.stream_file_from_gcs('gs://fake/file.dump'))
+
+    @mock.patch('google.cloud.forseti.common.util.file_loader.storage.'
+                'StorageClient', autospec=True)
+    def test_stream_file_from_gcs_stops_download(self, mock_storage_client):
+        """Test closing the stream early stops the download."""
+        def _download(full_bucket_path, output_file, chunksize):
+            """Fake download that writes more chunks than are read."""
+            for _ in range(100):
+                output_file.write(b'line\n')
+
+        mock_storage_client.return_value.download.side_effect = _download
+
+        stream = file_loader.stream_file_from_gcs(
+            'gs://fake/file.dump', max_buffered_chunks=1)
+        self.assertEqual('line\n', next(stream))
+        stream.close()
+
+
 if __name__ == '__main__':
     unittest.main()
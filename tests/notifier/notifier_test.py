@@ -186,6 +186,71 @@ class NotifierTest(ForsetiTestCase):
         self.assertFalse(mock_find_notifiers.called)
         self.assertTrue(mock_inventor_summary.called)
 
+    def test_stream_violations(self):
+        """The violations are mapped to their resource without loading them.
+
+        Setup:
+            Mock the violation access and make its count_by_type() return
+            counts for 2 notified violation types and an unknown type.
+
+        Expected outcome:
+            Only the resources with violations are mapped, to streams of the
+            violations of their types."""
+        mock_violation_access = mock.MagicMock()
+        mock_violation_access.count_by_type.return_value = {
+            'IAM_POLICY_VIOLATION': 2,
+            'BUCKET_VIOLATION': 1,
+            'UNKNOWN_VIOLATION': 4,
+        }
+        violation_map, all_violations = notifier.stream_violations(
+            mock_violation_access, 123)
+
+        self.assertEqual({'iam_policy_violations', 'buckets_acl_violations'},
+                         set(violation_map))
+        self.assertEqual(2, len(violation_map['iam_policy_violations']))
+        self.assertEqual(7, len(all_violations))
+        self.assertFalse(mock_violation_access.stream.called)
+
+        mock_violation_access.stream.return_value = iter(['violation'])
+        self.assertEqual(['violation'],
+                         list(violation_map['buckets_acl_violations']))
+        mock_violation_access.stream.assert_called_once_with(
+            123, ['BUCKET_VIOLATION'])
+
+    @mock.patch(
+        'google.cloud.forseti.notifier.notifier.stream_violations',
+        autospec=True)
+    @mock.patch(
+        'google.cloud.forseti.notifier.notifier.find_notifiers', autospec=True)
+    @mock.patch(
+        'google.cloud.forseti.notifier.notifier.scanner_dao', autospec=True)
+    def test_notifications_in_streaming_mode(
+        self, mock_dao, mock_find_notifiers, mock_stream_violations):
+        """The notifiers are given the streamed violations.
+
+        Setup:
+            Enable the streaming mode and make stream_violations() return
+            a violation for 'iam_policy_violations'.
+
+        Expected outcome:
+            The violations are not listed and the notifiers are
+            instantiated with the streamed violations."""
+        streamed_violations = ['violation']
+        mock_stream_violations.return_value = (
+            {'iam_policy_violations': streamed_violations}, [])
+        mock_service_cfg = mock.MagicMock()
+        mock_service_cfg.get_global_config.return_value = fake_violations.GLOBAL_CONFIGS
+        mock_service_cfg.get_notifier_config.return_value = dict(
+            fake_violations.NOTIFIER_CONFIGS, streaming=True)
+        mock_notifier_cls = mock.MagicMock()
+        mock_find_notifiers.return_value = mock_notifier_cls
+        notifier.run('iid-1-2-3', None, mock.MagicMock(), mock_service_cfg)
+
+        self.assertFalse(mock_dao.map_by_resource.called)
+        self.assertTrue(mock_notifier_cls.called)
+        self.assertIs(streamed_violations,
+                      mock_notifier_cls.call_args[0][2])
+
 
 if __name__ == '__main__':
     unittest.main()
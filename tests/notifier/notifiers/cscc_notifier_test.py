@@ -19,6 +19,7 @@ import datetime
 import json
 import unittest.mock as mock
 
+from google.cloud.forseti.common.gcp_api import errors as api_errors
 from google.cloud.forseti.notifier import notifier
 from google.cloud.forseti.notifier.notifiers import cscc_notifier
 from google.cloud.forseti.services.scanner import dao as scanner_dao
@@ -262,3 +263,116 @@ class CsccNotifierTest(scanner_base_db.ScannerBaseDbTestCase):
         notifier = cscc_notifier.CsccNotifier('abc')
         notifier._send_findings_to_cscc(violations, source_id)
         self.assertFalse(mock_list.update_finding.called)
+
+    @mock.patch('google.cloud.forseti.common.gcp_api.securitycenter.'
+                'SecurityCenterClient')
+    def test_only_changed_findings_are_sent(self, mock_client_cls):
+        """The findings sent to CSCC are recorded and not sent again.
+
+        Setup:
+            * Record no finding, CSCC has an active finding without
+              violation.
+            * Send the 2 violations, 3 times: the first one is missing from
+              the third run.
+
+        Expected outcome:
+            * The first run creates both findings and deactivates the one
+              listed from CSCC.
+            * The second run sends nothing and lists nothing.
+            * The third run only deactivates the missing finding.
+        """
+        source_id = 'organizations/11111/sources/22222'
+        stale_finding_id = 'f' * 32
+        mock_client = mock_client_cls.return_value
+        mock_client.list_findings.return_value = [
+            {'listFindingsResults': [
+                {'finding': {
+                    'name': '{}/findings/{}'.format(source_id,
+                                                    stale_finding_id),
+                    'state': 'ACTIVE'}}]}]
+        finding_access = scanner_dao.CsccFindingAccess(self.session)
+        violations = self._populate_and_retrieve_violations()
+        finding_ids = [violation['violation_hash'][:32]
+                       for violation in violations]
+        cscc = cscc_notifier.CsccNotifier('iii', finding_access=finding_access)
+
+        cscc._send_findings_to_cscc(violations, source_id)
+        self.assertEqual(2, mock_client.create_finding.call_count)
+        mock_client.update_finding.assert_called_once_with(
+            mock.ANY, stale_finding_id, source_id=source_id)
+        findings = finding_access.list(source_id)
+        self.assertEqual({'ACTIVE', 'INACTIVE'},
+                         set(state for _, state in findings.values()))
+        self.assertEqual('INACTIVE', findings[stale_finding_id][1])
+
+        mock_client.reset_mock()
+        cscc._send_findings_to_cscc(violations, source_id)
+        self.assertFalse(mock_client.list_findings.called)
+        self.assertFalse(mock_client.create_finding.called)
+        self.assertFalse(mock_client.update_finding.called)
+
+        cscc._send_findings_to_cscc(violations[1:], source_id)
+        self.assertFalse(mock_client.create_finding.called)
+        finding, finding_id = mock_client.update_finding.call_args[0]
+        self.assertEqual(finding_ids[0], finding_id)
+        self.assertEqual('INACTIVE', finding['state'])
+        self.assertEqual('INACTIVE', finding_access.list(source_id)[
+            finding_ids[0]][1])
+
+    @mock.patch('google.cloud.forseti.common.gcp_api.securitycenter.'
+                'SecurityCenterClient')
+    def test_failed_findings_are_sent_again(self, mock_client_cls):
+        """The findings that could not be sent are sent on the next run.
+
+        Setup:
+            Fail to create the first finding, then send the violations again.
+
+        Expected outcome:
+            Only the finding that failed is sent by the second run.
+        """
+        source_id = 'organizations/11111/sources/22222'
+        mock_client = mock_client_cls.return_value
+        mock_client.list_findings.return_value = []
+        violations = self._populate_and_retrieve_violations()
+        failed_finding_id = violations[0]['violation_hash'][:32]
+
+        def create_finding(finding, source_id=None, finding_id=None):
+            if finding_id == failed_finding_id:
+                raise api_errors.ApiExecutionError('violation', mock.MagicMock())
+        mock_client.create_finding.side_effect = create_finding
+
+        cscc = cscc_notifier.CsccNotifier(
+            'iii', finding_access=scanner_dao.CsccFindingAccess(self.session))
+        cscc._send_findings_to_cscc(violations, source_id)
+        self.assertEqual(2, mock_client.create_finding.call_count)
+
+        mock_client.reset_mock()
+        cscc._send_findings_to_cscc(violations, source_id)
+        mock_client.create_finding.assert_called_once_with(
+            mock.ANY, source_id=source_id, finding_id=failed_finding_id)
+
+    def test_finding_hash_ignores_run(self):
+        """The content hash of a finding does not depend on the run."""
+        violation = {
+            'violation_hash': 'a' * 128,
+            'full_name': 'organization/123/project/p1/bucket/b1/',
+            'violation_type': 'BUCKET_VIOLATION',
+            'created_at_datetime': '2019-03-12T16:06:19Z',
+            'id': 1,
+            'scanner_index_id': 1,
+            'rule_name': 'rule',
+        }
+        next_run_violation = dict(violation, id=2, scanner_index_id=2,
+                                  created_at_datetime='2019-03-13T16:06:19Z')
+        renamed_rule_violation = dict(violation, rule_name='new rule')
+        source_id = 'organizations/123/sources/560'
+
+        def hash_finding(inv_index_id, violation):
+            _, finding = cscc_notifier.CsccNotifier(
+                inv_index_id)._transform_violation(violation, source_id)
+            return cscc_notifier.CsccNotifier._hash_finding(finding)
+
+        self.assertEqual(hash_finding('iii', violation),
+                         hash_finding('jjj', next_run_violation))
+        self.assertNotEqual(hash_finding('iii', violation),
+                            hash_finding('iii', renamed_rule_violation))
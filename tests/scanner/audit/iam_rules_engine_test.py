@@ -2024,5 +2024,73 @@ class IamRulesEngineTest(ForsetiTestCase):
         self.assertEqual(expected_violations, actual_violations)
 
 
+    def test_member_matcher(self):
+        """Test that MemberMatcher matches like the rule members."""
+        matcher = ire.MemberMatcher([
+            IamPolicyMember.create_from(m) for m in [
+                'user:*@company.com',
+                'user:Admin@company.com',
+                'domain:other.com',
+                'allUsers',
+            ]])
+
+        self.assertTrue(matcher.matches(
+            IamPolicyMember.create_from('user:someone@company.com')))
+        self.assertTrue(matcher.matches(
+            IamPolicyMember.create_from('user:someone@other.com')))
+        self.assertTrue(matcher.matches(
+            IamPolicyMember.create_from('allUsers')))
+        self.assertFalse(matcher.matches(
+            IamPolicyMember.create_from('group:someone@company.com')))
+        self.assertFalse(matcher.matches(
+            IamPolicyMember.create_from('allAuthenticatedUsers')))
+        self.assertEqual(2, matcher.count_matches(
+            IamPolicyMember.create_from('user:admin@company.com')))
+
+    def test_compiled_rule_binding_indexes(self):
+        """Test that CompiledRule finds the rule bindings of a role."""
+        rule_bindings = [
+            IamPolicyBinding.create_from(
+                {'role': role, 'members': ['user:*@company.com']})
+            for role in ['roles/owner', 'roles/*', 'roles/storage.*',
+                         'Roles/Owner']]
+        compiled_rule = ire.CompiledRule(
+            scanner_rules.Rule('test rule', 0, rule_bindings,
+                               mode='whitelist'))
+
+        self.assertEqual((0, 1, 3),
+                         compiled_rule.get_binding_indexes('roles/owner'))
+        self.assertEqual((1, 2),
+                         compiled_rule.get_binding_indexes(
+                             'roles/storage.admin'))
+        self.assertEqual((),
+                         compiled_rule.get_binding_indexes(
+                             'organizations/1/roles/custom'))
+
+    def test_add_rule_rebuilds_index(self):
+        """Test that rules added after the first scan are found."""
+        rule_book = ire.IamRuleBook({}, test_rules.RULES1, self.fake_timestamp)
+        policy_bindings = [IamPolicyBinding.create_from(
+            {'role': 'roles/viewer', 'members': ['user:a@company.com']})]
+        before = list(rule_book.find_violations(
+            self.project1, self.mock_project1_policy_resource,
+            policy_bindings))
+
+        rule_book.add_rule({
+            'name': 'no viewers',
+            'mode': 'blacklist',
+            'resource': [{'type': 'project',
+                          'applies_to': 'self',
+                          'resource_ids': ['my-project-1']}],
+            'bindings': [{'role': 'roles/viewer',
+                          'members': ['user:*@company.com']}],
+        }, 100)
+        after = list(rule_book.find_violations(
+            self.project1, self.mock_project1_policy_resource,
+            policy_bindings))
+
+        self.assertEqual(
+            [100], [v.rule_index for v in after if v not in before])
+
 if __name__ == '__main__':
     unittest.main()
@@ -14,6 +14,8 @@
 """Scanner runner script test."""
 
 from datetime import datetime, timedelta
+import json
+import threading
 import unittest.mock as mock
 from sqlalchemy.orm import sessionmaker
 import unittest
@@ -155,6 +157,98 @@ class ScannerRunnerTest(scanner_base_db.ScannerBaseDbTestCase):
             db_row.scanner_index_errors)
         self.assertEqual(end, db_row.completed_at_datetime)
 
+    @mock.patch.object(date_time, 'get_utc_now_datetime')
+    def test_mark_scanner_index_complete_with_stats(self, mock_date_time):
+        start = datetime.utcnow()
+        end = start + timedelta(minutes=5)
+        mock_date_time.side_effect = [start, end]
+
+        scanner_index_id = scanner.init_scanner_index(
+            self.session, self.inv_index_id2)
+        scanner.mark_scanner_index_complete(
+            self.session, scanner_index_id, ['IamPolicyScanner'], [],
+            {'IamPolicyScanner': {'wall_time_seconds': 1.5,
+                                  'max_rss_kb': 1024}})
+        db_row = (self.session.query(scanner_dao.ScannerIndex)
+                  .filter(scanner_dao.ScannerIndex.id == scanner_index_id).one())
+        self.assertEqual(
+            {'IamPolicyScanner': {'wall_time_seconds': 1.5,
+                                  'max_rss_kb': 1024}},
+            json.loads(db_row.scanner_stats))
+
+
+class FakeScanner(object):
+    """Scanner stub."""
+
+
+class FirstScanner(FakeScanner):
+    """Scanner stub."""
+
+
+class SecondScanner(FakeScanner):
+    """Scanner stub."""
+
+
+class ScheduleScannersTest(unittest.TestCase):
+    """Test the scheduling of the scanners."""
+
+    def test_concurrent_runs(self):
+        """Test that the scanners run at the same time."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def run_scanner(_):
+            barrier.wait()
+            return {'succeeded': True}
+
+        results = dict(scanner._schedule_scanners(
+            [FirstScanner(), FakeScanner()], run_scanner, 2))
+        self.assertEqual({'FirstScanner', 'FakeScanner'}, set(results))
+
+    def test_failed_scanner(self):
+        """Test that the scanners run after one of them failed."""
+
+        def run_scanner(s):
+            return {'succeeded': not isinstance(s, FirstScanner)}
+
+        results = dict(scanner._schedule_scanners(
+            [FirstScanner(), SecondScanner()], run_scanner, 1))
+        self.assertEqual({'FirstScanner': {'succeeded': False},
+                          'SecondScanner': {'succeeded': True}}, results)
+
+    def test_max_concurrency(self):
+        """Test that max_concurrency is at least 1."""
+        self.assertEqual(scanner.DEFAULT_MAX_CONCURRENCY,
+                         scanner._get_max_concurrency({}))
+        self.assertEqual(4, scanner._get_max_concurrency(
+            {'max_concurrency': 4}))
+        self.assertEqual(1, scanner._get_max_concurrency(
+            {'max_concurrency': 0}))
+        self.assertEqual(1, scanner._get_max_concurrency(
+            {'max_concurrency': -2}))
+        self.assertEqual(scanner.DEFAULT_MAX_CONCURRENCY,
+                         scanner._get_max_concurrency(
+                             {'max_concurrency': 'many'}))
+
+    def test_run_scanner_stats(self):
+        """Test that a scanner writes its violations in its own session."""
+        service_config = mock.MagicMock()
+        progress_queue = mock.MagicMock()
+        fake_scanner = mock.MagicMock()
+        fake_scanner.run.side_effect = lambda: self.assertIsNotNone(
+            fake_scanner.violation_access)
+
+        stats = scanner._run_scanner(service_config, fake_scanner,
+                                     progress_queue)
+        self.assertTrue(stats['succeeded'])
+        self.assertGreater(stats['max_rss_kb'], 0)
+        self.assertIn('wall_time_seconds', stats)
+        self.assertIsNone(fake_scanner.violation_access)
+
+        fake_scanner.run.side_effect = ValueError('error')
+        stats = scanner._run_scanner(service_config, fake_scanner,
+                                     progress_queue)
+        self.assertFalse(stats['succeeded'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -31,11 +31,12 @@ from google.cloud.forseti.services.model.service import GrpcModellerFactory
 class TestServiceConfig(object):
     """ServiceConfig stub."""
 
-    def __init__(self):
+    def __init__(self, explain_config=None):
         self.engine = create_test_engine()
         self.model_manager = ModelManager(self.engine)
         self.inventory_config = (
             InventoryConfig(gcp_api_mocks.ORGANIZATION_ID, '', {}, '', {}))
+        self.explain_config = explain_config or {}
 
     def run_in_background(self, function):
         """Stub."""
@@ -46,6 +47,10 @@ class TestServiceConfig(object):
         """Stub."""
         return self.engine
 
+    def get_explain_config(self):
+        """Stub."""
+        return self.explain_config
+
 
 MODEL = {
     'resources': {
@@ -117,10 +122,10 @@ MODEL = {
 }
 
 
-def create_tester():
+def create_tester(explain_config=None):
     """Creates a model based test runner."""
     return ModelTestRunner(
-        MODEL, TestServiceConfig(),
+        MODEL, TestServiceConfig(explain_config),
         [
             GrpcExplainerFactory,
             GrpcInventoryFactory,
@@ -454,5 +459,19 @@ class ExplainerTest(ForsetiTestCase):
 
         self.setup.run(test)
 
+
+class InMemoryExplainerTest(ExplainerTest):
+    """Test the explain queries answered from the in-memory IAM graph."""
+
+    def setUp(self):
+        self.setup = create_tester({'in_memory': {'enabled': True}})
+
+
+class CachedExplainerTest(ExplainerTest):
+    """Test the explain queries through the result cache."""
+
+    def setUp(self):
+        self.setup = create_tester({'cache': {'max_entries': 100}})
+
 if __name__ == '__main__':
     unittest.main()
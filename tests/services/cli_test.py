@@ -205,6 +205,13 @@ class ImporterTest(ForsetiTestCase):
          '{"endpoint": "192.168.0.1:80"}',
          {'endpoint': '192.168.0.1:80'}),
 
+        ('model create --bulk --inventory_index_id 1 foo',
+         CLIENT.model.new_model,
+         ["inventory_bulk", "foo", 1, False],
+         {},
+         '{"endpoint": "192.168.0.1:80"}',
+         {'endpoint': '192.168.0.1:80'}),
+
         ('explainer list_resources',
          CLIENT.explain.list_resources,
          [''],
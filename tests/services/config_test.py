@@ -192,5 +192,37 @@ class ConfigTest(unittest_utils.ForsetiTestCase):
         self.assertIn('Neither root_resource_id nor composite_root_resources',
                       err_msg)
 
+    def test_server_config_database_pools(self, mock_engine, mock_mm):
+        """The write and read pools are created from the database section."""
+        config_file_path = os.path.join(TEST_RESOURCE_DIR_PATH,
+                                        'forseti_conf_server_new.yaml')
+        mock_engine.side_effect = ['write_engine', 'read_engine']
+
+        service_config = config.ServiceConfig(config_file_path,
+                                              'mysql://primary/forseti',
+                                              '')
+
+        mock_engine.assert_has_calls([
+            mock.call('mysql://primary/forseti', pool_name='write',
+                      pool_size=30, pool_recycle=3600, pool_pre_ping=True),
+            mock.call('mysql://replica/forseti_security', pool_name='read',
+                      pool_size=10, max_overflow=5, pool_recycle=3600,
+                      pool_pre_ping=False)])
+        mock_mm.assert_called_with('write_engine', 'read_engine')
+        self.assertEqual('read_engine', service_config.read_engine)
+
+    def test_server_config_default_pools(self, mock_engine, mock_mm):
+        """Without a read pool, reads share the write pool."""
+        config_file_path = os.path.join(TEST_RESOURCE_DIR_PATH,
+                                        'forseti_conf_server.yaml')
+        mock_engine.return_value = 'engine'
+
+        service_config = config.ServiceConfig(config_file_path, '', '')
+
+        mock_engine.assert_called_once_with('', pool_name='write',
+                                            pool_recycle=3600,
+                                            pool_pre_ping=True)
+        self.assertEqual('engine', service_config.read_engine)
+
 if __name__ == '__main__':
     unittest.main()
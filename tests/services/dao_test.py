@@ -496,10 +496,7 @@ class DaoTest(ForsetiTestCase):
     client = ModelCreatorClient(session, data_access)
     _ = ModelCreator(test_models.GROUP_IN_GROUP_TESTING_1, client)
 
-    iterations = data_access.denorm_group_in_group(session)
-    self.assertEqual(iterations,
-                     4,
-                     'Denormalization should have taken 4 iterations.')
+    rows = data_access.denorm_group_in_group(session)
 
     expected = [
         (u'group/g2', u'group/g2g1'),
@@ -535,6 +532,7 @@ class DaoTest(ForsetiTestCase):
         expected,
         denormed_set,
         'Denormalized should be equivalent to transitive closure')
+    self.assertEqual(len(expected), rows)
 
   def test_query_access_by_permission(self):
     """Test query_access_by_permission."""
@@ -692,11 +690,11 @@ class DaoTest(ForsetiTestCase):
     ]
 
     for resource, permissions, expansion, members in checks:
-      res = data_access.query_access_by_resource(
+      res = dict(data_access.query_access_by_resource(
           session,
           resource,
           permission_names=permissions,
-          expand_groups=expansion)
+          expand_groups=expansion))
       self.assertEqual(set(members), set(res[permissions[0]]))
 
   def test_query_permissions_by_roles(self):
@@ -986,6 +984,40 @@ class DaoTest(ForsetiTestCase):
                 for r in data_access.find_resource_path(session, test_val)]
       self.assertEqual(comparison, set(result))
 
+  def test_denorm_resource_hierarchy(self):
+    """Test resource hierarchy denormalization."""
+    session_maker, data_access = session_creator('test')
+    session = session_maker()
+    client = ModelCreatorClient(session, data_access)
+    _ = ModelCreator(test_models.RESOURCE_EXPANSION_1, client)
+
+    tbl = data_access.TBL_RESOURCE_ANCESTOR
+
+    def ancestor_rows():
+      return set(session.query(tbl.ancestor_type_name,
+                               tbl.resource_type_name,
+                               tbl.depth))
+
+    # Rows maintained by add_resource.
+    expected = ancestor_rows()
+    self.assertIn((u'r/res1', u'r/res7', 3), expected)
+    self.assertIn((u'r/res6', u'r/res7', 1), expected)
+    self.assertIn((u'r/res7', u'r/res7', 0), expected)
+    self.assertEqual(8 + 7 + 3 + 2, len(expected))
+
+    rows = data_access.denorm_resource_hierarchy(session)
+    self.assertEqual(len(expected), rows)
+    self.assertEqual(expected, ancestor_rows())
+
+    # Models imported without the hierarchy are denormalized on first use.
+    session.query(tbl).delete()
+    session.commit()
+    data_access._resource_hierarchy_checked = False
+    result = [r.type_name
+              for r in data_access.find_resource_path(session, u'r/res8')]
+    self.assertEqual([u'r/res8', u'r/res6', u'r/res5', u'r/res1'], result)
+    self.assertEqual(expected, ancestor_rows())
+
   def test_get_member(self):
     session_maker, data_access = session_creator('test')
     session = session_maker()
@@ -0,0 +1,78 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Unit Tests: Database session handling for Forseti Server."""
+
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy import exc
+
+from tests.unittest_utils import ForsetiTestCase
+from google.cloud.forseti.services import db
+
+
+class MonitoredQueuePoolTest(ForsetiTestCase):
+    """Test the checkout statistics of the connection pool."""
+
+    def setUp(self):
+        """Setup."""
+        fd, self.dbfile = tempfile.mkstemp('.db', 'forseti-test-')
+        os.close(fd)
+        self.engine = create_engine('sqlite:///{}'.format(self.dbfile),
+                                    poolclass=db.MonitoredQueuePool,
+                                    pool_name='read',
+                                    pool_size=1,
+                                    max_overflow=0,
+                                    pool_timeout=0.1)
+
+    def tearDown(self):
+        """Tear down."""
+        self.engine.dispose()
+        os.unlink(self.dbfile)
+
+    def test_checkout_stats(self):
+        """Test that checkouts and timeouts are counted."""
+        connection = self.engine.connect()
+        stats = db.get_pool_stats(self.engine)
+        self.assertEqual(1, stats['checkouts'])
+        self.assertEqual(1, stats['checked_out'])
+
+        with self.assertRaises(exc.TimeoutError):
+            self.engine.connect()
+        connection.close()
+        self.engine.connect().close()
+
+        stats = db.get_pool_stats(self.engine)
+        self.assertEqual(3, stats['checkouts'])
+        self.assertEqual(1, stats['timeouts'])
+        self.assertEqual(0, stats['checked_out'])
+        self.assertGreaterEqual(stats['max_wait_seconds'], 0.1)
+        self.assertEqual('read', self.engine.pool.stats.name)
+
+    def test_recreate(self):
+        """Test that the statistics are kept when the pool is recreated."""
+        self.engine.connect().close()
+        self.engine.dispose()
+        self.engine.connect().close()
+        self.assertEqual(2, db.get_pool_stats(self.engine)['checkouts'])
+
+    def test_unmonitored_pool(self):
+        """Test that other pools have no statistics."""
+        self.assertEqual({}, db.get_pool_stats(create_engine('sqlite://')))
+
+
+if __name__ == '__main__':
+    unittest.main()
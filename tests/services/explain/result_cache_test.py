@@ -0,0 +1,195 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Tests the cache of the Explainer query results."""
+
+import unittest
+import unittest.mock as mock
+
+from tests.services import test_models
+from tests.services.model_tester import ModelCreator
+from tests.services.model_tester import ModelCreatorClient
+from tests.services.util.db import create_test_engine
+from tests.unittest_utils import ForsetiTestCase
+from google.cloud.forseti.services.dao import create_engine
+from google.cloud.forseti.services.dao import ModelManager
+from google.cloud.forseti.services.explain import explainer
+from google.cloud.forseti.services.explain.result_cache import ResultCache
+
+
+class TestServiceConfig(object):
+    """ServiceConfig stub."""
+
+    def __init__(self, explain_config):
+        self.engine = create_test_engine()
+        self.model_manager = ModelManager(self.engine)
+        self.explain_config = explain_config
+
+    def get_explain_config(self):
+        """Stub."""
+        return self.explain_config
+
+
+class ResultCacheTest(ForsetiTestCase):
+    """Test the result cache."""
+
+    def test_lru_eviction(self):
+        """Test that the least recently used result is evicted."""
+        cache = ResultCache(2, None)
+        cache.put('a', 1, 'result a')
+        cache.put('b', 1, 'result b')
+        self.assertEqual((True, 'result a'), cache.get('a', 1))
+        cache.put('c', 1, 'result c')
+
+        self.assertEqual(2, len(cache))
+        self.assertEqual((False, None), cache.get('b', 1))
+        self.assertEqual((True, 'result a'), cache.get('a', 1))
+        self.assertEqual((True, 'result c'), cache.get('c', 1))
+        stats = cache.get_stats()
+        self.assertEqual(1, stats['evictions'])
+        self.assertEqual(3, stats['hits'])
+        self.assertEqual(1, stats['misses'])
+
+    def test_model_version(self):
+        """Test that a result of another model version is dropped."""
+        cache = ResultCache(2, None)
+        cache.put('a', 1, 'result a')
+        self.assertEqual((False, None), cache.get('a', 2))
+        self.assertEqual(0, len(cache))
+        self.assertEqual(1, cache.get_stats()['invalidations'])
+
+    @mock.patch('google.cloud.forseti.services.explain.result_cache.time')
+    def test_ttl(self, mock_time):
+        """Test that a result expires after the time to live."""
+        cache = ResultCache(2, 60)
+        mock_time.time.return_value = 1000
+        cache.put('a', 1, 'result a')
+        mock_time.time.return_value = 1059
+        self.assertEqual((True, 'result a'), cache.get('a', 1))
+        mock_time.time.return_value = 1060
+        self.assertEqual((False, None), cache.get('a', 1))
+        self.assertEqual(1, cache.get_stats()['expirations'])
+
+
+class ExplainerCacheTest(ForsetiTestCase):
+    """Test the Explainer queries through the result cache."""
+
+    def setUp(self):
+        """Setup."""
+        self.config = TestServiceConfig({'cache': {'max_entries': 100}})
+        model_manager = self.config.model_manager
+        self.handle = model_manager.create('test')
+        scoped_session, self.data_access = model_manager.get(self.handle)
+        with scoped_session as session:
+            client = ModelCreatorClient(session, self.data_access)
+            _ = ModelCreator(test_models.COMPLEX_MODEL, client)
+        self.explainer = explainer.Explainer(self.config)
+
+    def test_cache_disabled(self):
+        """Test that the queries are not cached by default."""
+        self.config.explain_config = {}
+        self.assertIsNone(self.explainer.get_cache())
+        self.assertEqual({}, self.explainer.get_cache_stats())
+        self.assertTrue(self.explainer.check_iam_policy(
+            self.handle, 'vm/instance-1', 'permission/c', 'user/d'))
+
+    def test_cached_queries(self):
+        """Test that a repeated query is served from the cache."""
+        expected = set(self.explainer.list_roles(self.handle, 'role'))
+        self.assertEqual(expected,
+                         set(self.explainer.list_roles(self.handle, 'role')))
+        access = list(self.explainer.get_access_by_members(
+            self.handle, 'group/a', ['permission/a'], True))
+        self.assertEqual(access, list(self.explainer.get_access_by_members(
+            self.handle, 'group/a', ['permission/a'], True)))
+
+        stats = self.explainer.get_cache_stats()
+        self.assertEqual(2, stats['hits'])
+        self.assertEqual(2, stats['misses'])
+        self.assertEqual(2, stats['entries'])
+
+    def test_cache_hit_without_session(self):
+        """Test that a cached result is served without opening a session."""
+        model_manager = self.config.model_manager
+        self.explainer.list_roles(self.handle, 'role')
+        with mock.patch.object(model_manager, 'get',
+                               wraps=model_manager.get) as mock_get:
+            self.explainer.list_roles(self.handle, 'role')
+        self.assertFalse(mock_get.called)
+        self.assertEqual(1, self.explainer.get_cache_stats()['hits'])
+
+    def test_model_change(self):
+        """Test that a model change invalidates the cached results."""
+        self.assertFalse(self.explainer.check_iam_policy(
+            self.handle, 'bucket/bucket2', 'permission/e', 'user/c'))
+
+        scoped_session, _ = self.config.model_manager.get(self.handle)
+        with scoped_session as session:
+            policy = self.data_access.get_iam_policy(session,
+                                                     'bucket/bucket2')
+            policy['bindings']['role/a'] = ['user/c']
+            self.data_access.set_iam_policy(session, 'bucket/bucket2',
+                                            policy)
+
+        self.assertTrue(self.explainer.check_iam_policy(
+            self.handle, 'bucket/bucket2', 'permission/e', 'user/c'))
+        stats = self.explainer.get_cache_stats()
+        self.assertEqual(0, stats['hits'])
+        self.assertEqual(1, stats['invalidations'])
+
+    def test_model_change_commit(self):
+        """Test that results computed before a change commits are dropped."""
+        scoped_session, _ = self.config.model_manager.get(self.handle)
+        with scoped_session as session:
+            self.data_access.add_resource_by_name(
+                session, 'organization/new', '', True)
+            # Computed concurrently, before the new resource is committed.
+            self.assertNotIn('organization/new', list(
+                self.explainer.list_resources(self.handle, '')))
+            session.commit()
+        self.assertIn('organization/new', list(
+            self.explainer.list_resources(self.handle, '')))
+
+    def test_cached_plain_values(self):
+        """Test that the cached results hold no database objects."""
+        resources = list(self.explainer.list_resources(self.handle, ''))
+        self.assertIn('organization/org1', resources)
+        permissions = list(self.explainer.get_permissions_by_roles(
+            self.handle, ['role/a'], []))
+        self.assertTrue(permissions)
+        for role, permission in permissions:
+            self.assertEqual('role/a', role)
+            self.assertTrue(permission.startswith('permission/'))
+
+    def test_model_deletion(self):
+        """Test that a deleted model is not served from the cache."""
+        self.explainer.list_roles(self.handle, '')
+        self.config.model_manager.delete(self.handle)
+        with self.assertRaises(KeyError):
+            self.explainer.list_roles(self.handle, '')
+
+    def test_read_replica(self):
+        """Test that nothing is cached if the queries read from a replica."""
+        model_manager = self.config.model_manager
+        # A replica of the database, which can lag behind the model version.
+        model_manager.read_engine = create_engine(str(self.config.engine.url))
+        expected = set(self.explainer.list_roles(self.handle, 'role'))
+        self.assertEqual(expected,
+                         set(self.explainer.list_roles(self.handle, 'role')))
+        stats = self.explainer.get_cache_stats()
+        self.assertEqual(0, stats['hits'])
+        self.assertEqual(0, stats['misses'])
+        self.assertEqual(0, stats['entries'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,257 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Unit Tests: In-memory IAM graph for Forseti Server."""
+
+import itertools
+import unittest
+import unittest.mock as mock
+from tests.services import test_models
+from tests.services.model_tester import ModelCreator
+from tests.services.model_tester import ModelCreatorClient
+from tests.unittest_utils import ForsetiTestCase
+from google.cloud.forseti.services import db
+from google.cloud.forseti.services.dao import create_engine
+from google.cloud.forseti.services.dao import session_creator
+from google.cloud.forseti.services.membership_graph import MembershipGraph
+
+
+def call(function, *args):
+    """Call a query, returning its error message if it raises.
+
+    Args:
+        function (function): The query.
+        *args (list): The query arguments.
+
+    Returns:
+        object: The query result, or the error message.
+    """
+    try:
+        return function(*args)
+    except Exception as e:  # pylint: disable=broad-except
+        return str(e)
+
+
+class IamGraphTest(ForsetiTestCase):
+    """Test the IAM graph against the database queries."""
+
+    def setUp(self):
+        """Setup."""
+        session_maker, self.data_access = session_creator('test')
+        self.session = session_maker()
+        client = ModelCreatorClient(self.session, self.data_access)
+        _ = ModelCreator(test_models.COMPLEX_MODEL, client)
+        self.graph = self.data_access.get_iam_graph(self.session)
+
+        self.members = [m.name for m in
+                        self.session.query(self.data_access.TBL_MEMBER)]
+        self.members.append('user/unknown')
+        self.resources = [r.type_name for r in
+                          self.session.query(self.data_access.TBL_RESOURCE)]
+        self.resources.append('project/unknown')
+        # Permissions of different roles and a missing one.
+        self.permissions = ['permission/a', 'permission/e', 'permission/h',
+                            'permission/i', 'permission/unknown']
+        self.roles = [r.name for r in
+                      self.session.query(self.data_access.TBL_ROLE)]
+
+    def test_check_iam_policy(self):
+        """Test checking access against the database query."""
+        for member, resource, permission in itertools.product(
+                self.members, self.resources, self.permissions):
+            self.assertEqual(
+                call(self.data_access.check_iam_policy, self.session,
+                     resource, permission, member),
+                call(self.graph.check_iam_policy,
+                     resource, permission, member))
+
+    def test_explain_granted(self):
+        """Test explaining granted access against the database query."""
+        queries = ([(role, None) for role in self.roles] +
+                   [(None, permission) for permission in self.permissions])
+        for member, resource, (role, permission) in itertools.product(
+                self.members, self.resources, queries):
+            expected = call(self.data_access.explain_granted, self.session,
+                            member, resource, role, permission)
+            result = call(self.graph.explain_granted,
+                          member, resource, role, permission)
+            if isinstance(expected, str):
+                self.assertEqual(expected, result)
+                continue
+            self.assertEqual(set(expected[0]), set(result[0]))
+            self.assertEqual(dict(expected[1]), dict(result[1]))
+            self.assertEqual(expected[2], result[2])
+
+    def test_explain_denied(self):
+        """Test explaining denied access against the database query."""
+        for member, resource, permission in itertools.product(
+                self.members, self.resources, self.permissions):
+            expected = call(self.data_access.explain_denied, self.session,
+                            member, [resource], [permission], [])
+            result = call(self.graph.explain_denied,
+                          member, [resource], [permission], [])
+            if isinstance(expected, str):
+                self.assertEqual(expected, result)
+                continue
+            self.assertEqual(sorted(expected), sorted(result))
+
+    def test_query_access_by_member(self):
+        """Test the access of a member against the database query."""
+        for member, permission, expand_resources in itertools.product(
+                self.members, self.permissions, [False, True]):
+            expected = self.data_access.query_access_by_member(
+                self.session, member, [permission], expand_resources)
+            result = self.graph.query_access_by_member(
+                member, [permission], expand_resources)
+            self.assertEqual(
+                sorted((role, sorted(resources))
+                       for role, resources in expected),
+                sorted((role, sorted(resources))
+                       for role, resources in result))
+
+    def test_query_access_by_permission(self):
+        """Test the access by role or permission against the database."""
+        queries = ([(role, None) for role in self.roles] +
+                   [(None, permission) for permission in self.permissions])
+        for (role, permission), expand_groups, expand_resources in (
+                itertools.product(queries, [False, True], [False, True])):
+            expected = self.data_access.query_access_by_permission(
+                self.session, role, permission, expand_groups,
+                expand_resources)
+            result = self.graph.query_access_by_permission(
+                role, permission, expand_groups, expand_resources)
+            self.assertEqual(list(expected), list(result))
+
+        with self.assertRaises(ValueError):
+            list(self.graph.query_access_by_permission())
+
+    def test_query_access_by_resource(self):
+        """Test the access to a resource against the database query."""
+        for resource, permission, expand_groups in itertools.product(
+                self.resources, self.permissions, [False, True]):
+            expected = self.data_access.query_access_by_resource(
+                self.session, resource, [permission], expand_groups)
+            result = self.graph.query_access_by_resource(
+                resource, [permission], expand_groups)
+            self.assertEqual(
+                dict((role, set(members)) for role, members in expected),
+                dict((role, set(members)) for role, members in result))
+
+    def test_model_change(self):
+        """Test that the graph is reloaded after the model changed."""
+        self.assertIs(self.graph,
+                      self.data_access.get_iam_graph(self.session))
+        self.assertFalse(self.graph.check_iam_policy(
+            'bucket/bucket2', 'permission/e', 'user/c'))
+
+        policy = self.data_access.get_iam_policy(self.session,
+                                                 'bucket/bucket2')
+        policy['bindings']['role/a'] = ['user/c']
+        self.data_access.set_iam_policy(self.session, 'bucket/bucket2',
+                                        policy)
+
+        graph = self.data_access.get_iam_graph(self.session)
+        self.assertIsNot(self.graph, graph)
+        self.assertTrue(graph.check_iam_policy(
+            'bucket/bucket2', 'permission/e', 'user/c'))
+
+    def test_load_from_read_session(self):
+        """Test that the graph is loaded from the write engine."""
+        self.data_access.model_changed()
+        # A read replica which has not caught up with the model yet.
+        read_engine = create_engine('sqlite:///:memory:')
+        with db.create_scoped_readonly_session(read_engine) as session:
+            graph = self.data_access.get_iam_graph(session)
+        self.assertIsNot(self.graph, graph)
+        self.assertEqual(
+            self.graph.check_iam_policy('bucket/bucket1', 'permission/a',
+                                        'user/d'),
+            graph.check_iam_policy('bucket/bucket1', 'permission/a',
+                                   'user/d'))
+
+    def test_load_caches_from_read_session(self):
+        """Test that the shared caches are loaded from the write engine."""
+        expected_members = self.data_access.get_membership_graph(
+            self.session).reverse_expand(['user/d'])
+        expected_permissions = self.data_access.get_permission_index(
+            self.session).permissions_by_roles(['role/a'], [])
+        # A read replica which has not caught up with the model yet.
+        read_engine = create_engine('sqlite:///:memory:')
+        with db.create_scoped_readonly_session(read_engine) as session:
+            members = self.data_access.get_membership_graph(
+                session, refresh=True).reverse_expand(['user/d'])
+            permissions = self.data_access.get_permission_index(
+                session, refresh=True).permissions_by_roles(['role/a'], [])
+        self.assertEqual(expected_members, members)
+        self.assertEqual(sorted(expected_permissions), sorted(permissions))
+
+    def test_model_change_during_load(self):
+        """Test that a graph loaded before a model change is discarded."""
+        self.data_access.model_changed()
+        load_iam_graph = self.data_access._load_iam_graph
+        loaded = []
+
+        def load(connection):
+            """Load the graph, changing the model during the first load.
+
+            Args:
+                connection (object): The connection to load from.
+
+            Returns:
+                IamGraph: The graph.
+            """
+            graph = load_iam_graph(connection)
+            loaded.append(graph)
+            if len(loaded) == 1:
+                self.data_access.model_changed()
+            return graph
+
+        with mock.patch.object(self.data_access, '_load_iam_graph',
+                               side_effect=load):
+            graph = self.data_access.get_iam_graph(self.session)
+        self.assertEqual(2, len(loaded))
+        self.assertIs(loaded[1], graph)
+        self.assertIs(graph, self.data_access.get_iam_graph(self.session))
+
+    def test_add_member_during_load(self):
+        """Test that a membership graph loaded before a change is discarded."""
+        self.data_access.add_member(self.session, 'group/loading', [])
+        self.data_access.get_membership_graph(self.session, refresh=True)
+        self.data_access._drop_caches('_membership_graph')
+        loaded = []
+
+        def load(edges):
+            """Load the graph, adding a membership during the first load.
+
+            Args:
+                edges (iterable): The memberships.
+
+            Returns:
+                MembershipGraph: The graph.
+            """
+            graph = MembershipGraph(edges)
+            loaded.append(graph)
+            if len(loaded) == 1:
+                self.data_access.add_member(self.session, 'user/loading',
+                                            ['group/loading'])
+            return graph
+
+        with mock.patch('google.cloud.forseti.services.dao.MembershipGraph',
+                        side_effect=load):
+            graph = self.data_access.get_membership_graph(self.session)
+        self.assertEqual(2, len(loaded))
+        self.assertIs(loaded[1], graph)
+        self.assertIn('group/loading', graph.reverse_expand(['user/loading']))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -68,6 +68,12 @@ EXPORT_ASSETS_ERROR = """
 """
 
 
+def _read_dump(file_name):
+    """Read the lines of a CAI dump from the test data directory."""
+    with open(os.path.join(TEST_RESOURCE_DIR_PATH, file_name)) as f:
+        return f.readlines()
+
+
 class InventoryCloudAssetTest(unittest_utils.ForsetiTestCase):
     """Test CloudAsset data loader."""
 
@@ -86,16 +92,13 @@ class InventoryCloudAssetTest(unittest_utils.ForsetiTestCase):
                                                  'gcs_path': 'gs://test-bucket'}
                                                )
 
-        # Ensure test data doesn't get deleted
-        self.mock_unlink = mock.patch.object(
-            os, 'unlink', autospec=True).start()
         self.mock_export_assets = mock.patch.object(
             cloudasset_api.CloudAssetClient,
             'export_assets',
             autospec=True).start()
-        self.mock_copy_file_from_gcs = mock.patch.object(
+        self.mock_stream_file_from_gcs = mock.patch.object(
             file_loader,
-            'copy_file_from_gcs',
+            'stream_file_from_gcs',
             autospec=True).start()
         self.mock_auth = mock.patch.object(
             google.auth,
@@ -177,23 +180,52 @@ class InventoryCloudAssetTest(unittest_utils.ForsetiTestCase):
         # Ignore call to export_assets for this test.
         self.mock_export_assets.return_value = {'done': True}
 
-        # Mock copy_file_from_gcs to return correct test data file
-        def _copy_file_from_gcs(file_path, *args, **kwargs):
-            """Fake copy_file_from_gcs."""
+        # Mock stream_file_from_gcs to return correct test data
+        def _stream_file_from_gcs(file_path, *args, **kwargs):
+            """Fake stream_file_from_gcs."""
             if 'resource' in file_path:
-                return os.path.join(TEST_RESOURCE_DIR_PATH,
-                                    'mock_cai_resources.dump')
+                return _read_dump('mock_cai_resources.dump')
             elif 'iam_policy' in file_path:
-                return os.path.join(TEST_RESOURCE_DIR_PATH,
-                                    'mock_cai_iam_policies.dump')
+                return _read_dump('mock_cai_iam_policies.dump')
 
-        self.mock_copy_file_from_gcs.side_effect = _copy_file_from_gcs
+        self.mock_stream_file_from_gcs.side_effect = _stream_file_from_gcs
 
         results = cloudasset.load_cloudasset_data(self.session,
                                                   self.inventory_config)
         self.assertTrue(results)
         self.validate_data_in_table()
 
+    def test_load_cloudasset_data_bulk_load(self):
+        """Validate load_cloudasset_data imports data with bulk inserts."""
+        inventory_config = InventoryConfig('organizations/987654321',
+                                           '',
+                                           {},
+                                           0,
+                                           {'enabled': True,
+                                            'gcs_path': 'gs://test-bucket',
+                                            'bulk_load': True})
+
+        # Ignore call to export_assets for this test.
+        self.mock_export_assets.return_value = {'done': True}
+
+        # Mock stream_file_from_gcs to return correct test data
+        def _stream_file_from_gcs(file_path, *args, **kwargs):
+            """Fake stream_file_from_gcs."""
+            if 'resource' in file_path:
+                return _read_dump('mock_cai_resources.dump')
+            elif 'iam_policy' in file_path:
+                return _read_dump('mock_cai_iam_policies.dump')
+
+        self.mock_stream_file_from_gcs.side_effect = _stream_file_from_gcs
+
+        with mock.patch.object(
+                storage.CaiDataAccess, 'populate_cai_data') as mock_populate:
+            results = cloudasset.load_cloudasset_data(self.session,
+                                                      inventory_config)
+        self.assertTrue(results)
+        self.assertFalse(mock_populate.called)
+        self.validate_data_in_table()
+
     def test_load_cloudasset_data_composite_root(self):
         """Validate load_cloudasset_data correctly works with composite root."""
         composite_root_resources = ['projects/1043', 'projects/1044']
@@ -208,25 +240,21 @@ class InventoryCloudAssetTest(unittest_utils.ForsetiTestCase):
         # Ignore call to export_assets for this test.
         self.mock_export_assets.return_value = {'done': True}
 
-        # Mock copy_file_from_gcs to return correct test data file
-        def _copy_file_from_gcs(file_path, *args, **kwargs):
-            """Fake copy_file_from_gcs."""
+        # Mock stream_file_from_gcs to return correct test data
+        def _stream_file_from_gcs(file_path, *args, **kwargs):
+            """Fake stream_file_from_gcs."""
             if 'resource' in file_path:
                 if 'projects-1043' in file_path:
-                    return os.path.join(TEST_RESOURCE_DIR_PATH,
-                                        'mock_cai_project3_resources.dump')
+                    return _read_dump('mock_cai_project3_resources.dump')
                 if 'projects-1044' in file_path:
-                    return os.path.join(TEST_RESOURCE_DIR_PATH,
-                                        'mock_cai_project4_resources.dump')
+                    return _read_dump('mock_cai_project4_resources.dump')
             elif 'iam_policy' in file_path:
                 if 'projects-1043' in file_path:
-                    return os.path.join(TEST_RESOURCE_DIR_PATH,
-                                        'mock_cai_project3_iam_policies.dump')
+                    return _read_dump('mock_cai_project3_iam_policies.dump')
                 if 'projects-1044' in file_path:
-                    return os.path.join(TEST_RESOURCE_DIR_PATH,
-                                        'mock_cai_project4_iam_policies.dump')
+                    return _read_dump('mock_cai_project4_iam_policies.dump')
 
-        self.mock_copy_file_from_gcs.side_effect = _copy_file_from_gcs
+        self.mock_stream_file_from_gcs.side_effect = _stream_file_from_gcs
 
         results = cloudasset.load_cloudasset_data(self.session,
                                                   inventory_config)
@@ -254,18 +282,15 @@ class InventoryCloudAssetTest(unittest_utils.ForsetiTestCase):
         # Ignore call to export_assets for this test.
         self.mock_export_assets.return_value = {'done': True}
 
-        # Mock copy_file_from_gcs to return correct test data file
-        def _copy_file_from_gcs(file_path, *args, **kwargs):
-            """Fake copy_file_from_gcs."""
+        # Mock stream_file_from_gcs to return correct test data
+        def _stream_file_from_gcs(file_path, *args, **kwargs):
+            """Fake stream_file_from_gcs."""
             if 'resource' in file_path:
-                return os.path.join(
-                    TEST_RESOURCE_DIR_PATH,
-                    'mock_cai_long_resource_name.dump')
+                return _read_dump('mock_cai_long_resource_name.dump')
             elif 'iam_policy' in file_path:
-                return os.path.join(TEST_RESOURCE_DIR_PATH,
-                                    'mock_cai_empty_iam_policies.dump')
+                return _read_dump('mock_cai_empty_iam_policies.dump')
 
-        self.mock_copy_file_from_gcs.side_effect = _copy_file_from_gcs
+        self.mock_stream_file_from_gcs.side_effect = _stream_file_from_gcs
 
         results = cloudasset.load_cloudasset_data(self.session,
                                                   self.inventory_config)
@@ -303,7 +328,7 @@ class InventoryCloudAssetTest(unittest_utils.ForsetiTestCase):
         results = cloudasset.load_cloudasset_data(self.session,
                                                   self.inventory_config)
         self.assertIsNone(results)
-        self.assertFalse(self.mock_copy_file_from_gcs.called)
+        self.assertFalse(self.mock_stream_file_from_gcs.called)
         self.validate_no_data_in_table()
 
     def test_load_cloudasset_data_cai_valueerror(self):
@@ -320,7 +345,7 @@ class InventoryCloudAssetTest(unittest_utils.ForsetiTestCase):
         results = cloudasset.load_cloudasset_data(self.session,
                                                   inventory_config)
         self.assertIsNone(results)
-        self.assertFalse(self.mock_copy_file_from_gcs.called)
+        self.assertFalse(self.mock_stream_file_from_gcs.called)
         self.validate_no_data_in_table()
 
     def test_load_cloudasset_data_cai_timeout(self):
@@ -330,7 +355,7 @@ class InventoryCloudAssetTest(unittest_utils.ForsetiTestCase):
         results = cloudasset.load_cloudasset_data(self.session,
                                                   self.inventory_config)
         self.assertIsNone(results)
-        self.assertFalse(self.mock_copy_file_from_gcs.called)
+        self.assertFalse(self.mock_stream_file_from_gcs.called)
         self.validate_no_data_in_table()
 
     def test_load_cloudasset_data_cai_error_response(self):
@@ -339,7 +364,7 @@ class InventoryCloudAssetTest(unittest_utils.ForsetiTestCase):
         results = cloudasset.load_cloudasset_data(self.session,
                                                   self.inventory_config)
         self.assertIsNone(results)
-        self.assertFalse(self.mock_copy_file_from_gcs.called)
+        self.assertFalse(self.mock_stream_file_from_gcs.called)
         self.validate_no_data_in_table()
 
     def test_load_cloudasset_data_download_error(self):
@@ -351,7 +376,7 @@ class InventoryCloudAssetTest(unittest_utils.ForsetiTestCase):
             {'status': '403', 'content-type': 'application/json'})
         content = PERMISSION_DENIED.encode()
         error_403 = errors.HttpError(response, content)
-        self.mock_copy_file_from_gcs.side_effect = error_403
+        self.mock_stream_file_from_gcs.side_effect = error_403
 
         results = cloudasset.load_cloudasset_data(self.session,
                                                   self.inventory_config)
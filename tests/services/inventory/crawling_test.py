@@ -28,6 +28,7 @@ from google.cloud.forseti.services.base.config import InventoryConfig
 from google.cloud.forseti.services.inventory.storage import initialize
 from google.cloud.forseti.services.inventory.base.progress import Progresser
 from google.cloud.forseti.services.inventory.base.storage import Memory as MemoryStorage
+from google.cloud.forseti.services.inventory.crawler import PriorityExecutor
 from google.cloud.forseti.services.inventory.crawler import run_crawler
 
 LOGGER = logger.get_logger(__name__)
@@ -483,6 +484,70 @@ class CrawlerTest(CrawlerBase):
 
         self.assertEqual(expected_counts, result_counts)
 
+    def test_crawling_with_bucket_prefetch(self):
+        """Crawl with the buckets of the projects fetched together."""
+        config = InventoryConfig(
+            gcp_api_mocks.ORGANIZATION_ID,
+            '',
+            {'storage': {'prefetch_buckets': True}},
+            '',
+            {})
+        config.set_service_config(FakeServerConfig('mock_engine'))
+
+        with MemoryStorage() as storage:
+            progresser = NullProgresser()
+            with gcp_api_mocks.mock_gcp() as gcp_mocks:
+                run_crawler(storage,
+                            progresser,
+                            config,
+                            parallel=True)
+                prefetched_projects = [
+                    project_number
+                    for call in (
+                        gcp_mocks.mock_storage.get_buckets_for_projects
+                        .call_args_list)
+                    for project_number in call[0][0]]
+                listed_projects = [
+                    call[0][0]
+                    for call in gcp_mocks.mock_storage.get_buckets.call_args_list]
+
+            self.assertEqual(0, progresser.errors)
+            self.assertEqual(GCP_API_RESOURCES,
+                             self._get_resource_counts_from_storage(storage))
+        # The prefetched buckets are only listed again for the projects
+        # listed twice by their parent.
+        self.assertTrue(prefetched_projects)
+        for project_number in listed_projects:
+            self.assertNotEqual(1, prefetched_projects.count(project_number))
+
+    @mock.patch('google.cloud.forseti.services.inventory.base.gcp.'
+                'MAX_PREFETCHED_BUCKET_PROJECTS', 1)
+    def test_crawling_with_bucket_prefetch_limit(self):
+        """Crawl keeping the prefetched buckets of a single project."""
+        config = InventoryConfig(
+            gcp_api_mocks.ORGANIZATION_ID,
+            '',
+            {'storage': {'prefetch_buckets': True}},
+            '',
+            {})
+        config.set_service_config(FakeServerConfig('mock_engine'))
+
+        with MemoryStorage() as storage:
+            progresser = NullProgresser()
+            with gcp_api_mocks.mock_gcp() as gcp_mocks:
+                run_crawler(storage,
+                            progresser,
+                            config,
+                            parallel=True)
+                self.assertTrue(
+                    gcp_mocks.mock_storage.get_buckets_for_projects.called)
+                # The dropped buckets are listed when their project is.
+                self.assertTrue(gcp_mocks.mock_storage.get_buckets.called)
+
+            self.assertEqual(0, progresser.errors)
+            self.assertEqual(GCP_API_RESOURCES,
+                             self._get_resource_counts_from_storage(storage))
+
 
 class CloudAssetCrawlerTest(CrawlerBase):
     """Test CloudAsset integration with crawler."""
@@ -765,5 +830,50 @@ class CloudAssetCrawlerTest(CrawlerBase):
         self.assertEqual(expected_counts, result_counts)
 
 
+class PriorityExecutorTest(unittest_utils.ForsetiTestCase):
+    """Test the crawler thread pool."""
+
+    def test_runs_lowest_priority_first(self):
+        """Queued callbacks run by priority, then in submission order."""
+        executor = PriorityExecutor(1)
+        order = []
+        executor.submit(lambda: order.append('a'), (1, 0))
+        executor.submit(lambda: order.append('b'), (1, -5))
+        executor.submit(lambda: order.append('c'), (0, 0))
+        executor.submit(lambda: order.append('d'), (1, 0))
+        executor.start()
+        executor.wait()
+        executor.shutdown()
+
+        self.assertEqual(['c', 'b', 'a', 'd'], order)
+        self.assertEqual(4, executor.stats[0]['tasks'])
+
+    def test_wait_includes_nested_callbacks(self):
+        """Wait returns once callbacks submitted by callbacks also ran."""
+        executor = PriorityExecutor(4)
+        results = []
+
+        def crawl(depth):
+            results.append(depth)
+            if depth < 3:
+                for _ in range(2):
+                    executor.submit(lambda: crawl(depth + 1))
+
+        def fail():
+            raise ValueError('failed')
+
+        executor.start()
+        executor.submit(fail)
+        executor.submit(lambda: crawl(0))
+        executor.wait()
+        executor.shutdown()
+
+        self.assertEqual(15, len(results))
+        self.assertEqual(16, sum(stats['tasks'] for stats in executor.stats))
+        for stats in executor.stats:
+            self.assertGreaterEqual(stats['busy_seconds'], 0)
+            self.assertGreaterEqual(stats['idle_seconds'], 0)
+
+
 if __name__ == '__main__':
     unittest.main()
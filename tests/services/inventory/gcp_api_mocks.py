@@ -472,10 +472,16 @@ def _mock_gcs():
             return results.GCS_GET_OBJECT_IAM[bucket_name][object_name]
         return {}
 
+    def _mock_gcs_get_buckets_for_projects(projectids, raise_errors=True):
+        return {projectid: _mock_gcs_get_buckets(projectid)
+                for projectid in projectids}
+
     gcs_patcher = mock.patch(
         MODULE_PATH + 'storage.StorageClient', spec=True)
     mock_gcs = gcs_patcher.start().return_value
     mock_gcs.get_buckets.side_effect = _mock_gcs_get_buckets
+    mock_gcs.get_buckets_for_projects.side_effect = (
+        _mock_gcs_get_buckets_for_projects)
     mock_gcs.get_objects.side_effect = _mock_gcs_get_objects
     mock_gcs.get_bucket_iam_policy.side_effect = _mock_gcs_get_bucket_iam
     mock_gcs.get_object_iam_policy.side_effect = _mock_gcs_get_object_iam
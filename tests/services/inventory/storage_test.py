@@ -31,9 +31,14 @@ from google.cloud.forseti.services import db
 from google.cloud.forseti.services.inventory.base.resources import Resource
 from google.cloud.forseti.services.inventory.base.gcp import AssetMetadata
 from google.cloud.forseti.services.inventory.storage import CaiDataAccess
+from google.cloud.forseti.services.inventory.storage import Categories
+from google.cloud.forseti.services.inventory.storage import ConcurrentDbWriter
 from google.cloud.forseti.services.inventory.storage import ContentTypes
+from google.cloud.forseti.services.inventory.storage import DataAccess
 from google.cloud.forseti.services.inventory.storage import initialize
+from google.cloud.forseti.services.inventory.storage import Inventory
 from google.cloud.forseti.services.inventory.storage import InventoryIndex
+from google.cloud.forseti.services.inventory.storage import ROW_ID_BLOCK_SIZE
 from google.cloud.forseti.services.inventory.storage import Storage
 
 
@@ -252,6 +257,195 @@ class StorageTest(ForsetiTestCase):
                                  'No types should yield empty list')
 
 
+    def test_write_generates_row_ids(self):
+        """Resource rows are buffered with client generated row ids."""
+        engine = create_test_engine()
+
+        initialize(engine)
+        scoped_sessionmaker = db.create_scoped_sessionmaker(engine)
+
+        res_org = ResourceMock('1', {'id': 'test'}, 'organization', 'resource')
+        res_proj = ResourceMock('2', {'id': 'test'}, 'project', 'resource',
+                                res_org)
+
+        with scoped_sessionmaker() as session:
+            with Storage(session) as storage:
+                storage.write(res_org)
+                storage.write(res_proj)
+                self.assertEqual([], self.reduced_inventory(storage, []))
+                self.assertEqual(res_org.inventory_key(),
+                                 storage._get_resource_id(res_org))
+
+                storage.commit()
+                rows = self.reduced_inventory(storage, [])
+                self.assertEqual([res_org.inventory_key(),
+                                  res_proj.inventory_key()],
+                                 [row.id for row in rows])
+                self.assertEqual(res_org.inventory_key(),
+                                 rows[1].get_parent_id())
+                last_id = rows[1].id
+
+        res_org = ResourceMock('1', {'id': 'test'}, 'organization', 'resource')
+        with scoped_sessionmaker() as session:
+            with Storage(session) as storage:
+                storage.write(res_org)
+                storage.commit()
+                self.assertGreater(res_org.inventory_key(), last_id)
+
+    def test_row_ids_skip_rows_of_other_writers(self):
+        """Row ids are not reused across storages and other writers."""
+        engine = create_test_engine()
+
+        initialize(engine)
+        scoped_sessionmaker = db.create_scoped_sessionmaker(engine)
+
+        first = ResourceMock('1', {'id': 'test'}, 'organization', 'resource')
+        with scoped_sessionmaker() as session:
+            with Storage(session) as storage:
+                storage.write(first)
+                storage.commit()
+
+        # A row inserted without reserving an id, e.g. by an older server.
+        external_id = first.inventory_key() + 5 * ROW_ID_BLOCK_SIZE
+        with scoped_sessionmaker() as session:
+            session.execute(Inventory.__table__.insert().values(
+                id=external_id,
+                inventory_index_id=0,
+                category=Categories.resource,
+                resource_type='organization',
+                resource_id='external',
+                resource_data='{}'))
+            session.commit()
+
+        second = ResourceMock('1', {'id': 'test'}, 'organization', 'resource')
+        third = ResourceMock('1', {'id': 'test'}, 'organization', 'resource')
+        with scoped_sessionmaker() as session:
+            with Storage(session) as storage:
+                storage.write(second)
+                storage.commit()
+        with scoped_sessionmaker() as session:
+            with Storage(session) as storage:
+                storage.write(third)
+                storage.commit()
+
+        self.assertGreater(second.inventory_key(), external_id)
+        self.assertGreater(third.inventory_key(), second.inventory_key())
+
+
+    def test_iter_all(self):
+        """Rows of all categories are read in a single ordered scan."""
+        engine = create_test_engine()
+
+        initialize(engine)
+        scoped_sessionmaker = db.create_scoped_sessionmaker(engine)
+
+        res_org = ResourceMock('1', {'id': 'test'}, 'organization', 'resource')
+        res_proj = ResourceMock('2', {'id': 'test'}, 'project', 'resource',
+                                res_org)
+        res_proj.get_iam_policy = lambda client=None: {'bindings': []}
+        res_buc = ResourceMock('3', {'id': 'test'}, 'bucket', 'resource',
+                               res_proj)
+
+        with scoped_sessionmaker() as session:
+            with Storage(session) as storage:
+                for resource in [res_org, res_proj, res_buc]:
+                    storage.write(resource)
+                storage.commit()
+
+                rows = list(storage.iter_all())
+                self.assertEqual(sorted(row.id for row in rows),
+                                 [row.id for row in rows])
+                self.assertEqual(
+                    [('resource', 'organization'),
+                     ('resource', 'project'),
+                     ('iam_policy', 'project'),
+                     ('resource', 'bucket')],
+                    [(row.get_category(), row.get_resource_type())
+                     for row in rows])
+
+    def test_get_child_counts(self):
+        """Children are counted per resource in the last full inventory."""
+        engine = create_test_engine()
+
+        initialize(engine)
+        scoped_sessionmaker = db.create_scoped_sessionmaker(engine)
+
+        res_org = ResourceMock('1', {'id': 'test'}, 'organization', 'resource')
+        res_proj1 = ResourceMock('2', {'id': 'p1'}, 'project', 'resource',
+                                 res_org)
+        res_buc1 = ResourceMock('3', {'id': 'b1'}, 'bucket', 'resource',
+                                res_proj1)
+        res_buc2 = ResourceMock('4', {'id': 'b2'}, 'bucket', 'resource',
+                                res_proj1)
+        res_proj2 = ResourceMock('5', {'id': 'p2'}, 'project', 'resource',
+                                 res_org)
+
+        with scoped_sessionmaker() as session:
+            with Storage(session) as storage:
+                self.assertEqual({}, storage.get_child_counts(['project']))
+                for resource in [res_org, res_proj1, res_buc1, res_buc2,
+                                 res_proj2]:
+                    storage.write(resource)
+                storage.commit()
+
+        with scoped_sessionmaker() as session:
+            with Storage(session) as storage:
+                self.assertEqual({'project/2': 2},
+                                 storage.get_child_counts(['project']))
+                self.assertEqual({'organization/1': 2},
+                                 storage.get_child_counts(['organization']))
+                storage.rollback()
+
+    def test_rollback_deletes_rows_in_batches(self):
+        """Rows committed for a failed inventory are deleted in batches."""
+        engine = create_test_engine()
+
+        initialize(engine)
+        scoped_sessionmaker = db.create_scoped_sessionmaker(engine)
+
+        with scoped_sessionmaker() as session:
+            with Storage(session) as storage:
+                index_id = storage.inventory_index.id
+                session.execute(Inventory.__table__.insert(), [
+                    {'id': i,
+                     'inventory_index_id': index_id,
+                     'category': Categories.resource,
+                     'resource_type': 'project',
+                     'resource_id': str(i)} for i in range(1, 8)])
+                session.commit()
+
+                with mock.patch.object(session, 'commit',
+                                       wraps=session.commit) as commit:
+                    storage._delete_rows(batch_size=3)
+                    self.assertEqual(3, commit.call_count)
+                self.assertEqual([], self.reduced_inventory(storage, []))
+                storage.rollback()
+
+
+    def test_concurrent_writer(self):
+        """Rows written by writer threads are visible after a flush."""
+        engine, dbfile = create_test_engine_with_file()
+        try:
+            initialize(engine)
+            writer = ConcurrentDbWriter(sessionmaker(bind=engine),
+                                        threads=2,
+                                        max_size=8)
+            for i in range(1, 50):
+                writer.add(Inventory(id=i,
+                                     inventory_index_id=1,
+                                     category=Categories.resource,
+                                     resource_type='project',
+                                     resource_id=str(i)))
+            writer.flush()
+            self.assertEqual(49, writer.session.query(Inventory).count())
+
+            writer.add(Inventory(id=1, inventory_index_id=1))
+            with self.assertRaises(Exception):
+                writer.close()
+        finally:
+            os.unlink(dbfile)
+
+
 class InventoryIndexTest(ForsetiTestCase):
     """Test inventory storage."""
 
@@ -321,6 +515,168 @@ class InventoryIndexTest(ForsetiTestCase):
         self.assertEqual({}, details)
 
 
+class IncrementalStorageTest(ForsetiTestCase):
+    """Test incremental inventory storage."""
+
+    def setUp(self):
+        """Setup method."""
+        ForsetiTestCase.setUp(self)
+        self.engine, self.dbfile = create_test_engine_with_file()
+        _session_maker = sessionmaker()
+        self.session = _session_maker(bind=self.engine)
+        initialize(self.engine)
+
+    def tearDown(self):
+        """Tear down method."""
+        os.unlink(self.dbfile)
+        ForsetiTestCase.tearDown(self)
+
+    def _crawl(self, resources, max_incremental_inventories=6):
+        storage = Storage(
+            self.session,
+            incremental=True,
+            max_incremental_inventories=max_incremental_inventories)
+        storage.open()
+        for resource in resources:
+            storage.write(resource)
+        storage.commit()
+        return storage.inventory_index
+
+    @staticmethod
+    def _org_resources(proj1_data=None, bucket1_parent='proj1',
+                       with_proj2=True, with_proj3=False):
+        res_org = ResourceMock('1', {'id': 'org'}, 'organization',
+                               'resource')
+        res_proj1 = ResourceMock('2', proj1_data or {'id': 'proj1'},
+                                 'project', 'resource', res_org)
+        setattr(res_proj1, '__cached_iam_policy',
+                {'bindings': [], 'etag': str(proj1_data)})
+        resources = {'org': res_org, 'proj1': res_proj1}
+        if with_proj3:
+            resources['proj3'] = ResourceMock('8', {'id': 'proj3'}, 'project',
+                                              'resource', res_org)
+        resources['bucket1'] = ResourceMock(
+            '3', {'id': 'bucket1'}, 'bucket', 'resource',
+            resources[bucket1_parent])
+        resources['object1'] = ResourceMock(
+            '4', {'id': 'object1'}, 'object', 'resource',
+            resources['bucket1'])
+        if with_proj2:
+            resources['proj2'] = ResourceMock('5', {'id': 'proj2'}, 'project',
+                                              'resource', res_org)
+            resources['bucket2'] = ResourceMock(
+                '6', {'id': 'bucket2'}, 'bucket', 'resource',
+                resources['proj2'])
+        order = ['org', 'proj1', 'proj3', 'bucket1', 'object1', 'proj2',
+                 'bucket2']
+        return [resources[name] for name in order if name in resources]
+
+    def _assert_parents_first(self, storage):
+        yielded_ids = set()
+        parents = {}
+        for row in storage.iter():
+            if row.get_parent_id():
+                self.assertIn(row.get_parent_id(), yielded_ids)
+            yielded_ids.add(row.id)
+            parents[row.get_resource_id()] = row.get_parent_id()
+        return parents
+
+    def test_unchanged_inventory_stores_no_rows(self):
+        """An unchanged crawl only references the full inventory."""
+        full_index = self._crawl(self._org_resources())
+        self.assertIsNone(full_index.base_inventory_index_id)
+
+        incremental_index = self._crawl(self._org_resources())
+        self.assertEqual(full_index.id,
+                         incremental_index.base_inventory_index_id)
+        self.assertEqual(0, incremental_index.counter)
+
+        with Storage(self.session,
+                     existing_id=incremental_index.id,
+                     readonly=True) as storage:
+            self.assertEqual(6, len([row for row in storage.iter()]))
+            self.assertEqual(1, len(list(
+                storage.iter(fetch_iam_policy=True))))
+            self.assertEqual('organization', storage.get_root().resource_type)
+        self.assertEqual({'bucket': 2, 'object': 1, 'organization': 1,
+                          'project': 2},
+                         incremental_index.get_summary(self.session))
+
+    def test_incremental_inventory_rebuilds_full_view(self):
+        """Changed, moved, added and deleted resources are merged."""
+        full_index = self._crawl(self._org_resources())
+        incremental_index = self._crawl(self._org_resources(
+            proj1_data={'id': 'proj1', 'labels': {'env': 'prod'}},
+            bucket1_parent='proj3', with_proj2=False, with_proj3=True))
+
+        self.assertEqual(full_index.id,
+                         incremental_index.base_inventory_index_id)
+        # proj1 and its policy changed, proj3 is new, bucket1 moved and
+        # proj2 and bucket2 were deleted.
+        self.assertEqual(6, incremental_index.counter)
+
+        with Storage(self.session,
+                     existing_id=incremental_index.id,
+                     readonly=True) as storage:
+            parents = self._assert_parents_first(storage)
+            self.assertEqual(['1', '2', '3', '4', '8'], sorted(parents))
+            ids = {row.get_resource_id(): row.id for row in storage.iter()}
+            self.assertEqual(ids['8'], parents['3'])
+
+            proj1 = list(storage.iter(['project']))[0]
+            self.assertEqual({'id': 'proj1', 'labels': {'env': 'prod'}},
+                             proj1.get_resource_data())
+            policies = list(storage.iter(fetch_iam_policy=True))
+            self.assertEqual(1, len(policies))
+            self.assertEqual(proj1.id, policies[0].get_parent_id())
+
+            children = [(child.get_resource_id(), parent.get_resource_id())
+                        for child, parent in storage.iter(
+                            ['bucket', 'object'], with_parent=True)]
+            self.assertEqual([('3', '8'), ('4', '3')], children)
+
+        self.assertEqual({'bucket': 1, 'object': 1, 'organization': 1,
+                          'project': 2},
+                         incremental_index.get_summary(self.session))
+
+        # The full inventory is left untouched.
+        with Storage(self.session,
+                     existing_id=full_index.id,
+                     readonly=True) as storage:
+            self.assertEqual(6, len(list(storage.iter())))
+
+    def test_full_inventory_after_max_incremental_inventories(self):
+        """A new full inventory is taken once the limit is reached."""
+        full_index = self._crawl(self._org_resources(),
+                                 max_incremental_inventories=1)
+        incremental_index = self._crawl(self._org_resources(),
+                                        max_incremental_inventories=1)
+        next_index = self._crawl(self._org_resources(),
+                                 max_incremental_inventories=1)
+
+        self.assertEqual(full_index.id,
+                         incremental_index.base_inventory_index_id)
+        self.assertIsNone(next_index.base_inventory_index_id)
+        self.assertEqual(7, next_index.counter)
+
+    def test_delete_base_inventory(self):
+        """A full inventory is only deleted after its incremental ones."""
+        full_index = self._crawl(self._org_resources())
+        incremental_index = self._crawl(self._org_resources())
+
+        with self.assertRaises(Exception):
+            DataAccess.delete(self.session, full_index.id)
+
+        cutoff = incremental_index.created_at_datetime
+        self.assertEqual(
+            [], DataAccess.get_inventory_indexes_older_than_cutoff(
+                self.session, cutoff))
+
+        DataAccess.delete(self.session, incremental_index.id)
+        DataAccess.delete(self.session, full_index.id)
+        self.assertEqual([], list(DataAccess.list(self.session)))
+
+
 class CaiTemporaryStoreTest(ForsetiTestCase):
     """Test the CaiTemporaryStore table and DAO."""
 
@@ -351,6 +707,44 @@ class CaiTemporaryStoreTest(ForsetiTestCase):
         self._add_resources()
         self._add_iam_policies()
 
+    def test_bulk_load_cai_data(self):
+        """Validate CAI data bulk insert matches the ORM insert path."""
+        rows = CaiDataAccess.bulk_load_cai_data(
+            StringIO(CAI_RESOURCE_DATA), self.session)
+        self.assertEqual(len(CAI_RESOURCE_DATA.split('\n')), rows)
+        rows = CaiDataAccess.bulk_load_cai_data(
+            StringIO(CAI_IAM_POLICY_DATA), self.session)
+        self.assertEqual(len(CAI_IAM_POLICY_DATA.split('\n')), rows)
+
+        results = CaiDataAccess.iter_cai_assets(
+            ContentTypes.resource,
+            'cloudresourcemanager.googleapis.com/Folder',
+            '//cloudresourcemanager.googleapis.com/organizations/1234567890',
+            self.session)
+        self.assertEqual(['folders/11111'],
+                         [asset['name'] for asset, _ in results])
+
+        asset, _ = CaiDataAccess.fetch_cai_asset(
+            ContentTypes.iam_policy,
+            'cloudresourcemanager.googleapis.com/Organization',
+            '//cloudresourcemanager.googleapis.com/organizations/1234567890',
+            self.session)
+        self.assertEqual('BwVvLqcT+M4=', asset['etag'])
+
+    def test_bulk_load_cai_data_small_packet(self):
+        """Validate bulk insert splits batches at the max packet size."""
+        with mock.patch('google.cloud.forseti.services.inventory.storage.'
+                        'MAX_ALLOWED_PACKET', 1024):
+            with mock.patch.object(self.session, 'commit',
+                                   wraps=self.session.commit) as mock_commit:
+                rows = CaiDataAccess.bulk_load_cai_data(
+                    StringIO(CAI_RESOURCE_DATA), self.session)
+        expected_rows = len(CAI_RESOURCE_DATA.split('\n'))
+        self.assertEqual(expected_rows, rows)
+        # Every row is larger than a quarter of the packet size, so each one
+        # is committed in its own batch.
+        self.assertEqual(expected_rows, mock_commit.call_count)
+
     def test_clear_cai_data(self):
         """Validate CAI data delete."""
         self._add_resources()
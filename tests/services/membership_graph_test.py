@@ -0,0 +1,133 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Unit Tests: In-memory membership graph for Forseti Server."""
+
+import unittest
+from tests.unittest_utils import ForsetiTestCase
+from google.cloud.forseti.services.membership_graph import MembershipGraph
+
+EDGES = [
+    ('group/g1', 'user/u1'),
+    ('group/g2', 'group/g1'),
+    ('group/g2', 'user/u2'),
+    ('group/g3', 'group/g2'),
+    ('group/g3', 'projectviewer/p1'),
+    ('projectviewer/p1', 'user/u3'),
+    # g4 and g5 contain each other.
+    ('group/g4', 'group/g5'),
+    ('group/g5', 'group/g4'),
+    ('group/g5', 'group/g3'),
+    ('group/g6', 'group/g6'),
+]
+
+
+def is_group(name):
+    """Whether the member name is a group.
+
+    Args:
+        name (str): Member name.
+
+    Returns:
+        bool: True for groups.
+    """
+    return name.startswith('group/')
+
+
+class MembershipGraphTest(ForsetiTestCase):
+    """Test the in-memory membership graph."""
+
+    def setUp(self):
+        """Setup."""
+        self.graph = MembershipGraph(EDGES)
+
+    def test_size(self):
+        """Test the member and edge counts."""
+        self.assertEqual(10, len(self.graph))
+        self.assertEqual(len(EDGES), self.graph.edge_count)
+
+    def test_expand(self):
+        """Test expanding members towards their transitive members."""
+        self.assertEqual(
+            {'group/g2', 'group/g1', 'user/u1', 'user/u2', 'user/missing'},
+            self.graph.expand(['group/g2', 'user/missing'], is_group))
+        # projectviewer/p1 is not expanded.
+        self.assertEqual(
+            {'group/g3', 'group/g2', 'group/g1', 'user/u1', 'user/u2',
+             'projectviewer/p1'},
+            self.graph.expand(['group/g3'], is_group))
+
+    def test_expand_members(self):
+        """Test the transitive members of a group."""
+        self.assertEqual({'group/g1', 'user/u1', 'user/u2'},
+                         self.graph.expand_members('group/g2', is_group))
+        self.assertEqual({'group/g4', 'group/g5', 'group/g3', 'group/g2',
+                          'group/g1', 'projectviewer/p1', 'user/u1',
+                          'user/u2'},
+                         self.graph.expand_members('group/g4', is_group))
+        self.assertEqual(set(), self.graph.expand_members('user/u1',
+                                                          is_group))
+        self.assertEqual(set(), self.graph.expand_members('group/missing',
+                                                          is_group))
+
+    def test_reverse_expand(self):
+        """Test expanding members towards their groups."""
+        edges = {}
+        self.assertEqual(
+            {'user/u3', 'projectviewer/p1', 'group/g3', 'group/g5',
+             'group/g4'},
+            self.graph.reverse_expand(['user/u3'], edges))
+        self.assertEqual({'user/u3': {'projectviewer/p1'},
+                          'projectviewer/p1': {'group/g3'},
+                          'group/g3': {'group/g5'},
+                          'group/g5': {'group/g4'},
+                          'group/g4': {'group/g5'}},
+                         edges)
+
+    def test_transitive_closure(self):
+        """Test the closure of the group subgraph."""
+        expected = {
+            ('group/g2', 'group/g1'),
+            ('group/g3', 'group/g2'),
+            ('group/g3', 'group/g1'),
+            ('group/g6', 'group/g6'),
+        }
+        for group in ['group/g4', 'group/g5']:
+            for member in ['group/g1', 'group/g2', 'group/g3', 'group/g4',
+                           'group/g5']:
+                expected.add((group, member))
+
+        closure = list(self.graph.transitive_closure(is_group))
+        self.assertEqual(len(expected), len(closure))
+        self.assertEqual(expected, set(closure))
+
+    def test_transitive_closure_deep_nesting(self):
+        """Test that deep nesting does not hit the recursion limit."""
+        depth = 1500
+        graph = MembershipGraph(
+            ('group/g{}'.format(i), 'group/g{}'.format(i + 1))
+            for i in range(depth))
+        count = sum(1 for _ in graph.transitive_closure(is_group))
+        self.assertEqual(depth * (depth + 1) // 2, count)
+
+    def test_add_edge(self):
+        """Test adding a membership to the graph."""
+        self.graph.add_edge('group/g1', 'user/u4')
+        self.assertEqual(['user/u1', 'user/u4'],
+                         self.graph.children('group/g1'))
+        self.assertIn('user/u4',
+                      self.graph.expand_members('group/g3', is_group))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -187,6 +187,111 @@ class ImporterTest(ForsetiTestCase):
              },
             model_description)
 
+    def _import_model_tables(self, source):
+        """Import the test inventory and return the content of the model."""
+        model_name = self.model_manager.create(name=source.lower())
+        scoped_session, data_access = self.model_manager.get(model_name)
+        with scoped_session as session:
+            import_runner = importer.by_source(source)(
+                session,
+                session,
+                self.model_manager.model(model_name,
+                                         expunge=False,
+                                         session=session),
+                data_access,
+                self.service_config,
+                inventory_index_id=FAKE_DATETIME_TIMESTAMP)
+            import_runner.run()
+
+            resource = data_access.TBL_RESOURCE
+            tables = {
+                'resources': set(session.query(
+                    resource.full_name, resource.type_name,
+                    resource.parent_type_name, resource.name, resource.type,
+                    resource.display_name, resource.email, resource.data,
+                    resource.cai_resource_name, resource.cai_resource_type)),
+                'bindings': set(
+                    (b.resource_type_name, b.role_name,
+                     frozenset(m.name for m in b.members))
+                    for b in session.query(data_access.TBL_BINDING)),
+                'members': set(
+                    (m.name, m.type, m.member_name,
+                     frozenset(p.name for p in m.parents))
+                    for m in session.query(data_access.TBL_MEMBER)),
+                'roles': set(
+                    (r.name, r.title, r.custom,
+                     frozenset(p.name for p in r.permissions))
+                    for r in session.query(data_access.TBL_ROLE)),
+                'permissions': set(session.query(
+                    data_access.TBL_PERMISSION.name)),
+                'groups_settings': set(session.query(
+                    data_access.TBL_GROUPS_SETTINGS)),
+                'group_in_group': set(session.query(
+                    data_access.TBL_GROUP_IN_GROUP.parent,
+                    data_access.TBL_GROUP_IN_GROUP.member)),
+                'resource_ancestors': set(session.query(
+                    data_access.TBL_RESOURCE_ANCESTOR.ancestor_type_name,
+                    data_access.TBL_RESOURCE_ANCESTOR.resource_type_name,
+                    data_access.TBL_RESOURCE_ANCESTOR.depth)),
+            }
+        model = self.model_manager.model(model_name)
+        self.assertIn(model.state, ['SUCCESS', 'PARTIAL_SUCCESS'],
+                      model.message)
+        return tables
+
+    def test_bulk_inventory_importer_same_model(self):
+        """Test the bulk importer creates the same model as the importer."""
+        expected = self._import_model_tables('INVENTORY')
+        actual = self._import_model_tables('INVENTORY_BULK')
+
+        self.assertTrue(expected['bindings'])
+        self.assertTrue(expected['groups_settings'])
+        for table in expected:
+            self.assertEqual(expected[table], actual[table], table)
+
+
+    def test_spill_queue(self):
+        """Test that the spill queue returns the rows in order."""
+        queue = importer.SpillQueue(max_rows=2)
+        for i in range(1, 6):
+            queue.put(importer.InventoryRow(
+                id=i, resource_type='bucket', resource_id=str(i),
+                resource_data='{}', parent_id=i - 1))
+        self.assertEqual(5, len(queue))
+
+        rows = list(queue.drain())
+        self.assertEqual([1, 2, 3, 4, 5], [row.id for row in rows])
+        self.assertEqual([0, 1, 2, 3, 4], [row.get_parent_id() for row in rows])
+        self.assertEqual(0, len(queue))
+        self.assertEqual([], list(queue.drain()))
+
+    def test_waiting_rows_counted_as_imported(self):
+        """Only the waiting rows imported as items are counted."""
+        session = mock.Mock()
+        import_runner = self.importer_cls(
+            session,
+            session,
+            self.model_manager.model(self.model_name,
+                                     expunge=False,
+                                     session=session),
+            mock.MagicMock(),
+            self.service_config,
+            inventory_index_id=FAKE_DATETIME_TIMESTAMP)
+        rows = [importer.InventoryRow(
+            id=i, resource_type='gsuite_group_member', resource_id=str(i),
+            resource_data='{}', parent_id=0) for i in range(1, 4)]
+        inventory = mock.Mock()
+        inventory.iter_all.return_value = iter(rows)
+
+        with mock.patch.object(import_runner, '_is_waiting',
+                               return_value=True), \
+                mock.patch.object(import_runner, '_import_row',
+                                  side_effect=[1, 0, 0]), \
+                mock.patch.object(import_runner, '_convert_role_post'), \
+                mock.patch.object(import_runner,
+                                  '_store_gsuite_membership_post'):
+            self.assertEqual(1, import_runner._import_inventory(inventory))
+
     def test_model_action_wrapper_post_action_called(self):
         session = mock.Mock()
         session.flush = mock.Mock()
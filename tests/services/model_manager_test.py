@@ -17,9 +17,11 @@ from builtins import str
 from builtins import range
 import os
 import unittest
+import unittest.mock as mock
 from tests.unittest_utils import ForsetiTestCase
 from tests.services.util.db import create_test_engine_with_file
 from google.cloud.forseti.common.util.threadpool import ThreadPool
+from google.cloud.forseti.services.dao import create_engine
 from google.cloud.forseti.services.dao import ModelManager
 
 
@@ -65,6 +67,38 @@ class ModelManagerTest(ForsetiTestCase):
         self.assertEqual(0, len(self.model_manager.models()),
                          'Expecting no models to exist after deletion')
 
+    def test_get_readonly(self):
+        """Read-only sessions are bound to the read engine."""
+        read_engine = create_engine('sqlite:///{}'.format(self.dbfile))
+        model_manager = ModelManager(self.engine, read_engine)
+        handle = model_manager.create(name='test_model')
+        scoped_session, data_access = model_manager.get(handle)
+        with scoped_session as session:
+            data_access.add_member(session, 'user/u1')
+
+        readonly_session, _ = model_manager.get(handle, readonly=True)
+        with readonly_session as session:
+            self.assertIs(read_engine, session.bind)
+            self.assertEqual(
+                ['user/u1'],
+                [m.name for m in session.query(data_access.TBL_MEMBER)])
+            session.add(data_access.TBL_MEMBER(name='user/u2', type='user',
+                                               member_name='u2'))
+            session.flush()
+        with scoped_session as session:
+            self.assertEqual(
+                1, session.query(data_access.TBL_MEMBER).count())
+
+    def test_get_readonly_checks_hierarchy_once(self):
+        """Read-only sessions only open a write session on first use."""
+        handle = self.model_manager.create(name='test_model')
+        _, data_access = self.model_manager.get(handle, readonly=True)
+        with mock.patch.object(data_access,
+                               '_check_resource_hierarchy') as check:
+            for _ in range(3):
+                self.model_manager.get(handle, readonly=True)
+            check.assert_not_called()
+
     @unittest.skip("Concurrent access leads to memory corruption.")
     def test_concurrent_access(self):
         """Start with no models, create multiple, delete them again, concurrent.
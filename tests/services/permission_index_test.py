@@ -0,0 +1,129 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Unit Tests: Index of the permissions of the roles for Forseti Server."""
+
+import unittest
+from tests.services import test_models
+from tests.services.model_tester import ModelCreator
+from tests.services.model_tester import ModelCreatorClient
+from tests.unittest_utils import ForsetiTestCase
+from google.cloud.forseti.services.dao import session_creator
+from google.cloud.forseti.services.permission_index import PermissionIndex
+
+ROLE_PERMISSIONS = [
+    ('roles/viewer', 'storage.get'),
+    ('roles/viewer', 'compute.get'),
+    ('roles/editor', 'storage.get'),
+    ('roles/editor', 'storage.set'),
+    ('roles/editor', 'compute.get'),
+    ('roles/storage.admin', 'storage.get'),
+    ('roles/storage.admin', 'storage.set'),
+    ('roles/storage.admin', 'storage.delete'),
+    ('organizations/1/roles/custom', 'compute.get'),
+]
+
+
+class PermissionIndexTest(ForsetiTestCase):
+    """Test the index of the permissions of the roles."""
+
+    def setUp(self):
+        """Setup."""
+        self.index = PermissionIndex(ROLE_PERMISSIONS)
+
+    def test_size(self):
+        """Test the role and permission counts."""
+        self.assertEqual(4, len(self.index))
+        self.assertEqual(4, self.index.permission_count)
+
+    def test_roles_by_permissions(self):
+        """Test the roles having all of the permissions."""
+        self.assertEqual(
+            {'roles/viewer', 'roles/editor', 'organizations/1/roles/custom'},
+            self.index.roles_by_permissions(['compute.get']))
+        self.assertEqual(
+            {'roles/editor', 'roles/storage.admin'},
+            self.index.roles_by_permissions(['storage.get', 'storage.set']))
+        self.assertEqual(
+            {'roles/editor'},
+            self.index.roles_by_permissions(['storage.set', 'compute.get']))
+        self.assertEqual(
+            set(), self.index.roles_by_permissions(['storage.get', 'missing']))
+        self.assertEqual(
+            {'roles/viewer', 'roles/editor', 'roles/storage.admin',
+             'organizations/1/roles/custom'},
+            self.index.roles_by_permissions([]))
+
+    def test_permissions_by_roles(self):
+        """Test the permissions of the roles by name and by prefix."""
+        self.assertEqual(
+            {('roles/viewer', 'storage.get'), ('roles/viewer', 'compute.get')},
+            set(self.index.permissions_by_roles(['roles/viewer', 'missing'],
+                                                [])))
+        self.assertEqual(
+            {('roles/storage.admin', 'storage.get'),
+             ('roles/storage.admin', 'storage.set'),
+             ('roles/storage.admin', 'storage.delete'),
+             ('organizations/1/roles/custom', 'compute.get')},
+            set(self.index.permissions_by_roles(
+                [], ['roles/s', 'organizations/'])))
+        # Names and prefixes must both match.
+        self.assertEqual(
+            {('roles/editor', 'storage.get'), ('roles/editor', 'storage.set'),
+             ('roles/editor', 'compute.get')},
+            set(self.index.permissions_by_roles(
+                ['roles/editor', 'organizations/1/roles/custom'],
+                ['roles/'])))
+        self.assertEqual(len(ROLE_PERMISSIONS),
+                         len(self.index.permissions_by_roles([], [''])))
+        self.assertEqual([], self.index.permissions_by_roles([], ['x']))
+
+
+class ModelPermissionIndexTest(ForsetiTestCase):
+    """Test the permission index of a model."""
+
+    def test_role_change(self):
+        """Test that the index is rebuilt after the roles changed."""
+        session_maker, data_access = session_creator('test')
+        session = session_maker()
+        client = ModelCreatorClient(session, data_access)
+        _ = ModelCreator(test_models.ROLES_PERMISSIONS_TESTING_1, client)
+
+        index = data_access.get_permission_index(session)
+        self.assertIs(index, data_access.get_permission_index(session))
+        self.assertEqual(set(), data_access.get_role_names_by_permission_names(
+            session, ['permission/new']))
+
+        data_access.add_role_by_name(session, 'role/new', ['permission/new'])
+        self.assertIsNot(index, data_access.get_permission_index(session))
+        self.assertEqual({'role/new'},
+                         data_access.get_role_names_by_permission_names(
+                             session, ['permission/new']))
+
+    def test_role_change_commit(self):
+        """Test that an index built before a role commit is dropped."""
+        session_maker, data_access = session_creator('test')
+        session = session_maker()
+        client = ModelCreatorClient(session, data_access)
+        _ = ModelCreator(test_models.ROLES_PERMISSIONS_TESTING_1, client)
+
+        for role_name in ['role/new1', 'role/new2', 'role/new3']:
+            data_access.add_role(session, role_name)
+            # Built concurrently, before the new role is committed.
+            index = data_access.get_permission_index(session)
+            session.commit()
+            self.assertIsNot(index, data_access.get_permission_index(session))
+
+
+if __name__ == '__main__':
+    unittest.main()
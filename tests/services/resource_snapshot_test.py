@@ -0,0 +1,117 @@
+# Copyright 2017 The Forseti Security Authors. All rights reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Unit Tests: Snapshot of the resources shared by the scanners."""
+
+import unittest
+import unittest.mock as mock
+
+from tests.services import test_models
+from tests.services.model_tester import ModelCreator
+from tests.services.model_tester import ModelCreatorClient
+from tests.unittest_utils import ForsetiTestCase
+from google.cloud.forseti.services.dao import session_creator
+
+
+class ScannerSnapshotTest(ForsetiTestCase):
+    """Test scanner_iter within a scanner snapshot."""
+
+    def setUp(self):
+        """Setup."""
+        session_maker, self.data_access = session_creator('test')
+        self.session = session_maker()
+        client = ModelCreatorClient(self.session, self.data_access)
+        _ = ModelCreator(test_models.COMPLEX_MODEL, client)
+
+    def _scan(self, resource_type, parent_type_name=None):
+        """Get the full names of the resources and their parents.
+
+        Args:
+            resource_type (str): type of the resources
+            parent_type_name (str): type_name of the parent
+
+        Returns:
+            set: (full name, parent full name) tuples.
+        """
+        return set((r.full_name, r.parent.full_name)
+                   for r in self.data_access.scanner_iter(
+                       self.session, resource_type, parent_type_name))
+
+    def test_same_resources(self):
+        """Test that the snapshot serves the same resources as the model."""
+        expected = self._scan('bucket')
+        expected_project2 = self._scan('bucket', 'project/project2')
+        self.assertEqual(2, len(expected))
+        self.assertEqual(1, len(expected_project2))
+
+        with self.data_access.scanner_snapshot() as snapshot:
+            self.assertEqual(expected, self._scan('bucket'))
+            self.assertEqual(expected_project2,
+                             self._scan('bucket', 'project/project2'))
+            self.assertEqual(set(), self._scan('bucket', 'project/missing'))
+            self.assertEqual(2, len(snapshot))
+            self.assertEqual(1, snapshot.stats['loads'])
+            self.assertEqual(2, snapshot.stats['hits'])
+
+            [resource] = list(self.data_access.scanner_iter(
+                self.session, 'vm'))
+            self.assertEqual('instance-1', resource.name)
+            self.assertEqual('project2', resource.parent.name)
+            with self.assertRaises(AttributeError):
+                resource.data = '{}'
+
+    def test_single_load(self):
+        """Test that each type is queried once by all of the scanners."""
+        with self.data_access.scanner_snapshot() as snapshot:
+            with mock.patch.object(self.session, 'query',
+                                   wraps=self.session.query) as query:
+                for _ in range(3):
+                    self._scan('bucket')
+                    self._scan('project')
+                self.assertEqual(2, query.call_count)
+            # Nested contexts share the snapshot.
+            with self.data_access.scanner_snapshot() as nested_snapshot:
+                self.assertIs(snapshot, nested_snapshot)
+            self.assertEqual(4, len(snapshot))
+
+        self.assertIsNone(self.data_access._scanner_snapshot)
+
+    def test_model_change(self):
+        """Test that a model change drops the loaded resources."""
+        with self.data_access.scanner_snapshot() as snapshot:
+            self._scan('bucket')
+            self.data_access.model_changed()
+            self.assertEqual(0, len(snapshot))
+
+    def test_model_change_while_loading(self):
+        """Test that resources loaded before a model change are dropped."""
+        with self.data_access.scanner_snapshot() as snapshot:
+            load = snapshot._load
+
+            def load_and_change(*args):
+                """Change the model once, while the first load runs."""
+                entry = load(*args)
+                if snapshot.stats['loads'] == 1:
+                    self.data_access.model_changed()
+                return entry
+
+            with mock.patch.object(snapshot, '_load',
+                                   side_effect=load_and_change):
+                self.assertEqual(2, len(self._scan('bucket')))
+            self.assertEqual(2, snapshot.stats['loads'])
+            self.assertEqual(1, snapshot.stats['discards'])
+            self.assertEqual(2, len(snapshot))
+
+
+if __name__ == '__main__':
+    unittest.main()
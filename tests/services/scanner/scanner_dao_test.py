@@ -104,7 +104,7 @@ class ScannerDaoTest(scanner_base_db.ScannerBaseDbTestCase):
                                          saved_key_value)
                     )
 
-    @mock.patch.object(scanner_dao, '_create_violation_hash')
+    @mock.patch.object(scanner_dao, '_hash_violation')
     def test_convert_sqlalchemy_object_to_dict(self, mock_violation_hash):
         mock_violation_hash.side_effect = [
             scanner_base_db.FAKE_VIOLATION_HASH,
@@ -168,7 +168,7 @@ class ScannerDaoTest(scanner_base_db.ScannerBaseDbTestCase):
                          len(scanner_base_db.FAKE_VIOLATIONS))
 
     def test_create_violation_hash_with_default_algorithm(self):
-        """Test _create_violation_hash."""
+        """Test _hash_violation."""
         test_hash = hashlib.new('sha512')
         test_hash.update(
             json.dumps(self.test_violation_full_name).encode() +
@@ -177,37 +177,38 @@ class ScannerDaoTest(scanner_base_db.ScannerBaseDbTestCase):
         )
         expected_hash = test_hash.hexdigest()
 
-        returned_hash = scanner_dao._create_violation_hash(
+        returned_hash = scanner_dao._hash_violation(
+            scanner_dao._new_violation_hash(),
             self.test_violation_full_name,
             self.test_inventory_data,
-            self.test_violation_data)
+            json.dumps(self.test_violation_data))
 
         self.assertEqual(expected_hash, returned_hash)
 
     @mock.patch.object(hashlib, 'new')
     def test_create_violation_hash_with_invalid_algorithm(self, mock_hashlib):
-        """Test _create_violation_hash with an invalid algorithm."""
+        """Test violations are not hashed with an invalid algorithm."""
         mock_hashlib.side_effect = ValueError
 
-        returned_hash = scanner_dao._create_violation_hash(
+        violation_hash = scanner_dao._new_violation_hash()
+        self.assertIsNone(violation_hash)
+        returned_hash = scanner_dao._hash_violation(
+            violation_hash,
             self.test_violation_full_name,
             self.test_inventory_data,
-            self.test_violation_data)
+            json.dumps(self.test_violation_data))
 
         self.assertEqual('', returned_hash)
 
-    @mock.patch.object(json, 'dumps')
-    def test_create_violation_hash_invalid_violation_data(self, mock_json):
-        """Test _create_violation_hash returns '' when it can't hash."""
+    def test_create_violation_hash_invalid_violation_data(self):
+        """Test _hash_violation returns '' when it can't hash."""
         expected_hash = ''
 
-        # Mock json.loads has an error, e.g. invalid violation_data data.:w
-        mock_json.side_effect = TypeError()
-
-        returned_hash = scanner_dao._create_violation_hash(
+        returned_hash = scanner_dao._hash_violation(
+            scanner_dao._new_violation_hash(),
             self.test_violation_full_name,
-            self.test_inventory_data,
-            self.test_violation_data)
+            set(['not serializable']),
+            json.dumps(self.test_violation_data))
 
         self.assertEqual(expected_hash, returned_hash)
 
@@ -215,22 +216,105 @@ class ScannerDaoTest(scanner_base_db.ScannerBaseDbTestCase):
         expected_hash = ('fc59c859e9a088d14627f363d629142920225c8b1ea40f2df8b45'
                          '0ff7296c3ad99addd6a1ab31b5b8ffb250e1f25f2a8a6ecf2068a'
                          'fd5f0c46bc2d810f720b9a')
-        returned_hash = scanner_dao._create_violation_hash(
+        returned_hash = scanner_dao._hash_violation(
+            scanner_dao._new_violation_hash(),
             self.test_violation_full_name,
             ['aaa', 'bbb', 'ccc'],
-            self.test_violation_data)
+            json.dumps(self.test_violation_data))
         self.assertEqual(expected_hash, returned_hash)
 
     def test_create_violation_hash_with_full_name_not_string(self):
         expected_hash = ('f8813c34ab225002fb2c04ee392691b4e37c9a0eee1a08b277c36'
                          'b7bb0309f9150a88231dbd3f4ec5e908a5a39a8e38515b8e532d5'
                          '09aa3220e71ab4844a0284')
-        returned_hash = scanner_dao._create_violation_hash(
+        returned_hash = scanner_dao._hash_violation(
+            scanner_dao._new_violation_hash(),
             None,
             self.test_inventory_data,
-            self.test_violation_data)
+            json.dumps(self.test_violation_data))
         self.assertEqual(expected_hash, returned_hash)
 
+    @mock.patch.object(scanner_dao, 'VIOLATION_BATCH_SIZE', 3)
+    def test_save_violations_in_batches(self):
+        """Test that a generator of violations is saved in batches."""
+        violations = ({'resource_id': 'fake_firewall_%s' % i,
+                       'resource_type': 'firewall_rule',
+                       'violation_type': 'FIREWALL_BLACKLIST_VIOLATION',
+                       'violation_data': {'index': i}}
+                      for i in range(7))
+        with mock.patch.object(self.session, 'execute',
+                               wraps=self.session.execute) as execute:
+            self.assertEqual(
+                7, self.violation_access.create(violations, 123))
+            self.assertEqual(3, execute.call_count)
+
+        saved = (self.session.query(scanner_dao.Violation)
+                 .order_by(scanner_dao.Violation.id).all())
+        self.assertEqual(['{"index": %s}' % i for i in range(7)],
+                         [v.violation_data for v in saved])
+        self.assertEqual(set([123]), set(v.scanner_index_id for v in saved))
+        self.assertEqual(set(['']), set(v.resource_name for v in saved))
+
+    def _populate_typed_violations(self, failed=[]):
+        """Populate the db with violations of notified types.
+
+        Args:
+            failed (list): names of scanners that failed
+
+        Returns:
+            str: the scanner index id
+        """
+        violation_types = ['IAM_POLICY_VIOLATION',
+                           'FIREWALL_BLACKLIST_VIOLATION',
+                           'IAM_POLICY_VIOLATION']
+        violations = [dict(scanner_base_db.FAKE_VIOLATIONS[i % 2],
+                           violation_type=violation_type)
+                      for i, violation_type in enumerate(violation_types)]
+        return self.populate_db(violations=violations,
+                                inv_index_id=self.inv_index_id1,
+                                succeeded=[] if failed else ['IamPolicyScanner'],
+                                failed=failed)
+
+    @mock.patch.object(scanner_dao, 'VIOLATION_FETCH_SIZE', 2)
+    def test_stream_violations(self):
+        """Test that the streamed violations are the listed violations."""
+        scanner_index_id = self._populate_typed_violations()
+        expected = [scanner_dao.convert_sqlalchemy_object_to_dict(v)
+                    for v in self.violation_access.list(
+                        scanner_index_id=scanner_index_id)]
+        for violation in expected:
+            violation['created_at_datetime'] = (
+                violation['created_at_datetime'].strftime(
+                    '%Y-%m-%dT%H:%M:%SZ'))
+            violation['violation_data'] = json.loads(
+                violation['violation_data'])
+
+        self.assertEqual(
+            expected, list(self.violation_access.stream(scanner_index_id)))
+        self.assertEqual(
+            [expected[0], expected[2]],
+            list(self.violation_access.stream(scanner_index_id,
+                                              ['IAM_POLICY_VIOLATION'])))
+        self.assertEqual(
+            {'IAM_POLICY_VIOLATION': 2, 'FIREWALL_BLACKLIST_VIOLATION': 1},
+            self.violation_access.count_by_type(scanner_index_id))
+
+        violations = scanner_dao.ViolationStream(
+            self.violation_access, scanner_index_id,
+            ['FIREWALL_BLACKLIST_VIOLATION'], 1)
+        self.assertEqual(1, len(violations))
+        self.assertEqual([expected[1]], list(violations))
+        self.assertEqual([expected[1]], list(violations))
+
+    def test_stream_violations_of_failed_scanner_run(self):
+        """Test that the violations of a failed scanner run are skipped."""
+        scanner_index_id = self._populate_typed_violations(
+            failed=['IamPolicyScanner'])
+        self.assertEqual(
+            [], list(self.violation_access.stream(scanner_index_id)))
+        self.assertEqual(
+            {}, self.violation_access.count_by_type(scanner_index_id))
+
     def test_get_latest_scanner_index_id_with_empty_table(self):
         """The method under test returns `None` if the table is empty."""
         self.assertIsNone(